@@ -0,0 +1,74 @@
+"""
+插件限制器后端基准测试
+
+用法:
+    python scripts/bench_limiter.py [--checks 100000] [--keys 1000] [--concurrency 50]
+
+设置 REDIS_HOST / REDIS_PORT / REDIS_PASSWORD 环境变量后会同时测试 redis 后端。
+"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from zhenxun.utils.limiters import LimitBackend, MemoryLimitBackend, RedisLimitBackend
+
+
+async def _bench(
+    backend: LimitBackend, kind: str, checks: int, keys: int, concurrency: int
+) -> float:
+    per_worker = checks // concurrency
+
+    async def worker(offset: int):
+        for i in range(per_worker):
+            key = (offset * per_worker + i) % keys
+            if kind == "cd":
+                await backend.acquire_cd("bench", key, 1)
+            elif kind == "count":
+                await backend.acquire_count("bench", key, 10)
+            else:
+                if await backend.acquire_block("bench", key, 30):
+                    await backend.release_block("bench", key)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    backends: list[LimitBackend] = [MemoryLimitBackend()]
+    client = None
+    if host := os.getenv("REDIS_HOST"):
+        import redis.asyncio as redis_async
+
+        client = redis_async.Redis(
+            host=host,
+            port=int(os.getenv("REDIS_PORT") or 6379),
+            password=os.getenv("REDIS_PASSWORD"),
+            decode_responses=True,
+        )
+        backends.append(RedisLimitBackend(client, prefix="ZHENXUN:LIMIT_BENCH"))
+
+    for backend in backends:
+        for kind in ("cd", "count", "block"):
+            rate = await _bench(backend, kind, args.checks, args.keys, args.concurrency)
+            print(f"{backend.name:<8}{kind:<8}{rate:>14,.0f} checks/s")  # noqa: T201
+    if client is not None:
+        async for key in client.scan_iter("ZHENXUN:LIMIT_BENCH:*"):
+            await client.delete(key)
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
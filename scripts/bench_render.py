@@ -0,0 +1,161 @@
+"""
+截图吞吐基准测试
+
+对比 nonebot-plugin-htmlrender 的 html_to_pic 方式（每次截图新建 context 与
+page）、PagePool 复用预热页面的方式以及 screenshot_many 批量截图，
+输出每秒截图数与延迟分位数。
+
+需要安装 playwright 与 chromium:
+    pip install playwright && playwright install chromium
+
+用法:
+    python scripts/bench_render.py [--renders 200] [--concurrency 4] [--rows 30]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 直接按文件加载，避免导入 zhenxun.services.renderer 时初始化 nonebot
+_spec = importlib.util.spec_from_file_location(
+    "page_pool", ROOT / "zhenxun" / "services" / "renderer" / "page_pool.py"
+)
+assert _spec
+assert _spec.loader
+page_pool = importlib.util.module_from_spec(_spec)
+sys.modules["page_pool"] = page_pool
+_spec.loader.exec_module(page_pool)
+
+VIEWPORT = {"viewport": {"width": 800, "height": 10}}
+
+
+def build_html(rows: int, seed: int) -> str:
+    body = "".join(
+        f"<tr><td>{n}</td><td>用户{seed}-{n}</td><td>{(seed * 31 + n) % 997}</td></tr>"
+        for n in range(rows)
+    )
+    return (
+        "<html><head><style>body{font-family:sans-serif;margin:16px}"
+        "table{border-collapse:collapse;width:100%}"
+        "td{border:1px solid #ccc;padding:4px 8px}</style></head>"
+        f"<body><h2>排行榜 {seed}</h2><table>{body}</table></body></html>"
+    )
+
+
+async def render_fresh(browser, html: str, base_url: str) -> bytes:
+    """与 html_to_pic 相同的流程"""
+    page = await browser.new_page(device_scale_factor=2, **VIEWPORT)
+    try:
+        await page.goto(base_url)
+        await page.set_content(html, wait_until="networkidle")
+        return await page.screenshot(full_page=True, type="png", timeout=30_000)
+    finally:
+        await page.close()
+
+
+async def run(render, count: int, concurrency: int, rows: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def _one(n: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await render(build_html(rows, n))
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(_one(n) for n in range(count)))
+    return latencies
+
+
+def report(name: str, latencies: list[float], elapsed: float):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(  # noqa: T201
+        f"{name:<10} {len(latencies) / elapsed:8.1f} renders/s"
+        f"  p50 {statistics.median(latencies) * 1000:7.1f}ms"
+        f"  p95 {p95 * 1000:7.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--max-renders", type=int, default=100)
+    args = parser.parse_args()
+
+    from playwright.async_api import async_playwright
+
+    base_url = Path(tempfile.gettempdir()).as_uri() + "/"
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+
+        async def get_browser():
+            return browser
+
+        pool = page_pool.PagePool(
+            get_browser,
+            warm_pages=args.concurrency,
+            max_pages=args.concurrency,
+            max_renders=args.max_renders,
+        )
+        await pool.warm(2, VIEWPORT)
+
+        async def render_pooled(html: str) -> bytes:
+            return await pool.screenshot(
+                html,
+                base_url,
+                device_scale_factor=2,
+                page_options=VIEWPORT,
+                full_page=True,
+                type="png",
+                timeout=30_000,
+            )
+
+        # 预热浏览器进程
+        await run(lambda html: render_fresh(browser, html, base_url), 4, 1, args.rows)
+        print(  # noqa: T201
+            f"截图 {args.renders} 次, 并发 {args.concurrency}, 表格 {args.rows} 行"
+        )
+        for name, render in (
+            ("fresh", lambda html: render_fresh(browser, html, base_url)),
+            ("pool", render_pooled),
+        ):
+            start = time.perf_counter()
+            latencies = await run(render, args.renders, args.concurrency, args.rows)
+            report(name, latencies, time.perf_counter() - start)
+        jobs = [
+            page_pool.ScreenshotJob(
+                build_html(args.rows, n),
+                base_url,
+                page_options=VIEWPORT,
+                screenshot_options={"full_page": True, "type": "png"},
+            )
+            for n in range(args.renders)
+        ]
+        start = time.perf_counter()
+        await pool.screenshot_many(jobs)
+        elapsed = time.perf_counter() - start
+        print(  # noqa: T201
+            f"{'batch':<10} {len(jobs) / elapsed:8.1f} renders/s"
+            f"  总耗时 {elapsed * 1000:7.1f}ms (单页面依次截图)"
+        )
+        stats = pool.stats
+        print(  # noqa: T201
+            f"页面池: 创建 {stats.created}, 回收 {stats.recycled},"
+            f" 丢弃 {stats.discarded}, 排队 {stats.wait_time:.2f}s"
+        )
+        await pool.close()
+        await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
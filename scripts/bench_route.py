@@ -0,0 +1,183 @@
+"""
+命令路由基准测试
+
+从插件源码中静态收集真实的命令、别名与快捷指令，
+对比旧的首字符索引逐条 startswith 匹配与前缀树单次遍历匹配。
+
+用法:
+    python scripts/bench_route.py [--messages 200000] [--miss-ratio 0.8]
+"""
+
+import argparse
+import ast
+from pathlib import Path
+import random
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from zhenxun.utils.command_trie import CommandTrie, command_head
+
+PLUGIN_PATHS = [ROOT / "zhenxun" / "builtin_plugins", ROOT / "zhenxun" / "plugins"]
+
+
+def _plugin_name(file: Path) -> str:
+    for base in PLUGIN_PATHS:
+        if file.is_relative_to(base):
+            return file.relative_to(base).parts[0].removesuffix(".py")
+    return file.stem
+
+
+def _str_values(node: ast.AST) -> list[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.Set | ast.List | ast.Tuple):
+        return [v for elt in node.elts for v in _str_values(elt)]
+    return []
+
+
+def collect_commands() -> tuple[dict[str, set[str]], dict[str, set[str]]]:
+    """收集 插件 -> 命令/别名 与 插件 -> 快捷指令"""
+    commands: dict[str, set[str]] = {}
+    shortcuts: dict[str, set[str]] = {}
+    for base in PLUGIN_PATHS:
+        for file in base.rglob("*.py"):
+            try:
+                tree = ast.parse(file.read_text(encoding="utf-8"))
+            except (SyntaxError, UnicodeDecodeError):
+                continue
+            module = _plugin_name(file)
+            for node in ast.walk(tree):
+                if not isinstance(node, ast.Call):
+                    continue
+                func = node.func
+                name = getattr(func, "id", None) or getattr(func, "attr", None)
+                if name == "Command":
+                    for kw in node.keywords:
+                        if kw.arg == "command":
+                            commands.setdefault(module, set()).update(
+                                command_head(v) for v in _str_values(kw.value)
+                            )
+                elif name == "PluginExtraData":
+                    for kw in node.keywords:
+                        if kw.arg == "aliases":
+                            commands.setdefault(module, set()).update(
+                                _str_values(kw.value)
+                            )
+                elif name == "shortcut" and node.args:
+                    shortcuts.setdefault(module, set()).update(
+                        _str_values(node.args[0])
+                    )
+    for command_set in commands.values():
+        command_set.discard("")
+    return commands, shortcuts
+
+
+def add_synthetic(commands: dict[str, set[str]], plugins: int):
+    """追加模拟插件，命令共享常见的中文开头，模拟大量插件的情况"""
+    rng = random.Random(1)
+    heads = ["我的", "查看", "开启", "关闭", "今日", "群", "查询", "设置", "每日", "抽"]
+    words = "金币道具签到好感排行信息状态功能列表帮助天气运势图片音乐商店背包"
+    for n in range(plugins):
+        commands[f"synthetic_{n}"] = {
+            rng.choice(heads) + "".join(rng.sample(words, rng.randint(2, 4)))
+            for _ in range(3)
+        }
+
+
+class PrefixMapRouter:
+    """旧实现：首字符 -> 命令集合，逐条 startswith 匹配"""
+
+    def __init__(self, commands: dict[str, set[str]]):
+        self.command_map: dict[str, set[str]] = {}
+        self.prefix_map: dict[str, set[str]] = {}
+        for module, command_set in commands.items():
+            for command in command_set:
+                if command := command.strip():
+                    self.command_map.setdefault(command, set()).add(module)
+                    self.prefix_map.setdefault(command[0], set()).add(command)
+
+    def match(self, text: str) -> set[str]:
+        text = text.strip()
+        if not text:
+            return set()
+        result: set[str] = set()
+        for command in self.prefix_map.get(text[0], ()):
+            if text.startswith(command) and (
+                len(text) == len(command) or text[len(command)].isspace()
+            ):
+                result.update(self.command_map[command])
+        return result
+
+
+def build_messages(
+    commands: dict[str, set[str]], count: int, miss_ratio: float
+) -> list[str]:
+    rng = random.Random(0)
+    command_list = sorted({c.strip() for cs in commands.values() for c in cs if c})
+    prefixes = sorted({c[0] for c in command_list})
+    chat = "今天天气不错我们去吃饭吧哈哈哈好的没问题在吗你好谢谢晚安早上好"
+    messages = []
+    for _ in range(count):
+        if rng.random() >= miss_ratio:
+            messages.append(f"{rng.choice(command_list)} {rng.randint(1, 100)}")
+        else:
+            # 与命令共享首字符的普通聊天，旧实现中最坏的情况
+            body = "".join(rng.choice(chat) for _ in range(rng.randint(2, 12)))
+            messages.append(rng.choice(prefixes) + body)
+    return messages
+
+
+def bench(match, messages: list[str]) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        match(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--miss-ratio", type=float, default=0.8)
+    parser.add_argument("--synthetic", type=int, default=0, help="追加的模拟插件数量")
+    args = parser.parse_args()
+
+    commands, shortcuts = collect_commands()
+    if args.synthetic:
+        add_synthetic(commands, args.synthetic)
+    command_count = sum(len(v) for v in commands.values())
+    shortcut_count = sum(len(v) for v in shortcuts.values())
+    print(  # noqa: T201
+        f"plugins: {len(commands)}, commands: {command_count},"
+        f" shortcuts: {shortcut_count}"
+    )
+
+    old = PrefixMapRouter(commands)
+    trie: CommandTrie[str] = CommandTrie()
+    literal_only: CommandTrie[str] = CommandTrie()
+    for module, command_set in commands.items():
+        for command in command_set:
+            trie.add(command, module)
+            literal_only.add(command, module)
+    for module, pattern_set in shortcuts.items():
+        for pattern in pattern_set:
+            try:
+                trie.add_pattern(pattern, module)
+            except Exception:
+                continue
+
+    messages = build_messages(commands, args.messages, args.miss_ratio)
+    mismatch = sum(old.match(m) != literal_only.match(m) for m in messages)
+    print(f"literal result mismatches: {mismatch}")  # noqa: T201
+    for name, match in (
+        ("prefix_map", old.match),
+        ("trie", literal_only.match),
+        ("trie+shortcut", trie.match),
+    ):
+        print(f"{name:<16}{bench(match, messages):>14,.0f} msgs/s")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
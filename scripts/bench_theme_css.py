@@ -0,0 +1,88 @@
+"""
+主题样式预编译基准测试
+
+模拟一次渲染遍历组件树加载样式：旧实现对每个组件实例都渲染一次样式模板，
+新实现在加载主题时预编译全部样式，渲染时只按路径取出并去重。
+输出预编译耗时与每次渲染的样式处理耗时、拼接后的CSS大小（未计入压缩）。
+
+需要安装 jinja2，并已下载主题资源。
+
+用法:
+    python scripts/bench_theme_css.py [--theme default] [--components 200]
+        [--themes-dir resources/themes]
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--theme", default="default")
+    parser.add_argument("--components", type=int, default=200)
+    parser.add_argument("--renders", type=int, default=50)
+    parser.add_argument(
+        "--themes-dir",
+        type=Path,
+        default=ROOT / "resources" / "themes",
+        help="主题资源目录，默认为 resources/themes",
+    )
+    args = parser.parse_args()
+
+    from jinja2 import Environment, FileSystemLoader
+
+    themes: Path = args.themes_dir
+    if not (themes / args.theme).is_dir():
+        sys.exit(f"主题目录不存在: {themes / args.theme}")
+    env = Environment(
+        loader=FileSystemLoader([str(themes / args.theme), str(themes / "default")]),
+        enable_async=True,
+    )
+    theme = {"name": args.theme, "palette": {}}
+    style_paths = [
+        p for p in env.list_templates(extensions=["css"]) if p.startswith("components/")
+    ]
+    if not style_paths:
+        sys.exit("主题中没有组件样式")
+    tree = [style_paths[n % len(style_paths)] for n in range(args.components)]
+
+    async def legacy() -> int:
+        css = [await env.get_template(path).render_async(theme=theme) for path in tree]
+        return len("".join(css))
+
+    start_time = time.perf_counter()
+    compiled = {
+        path: await env.get_template(path).render_async(theme=theme)
+        for path in style_paths
+    }
+    compile_time = time.perf_counter() - start_time
+
+    async def precompiled() -> int:
+        seen: set[str] = set()
+        css = []
+        for path in tree:
+            if path not in seen:
+                seen.add(path)
+                css.append(compiled[path])
+        return len("".join(css))
+
+    print(  # noqa: T201
+        f"样式 {len(style_paths)} 个, 预编译耗时 {compile_time * 1000:.1f}ms, "
+        f"每次渲染 {args.components} 个组件实例"
+    )
+    for name, func in (("legacy", legacy), ("compiled", precompiled)):
+        size = await func()
+        start_time = time.perf_counter()
+        for _ in range(args.renders):
+            await func()
+        elapsed = (time.perf_counter() - start_time) / args.renders
+        print(f"{name:<9} {elapsed * 1000:8.3f}ms/render  css {size} bytes")  # noqa: T201
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+
+async def test_render_cache_single_flight(tmp_path: Path) -> None:
+    """
+    测试相同键的并发渲染只执行一次
+    """
+    from zhenxun.services.renderer.cache import RenderCache, cache_key
+    from zhenxun.services.renderer.protocols import RenderResult
+
+    cache = RenderCache(tmp_path, memory_bytes=1024)
+    key = cache_key("theme", "1", "template", "{}")
+    calls = 0
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def render() -> RenderResult:
+        nonlocal calls
+        calls += 1
+        started.set()
+        await release.wait()
+        return RenderResult(image_bytes=b"png")
+
+    tasks = [asyncio.create_task(cache.get_or_render(key, render)) for _ in range(5)]
+    await started.wait()
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert all(result.image_bytes == b"png" for result in results)
+    assert cache.stats.misses == 1
+    assert cache.stats.coalesced == 4
+    assert cache.metrics()["inflight"] == 0
+
+    # 之后的请求直接命中内存缓存
+    result = await cache.get_or_render(key, render)
+    assert result.image_bytes == b"png"
+    assert calls == 1
+    assert cache.stats.memory_hits == 1
+
+
+async def test_render_cache_single_flight_error(tmp_path: Path) -> None:
+    """
+    测试渲染失败时所有等待者收到同一异常，且不写入缓存
+    """
+    from zhenxun.services.renderer.cache import RenderCache
+    from zhenxun.services.renderer.protocols import RenderResult
+
+    cache = RenderCache(tmp_path, memory_bytes=1024)
+    release = asyncio.Event()
+
+    async def render() -> RenderResult:
+        await release.wait()
+        raise RuntimeError("render failed")
+
+    tasks = [asyncio.create_task(cache.get_or_render("k", render)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await cache.get("k") is None
+    assert cache.metrics()["inflight"] == 0
+
+
+async def test_render_cache_single_flight_cancel(tmp_path: Path) -> None:
+    """
+    测试首个请求被取消时，渲染继续进行，其他等待者仍收到结果
+    """
+    from zhenxun.services.renderer.cache import RenderCache
+    from zhenxun.services.renderer.protocols import RenderResult
+
+    cache = RenderCache(tmp_path, memory_bytes=1024)
+    calls = 0
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def render() -> RenderResult:
+        nonlocal calls
+        calls += 1
+        started.set()
+        await release.wait()
+        return RenderResult(image_bytes=b"png")
+
+    leader = asyncio.create_task(cache.get_or_render("k", render))
+    await started.wait()
+    followers = [
+        asyncio.create_task(cache.get_or_render("k", render)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    release.set()
+    results = await asyncio.gather(*followers)
+
+    assert calls == 1
+    assert all(result.image_bytes == b"png" for result in results)
+    assert await cache.get("k") == b"png"
+    assert cache.metrics()["inflight"] == 0
+
+
+async def test_render_cache_memory_lru(tmp_path: Path) -> None:
+    """
+    测试内存缓存按字节预算淘汰最久未使用的条目
+    """
+    from zhenxun.services.renderer.cache import RenderCache
+
+    cache = RenderCache(tmp_path, memory_bytes=10)
+    await cache.set("a", b"aaaa")
+    await cache.set("b", b"bbbb")
+    assert await cache.get("a") == b"aaaa"
+    await cache.set("c", b"cccc")
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.metrics()["memory_bytes"] == 8
+    # 超出预算的单个条目不进入内存缓存
+    await cache.set("big", b"x" * 11)
+    assert "big" not in cache._memory
+
+    # 被淘汰的条目仍可从磁盘读取
+    assert await cache.get("b") == b"bbbb"
+    assert cache.stats.disk_hits == 1
+
+
+async def test_render_cache_disk_lru(tmp_path: Path) -> None:
+    """
+    测试磁盘缓存按字节预算淘汰，重启后按修改时间恢复使用顺序
+    """
+    from zhenxun.services.renderer.cache import RenderCache
+
+    cache = RenderCache(tmp_path, disk_bytes=10)
+    await cache.set("a", b"aaaa")
+    await cache.set("b", b"bbbb")
+    assert await cache.get("a") == b"aaaa"
+    await cache.set("c", b"cccc")
+
+    assert sorted(file.stem for file in tmp_path.glob("*.png")) == ["a", "c"]
+    assert cache.stats.evicted == 1
+    assert await cache.get("b") is None
+
+    os.utime(tmp_path / "c.png", ns=(1, 1))
+    restarted = RenderCache(tmp_path, disk_bytes=10)
+    await restarted.set("d", b"dddd")
+    assert sorted(file.stem for file in tmp_path.glob("*.png")) == ["a", "d"]
+
+
+@pytest.mark.parametrize("memory_bytes", [0, 1024])
+async def test_render_cache_missing_file(tmp_path: Path, memory_bytes: int) -> None:
+    """
+    测试磁盘文件被外部删除时视为未命中
+    """
+    from zhenxun.services.renderer.cache import RenderCache
+
+    cache = RenderCache(tmp_path, memory_bytes=memory_bytes)
+    await cache.set("a", b"aaaa")
+    cache.clear_memory()
+    (tmp_path / "a.png").unlink()
+
+    assert await cache.get("a") is None
+    assert cache.metrics()["disk_entries"] == 0
@@ -0,0 +1,40 @@
+import asyncio
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+
+async def test_render_many_batch_error(mocker: MockerFixture) -> None:
+    """
+    测试批量截图整体失败时，只有待截图的组件返回错误
+    """
+    from zhenxun.services.renderer.service import RendererService
+    from zhenxun.utils.exception import RenderingError
+
+    service = RendererService()
+    service._initialized = True
+    service._theme_manager = mocker.MagicMock()
+    engine = mocker.MagicMock()
+    engine.render_many = mocker.AsyncMock(side_effect=asyncio.TimeoutError("排队超时"))
+    service._screenshot_engine = engine
+
+    fast, slow, broken = object(), object(), object()
+
+    async def fast_path(context):
+        return b"fast" if context.component is fast else None
+
+    async def build_page(context):
+        if context.component is broken:
+            raise ValueError("template error")
+        return "<html></html>", Path(), {}
+
+    mocker.patch.object(service, "_render_fast_path", side_effect=fast_path)
+    mocker.patch.object(service, "_build_page", side_effect=build_page)
+
+    results = await service.render_many([fast, slow, broken])  # type: ignore
+
+    assert results[0] == b"fast"
+    assert isinstance(results[1], RenderingError)
+    assert isinstance(results[1].__cause__, asyncio.TimeoutError)
+    assert isinstance(results[2], RenderingError)
+    assert isinstance(results[2].__cause__, ValueError)
@@ -0,0 +1,198 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+
+def _item(
+    bot_id: str,
+    data: dict[str, Any],
+    priority: int = 0,
+    api: str = "send_group_msg",
+    enqueued: float | None = None,
+):
+    from zhenxun.services.send_queue import SendPriority, _SendItem, _target_key
+
+    return _SendItem(
+        bot=SimpleNamespace(self_id=bot_id),  # type: ignore
+        api=api,
+        data=data,
+        future=asyncio.get_running_loop().create_future(),
+        priority=SendPriority(priority),
+        target=_target_key(data),
+        enqueued=time.monotonic() if enqueued is None else enqueued,
+    )
+
+
+async def _drain(scheduler) -> list:
+    result = []
+    while scheduler.qsize():
+        result.append(await scheduler.get())
+    return result
+
+
+async def test_send_queue_fairness() -> None:
+    """
+    测试按 bot、目标轮询派发
+    """
+    from zhenxun.services.send_queue import SendScheduler
+
+    scheduler = SendScheduler(bot_rate=0, target_rate=0)
+    for n in range(3):
+        await scheduler.put(_item("a", {"group_id": 1, "message": f"a1-{n}"}))
+    await scheduler.put(_item("a", {"group_id": 2, "message": "a2-0"}))
+    await scheduler.put(_item("b", {"group_id": 3, "message": "b3-0"}))
+
+    items = await _drain(scheduler)
+    assert [item.data["message"] for item in items] == [
+        "a1-0",
+        "b3-0",
+        "a2-0",
+        "a1-1",
+        "a1-2",
+    ]
+    assert scheduler.stats()["bots"] == 0
+
+
+async def test_send_queue_priority() -> None:
+    """
+    测试高优先级消息先派发
+    """
+    from zhenxun.services.send_queue import SendPriority, SendScheduler
+
+    scheduler = SendScheduler(bot_rate=0, target_rate=0)
+    await scheduler.put(
+        _item("a", {"group_id": 1, "message": "broadcast"}, SendPriority.BROADCAST)
+    )
+    await scheduler.put(
+        _item("a", {"group_id": 1, "message": "scheduled"}, SendPriority.SCHEDULED)
+    )
+    await scheduler.put(_item("a", {"group_id": 1, "message": "reply"}))
+
+    items = await _drain(scheduler)
+    assert [item.data["message"] for item in items] == [
+        "reply",
+        "scheduled",
+        "broadcast",
+    ]
+
+
+async def test_send_queue_target_rate() -> None:
+    """
+    测试单个目标超出速率时先派发其他目标
+    """
+    from zhenxun.services.send_queue import SendScheduler
+
+    scheduler = SendScheduler(bot_rate=0, target_rate=1, target_burst=1)
+    await scheduler.put(_item("a", {"group_id": 1, "message": "g1-0"}))
+    await scheduler.put(_item("a", {"group_id": 1, "message": "g1-1"}))
+    await scheduler.put(_item("a", {"group_id": 2, "message": "g2-0"}))
+
+    first = await scheduler.get()
+    second = await scheduler.get()
+    assert [first.data["message"], second.data["message"]] == ["g1-0", "g2-0"]
+    # g1 需要等待令牌恢复
+    item, wait = scheduler._pop_ready(time.monotonic())
+    assert item is None
+    assert wait is not None
+    assert 0 < wait <= 1
+
+
+async def test_send_queue_evict_lower_priority() -> None:
+    """
+    测试队列已满时挤出低优先级的最新消息
+    """
+    from zhenxun.services.send_queue import (
+        SendPriority,
+        SendQueueFullError,
+        SendScheduler,
+    )
+
+    scheduler = SendScheduler(maxsize=2, bot_rate=0, target_rate=0)
+    old = _item("a", {"group_id": 1, "message": "old"}, SendPriority.BROADCAST)
+    new = _item("a", {"group_id": 2, "message": "new"}, SendPriority.BROADCAST)
+    await scheduler.put(old)
+    await scheduler.put(new)
+    assert scheduler.full()
+
+    await scheduler.put(_item("a", {"group_id": 1, "message": "reply"}))
+    assert scheduler.qsize() == 2
+    assert scheduler.stats()["dropped"] == 1
+    with pytest.raises(SendQueueFullError):
+        new.future.result()
+    assert not old.future.done()
+
+    # 同优先级无法挤出时等待空位
+    waiter = asyncio.create_task(
+        scheduler.put(
+            _item("a", {"group_id": 3, "message": "wait"}, SendPriority.BROADCAST)
+        )
+    )
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    await scheduler.get()
+    await asyncio.wait_for(waiter, 1)
+    assert [item.data["message"] for item in await _drain(scheduler)] == [
+        "old",
+        "wait",
+    ]
+
+
+async def test_send_queue_coalesce() -> None:
+    """
+    测试合并同一目标连续排队的文本消息
+    """
+    from nonebot.adapters.onebot.v11 import Message, MessageSegment
+
+    from zhenxun.services.send_queue import SendScheduler
+
+    scheduler = SendScheduler(bot_rate=0, target_rate=0, coalesce=True)
+    now = time.monotonic()
+    items = [
+        _item("a", {"group_id": 1, "message": Message(text)}, enqueued=now)
+        for text in ("a", "b", "c")
+    ]
+    # 非文本/图片消息不参与合并
+    record = _item(
+        "a",
+        {"group_id": 1, "message": Message(MessageSegment.record("x.mp3"))},
+        enqueued=now,
+    )
+    for item in (*items, record):
+        await scheduler.put(item)
+
+    merged = await scheduler.get()
+    assert merged is items[0]
+    assert str(merged.data["message"]) == "a\nb\nc"
+    assert merged.data["group_id"] == 1
+    assert scheduler.qsize() == 1
+    assert scheduler.stats()["merged"] == 2
+
+    merged.set_result({"message_id": 1})
+    assert [item.future.result() for item in items] == [{"message_id": 1}] * 3
+    assert await scheduler.get() is record
+
+
+async def test_send_queue_coalesce_window() -> None:
+    """
+    测试超出合并时间窗口的消息单独发送
+    """
+    from nonebot.adapters.onebot.v11 import Message
+
+    from zhenxun.services.send_queue import SendScheduler
+
+    scheduler = SendScheduler(
+        bot_rate=0, target_rate=0, coalesce=True, coalesce_window=0.3
+    )
+    now = time.monotonic()
+    await scheduler.put(
+        _item("a", {"group_id": 1, "message": Message("a")}, enqueued=now)
+    )
+    await scheduler.put(
+        _item("a", {"group_id": 1, "message": Message("b")}, enqueued=now + 1)
+    )
+
+    items = await _drain(scheduler)
+    assert [str(item.data["message"]) for item in items] == ["a", "b"]
@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+
+def test_literal_prefix() -> None:
+    """
+    测试获取正则表达式的字面前缀
+    """
+    from zhenxun.utils.command_trie import (
+        command_head,
+        literal_prefix,
+        literal_prefixes,
+    )
+
+    assert literal_prefix(r"签到(详情)?") == "签到"
+    assert literal_prefix(r"抽卡?") == "抽"
+    assert literal_prefix(r"\.help") == ".help"
+    assert literal_prefix(r"\d+连") == ""
+    assert literal_prefix(r"签到|打卡") == ""
+    assert literal_prefixes(r"(添加|安装)插件") == ["添加插件", "安装插件"]
+    assert literal_prefixes(r"(?:开启|关闭)(\S+)") == ["开启", "关闭"]
+    assert literal_prefixes(r"(添加|安装)?插件") == [""]
+    assert command_head("以后叫我 [昵称]") == "以后叫我"
+    assert command_head("?[群号] 退群") == "退群"
+
+
+def test_command_trie_match() -> None:
+    """
+    测试单次遍历匹配所有命令
+    """
+    from zhenxun.utils.command_trie import CommandTrie
+
+    trie = CommandTrie[str]()
+    trie.add("签到", "sign_in")
+    trie.add("签到详情", "sign_detail")
+    trie.add("抽", "draw")
+
+    assert trie.match("签到") == {"sign_in"}
+    assert trie.match("  签到 今天 ") == {"sign_in"}
+    assert trie.match("签到详情") == {"sign_detail"}
+    # 命令结束位置必须是文本末尾或空白字符
+    assert trie.match("签到啦") == set()
+    assert trie.match("抽卡") == set()
+    assert trie.match("") == set()
+
+    assert trie.longest_match("签到详情 1") == ("签到详情", {"sign_detail"})
+    assert trie.longest_match("签到啦") is None
+
+
+def test_command_trie_pattern() -> None:
+    """
+    测试正则命令只在经过其前缀节点时匹配
+    """
+    from zhenxun.utils.command_trie import CommandTrie
+
+    trie = CommandTrie[str]()
+    trie.add_pattern(r"我(是谁|叫什么)", "nickname")
+    trie.add_pattern(r"(添加|安装)插件\s*(\S+)", "install")
+    trie.add_pattern(r"\d+连", "draw")
+
+    assert trie.match("我是谁") == {"nickname"}
+    assert trie.match("我叫什么") == {"nickname"}
+    assert trie.match("我是谁啊") == set()
+    assert trie.match("安装插件 abc") == {"install"}
+    assert trie.match("添加插件abc") == {"install"}
+    # 无字面前缀的正则挂在根节点，总会尝试匹配
+    assert trie.match("10连") == {"draw"}
+
+    with pytest.raises(re.error):
+        trie.add_pattern(r"(", "bad")
+
+
+def test_command_trie_remove() -> None:
+    """
+    测试移除命令后清理空节点
+    """
+    from zhenxun.utils.command_trie import CommandTrie
+
+    trie = CommandTrie[str]()
+    trie.add("签到", "a")
+    trie.add("签到", "b")
+    trie.add("签到详情", "c")
+    trie.add_pattern(r"(添加|安装)插件", "install")
+
+    trie.remove("签到", "a")
+    assert trie.match("签到") == {"b"}
+    trie.remove("签到", "b")
+    assert trie.match("签到") == set()
+    assert trie.match("签到详情") == {"c"}
+    trie.remove("签到详情", "c")
+    trie.remove("不存在", "c")
+    assert "签" not in trie._root.children
+
+    trie.remove_pattern(r"(添加|安装)插件", "install")
+    assert trie.match("安装插件") == set()
+    assert not trie._root.children
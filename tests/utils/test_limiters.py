@@ -0,0 +1,200 @@
+import asyncio
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+def test_expiring_store_lru_and_sweep() -> None:
+    """
+    测试有界过期存储的 LRU 淘汰与过期清理
+    """
+    from zhenxun.utils.limiters import _ExpiringStore
+
+    now = time.time()
+    store = _ExpiringStore(max_size=2)
+    store.set("a", 1, now + 10)
+    store.set("b", 2, now + 100)
+    # 访问 a 后 b 成为最久未使用的条目
+    assert store.get("a", now=now) == 1
+    store.set("c", 3, now + 10)
+    assert store.get("b", now=now) is None
+    assert store.evicted == 1
+    assert len(store) == 2
+
+    assert store.get("missing") is None
+    assert len(store) == 2
+
+    assert store.sweep(now + 20) == 2
+    assert len(store) == 0
+    assert store.expired == 2
+
+
+def test_expiring_store_get_expired() -> None:
+    """
+    测试读取已过期条目时返回默认值并移除
+    """
+    from zhenxun.utils.limiters import _ExpiringStore
+
+    now = time.time()
+    store = _ExpiringStore()
+    store.set("a", 1, now + 1)
+    assert store.get("a", 0, now=now + 2) == 0
+    assert len(store) == 0
+    assert store.sweep(now + 10) == 0
+
+
+def test_expiring_store_drop_empty_buckets() -> None:
+    """
+    测试续期与删除条目时移除空桶，堆中的失效项不会无限增长
+    """
+    from zhenxun.utils.limiters import _ExpiringStore
+
+    now = time.time()
+    store = _ExpiringStore()
+    for i in range(1000):
+        store.set("a", 1, now + i)
+    assert len(store._buckets) == 1
+    assert len(store._bucket_heap) <= 2 * len(store._buckets) + 65
+
+    store.set("b", 2, now + 5)
+    store.pop("b")
+    assert len(store._buckets) == 1
+    assert store.sweep(now + 2000) == 1
+    assert not store._buckets
+    assert not store._bucket_heap
+
+
+async def test_memory_backend_acquire() -> None:
+    """
+    测试本地后端的检查并占用
+    """
+    from zhenxun.utils.limiters import MemoryLimitBackend
+
+    backend = MemoryLimitBackend()
+
+    assert await backend.acquire_cd("mod", "u1", 10) == 0
+    assert 0 < await backend.acquire_cd("mod", "u1", 10) <= 10
+    assert await backend.acquire_cd("mod", "u2", 10) == 0
+
+    assert await backend.acquire_count("mod", "u1", 2)
+    assert await backend.acquire_count("mod", "u1", 2)
+    assert not await backend.acquire_count("mod", "u1", 2)
+
+    assert await backend.acquire_block("mod", "u1")
+    assert not await backend.acquire_block("mod", "u1")
+    await backend.release_block("mod", "u1")
+    assert await backend.acquire_block("mod", "u1")
+
+
+async def test_memory_backend_concurrent_count() -> None:
+    """
+    测试并发占用每日次数时不会超出上限
+    """
+    from zhenxun.utils.limiters import MemoryLimitBackend
+
+    backend = MemoryLimitBackend()
+    results = await asyncio.gather(
+        *(backend.acquire_count("mod", "u1", 3) for _ in range(10))
+    )
+    assert results.count(True) == 3
+
+
+async def test_redis_backend_script_call(mocker: MockerFixture) -> None:
+    """
+    测试 redis 后端每次检查只调用一次脚本
+    """
+    from zhenxun.utils.limiters import RedisLimitBackend
+
+    cd_script = mocker.AsyncMock(return_value=1500)
+    count_script = mocker.AsyncMock(return_value=0)
+    client = mocker.MagicMock()
+    client.register_script.side_effect = [cd_script, count_script]
+    backend = RedisLimitBackend(client)
+
+    assert await backend.acquire_cd("mod", "u1", 2) == 1.5
+    cd_script.assert_awaited_once_with(keys=["ZHENXUN:LIMIT:cd:mod:u1"], args=[2000])
+
+    assert not await backend.acquire_count("mod", "u1", 5)
+    count_script.assert_awaited_once()
+    assert count_script.await_args.kwargs["args"][0] == 5
+
+    # 冷却时间为 0 时无需访问 redis
+    assert await backend.acquire_cd("mod", "u1", 0) == 0
+    assert cd_script.await_count == 1
+
+
+async def test_redis_backend_lua() -> None:
+    """
+    测试 redis 后端 Lua 脚本的检查并占用
+    """
+    pytest.importorskip("lupa")
+    fakeredis = pytest.importorskip("fakeredis")
+    from zhenxun.utils.limiters import RedisLimitBackend
+
+    backend = RedisLimitBackend(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+    assert await backend.acquire_cd("mod", "u1", 10) == 0
+    assert 9 < await backend.acquire_cd("mod", "u1", 10) <= 10
+
+    results = await asyncio.gather(
+        *(backend.acquire_count("mod", "u1", 3) for _ in range(10))
+    )
+    assert results.count(True) == 3
+
+    assert await backend.acquire_block("mod", "u1")
+    assert not await backend.acquire_block("mod", "u1")
+    await backend.release_block("mod", "u1")
+    assert await backend.acquire_block("mod", "u1")
+
+
+async def test_limit_manager_fallback_to_local(mocker: MockerFixture) -> None:
+    """
+    测试共享后端异常时回退到本地限制
+    """
+    from zhenxun.builtin_plugins.hooks.auth.auth_limit import Limit, LimitManager
+    from zhenxun.builtin_plugins.hooks.auth.exception import SkipPluginException
+    from zhenxun.services.cache.runtime_cache import PluginLimitSnapshot
+    from zhenxun.utils.enum import LimitCheckType, LimitWatchType, PluginLimitType
+    from zhenxun.utils.limiters import LimitBackend, MemoryLimitBackend
+
+    class BrokenBackend(LimitBackend):
+        name = "broken"
+
+        async def acquire_cd(self, scope, key, cd):
+            raise ConnectionError("redis down")
+
+        async def acquire_count(self, scope, key, max_count):
+            raise ConnectionError("redis down")
+
+        async def acquire_block(self, scope, key, timeout=30):
+            raise ConnectionError("redis down")
+
+        async def release_block(self, scope, key):
+            raise ConnectionError("redis down")
+
+    limit = PluginLimitSnapshot(
+        id=1,
+        module="test_limit",
+        module_path="test_limit",
+        limit_type=PluginLimitType.CD,
+        watch_type=LimitWatchType.USER,
+        check_type=LimitCheckType.ALL,
+        status=True,
+        result=None,
+        cd=10,
+        max_count=None,
+    )
+    local_backend = MemoryLimitBackend()
+    mocker.patch.object(LimitManager, "local_backend", local_backend)
+    mocker.patch.object(LimitManager, "backend", BrokenBackend())
+    mocker.patch.object(LimitManager, "last_update_time", time.time())
+    mocker.patch.object(LimitManager, "add_module", ["test_limit"])
+    mocker.patch.object(LimitManager, "cd_limit", {"test_limit": Limit(limit=limit)})
+    mocker.patch.object(LimitManager, "block_limit", {})
+    mocker.patch.object(LimitManager, "count_limit", {})
+
+    await LimitManager.check("test_limit", "u1", None, None)
+    with pytest.raises(SkipPluginException):
+        await LimitManager.check("test_limit", "u1", None, None)
+    assert await local_backend.acquire_cd("test_limit", "u1", 10) > 0
@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import pytest
+
+
+async def test_spool_drain(tmp_path: Path) -> None:
+    """
+    测试消费已落盘的数据后删除分段
+    """
+    from zhenxun.utils.spool import Spool
+
+    spool = Spool(tmp_path, "test", fsync_interval=60)
+    await spool.open()
+    for i in range(5):
+        spool.append({"id": i})
+    assert spool.pending == 5
+
+    chunks: list[list[dict]] = []
+
+    async def handler(records: list[dict]):
+        chunks.append(records)
+
+    assert await spool.drain(handler, chunk_size=2) == 5
+    assert [[r["id"] for r in chunk] for chunk in chunks] == [[0, 1], [2, 3], [4]]
+    assert spool.pending == 0
+    assert not list(tmp_path.glob("test-*.jsonl"))
+    await spool.close()
+
+
+async def test_spool_replay_after_failure(tmp_path: Path) -> None:
+    """
+    测试消费失败后，重启时从已提交的进度继续重放
+    """
+    from zhenxun.utils.spool import Spool
+
+    spool = Spool(tmp_path, "test", fsync_interval=60)
+    await spool.open()
+    for i in range(5):
+        spool.append({"id": i})
+
+    received: list[int] = []
+
+    async def failing(records: list[dict]):
+        if records[0]["id"] >= 2:
+            raise RuntimeError("db down")
+        received.extend(r["id"] for r in records)
+
+    with pytest.raises(RuntimeError):
+        await spool.drain(failing, chunk_size=2)
+    assert received == [0, 1]
+    await spool.close()
+
+    # 模拟进程重启
+    restarted = Spool(tmp_path, "test", fsync_interval=60)
+    await restarted.open()
+    assert restarted.pending == 3
+
+    async def handler(records: list[dict]):
+        received.extend(r["id"] for r in records)
+
+    assert await restarted.drain(handler) == 3
+    assert received == [0, 1, 2, 3, 4]
+    assert restarted.pending == 0
+    await restarted.close()
+
+
+async def test_spool_truncated_segment(tmp_path: Path) -> None:
+    """
+    测试崩溃时写了一半的行被跳过，其余数据正常重放
+    """
+    from zhenxun.utils.spool import Spool
+
+    segment = tmp_path / "test-0000000000.jsonl"
+    segment.write_text('{"id": 0}\n{"id": 1}\n{"id": 2, "na', encoding="utf-8")
+
+    spool = Spool(tmp_path, "test", fsync_interval=60)
+    await spool.open()
+    assert spool.pending == 3
+
+    received: list[int] = []
+
+    async def handler(records: list[dict]):
+        received.extend(r["id"] for r in records)
+
+    assert await spool.drain(handler) == 2
+    assert received == [0, 1]
+    assert spool.pending == 0
+    assert not segment.exists()
+
+    # 新数据写入新的分段，不会追加到已截断的分段之后
+    spool.append({"id": 3})
+    assert await spool.drain(handler) == 1
+    assert received == [0, 1, 3]
+    await spool.close()
+
+
+async def test_spool_segment_rollover(tmp_path: Path) -> None:
+    """
+    测试分段超出大小后切换新分段
+    """
+    from zhenxun.utils.spool import Spool
+
+    spool = Spool(tmp_path, "test", segment_bytes=32, fsync_interval=60)
+    await spool.open()
+    for i in range(4):
+        spool.append({"id": i, "text": "x" * 20})
+        await spool.sync()
+    assert len(list(tmp_path.glob("test-*.jsonl"))) == 4
+
+    received: list[int] = []
+
+    async def handler(records: list[dict]):
+        received.extend(r["id"] for r in records)
+
+    assert await spool.drain(handler) == 4
+    assert received == [0, 1, 2, 3]
+    await spool.close()
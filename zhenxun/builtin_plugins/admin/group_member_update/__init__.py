@@ -1,5 +1,5 @@
 import asyncio
-import random
+from dataclasses import dataclass
 import time
 
 import nonebot
@@ -13,17 +13,17 @@ from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_session import EventSession
 from nonebot_plugin_uninfo import Scene, SceneType, get_interface
 
-from zhenxun.configs.config import BotConfig
+from zhenxun.configs.config import BotConfig, Config
 from zhenxun.configs.utils import PluginExtraData
 from zhenxun.services.log import logger
-from zhenxun.services.message_load import should_pause_tasks
+from zhenxun.services.message_load import LoadGovernor, Subsystem
 from zhenxun.services.tags import tag_manager
 from zhenxun.utils.enum import PluginType
 from zhenxun.utils.message import MessageUtils
 from zhenxun.utils.platform import PlatformUtils
 from zhenxun.utils.rules import admin_check, ensure_group, notice_rule
 
-from ._data_source import MemberUpdateManage
+from ._data_source import UNCHANGED_MESSAGE, MemberUpdateManage
 
 __plugin_meta__ = PluginMetadata(
     name="更新群组成员列表",
@@ -41,10 +41,62 @@ __plugin_meta__ = PluginMetadata(
     ).to_dict(),
 )
 
+Config.add_plugin_config(
+    "group_member_update",
+    "SYNC_WORKERS",
+    4,
+    help="批量更新群组成员时同时更新的群组数量",
+    default_value=4,
+    type=int,
+)
+Config.add_plugin_config(
+    "group_member_update",
+    "SYNC_RATE",
+    2.0,
+    help="批量更新群组成员时每个Bot每秒最多获取的群成员列表次数",
+    default_value=2.0,
+    type=float,
+)
+
 _FULL_REFRESH_INTERVAL_SECONDS = 24 * 60 * 60
 
 _GROUP_LAST_UPDATE: dict[tuple[str, str], float] = {}
-_UPDATE_SEMAPHORE = asyncio.Semaphore(1)
+_UPDATE_SEMAPHORE = asyncio.Semaphore(
+    max(Config.get_config("group_member_update", "SYNC_WORKERS") or 4, 1)
+)
+
+
+class _BotPacer:
+    """按Bot限制获取群成员列表的频率"""
+
+    def __init__(self):
+        self._next: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def wait(self, bot_id: str):
+        rate = Config.get_config("group_member_update", "SYNC_RATE") or 2.0
+        interval = 1 / max(float(rate), 0.01)
+        async with self._locks.setdefault(bot_id, asyncio.Lock()):
+            now = time.monotonic()
+            if (delay := self._next.get(bot_id, 0) - now) > 0:
+                await asyncio.sleep(delay)
+                now += delay
+            self._next[bot_id] = now + interval
+
+
+_PACER = _BotPacer()
+
+
+@dataclass
+class SyncResult:
+    total: int = 0
+    """群组总数"""
+    updated: int = 0
+    """已同步群组数"""
+    unchanged: int = 0
+    """成员未变化跳过的群组数"""
+    failed: int = 0
+    """失败群组数"""
 
 
 _matcher = on_alconna(
@@ -87,51 +139,66 @@ async def _run_update(
 ) -> str | None:
     key = _group_key(bot.self_id, group_id)
     async with _UPDATE_SEMAPHORE:
+        await _PACER.wait(bot.self_id)
         result = await MemberUpdateManage.update_group_member(
-            bot, group_id, scene_map=scene_map, platform=platform
+            bot, group_id, scene_map=scene_map, platform=platform, force=force
         )
     _GROUP_LAST_UPDATE[key] = time.time()
     return result
 
 
+async def _sync_groups(
+    bot: Bot,
+    group_ids: list[str],
+    scene_map: dict[str, Scene],
+    *,
+    force: bool,
+    log_command: str,
+) -> SyncResult:
+    """并发更新多个群组的成员信息，并发数与获取频率分别受工作数和Bot频率限制
+
+    参数:
+        bot: Bot
+        group_ids: 群组id列表
+        scene_map: 群组id -> Scene
+        force: 是否忽略群成员指纹强制同步
+        log_command: 日志命令
+
+    返回:
+        SyncResult: 更新结果
+    """
+    result = SyncResult(total=len(group_ids))
+    platform = PlatformUtils.get_platform(bot)
+
+    async def _update(group_id: str):
+        try:
+            message = await _run_update(
+                bot, group_id, scene_map=scene_map, platform=platform, force=force
+            )
+        except Exception as e:
+            result.failed += 1
+            logger.error(
+                f"Bot {bot.self_id}: 更新群组 {group_id} 信息失败", log_command, e=e
+            )
+            return
+        if message == UNCHANGED_MESSAGE:
+            result.unchanged += 1
+        else:
+            result.updated += 1
+
+    await asyncio.gather(*(_update(group_id) for group_id in group_ids))
+    return result
+
+
 async def _update_all_groups_task(bot: Bot, session: EventSession):
     """
     在后台执行所有群组的更新任务，并向超级用户发送最终报告。
     """
-    success_count = 0
-    fail_count = 0
-    total_count = 0
     bot_id = bot.self_id
 
     logger.info(f"Bot {bot_id}: 开始执行所有群组信息更新任务...", "更新所有群组")
     try:
         scene_map = await _build_scene_map(bot)
-        platform = PlatformUtils.get_platform(bot)
-        group_ids = list(scene_map.keys())
-        total_count = len(group_ids)
-        for i, group_id in enumerate(group_ids):
-            try:
-                logger.debug(
-                    f"Bot {bot_id}: 正在更新第 {i + 1}/{total_count} 个群组: "
-                    f"{group_id}",
-                    "更新所有群组",
-                )
-                await _run_update(
-                    bot,
-                    group_id,
-                    scene_map=scene_map,
-                    platform=platform,
-                    force=True,
-                )
-                success_count += 1
-            except Exception as e:
-                fail_count += 1
-                logger.error(
-                    f"Bot {bot_id}: 更新群组 {group_id} 信息失败",
-                    "更新所有群组",
-                    e=e,
-                )
-            await asyncio.sleep(random.uniform(1.5, 3.0))
     except Exception as e:
         logger.error(f"Bot {bot_id}: 获取群组列表失败，任务中断", "更新所有群组", e=e)
         await PlatformUtils.send_superuser(
@@ -140,13 +207,16 @@ async def _update_all_groups_task(bot: Bot, session: EventSession):
             session.id1,
         )
         return
+    result = await _sync_groups(
+        bot, list(scene_map), scene_map, force=True, log_command="更新所有群组"
+    )
 
     await tag_manager._invalidate_cache()
     summary_message = (
         f"🤖 Bot {bot_id} 所有群组信息更新任务完成！\n"
-        f"总计群组: {total_count}\n"
-        f"✅ 成功: {success_count}\n"
-        f"❌ 失败: {fail_count}"
+        f"总计群组: {result.total}\n"
+        f"✅ 成功: {result.updated}\n"
+        f"❌ 失败: {result.failed}"
     )
     logger.info(summary_message.replace("\n", " | "), "更新所有群组")
     await PlatformUtils.send_superuser(bot, summary_message, session.id1)
@@ -192,7 +262,7 @@ async def _(bot: Bot, event: GroupIncreaseNoticeEvent):
     coalesce=True,
 )
 async def _nightly_full_refresh():
-    if should_pause_tasks():
+    if LoadGovernor.should_shed(Subsystem.SCHEDULER):
         return
     now = time.time()
     bots = nonebot.get_bots()
@@ -200,35 +270,31 @@ async def _nightly_full_refresh():
         return
     updated = 0
     for bot in bots.values():
-        platform = PlatformUtils.get_platform(bot)
-        if platform != "qq":
+        if PlatformUtils.get_platform(bot) != "qq":
             continue
         try:
             scene_map = await _build_scene_map(bot)
-            if not scene_map:
-                continue
-            for group_id in scene_map:
-                key = _group_key(bot.self_id, group_id)
-                last_update = _GROUP_LAST_UPDATE.get(key, 0)
-                if now - last_update < _FULL_REFRESH_INTERVAL_SECONDS:
-                    continue
-                try:
-                    result = await _run_update(
-                        bot,
-                        group_id,
-                        scene_map=scene_map,
-                        platform=platform,
-                        force=True,
-                    )
-                    if result is not None:
-                        updated += 1
-                except Exception as e:
-                    logger.error(
-                        f"Bot: {bot.self_id} 夜间更新群组成员信息失败",
-                        target=group_id,
-                        e=e,
-                    )
         except Exception as e:
             logger.error(f"Bot: {bot.self_id} 夜间更新群组信息", e=e)
+            continue
+        group_ids = [
+            group_id
+            for group_id in scene_map
+            if now - _GROUP_LAST_UPDATE.get(_group_key(bot.self_id, group_id), 0)
+            >= _FULL_REFRESH_INTERVAL_SECONDS
+        ]
+        if not group_ids:
+            continue
+        start = time.monotonic()
+        result = await _sync_groups(
+            bot, group_ids, scene_map, force=False, log_command="夜间更新群组成员"
+        )
+        updated += result.updated
+        logger.info(
+            f"Bot: {bot.self_id} 夜间更新群组成员完成，共 {result.total} 个群组，"
+            f"同步 {result.updated} 个，未变化 {result.unchanged} 个，"
+            f"失败 {result.failed} 个，耗时 {time.monotonic() - start:.1f}s",
+            "夜间更新群组成员",
+        )
     if updated:
         await tag_manager._invalidate_cache()
@@ -1,4 +1,5 @@
 from datetime import datetime
+import hashlib
 import re
 
 import nonebot
@@ -12,8 +13,38 @@ from zhenxun.models.level_user import LevelUser
 from zhenxun.services.log import logger
 from zhenxun.utils.platform import PlatformUtils
 
+UNCHANGED_MESSAGE = "群组成员未变化，跳过更新..."
+
 
 class MemberUpdateManage:
+    @classmethod
+    def member_fingerprint(
+        cls,
+        members: list[Member],
+        *,
+        default_auth: int | None,
+        superusers: set[str],
+    ) -> str:
+        """群成员指纹，成员id、昵称、身份或权限相关配置变化时改变
+
+        参数:
+            members: 群成员列表
+            default_auth: 群管理员默认权限
+            superusers: 超级用户
+
+        返回:
+            str: sha256 十六进制摘要
+        """
+        digest = hashlib.sha256(
+            f"{default_auth}\x1e{','.join(sorted(superusers))}".encode()
+        )
+        for member_id, nickname, role in sorted(
+            (str(m.id), m.nick or m.user.name or "", m.role.id if m.role else "")
+            for m in members
+        ):
+            digest.update(f"\x1e{member_id}\x1f{nickname}\x1f{role}".encode())
+        return digest.hexdigest()
+
     @classmethod
     async def __handle_user(
         cls,
@@ -76,12 +107,16 @@ class MemberUpdateManage:
         *,
         scene_map: dict[str, Scene] | None = None,
         platform: str | None = None,
+        force: bool = True,
     ) -> str:
         """更新群组成员信息
 
         参数:
             bot: Bot
             group_id: 群组id
+            scene_map: 群组id -> Scene，为None时重新获取
+            platform: 平台
+            force: 为False时群成员指纹未变化则跳过成员数据同步
 
         返回:
             str: 返回消息
@@ -103,24 +138,48 @@ class MemberUpdateManage:
                 )
                 return "更新群组失败，群组不存在..."
             members = await interface.get_members(SceneType.GROUP, group_scene.id)
+            driver = nonebot.get_driver()
+            superusers = set(driver.config.superusers)
+            default_auth = Config.get_config("admin_bot_manage", "ADMIN_DEFAULT_AUTH")
+            fingerprint = cls.member_fingerprint(
+                members, default_auth=default_auth, superusers=superusers
+            )
 
+            group_console: GroupConsole | None = None
+            synced = True
             try:
                 group_console, _ = await GroupConsole.get_or_create(
                     group_id=group_id, defaults={"platform": platform}
                 )
-                group_console.member_count = len(members)
-                group_console.group_name = group_scene.name or ""
-                await group_console.save(update_fields=["member_count", "group_name"])
-                logger.debug(
-                    f"已更新群组 {group_id} 的成员总数为 {len(members)}",
-                    "更新群组成员信息",
-                )
+                update_fields = []
+                if group_console.member_count != len(members):
+                    group_console.member_count = len(members)
+                    update_fields.append("member_count")
+                if group_console.group_name != (group_scene.name or ""):
+                    group_console.group_name = group_scene.name or ""
+                    update_fields.append("group_name")
+                if update_fields:
+                    await group_console.save(update_fields=update_fields)
+                    logger.debug(
+                        f"已更新群组 {group_id} 的成员总数为 {len(members)}",
+                        "更新群组成员信息",
+                    )
             except Exception as e:
+                synced = False
                 logger.error(
                     f"更新群组 {group_id} 的 GroupConsole 信息失败",
                     "更新群组成员信息",
                     e=e,
                 )
+            if (
+                not force
+                and group_console
+                and group_console.member_fingerprint == fingerprint
+            ):
+                logger.debug(
+                    f"群组 {group_id} 成员未变化，跳过更新", "更新群组成员信息"
+                )
+                return UNCHANGED_MESSAGE
 
             db_user = await GroupInfoUser.filter(group_id=group_id).all()
             db_user_map: dict[str, list[GroupInfoUser]] = {}
@@ -133,9 +192,6 @@ class MemberUpdateManage:
                 [],
             )
             exist_member_ids: set[str] = set()
-            driver = nonebot.get_driver()
-            superusers = set(driver.config.superusers)
-            default_auth = Config.get_config("admin_bot_manage", "ADMIN_DEFAULT_AUTH")
             for member in members:
                 member_id = str(member.id)
                 await cls.__handle_user(
@@ -159,6 +215,7 @@ class MemberUpdateManage:
                         target=group_id,
                     )
                 except Exception as e:
+                    synced = False
                     logger.error("批量创建用户数据失败", "更新群组成员信息", e=e)
             if data_list[1]:
                 await GroupInfoUser.bulk_update(data_list[1], ["user_name"], 30)
@@ -181,4 +238,12 @@ class MemberUpdateManage:
                     group_id=group_id,
                     platform="qq",
                 )
+            # 任一步写入失败时不记录指纹，下次同步仍会完整处理该群
+            if (
+                synced
+                and group_console
+                and group_console.member_fingerprint != fingerprint
+            ):
+                group_console.member_fingerprint = fingerprint
+                await group_console.save(update_fields=["member_fingerprint"])
         return "群组成员信息更新完成!"
@@ -4,6 +4,7 @@ from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.task_info import TaskInfo
 from zhenxun.services.cache import CacheRoot
+from zhenxun.services.cache.runtime_cache import PluginInfoMemoryCache
 from zhenxun.utils.common_utils import CommonUtils
 from zhenxun.utils.enum import BlockType, CacheType, PluginType
 from zhenxun.utils.exception import GroupInfoNotFound
@@ -202,6 +203,7 @@ class PluginManager:
             status=status, block_type=None if status else BlockType.ALL
         )
         await CacheRoot.invalidate_cache(CacheType.PLUGINS)
+        await PluginInfoMemoryCache.refresh()
         return f"成功将所有功能全局状态修改为: {'开启' if status else '关闭'}"
 
     @classmethod
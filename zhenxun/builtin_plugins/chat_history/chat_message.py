@@ -1,5 +1,8 @@
 import asyncio
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
 import time
+from typing import Any
 
 from nonebot import get_driver, on_message
 from nonebot.adapters import Event
@@ -7,13 +10,20 @@ from nonebot.plugin import PluginMetadata
 from nonebot_plugin_alconna import UniMsg
 from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_uninfo import Uninfo
+from tortoise import timezone
+from tortoise.transactions import in_transaction
 
 from zhenxun.configs.config import Config
+from zhenxun.configs.path_config import DATA_PATH
 from zhenxun.configs.utils import PluginExtraData, RegisterConfig
 from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.chat_history_daily import ChatHistoryDaily
+from zhenxun.services.db_context import bulk_insert_rows
 from zhenxun.services.log import logger
-from zhenxun.services.message_load import is_overloaded, should_pause_tasks
+from zhenxun.services.message_load import LoadGovernor, Subsystem
 from zhenxun.utils.enum import PluginType
+from zhenxun.utils.manager.priority_manager import PriorityLifecycle
+from zhenxun.utils.spool import Spool
 from zhenxun.utils.utils import get_entity_ids
 
 __plugin_meta__ = PluginMetadata(
@@ -32,7 +42,39 @@ __plugin_meta__ = PluginMetadata(
                 help="是否开启消息自从存储",
                 default_value=True,
                 type=bool,
-            )
+            ),
+            RegisterConfig(
+                module="chat_history",
+                key="FLUSH_ROWS",
+                value=2000,
+                help="本地缓存的聊天记录达到该条数时立即写入数据库",
+                default_value=2000,
+                type=int,
+            ),
+            RegisterConfig(
+                module="chat_history",
+                key="FLUSH_INTERVAL",
+                value=60,
+                help="聊天记录写入数据库的最长间隔（秒）",
+                default_value=60,
+                type=int,
+            ),
+            RegisterConfig(
+                module="chat_history",
+                key="FLUSH_CHUNK_SIZE",
+                value=500,
+                help="每个写入事务包含的聊天记录最大条数，实际条数按写入耗时自适应",
+                default_value=500,
+                type=int,
+            ),
+            RegisterConfig(
+                module="chat_history",
+                key="FLUSH_TARGET_LATENCY",
+                value=0.5,
+                help="单个写入事务的目标耗时（秒），超出时缩小每块条数",
+                default_value=0.5,
+                type=float,
+            ),
         ],
     ).to_dict(),
 )
@@ -55,7 +97,7 @@ def _is_command_like(text: str) -> bool:
 
 
 async def rule(event: Event, message: UniMsg, session: Uninfo) -> bool:
-    if is_overloaded():
+    if LoadGovernor.should_shed(Subsystem.CHAT_HISTORY):
         return False
     if not Config.get_config("chat_history", "FLAG"):
         return False
@@ -79,10 +121,175 @@ async def rule(event: Event, message: UniMsg, session: Uninfo) -> bool:
 
 chat_history = on_message(rule=rule, priority=1, block=False)
 
-_HISTORY_QUEUE: asyncio.Queue[ChatHistory] = asyncio.Queue(maxsize=5000)
-_DROP_COUNT = 0
-_LAST_DROP_LOG = 0.0
-_DROP_LOG_INTERVAL = 10.0
+driver = get_driver()
+
+LOG_COMMAND = "chat_history"
+
+_SPOOL = Spool(DATA_PATH / "chat_history" / "spool", "chat_history")
+_FLUSH_LOCK = asyncio.Lock()
+_FLUSH_TASK: asyncio.Task | None = None
+_LAST_FLUSH = 0.0
+_NEXT_RETRY = 0.0
+_MIN_CHUNK_SIZE = 50
+_RETRY_BASE = 5
+_RETRY_MAX = 300
+
+
+@dataclass
+class FlushStats:
+    flushes: int = 0
+    """写入轮数"""
+    failures: int = 0
+    """失败轮数"""
+    consecutive_failures: int = 0
+    """连续失败轮数，用于计算重试间隔"""
+    rows: int = 0
+    """累计写入条数"""
+    chunks: int = 0
+    """累计写入事务数"""
+    chunk_size: int = 0
+    """当前每块条数"""
+    last_rows: int = 0
+    """上一轮写入条数"""
+    last_latency: float = 0.0
+    """上一轮耗时（秒）"""
+    max_chunk_latency: float = 0.0
+    """单个事务最大耗时（秒）"""
+
+
+_STATS = FlushStats()
+
+
+def get_flush_stats() -> dict[str, Any]:
+    """获取聊天记录写入统计"""
+    return {**asdict(_STATS), "pending": _SPOOL.pending}
+
+
+def _max_chunk_size() -> int:
+    return max(
+        _MIN_CHUNK_SIZE, Config.get_config("chat_history", "FLUSH_CHUNK_SIZE") or 500
+    )
+
+
+def _next_chunk_size() -> int:
+    if not _STATS.chunk_size:
+        _STATS.chunk_size = _max_chunk_size()
+    return min(_STATS.chunk_size, _max_chunk_size())
+
+
+def _adapt_chunk_size(latency: float):
+    """根据单个事务耗时调整下一块的条数"""
+    target = Config.get_config("chat_history", "FLUSH_TARGET_LATENCY") or 0.5
+    if latency > target:
+        _STATS.chunk_size = max(_MIN_CHUNK_SIZE, _STATS.chunk_size // 2)
+    elif latency < target / 4:
+        _STATS.chunk_size = min(_max_chunk_size(), int(_STATS.chunk_size * 1.25) + 1)
+
+
+def _to_row(record: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "user_id": record["user_id"],
+        "group_id": record.get("group_id"),
+        "text": record.get("text"),
+        "plain_text": record.get("plain_text"),
+        "create_time": datetime.fromisoformat(record["create_time"]),
+        "bot_id": record.get("bot_id"),
+        "platform": record.get("platform"),
+    }
+
+
+async def _write_chunk(records: list[dict[str, Any]]):
+    start = time.perf_counter()
+    rows = [_to_row(record) for record in records]
+    async with in_transaction() as connection:
+        await bulk_insert_rows(ChatHistory, rows, connection)
+        await ChatHistoryDaily.add_rows(rows, connection)
+    latency = time.perf_counter() - start
+    _STATS.chunks += 1
+    _STATS.max_chunk_latency = max(_STATS.max_chunk_latency, latency)
+    _adapt_chunk_size(latency)
+
+
+async def flush_chat_history(force: bool = False) -> int:
+    """将 spool 中已落盘的聊天记录分块写入数据库
+
+    参数:
+        force: 忽略负载暂停标记强制写入
+
+    返回:
+        int: 写入条数
+    """
+    global _LAST_FLUSH, _NEXT_RETRY
+    # 采样在 ELEVATED 即停止，已落盘记录的写入与统计一样到 HIGH 才推迟
+    if not force and (
+        time.time() < _NEXT_RETRY or LoadGovernor.should_shed(Subsystem.STATISTICS)
+    ):
+        return 0
+    async with _FLUSH_LOCK:
+        _LAST_FLUSH = time.time()
+        start = time.perf_counter()
+        try:
+            count = await _SPOOL.drain(_write_chunk, chunk_size=_next_chunk_size)
+        except Exception as e:
+            _STATS.failures += 1
+            _STATS.consecutive_failures += 1
+            # 数据库不可用时按指数退避重试，避免每条新消息都触发一次写入
+            delay = min(
+                _RETRY_BASE * 2 ** (_STATS.consecutive_failures - 1), _RETRY_MAX
+            )
+            _NEXT_RETRY = time.time() + delay
+            logger.warning(
+                f"存储聊天记录失败，数据保留在本地，{delay}s 后重试", LOG_COMMAND, e=e
+            )
+            return 0
+        _STATS.consecutive_failures = 0
+        _NEXT_RETRY = 0.0
+        if count:
+            _STATS.flushes += 1
+            _STATS.rows += count
+            _STATS.last_rows = count
+            _STATS.last_latency = time.perf_counter() - start
+            logger.debug(
+                f"批量添加聊天记录 {count} 条，耗时 {_STATS.last_latency:.3f}s，"
+                f"当前每块 {_STATS.chunk_size} 条",
+                LOG_COMMAND,
+            )
+        return count
+
+
+async def rebuild_daily_rollup(day: date) -> int:
+    """重建某一天的聊天记录汇总，与写入互斥避免重复累加
+
+    参数:
+        day: 日期
+
+    返回:
+        int: 当日消息数量
+    """
+    async with _FLUSH_LOCK:
+        return await ChatHistoryDaily.rebuild_day(day)
+
+
+def _trigger_flush():
+    global _FLUSH_TASK
+    if _FLUSH_TASK is not None and not _FLUSH_TASK.done():
+        return
+    if time.time() < _NEXT_RETRY:
+        return
+    _FLUSH_TASK = asyncio.create_task(flush_chat_history())
+
+
+@PriorityLifecycle.on_startup(priority=5)
+async def _():
+    await _SPOOL.open()
+    if _SPOOL.pending:
+        count = await flush_chat_history(force=True)
+        logger.info(f"重放未写入的聊天记录 {count} 条", LOG_COMMAND)
+
+
+@driver.on_shutdown
+async def _():
+    await _SPOOL.close()
 
 
 @chat_history.handle()
@@ -93,46 +300,28 @@ async def _(message: UniMsg, session: Uninfo):
         _LAST_GROUP_SAVE[entity.group_id] = now
     if entity.user_id:
         _LAST_USER_SAVE[entity.user_id] = now
-    if is_overloaded():
+    if LoadGovernor.should_shed(Subsystem.CHAT_HISTORY):
         return
-    try:
-        _HISTORY_QUEUE.put_nowait(
-            ChatHistory(
-                user_id=entity.user_id,
-                group_id=entity.group_id,
-                text=str(message),
-                plain_text=message.extract_plain_text(),
-                bot_id=session.self_id,
-                platform=session.platform,
-            )
-        )
-    except asyncio.QueueFull:
-        global _DROP_COUNT, _LAST_DROP_LOG
-        _DROP_COUNT += 1
-        if now - _LAST_DROP_LOG > _DROP_LOG_INTERVAL:
-            _LAST_DROP_LOG = now
-            logger.debug(
-                f"chat_history queue full, dropped {_DROP_COUNT} items",
-                "chat_history",
-            )
+    _SPOOL.append(
+        {
+            "user_id": entity.user_id,
+            "group_id": entity.group_id,
+            "text": str(message),
+            "plain_text": message.extract_plain_text(),
+            "create_time": timezone.now().isoformat(),
+            "bot_id": session.self_id,
+            "platform": session.platform,
+        }
+    )
+    if _SPOOL.pending >= (Config.get_config("chat_history", "FLUSH_ROWS") or 2000):
+        _trigger_flush()
 
 
 @scheduler.scheduled_job(
     "interval",
-    minutes=1,
+    seconds=10,
 )
 async def _():
-    try:
-        if should_pause_tasks():
-            return
-        message_list: list[ChatHistory] = []
-        while True:
-            try:
-                message_list.append(_HISTORY_QUEUE.get_nowait())
-            except asyncio.QueueEmpty:
-                break
-        if message_list:
-            await ChatHistory.bulk_create(message_list)
-            logger.debug(f"批量添加聊天记录 {len(message_list)} 条", "定时任务")
-    except Exception as e:
-        logger.warning("存储聊天记录失败", "chat_history", e=e)
+    interval = Config.get_config("chat_history", "FLUSH_INTERVAL") or 60
+    if _SPOOL.pending and time.time() - _LAST_FLUSH >= interval:
+        _trigger_flush()
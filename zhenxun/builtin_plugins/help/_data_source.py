@@ -9,7 +9,7 @@ from zhenxun.models.bot_console import BotConsole
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.level_user import LevelUser
 from zhenxun.models.plugin_info import PluginInfo
-from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_daily import StatisticsDaily
 from zhenxun.services import (
     LLMException,
     LLMMessage,
@@ -188,7 +188,7 @@ async def get_plugin_help(
         if _plugin and _plugin.metadata:
             extra_data = PluginExtraData(**_plugin.metadata.extra)
 
-            call_count = await Statistics.filter(plugin_name=plugin.module).count()
+            call_count = await StatisticsDaily.get_count(plugin_name=plugin.module)
             usage = _plugin.metadata.usage
             if is_superuser:
                 if not extra_data.superuser_help:
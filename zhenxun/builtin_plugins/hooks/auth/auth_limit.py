@@ -12,11 +12,17 @@ from zhenxun.models.plugin_limit import PluginLimit
 from zhenxun.services.cache.runtime_cache import (
     PluginLimitMemoryCache,
     PluginLimitSnapshot,
+    create_redis_client,
 )
 from zhenxun.services.db_context import DB_TIMEOUT_SECONDS
 from zhenxun.services.log import logger
 from zhenxun.utils.enum import LimitWatchType, PluginLimitType
-from zhenxun.utils.limiters import CountLimiter, FreqLimiter, UserBlockLimiter
+from zhenxun.utils.limiters import (
+    FreqLimiter,
+    LimitBackend,
+    MemoryLimitBackend,
+    RedisLimitBackend,
+)
 from zhenxun.utils.manager.priority_manager import PriorityLifecycle
 from zhenxun.utils.message import MessageUtils
 from zhenxun.utils.time_utils import TimeUtils
@@ -33,20 +39,38 @@ Config.add_plugin_config(
     2,
     help="auth limit notice cooldown seconds",
 )
+Config.add_plugin_config(
+    "hook",
+    "AUTH_LIMIT_SHARED",
+    True,
+    help="share plugin limits through redis when CACHE_MODE=REDIS",
+)
+Config.add_plugin_config(
+    "hook",
+    "AUTH_LIMIT_BLOCK_TIMEOUT",
+    30,
+    help="auth block limit auto release seconds",
+)
 _LIMIT_NOTICE_CD = int(Config.get_config("hook", "AUTH_LIMIT_NOTICE_CD", 2) or 2)
 _LIMIT_NOTICE_LIMITER = FreqLimiter(_LIMIT_NOTICE_CD)
 _LIMIT_NOTICE_TASKS: set[asyncio.Task] = set()
+_BLOCK_TIMEOUT = int(Config.get_config("hook", "AUTH_LIMIT_BLOCK_TIMEOUT", 30) or 30)
 
 
 @PriorityLifecycle.on_startup(priority=5)
 async def _():
     """初始化限制"""
+    LimitManager.init_backend()
     await LimitManager.init_limit()
 
 
+@driver.on_shutdown
+async def _():
+    await LimitManager.close_backend()
+
+
 class Limit(BaseModel):
     limit: PluginLimit | PluginLimitSnapshot
-    limiter: FreqLimiter | UserBlockLimiter | CountLimiter
 
     class Config:
         arbitrary_types_allowed = True
@@ -97,6 +121,76 @@ class LimitManager:
     module_cache_ttl: ClassVar[float] = 60  # 模块缓存有效期（秒）
     module_cache_error_ttl: ClassVar[float] = 5  # 超时缓存有效期（秒）
 
+    # 限制状态存储后端，redis 不可用时回退到本地内存
+    local_backend: ClassVar[MemoryLimitBackend] = MemoryLimitBackend()
+    backend: ClassVar[LimitBackend] = local_backend
+    backend_error_log_time: ClassVar[float] = 0
+    _release_tasks: ClassVar[set[asyncio.Task]] = set()
+
+    @classmethod
+    def init_backend(cls):
+        """根据 CACHE_MODE 选择限制器后端"""
+        cls.backend = cls.local_backend
+        if not Config.get_config("hook", "AUTH_LIMIT_SHARED", True):
+            return
+        try:
+            client = create_redis_client()
+        except Exception as exc:
+            logger.error("创建限制器 redis 连接失败", LOGGER_COMMAND, e=exc)
+            return
+        if client is None:
+            return
+        cls.backend = RedisLimitBackend(client)
+        logger.info("插件限制使用 redis 共享后端", LOGGER_COMMAND)
+
+    @classmethod
+    async def close_backend(cls):
+        """关闭限制器后端连接"""
+        try:
+            await cls.backend.close()
+        except Exception as exc:
+            logger.debug("关闭限制器后端失败", LOGGER_COMMAND, e=exc)
+        cls.backend = cls.local_backend
+
+    @classmethod
+    def _log_backend_error(cls, exc: Exception):
+        now = time.time()
+        if now - cls.backend_error_log_time > 10:
+            cls.backend_error_log_time = now
+            logger.error(
+                f"限制器后端 {cls.backend.name} 异常，回退到本地限制",
+                LOGGER_COMMAND,
+                e=exc,
+            )
+
+    @classmethod
+    async def _acquire(
+        cls, backend: LimitBackend, limit: PluginLimit | PluginLimitSnapshot, key: str
+    ) -> float | None:
+        """检查并占用限制
+
+        返回:
+            float | None: None 表示通过，否则为剩余冷却秒数（非冷却限制为 0）
+        """
+        if limit.limit_type == PluginLimitType.CD:
+            left_time = await backend.acquire_cd(limit.module, key, int(limit.cd or 0))
+            return left_time if left_time > 0 else None
+        if limit.limit_type == PluginLimitType.BLOCK:
+            allowed = await backend.acquire_block(limit.module, key, _BLOCK_TIMEOUT)
+        else:
+            allowed = await backend.acquire_count(
+                limit.module, key, int(limit.max_count or 0)
+            )
+        return None if allowed else 0.0
+
+    @classmethod
+    async def _release_block(cls, module: str, key: str):
+        try:
+            await cls.backend.release_block(module, key)
+        except Exception as exc:
+            cls._log_backend_error(exc)
+        cls.local_backend.release_block_nowait(module, key)
+
     @classmethod
     async def init_limit(cls):
         """初始化限制"""
@@ -145,21 +239,13 @@ class LimitManager:
         if limit.module not in cls.add_module:
             cls.add_module.append(limit.module)
             if limit.limit_type == PluginLimitType.BLOCK:
-                cls.block_limit[limit.module] = Limit(
-                    limit=limit, limiter=UserBlockLimiter()
-                )
+                cls.block_limit[limit.module] = Limit(limit=limit)
             elif limit.limit_type == PluginLimitType.CD:
-                cd_value = int(limit.cd or 0)
-                cls.cd_limit[limit.module] = Limit(
-                    limit=limit, limiter=FreqLimiter(cd_value)
-                )
+                cls.cd_limit[limit.module] = Limit(limit=limit)
             elif limit.limit_type == PluginLimitType.COUNT:
-                max_count = int(limit.max_count or 0)
-                if max_count <= 0:
+                if int(limit.max_count or 0) <= 0:
                     return
-                cls.count_limit[limit.module] = Limit(
-                    limit=limit, limiter=CountLimiter(max_count)
-                )
+                cls.count_limit[limit.module] = Limit(limit=limit)
 
     @classmethod
     def unblock(
@@ -175,7 +261,6 @@ class LimitManager:
         """
         if limit_model := cls.block_limit.get(module):
             limit = limit_model.limit
-            limiter: UserBlockLimiter = limit_model.limiter  # type: ignore
             key_type = user_id
             if group_id and limit.watch_type == LimitWatchType.GROUP:
                 key_type = channel_id or group_id
@@ -185,7 +270,12 @@ class LimitManager:
                 session=user_id,
                 group_id=group_id,
             )
-            limiter.set_false(key_type)
+            if cls.backend is cls.local_backend:
+                cls.local_backend.release_block_nowait(module, key_type)
+                return
+            task = asyncio.create_task(cls._release_block(module, key_type))
+            cls._release_tasks.add(task)
+            task.add_done_callback(cls._release_tasks.discard)
 
     @classmethod
     async def get_module_limits(cls, module: str) -> list[PluginLimitSnapshot]:
@@ -293,7 +383,6 @@ class LimitManager:
         if not limit_model:
             return
         limit = limit_model.limit
-        limiter = limit_model.limiter
         is_limit = (
             LimitWatchType.ALL
             or (group_id and limit.watch_type == LimitWatchType.GROUP)
@@ -302,11 +391,18 @@ class LimitManager:
         key_type = user_id
         if group_id and limit.watch_type == LimitWatchType.GROUP:
             key_type = channel_id or group_id
-        if is_limit and not limiter.check(key_type):
+        # 检查与占用在后端一次完成，共享后端时无需额外往返
+        try:
+            left_time = await cls._acquire(cls.backend, limit, key_type)
+        except Exception as exc:
+            if cls.backend is cls.local_backend:
+                raise
+            cls._log_backend_error(exc)
+            left_time = await cls._acquire(cls.local_backend, limit, key_type)
+        if is_limit and left_time is not None:
             if limit.result:
                 format_kwargs = {}
-                if isinstance(limiter, FreqLimiter):
-                    left_time = limiter.left_time(key_type)
+                if limit.limit_type == PluginLimitType.CD:
                     cd_str = TimeUtils.format_duration(left_time)
                     format_kwargs = {"cd": cd_str}
                 notice_key = _limit_notice_key(limit, user_id, group_id, channel_id)
@@ -314,19 +410,12 @@ class LimitManager:
             raise SkipPluginException(
                 f"{limit.module}({limit.limit_type}) 正在限制中..."
             )
-        else:
-            logger.debug(
-                f"开始进行限制 {limit.module}({limit.limit_type})...",
-                LOGGER_COMMAND,
-                session=user_id,
-                group_id=group_id,
-            )
-            if isinstance(limiter, FreqLimiter):
-                limiter.start_cd(key_type)
-            if isinstance(limiter, UserBlockLimiter):
-                limiter.set_true(key_type)
-            if isinstance(limiter, CountLimiter):
-                limiter.increase(key_type)
+        logger.debug(
+            f"开始进行限制 {limit.module}({limit.limit_type})...",
+            LOGGER_COMMAND,
+            session=user_id,
+            group_id=group_id,
+        )
 
 
 async def auth_limit(plugin: PluginInfo, session: Uninfo):
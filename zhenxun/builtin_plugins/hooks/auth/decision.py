@@ -0,0 +1,249 @@
+"""
+预编译权限决策表
+
+以 (插件模块, 群组, bot) 为键缓存由内存缓存快照计算出的静态检查结果，
+常规事件无需等待任何协程即可完成插件、群组、bot 层面的权限判定。
+插件、群组、bot、插件限制内存缓存变更时按维度失效对应条目，下次访问时重新计算。
+"""
+
+from dataclasses import dataclass
+import time
+from typing import Any, ClassVar
+
+from zhenxun.models.plugin_info import PluginInfo
+from zhenxun.services.cache.runtime_cache import (
+    BotMemoryCache,
+    BotSnapshot,
+    GroupMemoryCache,
+    GroupSnapshot,
+    PluginInfoMemoryCache,
+    PluginLimitMemoryCache,
+    add_change_listener,
+)
+from zhenxun.utils.common_utils import CommonUtils
+from zhenxun.utils.enum import BlockType, PluginType
+
+DecisionKey = tuple[str, tuple[str, str], str]
+
+
+@dataclass(frozen=True)
+class AuthDecision:
+    plugin: PluginInfo | None
+    """插件数据，为None时插件不存在或隐藏，跳过检测"""
+    bot_reason: str | None = None
+    """bot 层面拒绝原因，超级用户同样生效"""
+    group_reason: str | None = None
+    """群组层面拒绝原因"""
+    group_sleeping: bool = False
+    """群组是否休眠"""
+    plugin_reason: str | None = None
+    """插件开关层面拒绝原因"""
+    plugin_notice: str | None = None
+    """插件开关层面拒绝时的提示消息"""
+    need_cost: bool = False
+    """是否需要扣除金币"""
+    has_limits: bool = False
+    """是否存在插件限制"""
+    expire_at: float = 0
+    """过期时间，群组或bot数据不存在时按负缓存时长过期，为0时不过期"""
+
+
+def _group_blocks(group: GroupSnapshot | None, module: str) -> tuple[bool, bool]:
+    if not group:
+        return False, False
+    return (
+        module in group.block_plugin_set,
+        module in group.superuser_block_plugin_set,
+    )
+
+
+def _check_plugin_block(
+    plugin: PluginInfo, group: GroupSnapshot | None, group_id: str
+) -> tuple[str, str] | None:
+    """与 auth_plugin 判定一致的插件开关检查
+
+    返回:
+        tuple[str, str] | None: (拒绝原因, 提示消息)，通过时为None
+    """
+    name = f"{plugin.name}({plugin.module})"
+    blocked, super_blocked = _group_blocks(group, plugin.module)
+    if plugin.block_type == BlockType.ALL and not plugin.status:
+        if group and group.is_super:
+            return None
+    elif group_id:
+        if plugin.block_type != BlockType.GROUP and not blocked and not super_blocked:
+            return None
+    elif plugin.block_type != BlockType.PRIVATE:
+        return None
+    if group:
+        if super_blocked:
+            return (
+                f"{name} 超级管理员禁用了该群此功能...",
+                "超级管理员禁用了该群此功能...",
+            )
+        if blocked:
+            return f"{name} 未开启此功能...", "该群未开启此功能..."
+        if plugin.block_type == BlockType.GROUP:
+            return f"{name}该插件在群组中已被禁用...", "该功能在群组中已被禁用..."
+    elif plugin.block_type == BlockType.PRIVATE:
+        return f"{name} 该插件在私聊中已被禁用...", "该功能在私聊中已被禁用..."
+    if plugin.status or plugin.block_type != BlockType.ALL:
+        return None
+    if group and group.is_super:
+        return None
+    return f"{name} 全局未开启此功能...", "全局未开启此功能..."
+
+
+def _check_bot(plugin: PluginInfo, bot: BotSnapshot | None) -> str | None:
+    if not bot or not bot.status:
+        return "Bot不存在或休眠中阻断权限检测..."
+    if CommonUtils.format(plugin.module) in bot.block_plugins:
+        return f"Bot插件 {plugin.name}({plugin.module}) 权限检查结果为关闭..."
+    return None
+
+
+def _check_group(plugin: PluginInfo, group: GroupSnapshot | None) -> str | None:
+    if not group:
+        return "群组信息不存在..."
+    if group.level < 0:
+        return "群组黑名单, 目标群组群权限权限-1..."
+    if plugin.level > group.level:
+        return (
+            f"{plugin.name}({plugin.module}) 群等级限制，"
+            f"该功能需要的群等级: {plugin.level}..."
+        )
+    return None
+
+
+class AuthDecisionTable:
+    _table: ClassVar[dict[DecisionKey, AuthDecision]] = {}
+    _by_module: ClassVar[dict[str, set[DecisionKey]]] = {}
+    _by_group: ClassVar[dict[tuple[str, str], set[DecisionKey]]] = {}
+    _by_bot: ClassVar[dict[str, set[DecisionKey]]] = {}
+    _MAX_ENTRIES: ClassVar[int] = 50000
+    """决策表最大条目数，超出后整体清空重新计算"""
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """数据来源的内存缓存是否均已加载"""
+        return (
+            PluginInfoMemoryCache.is_loaded()
+            and BotMemoryCache.is_loaded()
+            and GroupMemoryCache.is_loaded()
+            and PluginLimitMemoryCache.is_loaded()
+        )
+
+    @classmethod
+    def get(
+        cls,
+        module: str,
+        group_id: str | None,
+        channel_id: str | None,
+        bot_id: str,
+    ) -> AuthDecision | None:
+        """获取权限决策，不存在时根据内存缓存快照同步计算
+
+        参数:
+            module: 插件模块名
+            group_id: 群组id
+            channel_id: 频道id
+            bot_id: bot id
+
+        返回:
+            AuthDecision | None: 权限决策，内存缓存未就绪时为None
+        """
+        group_key = (group_id or "", channel_id or "")
+        key = (module, group_key, bot_id)
+        if (decision := cls._table.get(key)) and (
+            not decision.expire_at or decision.expire_at > time.time()
+        ):
+            return decision
+        if not cls.is_ready():
+            return None
+        decision = cls._build(module, group_id, channel_id, bot_id)
+        if len(cls._table) >= cls._MAX_ENTRIES:
+            cls.clear()
+        cls._table[key] = decision
+        cls._by_module.setdefault(module, set()).add(key)
+        cls._by_group.setdefault(group_key, set()).add(key)
+        cls._by_bot.setdefault(bot_id, set()).add(key)
+        return decision
+
+    @classmethod
+    def _build(
+        cls,
+        module: str,
+        group_id: str | None,
+        channel_id: str | None,
+        bot_id: str,
+    ) -> AuthDecision:
+        plugin = PluginInfoMemoryCache.get_if_ready(module)
+        if not plugin or plugin.plugin_type == PluginType.HIDDEN:
+            return AuthDecision(plugin=None)
+        group = (
+            GroupMemoryCache.get_if_ready(group_id, channel_id) if group_id else None
+        )
+        bot = BotMemoryCache.get_if_ready(bot_id)
+        plugin_block = _check_plugin_block(plugin, group, group_id or "")
+        # 数据缺失时的结果与内存缓存的负缓存一样只保留一段时间，
+        # 数据库中补上记录后不会一直等待变更通知
+        ttls = []
+        if group_id and not group:
+            ttls.append(GroupMemoryCache._negative_ttl())
+        if not bot:
+            ttls.append(BotMemoryCache._negative_ttl())
+        return AuthDecision(
+            plugin=plugin,
+            bot_reason=_check_bot(plugin, bot),
+            group_reason=_check_group(plugin, group) if group_id else None,
+            group_sleeping=bool(group_id and group and not group.status),
+            plugin_reason=plugin_block[0] if plugin_block else None,
+            plugin_notice=plugin_block[1] if plugin_block else None,
+            need_cost=plugin.cost_gold > 0,
+            has_limits=bool(PluginLimitMemoryCache.get_if_ready(module)),
+            expire_at=time.time() + max(min(ttls), 0) if ttls else 0,
+        )
+
+    @classmethod
+    def _discard(cls, keys: set[DecisionKey] | None):
+        for key in list(keys or ()):
+            if cls._table.pop(key, None) is None:
+                continue
+            module, group_key, bot_id = key
+            for index, index_key in (
+                (cls._by_module, module),
+                (cls._by_group, group_key),
+                (cls._by_bot, bot_id),
+            ):
+                if (items := index.get(index_key)) is not None:
+                    items.discard(key)
+                    if not items:
+                        index.pop(index_key, None)
+
+    @classmethod
+    def clear(cls):
+        """清空决策表"""
+        cls._table.clear()
+        cls._by_module.clear()
+        cls._by_group.clear()
+        cls._by_bot.clear()
+
+    @classmethod
+    def on_cache_change(cls, cache_type: str, key: Any):
+        """内存缓存变更时失效对应条目
+
+        参数:
+            cache_type: 缓存类型
+            key: 变更键，为None时失效该维度下所有条目
+        """
+        if key is None:
+            cls.clear()
+        elif cache_type in {"plugin", "plugin_limit"}:
+            cls._discard(cls._by_module.get(key))
+        elif cache_type == "group":
+            cls._discard(cls._by_group.get(key))
+        elif cache_type == "bot":
+            cls._discard(cls._by_bot.get(key))
+
+
+add_change_listener(AuthDecisionTable.on_cache_change)
@@ -0,0 +1,143 @@
+import re
+import time
+from typing import ClassVar
+
+from nonebot import get_loaded_plugins
+from nonebot.plugin import Plugin
+
+from zhenxun.configs.utils import PluginExtraData
+from zhenxun.services.log import logger
+from zhenxun.utils.command_trie import CommandTrie, command_head
+
+from .config import LOGGER_COMMAND
+
+
+def _extract_commands(plugin: Plugin) -> set[str]:
+    """插件元数据中声明的命令与别名，命令只取去除参数占位后的字面部分"""
+    if not plugin.metadata:
+        return set()
+    try:
+        extra = PluginExtraData(**(plugin.metadata.extra or {}))
+    except Exception:
+        return set()
+    commands = {command_head(c.command) for c in extra.commands if c.command}
+    commands.update(alias.strip() for alias in extra.aliases or set() if alias)
+    commands.discard("")
+    return commands
+
+
+def _extract_shortcuts(plugin: Plugin) -> set[str]:
+    """插件中 alconna 命令注册的快捷指令"""
+    try:
+        from arclet.alconna import command_manager
+    except ImportError:
+        return set()
+    shortcuts: set[str] = set()
+    for matcher in plugin.matcher:
+        get_command = getattr(matcher, "command", None)
+        if not callable(get_command):
+            continue
+        try:
+            keys = command_manager.get_shortcut(get_command())
+        except Exception:
+            continue
+        shortcuts.update(key for key in keys if isinstance(key, str) and key)
+    return shortcuts
+
+
+class RouteIndex:
+    """命令路由索引，根据消息文本获取可能响应的插件模块
+
+    插件元数据中的命令与别名作为字面命令，alconna 快捷指令作为正则命令，
+    统一存入前缀树。插件加载或卸载后会在下一次匹配时增量更新。
+    """
+
+    _trie: ClassVar[CommandTrie[str]] = CommandTrie()
+    _routes: ClassVar[dict[str, tuple[int, set[str], set[str]]]] = {}
+    """插件模块 -> (插件对象id, 命令, 快捷指令)"""
+    _modules_with_commands: ClassVar[set[str]] = set()
+    _last_sync: ClassVar[float] = 0.0
+    _SYNC_INTERVAL: ClassVar[float] = 5.0
+    """检查插件加载情况的最小间隔（秒）"""
+
+    @classmethod
+    def add_plugin(cls, plugin: Plugin):
+        """添加或更新插件的命令路由
+
+        参数:
+            plugin: 插件
+        """
+        module = plugin.name
+        cls.remove_plugin(module)
+        commands = _extract_commands(plugin)
+        shortcuts = set()
+        for pattern in _extract_shortcuts(plugin):
+            try:
+                cls._trie.add_pattern(pattern, module)
+            except re.error as e:
+                logger.debug(f"快捷指令 {pattern} 无法解析", LOGGER_COMMAND, e=e)
+                continue
+            shortcuts.add(pattern)
+        for command in commands:
+            cls._trie.add(command, module)
+        if commands:
+            cls._modules_with_commands.add(module)
+        cls._routes[module] = (id(plugin), commands, shortcuts)
+
+    @classmethod
+    def remove_plugin(cls, module: str):
+        """移除插件的命令路由
+
+        参数:
+            module: 插件模块名
+        """
+        if not (route := cls._routes.pop(module, None)):
+            return
+        _, commands, shortcuts = route
+        for command in commands:
+            cls._trie.remove(command, module)
+        for pattern in shortcuts:
+            cls._trie.remove_pattern(pattern, module)
+        cls._modules_with_commands.discard(module)
+
+    @classmethod
+    def sync(cls, force: bool = False):
+        """根据当前已加载插件增量更新索引
+
+        参数:
+            force: 忽略检查间隔
+        """
+        now = time.monotonic()
+        if not force and now - cls._last_sync < cls._SYNC_INTERVAL:
+            return
+        cls._last_sync = now
+        plugins = {plugin.name: plugin for plugin in get_loaded_plugins()}
+        for module in cls._routes.keys() - plugins.keys():
+            cls.remove_plugin(module)
+        for module, plugin in plugins.items():
+            route = cls._routes.get(module)
+            if route is None or route[0] != id(plugin):
+                cls.add_plugin(plugin)
+
+    @classmethod
+    def match(cls, text: str) -> set[str]:
+        """获取消息文本命中的插件模块
+
+        参数:
+            text: 消息文本
+
+        返回:
+            set[str]: 命中的插件模块
+        """
+        cls.sync()
+        return cls._trie.match(text)
+
+    @classmethod
+    def has_commands(cls, module: str) -> bool:
+        """插件是否声明了命令，未声明命令的插件不参与路由过滤
+
+        参数:
+            module: 插件模块名
+        """
+        cls.sync()
+        return module in cls._modules_with_commands
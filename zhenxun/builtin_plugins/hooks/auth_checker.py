@@ -3,7 +3,6 @@ import contextlib
 import time
 from typing import cast
 
-from nonebot import get_loaded_plugins
 from nonebot.adapters import Bot, Event
 from nonebot.exception import IgnoredException
 from nonebot.matcher import Matcher
@@ -11,7 +10,6 @@ from nonebot_plugin_alconna import UniMsg
 from nonebot_plugin_uninfo import Uninfo
 
 from zhenxun.configs.config import Config
-from zhenxun.configs.utils import PluginExtraData
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.user_console import UserConsole
 from zhenxun.services.cache.cache_containers import CacheDict
@@ -26,7 +24,7 @@ from zhenxun.services.cache.runtime_cache import (
 )
 from zhenxun.services.data_access import DataAccess
 from zhenxun.services.log import logger
-from zhenxun.services.message_load import is_overloaded
+from zhenxun.services.message_load import LoadGovernor, Subsystem
 from zhenxun.utils.enum import BlockType, GoldHandle, PluginType
 from zhenxun.utils.exception import InsufficientGold
 from zhenxun.utils.platform import PlatformUtils
@@ -40,13 +38,15 @@ from .auth.auth_group import auth_group
 from .auth.auth_limit import LimitManager, auth_limit
 from .auth.auth_plugin import auth_plugin
 from .auth.bot_filter import bot_filter
-from .auth.config import LOGGER_COMMAND, WARNING_THRESHOLD
+from .auth.config import LOGGER_COMMAND, WARNING_THRESHOLD, SwitchEnum
+from .auth.decision import AuthDecisionTable
 from .auth.exception import (
     IsSuperuserException,
     PermissionExemption,
     SkipPluginException,
 )
-from .auth.utils import base_config
+from .auth.route_index import RouteIndex
+from .auth.utils import base_config, freq, is_poke, send_message
 
 Config.add_plugin_config(
     "hook",
@@ -139,13 +139,6 @@ EVENT_CACHE = (
     else None
 )
 
-# 路由索引缓存
-_ROUTE_INDEX_LOCK = asyncio.Lock()
-_ROUTE_INDEX_READY = False
-_ROUTE_COMMAND_MAP: dict[str, set[str]] = {}
-_ROUTE_PREFIX_MAP: dict[str, set[str]] = {}
-_ROUTE_MODULES_WITH_COMMANDS: set[str] = set()
-
 # 全局信号量与计数器
 HOOKS_SEMAPHORE = asyncio.Semaphore(HOOKS_CONCURRENCY_LIMIT)
 HOOKS_ACTIVE_COUNT = 0
@@ -171,7 +164,7 @@ def _cache_set(cache: CacheDict | None, key: str, value):
 
 
 def _debug_log(message: str, *args, **kwargs) -> None:
-    if is_overloaded():
+    if LoadGovernor.should_shed(Subsystem.LOGGING):
         return
     logger.debug(message, *args, **kwargs)
 
@@ -203,79 +196,6 @@ def _get_event_cache(event: Event, session: Uninfo, entity):
         return cache
 
 
-def _normalize_command(command: str) -> str:
-    return command.strip()
-
-
-def _extract_commands(extra: PluginExtraData | None) -> set[str]:
-    if not extra:
-        return set()
-    commands = {c.command for c in extra.commands if c.command}
-    commands.update(extra.aliases or set())
-    return {cmd.strip() for cmd in commands if cmd and cmd.strip()}
-
-
-async def _ensure_route_index():
-    global _ROUTE_INDEX_READY
-    if _ROUTE_INDEX_READY:
-        return
-    async with _ROUTE_INDEX_LOCK:
-        if _ROUTE_INDEX_READY:
-            return
-        _ROUTE_COMMAND_MAP.clear()
-        _ROUTE_PREFIX_MAP.clear()
-        _ROUTE_MODULES_WITH_COMMANDS.clear()
-        for plugin in get_loaded_plugins():
-            if not plugin.metadata:
-                continue
-            extra = plugin.metadata.extra or {}
-            try:
-                extra_data = PluginExtraData(**extra)
-            except Exception:
-                continue
-            command_set = _extract_commands(extra_data)
-            if not command_set:
-                continue
-            module = plugin.name
-            _ROUTE_MODULES_WITH_COMMANDS.add(module)
-            for command in command_set:
-                normalized = _normalize_command(command)
-                if not normalized:
-                    continue
-                _ROUTE_COMMAND_MAP.setdefault(normalized, set()).add(module)
-                _ROUTE_PREFIX_MAP.setdefault(normalized[0], set()).add(normalized)
-        _ROUTE_INDEX_READY = True
-
-
-def _command_matches(text: str, command: str) -> bool:
-    if not text or not command:
-        return False
-    if text == command:
-        return True
-    if text.startswith(command):
-        if len(text) == len(command):
-            return True
-        next_char = text[len(command)]
-        return next_char.isspace()
-    return False
-
-
-def _match_route_modules(text: str) -> set[str]:
-    text = text.strip()
-    if not text:
-        return set()
-    commands = _ROUTE_PREFIX_MAP.get(text[0])
-    if not commands:
-        return set()
-    matched_modules: set[str] = set()
-    for command in commands:
-        if _command_matches(text, command):
-            modules = _ROUTE_COMMAND_MAP.get(command)
-            if modules:
-                matched_modules.update(modules)
-    return matched_modules
-
-
 def _get_message_text(message: UniMsg, event_cache: dict | None) -> str:
     if event_cache is None:
         return message.extract_plain_text()
@@ -291,8 +211,7 @@ async def _get_route_context(text: str, event_cache: dict | None) -> set[str]:
         return set()
     if event_cache is not None and "route_modules" in event_cache:
         return event_cache["route_modules"]
-    await _ensure_route_index()
-    matched = _match_route_modules(text)
+    matched = RouteIndex.match(text)
     if event_cache is not None:
         event_cache["route_modules"] = matched
     return matched
@@ -501,6 +420,8 @@ async def get_plugin_and_user(
     need_user: bool = True,
 ) -> tuple[PluginInfo, UserConsole | None]:
     """Fetch plugin info and read user only when cost is required."""
+    # 金币余额用于扣费判断，不能返回过期数据：
+    # 过期副本只在本进程内随缓存失效清除，其他实例的修改无法使其失效
     user_dao = DataAccess(UserConsole)
 
     plugin = None
@@ -682,8 +603,7 @@ async def route_precheck(
     event_cache = _get_event_cache(event, session, entity)
     text = _get_message_text(message, event_cache)
     route_modules = await _get_route_context(text, event_cache)
-    await _ensure_route_index()
-    if module in _ROUTE_MODULES_WITH_COMMANDS and module not in route_modules:
+    if RouteIndex.has_commands(module) and module not in route_modules:
         if event_cache is not None:
             event_cache["route_skip"] = True
         return True
@@ -721,6 +641,86 @@ async def auth_precheck(
         await auth_admin(plugin, session, cached_levels=levels)
 
 
+async def auth_fast(
+    matcher: Matcher,
+    event: Event,
+    bot: Bot,
+    session: Uninfo,
+    message: UniMsg,
+) -> bool:
+    """使用预编译决策表进行权限检查，常规情况下不会等待任何协程
+
+    参数:
+        matcher: matcher
+        event: Event
+        bot: bot
+        session: Uninfo
+        message: UniMsg
+
+    异常:
+        IgnoredException: 权限检查未通过
+
+    返回:
+        bool: 是否已完成检查，为 False 时需要执行完整的 auth
+    """
+    module = matcher.plugin_name or ""
+    if not module or _is_hidden_plugin(matcher):
+        return True
+    entity = get_entity_ids(session)
+    event_cache = _get_event_cache(event, session, entity)
+    auth_result_cache = None
+    if event_cache is not None:
+        # 同一事件触发同一插件的多个 matcher 时复用首次结果，
+        # 避免重复计数或释放首个 matcher 持有的限制
+        auth_result_cache = event_cache.setdefault("auth_result", {})
+        if (cached_result := auth_result_cache.get(module)) is not None:
+            allowed, reason = cached_result
+            if allowed:
+                return True
+            logger.info(reason or "auth cached skip", LOGGER_COMMAND, session=session)
+            raise IgnoredException("权限检测 ignore")
+    decision = AuthDecisionTable.get(
+        module, entity.group_id, entity.channel_id, bot.self_id
+    )
+    if decision is None or decision.need_cost:
+        return False
+    plugin = decision.plugin
+    if plugin is None:
+        return True
+    is_superuser = session.user.id in bot.config.superusers
+    try:
+        bot_filter(session)
+        if decision.bot_reason:
+            raise SkipPluginException(decision.bot_reason)
+        if not is_superuser:
+            if decision.group_reason:
+                raise SkipPluginException(decision.group_reason)
+            if decision.group_sleeping:
+                text = _get_message_text(message, event_cache)
+                if text.strip() != SwitchEnum.ENABLE:
+                    raise SkipPluginException("群组休眠状态...")
+            if decision.plugin_reason:
+                sid = entity.group_id or entity.user_id
+                if decision.plugin_notice and freq.is_send_limit_message(
+                    plugin, sid, is_poke(event)
+                ):
+                    await send_message(
+                        session, decision.plugin_notice, sid, background=True
+                    )
+                raise SkipPluginException(decision.plugin_reason)
+        if decision.has_limits:
+            await auth_limit(plugin, session)
+    except SkipPluginException as e:
+        LimitManager.unblock(module, entity.user_id, entity.group_id, entity.channel_id)
+        logger.info(str(e), LOGGER_COMMAND, session=session)
+        if auth_result_cache is not None:
+            auth_result_cache[module] = (False, str(e))
+        raise IgnoredException("权限检测 ignore") from e
+    if auth_result_cache is not None:
+        auth_result_cache[module] = (True, None)
+    return True
+
+
 async def auth(
     matcher: Matcher,
     event: Event,
@@ -776,9 +776,8 @@ async def auth(
 
         text = _get_message_text(message, event_cache)
         route_modules = await _get_route_context(text, event_cache)
-        await _ensure_route_index()
         route_skip_checks = (
-            module in _ROUTE_MODULES_WITH_COMMANDS and module not in route_modules
+            RouteIndex.has_commands(module) and module not in route_modules
         )
         if route_skip_checks:
             if event_cache is not None:
@@ -1,4 +1,3 @@
-import asyncio
 import time
 
 from nonebot import get_driver
@@ -11,7 +10,7 @@ from nonebot_plugin_uninfo import Uninfo
 
 from zhenxun.services.cache.runtime_cache import is_cache_ready
 from zhenxun.services.log import logger
-from zhenxun.services.message_load import is_overloaded, signal_overload
+from zhenxun.services.message_load import LoadGovernor, Subsystem
 from zhenxun.utils.utils import get_entity_ids
 
 from .auth.config import LOGGER_COMMAND
@@ -21,21 +20,13 @@ from .auth_checker import (
     _get_event_cache,
     auth,
     auth_ban_fast,
+    auth_fast,
     auth_precheck,
     route_precheck,
 )
 
 _SKIP_AUTH_PLUGINS = {"chat_history", "chat_message"}
 _BOT_CONNECT_TS: float | None = None
-_AUTH_QUEUE_MAXSIZE = 200
-_AUTH_QUEUE_HIGH_WATER = 160
-_AUTH_OVERLOAD_WINDOW = 5.0
-_AUTH_QUEUE: asyncio.Queue[tuple[Matcher, Event, Bot, Uninfo, UniMsg]] = asyncio.Queue(
-    maxsize=_AUTH_QUEUE_MAXSIZE
-)
-_AUTH_QUEUE_STARTED = False
-_AUTH_WORKERS: list[asyncio.Task] = []
-_LAST_DROP_LOG = 0.0
 
 driver = get_driver()
 
@@ -47,38 +38,6 @@ async def _mark_bot_connected(bot: Bot):
     _BOT_CONNECT_TS = time.time()
 
 
-async def _auth_worker(worker_id: int) -> None:
-    while True:
-        matcher, event, bot, session, message = await _AUTH_QUEUE.get()
-        try:
-            await auth(
-                matcher,
-                event,
-                bot,
-                session,
-                message,
-                skip_ban=True,
-            )
-        except IgnoredException:
-            pass
-        except Exception as exc:
-            if not is_overloaded():
-                logger.error("async auth failed", LOGGER_COMMAND, e=exc)
-        finally:
-            _AUTH_QUEUE.task_done()
-
-
-@driver.on_startup
-async def _start_auth_queue():
-    global _AUTH_QUEUE_STARTED
-    if _AUTH_QUEUE_STARTED:
-        return
-    _AUTH_QUEUE_STARTED = True
-    worker_count = max(1, min(6, _AUTH_QUEUE_MAXSIZE // 50))
-    for idx in range(worker_count):
-        _AUTH_WORKERS.append(asyncio.create_task(_auth_worker(idx)))
-
-
 def _skip_auth_for_plugin(matcher: Matcher) -> bool:
     if not matcher.plugin:
         return False
@@ -126,25 +85,18 @@ async def _auth_preprocessor(
         raise IgnoredException("precheck ignore") from exc
 
     if event_cache is not None and event_cache.get("route_skip") is True:
-        if not is_overloaded():
+        if not LoadGovernor.should_shed(Subsystem.LOGGING):
             logger.debug("route miss skip auth task", LOGGER_COMMAND)
         return
 
-    try:
-        _AUTH_QUEUE.put_nowait((matcher, event, bot, session, message))
-    except asyncio.QueueFull:
-        signal_overload(_AUTH_OVERLOAD_WINDOW)
-        now = time.monotonic()
-        global _LAST_DROP_LOG
-        if now - _LAST_DROP_LOG > 1.0:
-            _LAST_DROP_LOG = now
-            logger.warning("auth queue full, skip auth task", LOGGER_COMMAND)
-        return
-    if _AUTH_QUEUE.qsize() >= _AUTH_QUEUE_HIGH_WATER:
-        signal_overload(_AUTH_OVERLOAD_WINDOW)
+    if LoadGovernor.should_shed(Subsystem.INTERACTIVE):
+        raise IgnoredException("load shedding ignore")
+    with LoadGovernor.inflight("auth"):
+        if not await auth_fast(matcher, event, bot, session, message):
+            await auth(matcher, event, bot, session, message, skip_ban=True)
     now = time.monotonic()
     last_log = getattr(_auth_preprocessor, "_last_log", 0.0)
-    if now - last_log > 1.0 and not is_overloaded():
+    if now - last_log > 1.0 and not LoadGovernor.should_shed(Subsystem.LOGGING):
         setattr(_auth_preprocessor, "_last_log", now)
         logger.debug(
             f"auth check cost: {time.time() - start_time:.3f}s",
@@ -1,7 +1,56 @@
+import asyncio
+
+import nonebot
 from nonebot.matcher import Matcher
 from nonebot.message import run_postprocessor
 
-from zhenxun.utils.limiters import ConcurrencyLimiter
+from zhenxun.configs.config import Config
+from zhenxun.services.log import logger
+from zhenxun.utils.limiters import ConcurrencyLimiter, limiter_stats, sweep_limiters
+
+from .auth.config import LOGGER_COMMAND
+
+Config.add_plugin_config(
+    "hook",
+    "LIMITER_SWEEP_INTERVAL",
+    60,
+    help="limiter expired entry sweep seconds, 0 to disable",
+)
+
+driver = nonebot.get_driver()
+_SWEEP_TASK: asyncio.Task | None = None
+
+
+async def _sweep_loop(interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = sweep_limiters()
+            if removed:
+                entries = sum(data["entries"] for data in limiter_stats().values())
+                logger.debug(
+                    f"限制器清理过期条目: {removed}, 剩余条目: {entries}",
+                    LOGGER_COMMAND,
+                )
+        except Exception as exc:
+            logger.error("限制器清理失败", LOGGER_COMMAND, e=exc)
+
+
+@driver.on_startup
+async def _start_limiter_sweeper():
+    global _SWEEP_TASK
+    interval = int(Config.get_config("hook", "LIMITER_SWEEP_INTERVAL", 60) or 0)
+    if interval <= 0 or (_SWEEP_TASK and not _SWEEP_TASK.done()):
+        return
+    _SWEEP_TASK = asyncio.create_task(_sweep_loop(interval))
+
+
+@driver.on_shutdown
+async def _stop_limiter_sweeper():
+    global _SWEEP_TASK
+    if _SWEEP_TASK and not _SWEEP_TASK.done():
+        _SWEEP_TASK.cancel()
+    _SWEEP_TASK = None
 
 
 @run_postprocessor
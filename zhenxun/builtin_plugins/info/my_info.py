@@ -2,14 +2,12 @@ from datetime import datetime, timedelta
 import random
 
 from nonebot_plugin_uninfo import Uninfo
-from tortoise.expressions import RawSQL
-from tortoise.functions import Count
 
 from zhenxun import ui
-from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.chat_history_daily import ChatHistoryDaily
 from zhenxun.models.level_user import LevelUser
 from zhenxun.models.sign_user import SignUser
-from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_daily import StatisticsDaily
 from zhenxun.models.user_console import UserConsole
 from zhenxun.services import avatar_service
 from zhenxun.utils.platform import PlatformUtils
@@ -103,17 +101,11 @@ async def get_chat_history(
     """
     now = datetime.now()
     filter_date = now - timedelta(days=7)
-    date_list = (
-        await ChatHistory.filter(
-            user_id=user_id, group_id=group_id, create_time__gte=filter_date
-        )
-        .annotate(date=RawSQL("DATE(create_time)"), count=Count("id"))
-        .group_by("date")
-        .values("date", "count")
+    date2cnt = await ChatHistoryDaily.get_daily_count(
+        filter_date.date(), user_id=user_id, group_id=group_id
     )
     chart_date: list[str] = []
     count_list: list[int] = []
-    date2cnt = {str(item["date"]): item["count"] for item in date_list}
     current_date = now.date()
     for _ in range(7):
         date_str = str(current_date)
@@ -150,8 +142,8 @@ async def get_user_info(
     if sign_user := await SignUser.get_or_none(user_id=user_id):
         sign_level = get_level(float(sign_user.impression))
 
-    chat_count = await ChatHistory.filter(user_id=user_id, group_id=group_id).count()
-    stat_count = await Statistics.filter(user_id=user_id, group_id=group_id).count()
+    chat_count = await ChatHistoryDaily.get_count(user_id=user_id, group_id=group_id)
+    stat_count = await StatisticsDaily.get_count(user_id=user_id, group_id=group_id)
 
     selected_indices = [""] * 9
     selected_indices[sign_level] = "select"
@@ -6,11 +6,14 @@ import shutil
 from aiocache import cached
 import ujson as json
 
+from zhenxun import ui
 from zhenxun.builtin_plugins.plugin_store.models import StorePluginInfo
 from zhenxun.configs.path_config import TEMP_PATH
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.services.log import logger
 from zhenxun.services.plugin_init import PluginInitManager
+from zhenxun.ui.builders import TableBuilder
+from zhenxun.ui.models import TextCell
 from zhenxun.utils.enum import PluginType
 from zhenxun.utils.image_utils import BuildImage, ImageTemplate, RowStyle
 from zhenxun.utils.manager.virtual_env_package_manager import VirtualEnvPackageManager
@@ -107,61 +110,48 @@ class StoreManager:
         return await PluginInfo.filter(load_status=True).values_list(*args)
 
     @classmethod
-    async def get_plugins_info(cls) -> list[BuildImage] | str:
+    def _plugin_row(
+        cls, plugin_info: StorePluginInfo, index: int, suc_plugin: dict[str, str]
+    ) -> list:
+        installed = plugin_info.module in suc_plugin
+        return [
+            TextCell(content="已安装" if installed else "", color="#67C23A"),
+            index,
+            plugin_info.name,
+            plugin_info.description,
+            plugin_info.author,
+            cls.version_check(plugin_info, suc_plugin),
+            plugin_info.plugin_type_name,
+        ]
+
+    @classmethod
+    async def get_plugins_info(cls) -> list[bytes] | str:
         """插件列表
 
         返回:
-            BuildImage | str: 返回消息
+            list[bytes] | str: 原生插件与第三方插件列表图片
         """
         plugin_list, extra_plugin_list = await cls.get_data()
         column_name = ["-", "ID", "名称", "简介", "作者", "版本", "类型"]
         db_plugin_list = await cls.get_loaded_plugins("module", "version")
         suc_plugin = {p[0]: (p[1] or "0.1") for p in db_plugin_list}
+        tables = []
         index = 0
-        data_list = []
-        extra_data_list = []
-        for plugin_info in plugin_list:
-            data_list.append(
-                [
-                    "已安装" if plugin_info.module in suc_plugin else "",
-                    index,
-                    plugin_info.name,
-                    plugin_info.description,
-                    plugin_info.author,
-                    cls.version_check(plugin_info, suc_plugin),
-                    plugin_info.plugin_type_name,
-                ]
-            )
-            index += 1
-        for plugin_info in extra_plugin_list:
-            extra_data_list.append(
-                [
-                    "已安装" if plugin_info.module in suc_plugin else "",
-                    index,
-                    plugin_info.name,
-                    plugin_info.description,
-                    plugin_info.author,
-                    cls.version_check(plugin_info, suc_plugin),
-                    plugin_info.plugin_type_name,
-                ]
-            )
-            index += 1
-        return [
-            await ImageTemplate.table_page(
-                "原生插件列表",
-                "通过添加/移除插件 ID 来管理插件",
-                column_name,
-                data_list,
-                text_style=row_style,
-            ),
-            await ImageTemplate.table_page(
-                "第三方插件列表",
-                "通过添加/移除插件 ID 来管理插件",
-                column_name,
-                extra_data_list,
-                text_style=row_style,
-            ),
-        ]
+        for title, plugins in (
+            ("原生插件列表", plugin_list),
+            ("第三方插件列表", extra_plugin_list),
+        ):
+            builder = TableBuilder(title, "通过添加/移除插件 ID 来管理插件")
+            builder.set_headers(column_name)
+            for plugin_info in plugins:
+                builder.add_row(cls._plugin_row(plugin_info, index, suc_plugin))
+                index += 1
+            tables.append(builder.build())
+        images = await ui.render_many(tables)
+        for image in images:
+            if isinstance(image, Exception):
+                raise image
+        return images  # type: ignore
 
     @classmethod
     async def get_plugin_by_value(
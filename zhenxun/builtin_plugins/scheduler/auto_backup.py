@@ -1,10 +1,11 @@
+import asyncio
 from pathlib import Path
-import shutil
 
 from nonebot_plugin_apscheduler import scheduler
 
 from zhenxun.configs.config import Config
 from zhenxun.services.log import logger
+from zhenxun.utils.backup import BackupEngine
 
 Config.add_plugin_config(
     "_backup",
@@ -24,6 +25,26 @@ Config.add_plugin_config(
     type=list[str],
 )
 
+Config.add_plugin_config(
+    "_backup",
+    "BACKUP_KEEP",
+    7,
+    help="保留的备份快照数量",
+    default_value=7,
+    type=int,
+)
+
+Config.add_plugin_config(
+    "_backup",
+    "BACKUP_COMPRESS_LEVEL",
+    6,
+    help="备份文件 gzip 压缩等级(1-9)",
+    default_value=6,
+    type=int,
+)
+
+_BACKUP_LOCK = asyncio.Lock()
+
 
 # 自动备份
 @scheduler.scheduled_job(
@@ -34,23 +55,36 @@ Config.add_plugin_config(
 async def _():
     if not Config.get_config("_backup", "BACKUP_FLAG"):
         return
-    _backup_path = Path() / "backup"
-    _backup_path.mkdir(exist_ok=True, parents=True)
-    if backup_dir_or_file := Config.get_config("_backup", "BACKUP_DIR_OR_FILE"):
-        for path_file in backup_dir_or_file:
-            try:
-                path = Path(path_file)
-                _p = _backup_path / path_file
-                if path.exists():
-                    if path.is_dir():
-                        if _p.exists():
-                            shutil.rmtree(_p, ignore_errors=True)
-                        shutil.copytree(path_file, _p)
-                    else:
-                        if _p.exists():
-                            _p.unlink()
-                        shutil.copy(path_file, _p)
-                    logger.debug(f"已完成自动备份：{path_file}", "自动备份")
-            except Exception as e:
-                logger.error(f"自动备份文件 {path_file} 发生错误", "自动备份", e=e)
-    logger.info("自动备份成功...", "自动备份")
+    backup_dir_or_file = Config.get_config("_backup", "BACKUP_DIR_OR_FILE")
+    if not backup_dir_or_file:
+        return
+    sources = [Path(path_file) for path_file in backup_dir_or_file]
+    for path in sources:
+        if not path.exists():
+            logger.debug(f"备份文件不存在：{path}", "自动备份")
+    engine = BackupEngine(
+        Path() / "backup",
+        keep=Config.get_config("_backup", "BACKUP_KEEP") or 7,
+        compress_level=Config.get_config("_backup", "BACKUP_COMPRESS_LEVEL") or 6,
+    )
+    if _BACKUP_LOCK.locked():
+        logger.warning("上一次自动备份尚未完成，跳过本次备份", "自动备份")
+        return
+    async with _BACKUP_LOCK:
+        try:
+            report = await asyncio.to_thread(
+                engine.backup, [path for path in sources if path.exists()]
+            )
+        except Exception as e:
+            logger.error("自动备份发生错误", "自动备份", e=e)
+            return
+    logger.info(
+        f"自动备份成功 快照: {report.snapshot}，文件 {report.files} 个"
+        f"（读取 {report.hashed} 个，新增对象 {report.stored} 个，"
+        f"数据库 {report.sqlite} 个，失败 {report.errors} 个），"
+        f"读取 {report.bytes_read / 1024 / 1024:.2f}MB，"
+        f"写入 {report.bytes_written / 1024 / 1024:.2f}MB，"
+        f"耗时 {report.duration:.2f}s，{report.throughput:.2f}MB/s，"
+        f"清理快照 {report.removed_snapshots} 个、对象 {report.removed_objects} 个",
+        "自动备份",
+    )
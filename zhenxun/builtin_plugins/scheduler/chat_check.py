@@ -2,14 +2,13 @@ from datetime import datetime, timedelta
 
 import nonebot
 from nonebot_plugin_apscheduler import scheduler
-import pytz
 
 from zhenxun.configs.config import Config
-from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.chat_history_daily import ChatHistoryDaily
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.task_info import TaskInfo
 from zhenxun.services.log import logger
-from zhenxun.services.message_load import should_pause_tasks
+from zhenxun.services.message_load import LoadGovernor, Subsystem
 from zhenxun.utils.platform import PlatformUtils
 
 Config.add_plugin_config(
@@ -21,6 +20,38 @@ Config.add_plugin_config(
     type=bool,
 )
 
+INACTIVE_DAYS = 2
+"""群组超过该天数未发送消息时关闭全部被动"""
+
+
+async def _get_group_ids() -> set[str]:
+    group_ids: set[str] = set()
+    for bot in nonebot.get_bots().values():
+        try:
+            group_list, _ = await PlatformUtils.get_group_list(bot, True)
+        except Exception as e:
+            logger.error("获取群组列表失败...", "Chat检测", target=bot.self_id, e=e)
+            continue
+        group_ids.update(group.group_id for group in group_list)
+    return group_ids
+
+
+async def get_inactive_groups(group_ids: set[str]) -> set[str]:
+    """获取超过 INACTIVE_DAYS 天未发送消息的群组
+
+    根据按日汇总表中每个群最后有消息的日期判断，该日期之后完整经过
+    INACTIVE_DAYS 天才视为不活跃；从未记录过消息的群组不视为不活跃。
+
+    参数:
+        group_ids: 群组id
+
+    返回:
+        set[str]: 不活跃的群组id
+    """
+    cutoff = (datetime.now() - timedelta(days=INACTIVE_DAYS)).date()
+    last_days = await ChatHistoryDaily.get_group_last_day(group_ids)
+    return {group_id for group_id, day in last_days.items() if day < cutoff}
+
 
 @scheduler.scheduled_job(
     "cron",
@@ -28,7 +59,7 @@ Config.add_plugin_config(
     minute=40,
 )
 async def _():
-    if should_pause_tasks():
+    if LoadGovernor.should_shed(Subsystem.SCHEDULER):
         return
     if not Config.get_config("chat_history", "FLAG"):
         logger.debug("未开启历史发言记录，过滤群组发言检测...")
@@ -37,35 +68,31 @@ async def _():
         logger.debug("未开启群组聊天时间检查，过滤群组发言检测...")
         return
     """检测群组发言时间并禁用全部被动"""
-    update_list = []
-    if modules := await TaskInfo.annotate().values_list("module", flat=True):
-        for bot in nonebot.get_bots().values():
-            group_list, _ = await PlatformUtils.get_group_list(bot, True)
-            for group in group_list:
-                try:
-                    last_message = (
-                        await ChatHistory.filter(group_id=group.group_id)
-                        .annotate()
-                        .order_by("-create_time")
-                        .first()
-                    )
-                    if last_message:
-                        now = datetime.now(pytz.timezone("Asia/Shanghai"))
-                        if now - timedelta(days=2) > last_message.create_time:
-                            _group, _ = await GroupConsole.get_or_create(
-                                group_id=group.group_id, channel_id__isnull=True
-                            )
-                            modules = [f"<{module}" for module in modules]
-                            _group.block_task = ",".join(modules) + ","  # type: ignore
-                            update_list.append(_group)
-                            logger.info(
-                                "群组两日内未发送任何消息，关闭该群全部被动",
-                                "Chat检测",
-                                target=_group.group_id,
-                            )
-                except Exception:
-                    logger.error(
-                        "检测群组发言时间失败...", "Chat检测", target=group.group_id
-                    )
-    if update_list:
-        await GroupConsole.bulk_update(update_list, ["block_task"], 10)
+    modules = await TaskInfo.annotate().values_list("module", flat=True)
+    if not modules:
+        return
+    block_task = "".join(f"<{module}," for module in modules)
+    try:
+        inactive = await get_inactive_groups(await _get_group_ids())
+        if not inactive:
+            return
+        groups = await GroupConsole.filter(
+            group_id__in=inactive, channel_id__isnull=True
+        ).all()
+        for group_id in inactive - {group.group_id for group in groups}:
+            group, _ = await GroupConsole.get_or_create(
+                group_id=group_id, channel_id__isnull=True
+            )
+            groups.append(group)
+        update_list = [group for group in groups if group.block_task != block_task]
+        for group in update_list:
+            group.block_task = block_task
+            logger.info(
+                "群组两日内未发送任何消息，关闭该群全部被动",
+                "Chat检测",
+                target=group.group_id,
+            )
+        if update_list:
+            await GroupConsole.bulk_update(update_list, ["block_task"], 100)
+    except Exception as e:
+        logger.error("检测群组发言时间失败...", "Chat检测", e=e)
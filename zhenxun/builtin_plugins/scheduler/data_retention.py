@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta
+import gzip
+import json
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from zhenxun.configs.path_config import DATA_PATH
+from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.statistics import Statistics
+from zhenxun.services.db_context import Model
+from zhenxun.services.log import logger
+from zhenxun.services.scheduler import Trigger, scheduler_manager
+from zhenxun.utils.manager.retention_manager import RetentionManager
+
+LOG_COMMAND = "数据保留"
+
+ARCHIVE_PATH = DATA_PATH / "archive"
+
+
+class RetentionParams(BaseModel):
+    chat_history_days: int = Field(0, description="聊天记录保留天数，0 为永久保留")
+    statistics_days: int = Field(0, description="功能调用统计保留天数，0 为永久保留")
+    archive: bool = Field(True, description="删除前是否导出为压缩归档文件")
+    batch_size: int = Field(5000, description="每批删除条数")
+
+
+RETENTION_POLICIES: list[tuple[type[Model], str]] = [
+    (ChatHistory, "chat_history_days"),
+    (Statistics, "statistics_days"),
+]
+"""数据表 -> 保留天数参数名，数据表需包含 id 与 create_time 字段"""
+
+
+def _write_archive(table: str, rows: list[dict[str, Any]]):
+    """按月份将数据追加写入 gzip 压缩的 JSON 行文件"""
+    path = ARCHIVE_PATH / table
+    path.mkdir(parents=True, exist_ok=True)
+    month2lines: dict[str, list[str]] = {}
+    for row in rows:
+        month = row["create_time"].strftime("%Y%m")
+        month2lines.setdefault(month, []).append(
+            json.dumps(row, ensure_ascii=False, default=str)
+        )
+    for month, lines in month2lines.items():
+        file: Path = path / f"{table}-{month}.jsonl.gz"
+        with gzip.open(file, "at", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+async def purge_expired(
+    model: type[Model], days: int, archive: bool = True, batch_size: int = 5000
+) -> int:
+    """分批归档并删除过期数据
+
+    参数:
+        model: 数据表
+        days: 保留天数
+        archive: 删除前是否归档
+        batch_size: 每批条数
+
+    返回:
+        int: 删除条数
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    table = model._meta.db_table
+    total = 0
+    while True:
+        query = model.filter(create_time__lt=cutoff).order_by("id").limit(batch_size)
+        if archive:
+            rows = await query.values()
+            ids = [row["id"] for row in rows]
+        else:
+            ids = await query.values_list("id", flat=True)
+        if not ids:
+            break
+        if not total:
+            # 删除前记录，此后汇总表不再根据早于截止时间的原始数据重建
+            RetentionManager.mark_purged(table, cutoff)
+        if archive:
+            await asyncio.to_thread(_write_archive, table, rows)
+        await model.filter(id__in=ids).delete()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+        await asyncio.sleep(0.1)
+    return total
+
+
+@scheduler_manager.job(
+    Trigger.cron(hour=4, minute=10),
+    default_params=RetentionParams(),
+)
+async def _(params: RetentionParams, **kwargs):
+    for model, key in RETENTION_POLICIES:
+        days = getattr(params, key)
+        if days <= 0:
+            continue
+        table = model._meta.db_table
+        try:
+            count = await purge_expired(
+                model, days, params.archive, max(params.batch_size, 1)
+            )
+        except Exception as e:
+            logger.error(f"清理 {table} 过期数据失败", LOG_COMMAND, e=e)
+            continue
+        if count:
+            logger.info(f"已清理 {table} 中 {days} 天前的数据 {count} 条", LOG_COMMAND)
@@ -22,6 +22,7 @@ from zhenxun.models.user_console import UserConsole
 from zhenxun.models.user_gold_log import UserGoldLog
 from zhenxun.models.user_props_log import UserPropsLog
 from zhenxun.services import avatar_service
+from zhenxun.services.leaderboard import Leaderboard
 from zhenxun.services.log import logger
 from zhenxun.ui.models import ImageCell, TextCell
 from zhenxun.utils.enum import GoldHandle, PropHandle
@@ -94,22 +95,11 @@ class ShopParam(BaseModel):
 
 
 async def gold_rank(session: Uninfo, group_id: str | None, num: int) -> bytes | str:
-    query = UserConsole
-    if group_id:
-        uid_list = await GroupInfoUser.filter(group_id=group_id).values_list(
-            "user_id", flat=True
-        )
-        if uid_list:
-            query = query.filter(user_id__in=uid_list)
-    user_list = await query.annotate().order_by("-gold").values_list("user_id", "gold")
+    user_list = await Leaderboard.top("gold", num, group_id)
     if not user_list:
         return "当前还没有人拥有金币哦..."
     user_id_list = [user[0] for user in user_list]
-    if session.user.id in user_id_list:
-        index = user_id_list.index(session.user.id) + 1
-    else:
-        index = "-1（未统计）"
-    user_list = user_list[:num] if num < len(user_list) else user_list
+    index = await Leaderboard.rank("gold", session.user.id, group_id) or "-1（未统计）"
     friend_user = await FriendUser.filter(user_id__in=user_id_list).values_list(
         "user_id", "user_name"
     )
@@ -134,7 +124,7 @@ async def gold_rank(session: Uninfo, group_id: str | None, num: int) -> bytes |
                 if avatar_path
                 else TextCell(content=""),
                 TextCell(content=uid2name.get(user[0]) or user[0]),
-                TextCell(content=str(user[1]), bold=True),
+                TextCell(content=str(int(user[1])), bold=True),
                 ImageCell(src=platform_path.resolve().as_uri())
                 if (platform_path := PLATFORM_PATH.get(platform))
                 else TextCell(content=""),
@@ -14,6 +14,7 @@ from zhenxun.models.sign_log import SignLog
 from zhenxun.models.sign_user import SignUser
 from zhenxun.models.user_console import UserConsole
 from zhenxun.services.avatar_service import avatar_service
+from zhenxun.services.leaderboard import Leaderboard
 from zhenxun.services.log import logger
 from zhenxun.ui.models import ImageCell, TextCell
 from zhenxun.utils.platform import PlatformUtils
@@ -46,26 +47,21 @@ class SignManage:
         返回:
             bytes: 构造图片
         """
-        query = SignUser
-        if group_id:
-            user_list = await GroupInfoUser.filter(group_id=group_id).values_list(
-                "user_id", flat=True
-            )
-            if user_list:
-                query = query.filter(user_id__in=user_list)
-        user_list = (
-            await query.annotate()
-            .order_by("-impression")
-            .values_list("user_id", "impression", "sign_count", "platform")
-        )
-        if not user_list:
+        top = await Leaderboard.top("impression", num, group_id)
+        if not top:
             return "当前还没有人签到过哦..."
-        user_id_list = [user[0] for user in user_list]
-        if session.user.id in user_id_list:
-            index = user_id_list.index(session.user.id) + 1
-        else:
-            index = "-1（未统计）"
-        user_list = user_list[:num] if num < len(user_list) else user_list
+        user_id_list = [user[0] for user in top]
+        index = (
+            await Leaderboard.rank("impression", session.user.id, group_id)
+            or "-1（未统计）"
+        )
+        uid2data = {
+            uid: (impression, sign_count, platform)
+            for uid, impression, sign_count, platform in await SignUser.filter(
+                user_id__in=user_id_list
+            ).values_list("user_id", "impression", "sign_count", "platform")
+        }
+        user_list = [(uid, *uid2data[uid]) for uid, _ in top if uid in uid2data]
         column_name = ["排名", "-", "名称", "好感度", "签到次数", "平台"]
         friend_list = await FriendUser.filter(user_id__in=user_id_list).values_list(
             "user_id", "user_name"
@@ -1,13 +1,12 @@
-from tortoise.functions import Count
+from datetime import date, datetime, timedelta
 
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.group_member_info import GroupInfoUser
 from zhenxun.models.plugin_info import PluginInfo
-from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_daily import StatisticsDaily
 from zhenxun.utils.echart_utils import ChartUtils
 from zhenxun.utils.echart_utils.models import Barh
 from zhenxun.utils.enum import PluginType
-from zhenxun.utils.time_utils import TimeUtils
 
 
 class StatisticsManage:
@@ -60,15 +59,9 @@ class StatisticsManage:
     async def get_global_statistics(
         cls, plugin_name: str | None, day: int | None, title: str
     ) -> bytes | str:
-        query = Statistics
-        if plugin_name:
-            query = query.filter(plugin_name=plugin_name)
-        if day:
-            query = query.filter(create_time__gte=TimeUtils.get_day_start())
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .group_by("plugin_name")
-            .values_list("plugin_name", "count")
+        filters = {"plugin_name": plugin_name} if plugin_name else {}
+        data_list = await StatisticsDaily.get_plugin_count(
+            start=cls.__start_day(day), **filters
         )
         return (
             await cls.__build_image(data_list, title)
@@ -80,15 +73,8 @@ class StatisticsManage:
     async def get_my_statistics(
         cls, user_id: str, group_id: str | None, day: int | None, title: str
     ):
-        query = Statistics.filter(user_id=user_id)
-        if group_id:
-            query = query.filter(group_id=group_id)
-        if day:
-            query = query.filter(create_time__gte=TimeUtils.get_day_start())
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .group_by("plugin_name")
-            .values_list("plugin_name", "count")
+        data_list = await StatisticsDaily.get_plugin_count(
+            user_id=user_id, group_id=group_id, start=cls.__start_day(day)
         )
         return (
             await cls.__build_image(data_list, title)
@@ -98,13 +84,8 @@ class StatisticsManage:
 
     @classmethod
     async def get_group_statistics(cls, group_id: str, day: int | None, title: str):
-        query = Statistics.filter(group_id=group_id)
-        if day:
-            query = query.filter(create_time__gte=TimeUtils.get_day_start())
-        data_list = (
-            await query.annotate(count=Count("id"))
-            .group_by("plugin_name")
-            .values_list("plugin_name", "count")
+        data_list = await StatisticsDaily.get_plugin_count(
+            group_id=group_id, start=cls.__start_day(day)
         )
         return (
             await cls.__build_image(data_list, title)
@@ -112,6 +93,11 @@ class StatisticsManage:
             else "统计数据为空..."
         )
 
+    @classmethod
+    def __start_day(cls, day: int | None) -> date | None:
+        """统计起始日期，包含今天在内共 day 天"""
+        return (datetime.now() - timedelta(days=day - 1)).date() if day else None
+
     @classmethod
     async def __build_image(cls, data_list: list[tuple[str, int]], title: str) -> bytes:
         module2count = {x[0]: x[1] for x in data_list}
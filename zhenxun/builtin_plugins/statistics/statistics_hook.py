@@ -1,5 +1,10 @@
-from datetime import datetime
+import asyncio
+from collections import deque
+from datetime import date, datetime
+import time
+from typing import Any
 
+from nonebot import get_driver
 from nonebot.adapters import Bot, Event
 from nonebot.adapters.onebot.v11 import PokeNotifyEvent
 from nonebot.matcher import Matcher
@@ -7,12 +12,17 @@ from nonebot.message import run_postprocessor
 from nonebot.plugin import PluginMetadata
 from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_session import EventSession
+from tortoise.transactions import in_transaction
 
-from zhenxun.configs.utils import PluginExtraData
+from zhenxun.configs.config import Config
+from zhenxun.configs.utils import PluginExtraData, RegisterConfig
 from zhenxun.models.plugin_info import PluginInfo
 from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_daily import StatisticsDaily
+from zhenxun.services.cache.runtime_cache import PluginInfoMemoryCache
+from zhenxun.services.db_context import bulk_insert_rows
 from zhenxun.services.log import logger
-from zhenxun.services.message_load import should_pause_tasks
+from zhenxun.services.message_load import LoadGovernor, Subsystem
 from zhenxun.utils.enum import PluginType
 
 __plugin_meta__ = PluginMetadata(
@@ -20,11 +30,137 @@ __plugin_meta__ = PluginMetadata(
     description="功能调用统计",
     usage="""""".strip(),
     extra=PluginExtraData(
-        author="HibiKier", version="0.1", plugin_type=PluginType.HIDDEN
+        author="HibiKier",
+        version="0.1",
+        plugin_type=PluginType.HIDDEN,
+        configs=[
+            RegisterConfig(
+                module="statistics",
+                key="BUFFER_SIZE",
+                value=20000,
+                help="内存中最多缓存的调用记录条数，超出时丢弃最早的记录",
+                default_value=20000,
+                type=int,
+            ),
+            RegisterConfig(
+                module="statistics",
+                key="FLUSH_ROWS",
+                value=500,
+                help="缓存的调用记录达到该条数时立即写入数据库",
+                default_value=500,
+                type=int,
+            ),
+            RegisterConfig(
+                module="statistics",
+                key="FLUSH_INTERVAL",
+                value=60,
+                help="调用记录写入数据库的最长间隔（秒）",
+                default_value=60,
+                type=int,
+            ),
+        ],
     ).to_dict(),
 )
 
-TEMP_LIST = []
+driver = get_driver()
+
+LOG_COMMAND = "statistics"
+
+_BUFFER: deque[dict[str, Any]] = deque(
+    maxlen=max(Config.get_config("statistics", "BUFFER_SIZE") or 20000, 100)
+)
+_FLUSH_LOCK = asyncio.Lock()
+_FLUSH_TASK: asyncio.Task | None = None
+_LAST_FLUSH = 0.0
+_NEXT_RETRY = 0.0
+_FAILURES = 0
+_DROPPED = 0
+_RETRY_BASE = 5
+_RETRY_MAX = 300
+
+
+async def _get_plugin_type(module_path: str) -> PluginType | None:
+    if PluginInfoMemoryCache.is_loaded():
+        plugin = PluginInfoMemoryCache.get_by_module_path(module_path)
+    else:
+        plugin = await PluginInfo.get_plugin(module_path=module_path)
+    return plugin.plugin_type if plugin else None
+
+
+def _push(row: dict[str, Any]):
+    global _DROPPED
+    if len(_BUFFER) == _BUFFER.maxlen:
+        _DROPPED += 1
+    _BUFFER.append(row)
+    if len(_BUFFER) >= (Config.get_config("statistics", "FLUSH_ROWS") or 500):
+        _trigger_flush()
+
+
+async def flush_statistics(force: bool = False) -> int:
+    """将缓存的调用记录写入数据库，并累加到按日汇总表
+
+    参数:
+        force: 忽略负载降级强制写入
+
+    返回:
+        int: 写入条数
+    """
+    global _LAST_FLUSH, _DROPPED, _NEXT_RETRY, _FAILURES
+    if not force and (
+        time.time() < _NEXT_RETRY or LoadGovernor.should_shed(Subsystem.STATISTICS)
+    ):
+        return 0
+    async with _FLUSH_LOCK:
+        _LAST_FLUSH = time.time()
+        if not _BUFFER:
+            return 0
+        rows = list(_BUFFER)
+        _BUFFER.clear()
+        try:
+            async with in_transaction() as connection:
+                await bulk_insert_rows(Statistics, rows, connection)
+                await StatisticsDaily.add_rows(rows, connection)
+        except Exception as e:
+            # 放回缓存等待下次写入，缓存已满时丢弃最早的记录
+            restored = rows + list(_BUFFER)
+            _BUFFER.clear()
+            _BUFFER.extend(restored)
+            _DROPPED += len(restored) - len(_BUFFER)
+            # 数据库不可用时按指数退避重试，避免每次调用都触发一次写入
+            _FAILURES += 1
+            delay = min(_RETRY_BASE * 2 ** (_FAILURES - 1), _RETRY_MAX)
+            _NEXT_RETRY = time.time() + delay
+            logger.error(f"批量添加调用记录失败，{delay}s 后重试", LOG_COMMAND, e=e)
+            return 0
+        _FAILURES = 0
+        _NEXT_RETRY = 0.0
+        if _DROPPED:
+            logger.warning(f"调用记录缓存已满，丢弃 {_DROPPED} 条", LOG_COMMAND)
+            _DROPPED = 0
+        logger.debug(f"批量添加调用记录 {len(rows)} 条", LOG_COMMAND)
+        return len(rows)
+
+
+async def rebuild_daily_rollup(day: date) -> int:
+    """重建某一天的调用统计汇总，与写入互斥避免重复累加
+
+    参数:
+        day: 日期
+
+    返回:
+        int: 当日调用次数
+    """
+    async with _FLUSH_LOCK:
+        return await StatisticsDaily.rebuild_day(day)
+
+
+def _trigger_flush():
+    global _FLUSH_TASK
+    if _FLUSH_TASK is not None and not _FLUSH_TASK.done():
+        return
+    if time.time() < _NEXT_RETRY:
+        return
+    _FLUSH_TASK = asyncio.create_task(flush_statistics())
 
 
 @run_postprocessor
@@ -39,30 +175,27 @@ async def _(
         """过滤除poke外的notice"""
         return
     if session.id1 and matcher.plugin:
-        plugin = await PluginInfo.get_plugin(module_path=matcher.plugin.module_name)
-        plugin_type = plugin.plugin_type if plugin else None
+        plugin_type = await _get_plugin_type(matcher.plugin.module_name)
         if plugin_type == PluginType.NORMAL:
             logger.debug(f"提交调用记录: {matcher.plugin_name}...", session=session)
-            TEMP_LIST.append(
-                Statistics(
-                    user_id=session.id1,
-                    group_id=session.id3 or session.id2,
-                    plugin_name=matcher.plugin_name,
-                    create_time=datetime.now(),
-                    bot_id=bot.self_id,
-                )
+            _push(
+                {
+                    "user_id": session.id1,
+                    "group_id": session.id3 or session.id2,
+                    "plugin_name": matcher.plugin_name,
+                    "create_time": datetime.now(),
+                    "bot_id": bot.self_id,
+                }
             )
 
 
-@scheduler.scheduled_job("interval", minutes=30, max_instances=1, coalesce=True)
+@scheduler.scheduled_job("interval", seconds=10)
+async def _():
+    interval = Config.get_config("statistics", "FLUSH_INTERVAL") or 60
+    if _BUFFER and time.time() - _LAST_FLUSH >= interval:
+        _trigger_flush()
+
+
+@driver.on_shutdown
 async def _():
-    try:
-        if should_pause_tasks():
-            return
-        call_list = TEMP_LIST.copy()
-        TEMP_LIST.clear()
-        if call_list:
-            await Statistics.bulk_create(call_list)
-        logger.debug(f"批量添加调用记录 {len(call_list)} 条", "定时任务")
-    except Exception as e:
-        logger.error("定时批量添加调用记录", "定时任务", e=e)
+    await flush_statistics(force=True)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from nonebot.permission import SUPERUSER
+from nonebot.plugin import PluginMetadata
+from nonebot.rule import to_me
+from nonebot_plugin_alconna import Alconna, Args, Arparma, Match, on_alconna
+from nonebot_plugin_session import EventSession
+
+from zhenxun.configs.utils import PluginExtraData
+from zhenxun.models.statistics import Statistics
+from zhenxun.services.log import logger
+from zhenxun.utils.enum import PluginType
+from zhenxun.utils.manager.retention_manager import RetentionManager
+from zhenxun.utils.message import MessageUtils
+
+from .statistics_hook import rebuild_daily_rollup
+
+__plugin_meta__ = PluginMetadata(
+    name="重建调用统计",
+    description="根据调用记录重建按日汇总的功能调用统计数据",
+    usage="""
+    重建调用统计 ?[天数]: 不填天数时从第一条调用记录开始重建
+    已被数据保留任务清理的日期不会重建
+
+    示例:
+    重建调用统计
+    重建调用统计 30
+    """.strip(),
+    extra=PluginExtraData(
+        author="HibiKier",
+        version="0.1",
+        plugin_type=PluginType.SUPERUSER,
+    ).to_dict(),
+)
+
+
+_matcher = on_alconna(
+    Alconna("重建调用统计", Args["days?", int]),
+    rule=to_me(),
+    permission=SUPERUSER,
+    priority=5,
+    block=True,
+)
+
+
+@_matcher.handle()
+async def _(session: EventSession, arparma: Arparma, days: Match[int]):
+    today = datetime.now().date()
+    if days.available:
+        start = today - timedelta(days=max(days.result, 1) - 1)
+    elif record := await Statistics.all().order_by("create_time").first():
+        start = record.create_time.date()
+    else:
+        await MessageUtils.build_message("调用记录为空...").finish()
+    if (
+        earliest := RetentionManager.get_rebuild_start("statistics")
+    ) and start < earliest:
+        # 已清理的日期只保留汇总数据，重建会丢失这部分统计
+        if earliest > today:
+            await MessageUtils.build_message(
+                "指定日期的调用记录均已被清理，无法重建..."
+            ).finish()
+        start = earliest
+    await MessageUtils.build_message(
+        f"开始重建 {start} 至 {today} 的调用统计..."
+    ).send()
+    total = 0
+    day = start
+    while day <= today:
+        try:
+            total += await rebuild_daily_rollup(day)
+        except Exception as e:
+            logger.error(f"重建 {day} 调用统计失败", arparma.header_result, e=e)
+            await MessageUtils.build_message(
+                f"重建 {day} 调用统计失败，已停止..."
+            ).finish()
+        day += timedelta(days=1)
+    logger.info(
+        f"重建调用统计完成 {start} - {today}，共 {total} 条",
+        arparma.header_result,
+        session=session,
+    )
+    await MessageUtils.build_message(
+        f"重建调用统计完成，共统计 {total} 次调用..."
+    ).send()
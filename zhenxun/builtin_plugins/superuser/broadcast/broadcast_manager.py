@@ -13,6 +13,7 @@ from nonebot_plugin_session import EventSession
 from zhenxun.configs.config import Config
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.services.log import logger
+from zhenxun.services.send_queue import SendPriority, send_priority
 from zhenxun.utils.common_utils import CommonUtils
 from zhenxun.utils.platform import PlatformUtils
 
@@ -344,9 +345,10 @@ class BroadcastManager:
             group_key = group.group_id or group.channel_id
             async with semaphore:
                 try:
-                    result = await bot.send_group_forward_msg(
-                        group_id=int(group.group_id), messages=v11_nodes
-                    )
+                    with send_priority(SendPriority.BROADCAST):
+                        result = await bot.send_group_forward_msg(
+                            group_id=int(group.group_id), messages=v11_nodes
+                        )
                     async with msg_id_lock:
                         await cls._extract_message_id_from_result(
                             result, group_key, session_info, "合并转发"
@@ -431,7 +433,8 @@ class BroadcastManager:
 
             async with semaphore:
                 try:
-                    receipt: Receipt = await message.send(target, bot=bot)
+                    with send_priority(SendPriority.BROADCAST):
+                        receipt: Receipt = await message.send(target, bot=bot)
                     async with msg_id_lock:
                         await cls._extract_message_id_from_result(
                             receipt, group_key, session_info
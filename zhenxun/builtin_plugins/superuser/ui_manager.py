@@ -48,6 +48,30 @@ __plugin_meta__ = PluginMetadata(
                 default_value=True,
                 type=bool,
             ),
+            RegisterConfig(
+                module="UI",
+                key="CACHE_MEMORY_MB",
+                value=32,
+                help="渲染缓存在内存中保留的最近图片总大小(MB)，0为不使用内存缓存",
+                default_value=32,
+                type=int,
+            ),
+            RegisterConfig(
+                module="UI",
+                key="CACHE_DISK_MB",
+                value=512,
+                help="渲染缓存目录的总大小上限(MB)，超出后删除最久未使用的图片，0为不限制",
+                default_value=512,
+                type=int,
+            ),
+            RegisterConfig(
+                module="UI",
+                key="PILLOW_FAST_PATH",
+                value=True,
+                help="默认主题下的简单表格直接使用Pillow绘制，不经过浏览器截图",
+                default_value=True,
+                type=bool,
+            ),
             RegisterConfig(
                 module="UI",
                 key="DEBUG_MODE",
@@ -56,6 +80,46 @@ __plugin_meta__ = PluginMetadata(
                 default_value=False,
                 type=bool,
             ),
+            RegisterConfig(
+                module="UI",
+                key="SCREENSHOT_ENGINE",
+                value="pool",
+                help="截图引擎，pool: 复用预热页面，playwright: 每次截图新建页面",
+                default_value="pool",
+                type=str,
+            ),
+            RegisterConfig(
+                module="UI",
+                key="PAGE_POOL_SIZE",
+                value=2,
+                help="页面池中每种视口预热并保留的空闲页面数量",
+                default_value=2,
+                type=int,
+            ),
+            RegisterConfig(
+                module="UI",
+                key="PAGE_POOL_MAX_PAGES",
+                value=8,
+                help="页面池同时进行的截图数量上限，超出的请求排队等待",
+                default_value=8,
+                type=int,
+            ),
+            RegisterConfig(
+                module="UI",
+                key="PAGE_MAX_RENDERS",
+                value=100,
+                help="单个页面最多截图的次数，超出后关闭并重新创建",
+                default_value=100,
+                type=int,
+            ),
+            RegisterConfig(
+                module="UI",
+                key="RENDER_QUEUE_TIMEOUT",
+                value=30,
+                help="截图排队的最长等待秒数，超时则渲染失败，0为不限制",
+                default_value=30,
+                type=int,
+            ),
         ],
     ).to_dict(),
 )
@@ -1,10 +1,12 @@
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import nonebot
 from nonebot import require
 from nonebot.config import Config
 
+from zhenxun.services.cache.runtime_cache import RuntimeCacheSync
 from zhenxun.services.log import logger
+from zhenxun.services.message_load import LoadGovernor
 
 from ....base_model import BaseResultModel, QueryModel, Result
 from ....utils import authentication
@@ -110,3 +112,35 @@ async def _(query: QueryModel) -> Result[BaseResultModel]:
 )
 async def _() -> Result[Config]:
     return Result.ok(driver.config)
+
+
+@router.get(
+    "/get_load_status",
+    dependencies=[authentication()],
+    response_model=Result[dict],
+    response_class=JSONResponse,
+    description="获取负载等级与各子系统降级状态",  # type: ignore
+)
+async def _() -> Result[dict]:
+    return Result.ok(LoadGovernor.metrics())
+
+
+@router.get(
+    "/metrics",
+    dependencies=[authentication()],
+    response_class=PlainTextResponse,
+    description="Prometheus 格式的负载与缓存同步指标",  # type: ignore
+)
+async def _() -> str:
+    return LoadGovernor.prometheus() + RuntimeCacheSync.prometheus()
+
+
+@router.get(
+    "/get_cache_sync_status",
+    dependencies=[authentication()],
+    response_model=Result[dict],
+    response_class=JSONResponse,
+    description="获取多实例缓存同步状态与传播延迟",  # type: ignore
+)
+async def _() -> Result[dict]:
+    return Result.ok(RuntimeCacheSync.stats())
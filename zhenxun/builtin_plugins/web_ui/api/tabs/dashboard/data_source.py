@@ -5,13 +5,11 @@ import time
 import nonebot
 from nonebot.adapters import Bot
 from nonebot.drivers import Driver
-from tortoise.expressions import RawSQL
-from tortoise.functions import Count
 
 from zhenxun.configs.config import BotConfig
 from zhenxun.models.bot_connect_log import BotConnectLog
-from zhenxun.models.chat_history import ChatHistory
-from zhenxun.models.statistics import Statistics
+from zhenxun.models.chat_history_daily import ChatHistoryDaily
+from zhenxun.models.statistics_daily import StatisticsDaily
 from zhenxun.services.log import logger
 from zhenxun.utils.manager.priority_manager import PriorityLifecycle
 from zhenxun.utils.platform import PlatformUtils
@@ -77,14 +75,12 @@ class ApiDataSource:
             logger.warning("获取bot好友/群组信息失败...", "WebUi", e=e)
             bot_info.group_count = 0
             bot_info.friend_count = 0
-        bot_info.day_call = await Statistics.filter(
-            create_time__gte=now - timedelta(hours=now.hour, minutes=now.minute),
-            bot_id=bot.self_id,
-        ).count()
-        bot_info.received_messages = await ChatHistory.filter(
-            bot_id=bot_info.self_id,
-            create_time__gte=now - timedelta(hours=now.hour, minutes=now.minute),
-        ).count()
+        bot_info.day_call = await StatisticsDaily.get_count(
+            bot_id=bot.self_id, start=now.date()
+        )
+        bot_info.received_messages = await ChatHistoryDaily.get_count(
+            bot_id=bot_info.self_id, start=now.date()
+        )
         bot_info.connect_time = bot_live.get(bot.self_id) or 0
         if bot_info.connect_time:
             connect_date = datetime.fromtimestamp(CONNECT_TIME)
@@ -114,20 +110,14 @@ class ApiDataSource:
             QueryChatCallCount: 数据内容
         """
         now = datetime.now()
-        query = ChatHistory
-        if bot_id:
-            query = query.filter(bot_id=bot_id)
-        chat_all_count = await query.annotate().count()
-        chat_day_count = await query.filter(
-            create_time__gte=now - timedelta(hours=now.hour, minutes=now.minute)
-        ).count()
-        query = Statistics
-        if bot_id:
-            query = query.filter(bot_id=bot_id)
-        call_all_count = await query.annotate().count()
-        call_day_count = await query.filter(
-            create_time__gte=now - timedelta(hours=now.hour, minutes=now.minute)
-        ).count()
+        chat_all_count = await ChatHistoryDaily.get_count(bot_id=bot_id)
+        chat_day_count = await ChatHistoryDaily.get_count(
+            bot_id=bot_id, start=now.date()
+        )
+        call_all_count = await StatisticsDaily.get_count(bot_id=bot_id)
+        call_day_count = await StatisticsDaily.get_count(
+            bot_id=bot_id, start=now.date()
+        )
         return QueryChatCallCount(
             chat_num=chat_all_count,
             chat_day=chat_day_count,
@@ -148,34 +138,24 @@ class ApiDataSource:
             AllChatAndCallCount: 数据内容
         """
         now = datetime.now()
-        query = ChatHistory
-        if bot_id:
-            query = query.filter(bot_id=bot_id)
-        chat_week_count = await query.filter(
-            create_time__gte=now - timedelta(days=7, hours=now.hour, minutes=now.minute)
-        ).count()
-        chat_month_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=30, hours=now.hour, minutes=now.minute)
-        ).count()
-        chat_year_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=365, hours=now.hour, minutes=now.minute)
-        ).count()
-        query = Statistics
-        if bot_id:
-            query = query.filter(bot_id=bot_id)
-        call_week_count = await query.filter(
-            create_time__gte=now - timedelta(days=7, hours=now.hour, minutes=now.minute)
-        ).count()
-        call_month_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=30, hours=now.hour, minutes=now.minute)
-        ).count()
-        call_year_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=365, hours=now.hour, minutes=now.minute)
-        ).count()
+        chat_week_count = await ChatHistoryDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=7)).date()
+        )
+        chat_month_count = await ChatHistoryDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=30)).date()
+        )
+        chat_year_count = await ChatHistoryDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=365)).date()
+        )
+        call_week_count = await StatisticsDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=7)).date()
+        )
+        call_month_count = await StatisticsDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=30)).date()
+        )
+        call_year_count = await StatisticsDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=365)).date()
+        )
         return AllChatAndCallCount(
             chat_week=chat_week_count,
             chat_month=chat_month_count,
@@ -197,28 +177,16 @@ class ApiDataSource:
         """
         now = datetime.now()
         filter_date = now - timedelta(days=30, hours=now.hour, minutes=now.minute)
-        chat_query = ChatHistory
-        call_query = Statistics
-        if bot_id:
-            chat_query = chat_query.filter(bot_id=bot_id)
-            call_query = call_query.filter(bot_id=bot_id)
-        chat_date_list = (
-            await chat_query.filter(create_time__gte=filter_date)
-            .annotate(date=RawSQL("DATE(create_time)"), count=Count("id"))
-            .group_by("date")
-            .values("date", "count")
+        bot_filter = {"bot_id": bot_id} if bot_id else {}
+        chat_date2cnt = await ChatHistoryDaily.get_daily_count(
+            filter_date.date(), **bot_filter
         )
-        call_date_list = (
-            await call_query.filter(create_time__gte=filter_date)
-            .annotate(date=RawSQL("DATE(create_time)"), count=Count("id"))
-            .group_by("date")
-            .values("date", "count")
+        call_date2cnt = await StatisticsDaily.get_daily_count(
+            filter_date.date(), **bot_filter
         )
         date_list = []
         chat_count_list = []
         call_count_list = []
-        chat_date2cnt = {str(date["date"]): date["count"] for date in chat_date_list}
-        call_date2cnt = {str(date["date"]): date["count"] for date in call_date_list}
         date = now.date()
         for _ in range(30):
             if str(date) in chat_date2cnt:
@@ -5,14 +5,15 @@ import time
 import nonebot
 from nonebot.adapters import Bot
 from nonebot.drivers import Driver
-from tortoise.functions import Count
+from tortoise.functions import Count, Sum
 
 from zhenxun.models.bot_connect_log import BotConnectLog
 from zhenxun.models.bot_console import BotConsole
 from zhenxun.models.chat_history import ChatHistory
+from zhenxun.models.chat_history_daily import ChatHistoryDaily
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.plugin_info import PluginInfo
-from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_daily import StatisticsDaily
 from zhenxun.models.task_info import TaskInfo
 from zhenxun.services.log import logger
 from zhenxun.utils.common_utils import CommonUtils
@@ -29,6 +30,14 @@ from .model import (
     TemplateBaseInfo,
 )
 
+_DATE_TYPE_DAYS = {
+    QueryDateType.DAY: 0,
+    QueryDateType.WEEK: 7,
+    QueryDateType.MONTH: 30,
+    QueryDateType.YEAR: 365,
+}
+"""日期类型 -> 统计起始日期距今天数"""
+
 driver: Driver = nonebot.get_driver()
 
 
@@ -105,10 +114,9 @@ class ApiDataSource:
         """
         now = datetime.now()
         # 今日累计接收消息
-        select_bot.received_messages = await ChatHistory.filter(
-            bot_id=select_bot.self_id,
-            create_time__gte=now - timedelta(hours=now.hour),
-        ).count()
+        select_bot.received_messages = await ChatHistoryDaily.get_count(
+            bot_id=select_bot.self_id, start=now.date()
+        )
         # 群聊数量
         try:
             select_bot.group_count = len(
@@ -129,10 +137,7 @@ class ApiDataSource:
             connect_date = datetime.fromtimestamp(select_bot.connect_time)
             select_bot.connect_date = connect_date.strftime("%Y-%m-%d %H:%M:%S")
         select_bot.version = cls.__get_bot_version()
-        day_call = await Statistics.filter(
-            create_time__gte=now - timedelta(hours=now.hour)
-        ).count()
-        select_bot.day_call = day_call
+        select_bot.day_call = await StatisticsDaily.get_count(start=now.date())
         select_bot.connect_count = await BotConnectLog.filter(
             bot_id=select_bot.self_id
         ).count()
@@ -174,24 +179,17 @@ class ApiDataSource:
             QueryCount: 数据内容
         """
         now = datetime.now()
-        query = ChatHistory
-        if bot_id:
-            query = query.filter(bot_id=bot_id)
-        all_count = await query.annotate().count()
-        day_count = await query.filter(
-            create_time__gte=now - timedelta(hours=now.hour, minutes=now.minute)
-        ).count()
-        week_count = await query.filter(
-            create_time__gte=now - timedelta(days=7, hours=now.hour, minutes=now.minute)
-        ).count()
-        month_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=30, hours=now.hour, minutes=now.minute)
-        ).count()
-        year_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=365, hours=now.hour, minutes=now.minute)
-        ).count()
+        all_count = await ChatHistoryDaily.get_count(bot_id=bot_id)
+        day_count = await ChatHistoryDaily.get_count(bot_id=bot_id, start=now.date())
+        week_count = await ChatHistoryDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=7)).date()
+        )
+        month_count = await ChatHistoryDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=30)).date()
+        )
+        year_count = await ChatHistoryDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=365)).date()
+        )
         return QueryCount(
             num=all_count,
             day=day_count,
@@ -211,24 +209,17 @@ class ApiDataSource:
             QueryCount: 数据内容
         """
         now = datetime.now()
-        query = Statistics
-        if bot_id:
-            query = query.filter(bot_id=bot_id)
-        all_count = await query.annotate().count()
-        day_count = await query.filter(
-            create_time__gte=now - timedelta(hours=now.hour, minutes=now.minute)
-        ).count()
-        week_count = await query.filter(
-            create_time__gte=now - timedelta(days=7, hours=now.hour, minutes=now.minute)
-        ).count()
-        month_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=30, hours=now.hour, minutes=now.minute)
-        ).count()
-        year_count = await query.filter(
-            create_time__gte=now
-            - timedelta(days=365, hours=now.hour, minutes=now.minute)
-        ).count()
+        all_count = await StatisticsDaily.get_count(bot_id=bot_id)
+        day_count = await StatisticsDaily.get_count(bot_id=bot_id, start=now.date())
+        week_count = await StatisticsDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=7)).date()
+        )
+        month_count = await StatisticsDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=30)).date()
+        )
+        year_count = await StatisticsDaily.get_count(
+            bot_id=bot_id, start=(now - timedelta(days=365)).date()
+        )
         return QueryCount(
             num=all_count,
             day=day_count,
@@ -240,7 +231,7 @@ class ApiDataSource:
     @classmethod
     def __get_query(
         cls,
-        base_query: type[ChatHistory | Statistics],
+        base_query: type[ChatHistory],
         date_type: QueryDateType | None = None,
         bot_id: str | None = None,
     ):
@@ -340,9 +331,14 @@ class ApiDataSource:
         返回:
             list[HotPlugin]: 热门插件列表
         """
-        query = cls.__get_query(Statistics, date_type, bot_id)
+        query = StatisticsDaily.all()
+        if bot_id:
+            query = query.filter(bot_id=bot_id)
+        if date_type in _DATE_TYPE_DAYS:
+            start = datetime.now() - timedelta(days=_DATE_TYPE_DAYS[date_type])
+            query = query.filter(day__gte=start.date())
         data_list = (
-            await query.annotate(count=Count("id"))
+            await query.annotate(count=Sum("call_count"))
             .group_by("plugin_name")
             .order_by("-count")
             .limit(5)
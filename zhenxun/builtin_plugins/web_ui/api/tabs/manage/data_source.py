@@ -1,12 +1,12 @@
 import nonebot
-from tortoise.functions import Count
+from tortoise.functions import Sum
 
 from zhenxun.models.ban_console import BanConsole
 from zhenxun.models.chat_history import ChatHistory
 from zhenxun.models.fg_request import FgRequest
 from zhenxun.models.group_console import GroupConsole
 from zhenxun.models.plugin_info import PluginInfo
-from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_daily import StatisticsDaily
 from zhenxun.models.task_info import TaskInfo
 from zhenxun.utils.common_utils import CommonUtils
 from zhenxun.utils.enum import RequestType
@@ -111,8 +111,8 @@ class ApiDataSource:
         if not fd:
             return None
         like_plugin_list = (
-            await Statistics.filter(user_id=user_id)
-            .annotate(count=Count("id"))
+            await StatisticsDaily.filter(user_id=user_id)
+            .annotate(count=Sum("call_count"))
             .group_by("plugin_name")
             .order_by("-count")
             .limit(5)
@@ -132,8 +132,8 @@ class ApiDataSource:
             nickname=user.user_name,
             remark="",
             is_ban=await BanConsole.is_ban(user_id),
-            chat_count=await ChatHistory.filter(user_id=user_id).count(),
-            call_count=await Statistics.filter(user_id=user_id).count(),
+            chat_count=await ChatHistory.get_message_count(user_id, "", "user"),
+            call_count=await StatisticsDaily.get_count(user_id=user_id),
             like_plugin=like_plugin,
         )
 
@@ -148,8 +148,8 @@ class ApiDataSource:
             dict[str, int]: 插件与调用次数
         """
         like_plugin_list = (
-            await Statistics.filter(group_id=group_id)
-            .annotate(count=Count("id"))
+            await StatisticsDaily.filter(group_id=group_id)
+            .annotate(count=Sum("call_count"))
             .group_by("plugin_name")
             .order_by("-count")
             .limit(5)
@@ -264,8 +264,8 @@ class ApiDataSource:
             name=group.group_name,
             member_count=group.member_count,
             max_member_count=group.max_member_count,
-            chat_count=await ChatHistory.filter(group_id=group_id).count(),
-            call_count=await Statistics.filter(group_id=group_id).count(),
+            chat_count=await ChatHistory.get_message_count("", group_id, "group"),
+            call_count=await StatisticsDaily.get_count(group_id=group_id),
             like_plugin=like_plugin,
             level=group.level,
             status=group.status,
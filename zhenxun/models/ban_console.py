@@ -29,6 +29,8 @@ class BanConsole(Model):
     """ban时长"""
     operator = fields.CharField(255)
     """使用Ban命令的用户"""
+    update_time = fields.DatetimeField(auto_now=True, null=True, description="更新时间")
+    """更新时间，运行时缓存据此增量刷新"""
 
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "ban_console"
@@ -212,4 +214,7 @@ class BanConsole(Model):
             "CREATE INDEX idx_ban_console_user_id ON ban_console(user_id);",
             "CREATE INDEX idx_ban_console_group_id ON ban_console(group_id);",
             "ALTER TABLE ban_console ADD COLUMN ban_reason TEXT DEFAULT NULL;",
+            "ALTER TABLE ban_console ADD COLUMN update_time TIMESTAMPTZ;",
+            "ALTER TABLE ban_console ADD COLUMN update_time DATETIME(6) NULL;",
+            "CREATE INDEX idx_ban_console_update_time ON ban_console(update_time);",
         ]
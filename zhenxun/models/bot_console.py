@@ -26,6 +26,8 @@ class BotConsole(Model):
     """可用插件"""
     available_tasks = fields.TextField(default="", description="可用被动技能")
     """可用被动技能"""
+    update_time = fields.DatetimeField(auto_now=True, null=True, description="更新时间")
+    """更新时间，运行时缓存据此增量刷新"""
 
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "bot_console"
@@ -465,4 +467,7 @@ class BotConsole(Model):
             "ALTER TABLE bot_console RENAME COLUMN block_task TO block_tasks;",
             "ALTER TABLE bot_console ADD available_plugins text default '';",
             "ALTER TABLE bot_console ADD available_tasks text default '';",
+            "ALTER TABLE bot_console ADD COLUMN update_time TIMESTAMPTZ;",
+            "ALTER TABLE bot_console ADD COLUMN update_time DATETIME(6) NULL;",
+            "CREATE INDEX idx_bot_console_update_time ON bot_console(update_time);",
         ]
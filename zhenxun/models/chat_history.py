@@ -3,9 +3,10 @@ from typing import Literal
 from typing_extensions import Self
 
 from tortoise import fields
-from tortoise.functions import Count
+from tortoise.functions import Sum
 
-from zhenxun.services.db_context import Model
+from zhenxun.models.chat_history_daily import ChatHistoryDaily
+from zhenxun.services.db_context import Model, mysql_index_sql
 
 
 class ChatHistory(Model):
@@ -29,6 +30,12 @@ class ChatHistory(Model):
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "chat_history"
         table_description = "聊天记录数据表"
+        indexes = (
+            ("group_id", "create_time"),
+            ("user_id", "group_id"),
+            ("bot_id", "create_time"),
+            ("create_time",),
+        )
 
     @classmethod
     async def get_group_msg_rank(
@@ -38,7 +45,7 @@ class ChatHistory(Model):
         order: str = "DESC",
         date_scope: tuple[datetime, datetime] | None = None,
     ) -> list[Self]:
-        """获取排行数据
+        """获取排行数据，读取按日汇总表，日期范围按天计算
 
         参数:
             gid: 群号
@@ -47,12 +54,13 @@ class ChatHistory(Model):
             date_scope: 日期范围
         """
         o = "-" if order == "DESC" else ""
-        query = cls.filter(group_id=gid) if gid else cls
+        query = ChatHistoryDaily.filter(group_id=gid) if gid else ChatHistoryDaily
         if date_scope:
-            filter_scope = (date_scope[0].isoformat(" "), date_scope[1].isoformat(" "))
-            query = query.filter(create_time__range=filter_scope)
+            query = query.filter(
+                day__range=(date_scope[0].date(), date_scope[1].date())
+            )
         return list(
-            await query.annotate(count=Count("user_id"))
+            await query.annotate(count=Sum("message_count"))
             .order_by(f"{o}count")
             .group_by("user_id")
             .limit(limit)
@@ -68,13 +76,13 @@ class ChatHistory(Model):
         参数:
             group_id: 群组id
         """
-        if group_id:
-            message = (
-                await cls.filter(group_id=group_id).order_by("create_time").first()
-            )
-        else:
-            message = await cls.all().order_by("create_time").first()
-        return message.create_time if message else None
+        query = (
+            ChatHistoryDaily.filter(group_id=group_id)
+            if group_id
+            else ChatHistoryDaily.all()
+        )
+        record = await query.order_by("day", "first_time").first()
+        return record.first_time if record else None
 
     @classmethod
     async def get_message(
@@ -113,6 +121,43 @@ class ChatHistory(Model):
                 query = query.filter(create_time__range=days)
         return await query.all()  # type: ignore
 
+    @classmethod
+    async def get_message_count(
+        cls,
+        uid: str,
+        gid: str,
+        type_: Literal["user", "group"],
+        msg_type: Literal["private", "group"] | None = None,
+        days: int | tuple[datetime, datetime] | None = None,
+    ) -> int:
+        """获取消息数量，参数同 get_message，读取按日汇总表
+
+        参数:
+            uid: 用户id
+            gid: 群聊id
+            type_: 类型，私聊或群聊
+            msg_type: 消息类型，用户或群聊
+            days: 限制日期
+        """
+        query = ChatHistoryDaily.filter(user_id=uid) if uid else ChatHistoryDaily.all()
+        if type_ == "user":
+            if msg_type == "private":
+                query = query.filter(group_id="")
+            elif msg_type == "group":
+                query = query.exclude(group_id="")
+        else:
+            query = query.filter(group_id=gid)
+        if isinstance(days, int) and days:
+            query = query.filter(
+                day__gte=(datetime.now() - timedelta(days=days)).date()
+            )
+        elif isinstance(days, tuple):
+            query = query.filter(day__range=(days[0].date(), days[1].date()))
+        result = await query.annotate(total=Sum("message_count")).values_list(
+            "total", flat=True
+        )
+        return int(result[0] or 0) if result else 0
+
     @classmethod
     async def _run_script(cls):
         return [
@@ -132,4 +177,7 @@ class ChatHistory(Model):
             "ALTER TABLE chat_history ADD bot_id VARCHAR(255);",
             "ALTER TABLE chat_history ALTER COLUMN bot_id TYPE character varying(255);",
             "ALTER TABLE chat_history ADD COLUMN platform character varying(255);",
+            # PostgreSQL/SQLite 由 generate_schemas 补建 Meta.indexes，
+            # MySQL 已有数据表需要单独补建
+            *mysql_index_sql(cls),
         ]
@@ -0,0 +1,195 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from tortoise import fields
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.functions import Count, Max, Min, Sum
+
+from zhenxun.services.db_context import Model, replace_rows, upsert_increment
+
+
+class ChatHistoryDaily(Model):
+    id = fields.IntField(pk=True, generated=True, auto_increment=True)
+    """自增id"""
+    group_id = fields.CharField(255, default="")
+    """群聊id，私聊为空字符串"""
+    user_id = fields.CharField(255)
+    """用户id"""
+    bot_id = fields.CharField(255, default="")
+    """bot记录id"""
+    day = fields.DateField()
+    """日期"""
+    message_count = fields.IntField(default=0)
+    """当日消息数量"""
+    first_time = fields.DatetimeField(null=True)
+    """当日第一条消息时间"""
+
+    class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
+        table = "chat_history_daily"
+        table_description = "聊天记录按日汇总表"
+        unique_together = ("group_id", "user_id", "bot_id", "day")
+        indexes = (("day", "bot_id"),)
+
+    @classmethod
+    async def add_rows(
+        cls, rows: list[dict[str, Any]], using_db: BaseDBAsyncClient | None = None
+    ):
+        """将新写入的聊天记录累加到汇总表
+
+        参数:
+            rows: 聊天记录字段字典，需包含 user_id, group_id, bot_id, create_time
+            using_db: 数据库连接或事务
+        """
+        counter: dict[tuple[str, str, str, date], list] = {}
+        for row in rows:
+            create_time: datetime = row["create_time"]
+            key = (
+                row.get("group_id") or "",
+                row["user_id"],
+                row.get("bot_id") or "",
+                create_time.date(),
+            )
+            if item := counter.get(key):
+                item[0] += 1
+            else:
+                counter[key] = [1, create_time]
+        await upsert_increment(
+            cls,
+            [
+                {
+                    "group_id": key[0],
+                    "user_id": key[1],
+                    "bot_id": key[2],
+                    "day": key[3],
+                    "message_count": count,
+                    "first_time": first_time,
+                }
+                for key, (count, first_time) in counter.items()
+            ],
+            cls._meta.unique_together[0],
+            "message_count",
+            using_db,
+        )
+
+    @classmethod
+    async def rebuild_day(cls, day: date) -> int:
+        """根据原始聊天记录重建某一天的汇总数据
+
+        参数:
+            day: 日期
+
+        返回:
+            int: 当日消息数量
+        """
+        from zhenxun.models.chat_history import ChatHistory
+
+        start = datetime.combine(day, time.min)
+        data_list = (
+            await ChatHistory.filter(
+                create_time__gte=start, create_time__lt=start + timedelta(days=1)
+            )
+            .annotate(count=Count("id"), first_time=Min("create_time"))
+            .group_by("group_id", "user_id", "bot_id")
+            .values("group_id", "user_id", "bot_id", "count", "first_time")
+        )
+        records: dict[tuple[str, str, str], ChatHistoryDaily] = {}
+        for data in data_list:
+            key = (data["group_id"] or "", data["user_id"], data["bot_id"] or "")
+            # 原始表中 NULL 与空字符串在汇总表中为同一行
+            if record := records.get(key):
+                record.message_count += data["count"]
+                record.first_time = min(record.first_time, data["first_time"])
+            else:
+                records[key] = cls(
+                    group_id=key[0],
+                    user_id=key[1],
+                    bot_id=key[2],
+                    day=day,
+                    message_count=data["count"],
+                    first_time=data["first_time"],
+                )
+        await replace_rows(cls, {"day": day}, list(records.values()))
+        return sum(data["count"] for data in data_list)
+
+    @classmethod
+    async def get_count(
+        cls,
+        *,
+        user_id: str | None = None,
+        group_id: str | None = None,
+        bot_id: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        **filters: Any,
+    ) -> int:
+        """统计消息数量
+
+        参数:
+            user_id: 用户id
+            group_id: 群聊id
+            bot_id: bot id
+            start: 起始日期（包含）
+            end: 结束日期（包含）
+            filters: 其他过滤条件
+
+        返回:
+            int: 消息数量
+        """
+        query = cls.filter(**filters)
+        if user_id:
+            query = query.filter(user_id=user_id)
+        if group_id:
+            query = query.filter(group_id=group_id)
+        if bot_id:
+            query = query.filter(bot_id=bot_id)
+        if start:
+            query = query.filter(day__gte=start)
+        if end:
+            query = query.filter(day__lte=end)
+        result = await query.annotate(total=Sum("message_count")).values_list(
+            "total", flat=True
+        )
+        return int(result[0] or 0) if result else 0
+
+    @classmethod
+    async def get_daily_count(cls, start: date, **filters: Any) -> dict[str, int]:
+        """获取从起始日期开始每天的消息数量
+
+        参数:
+            start: 起始日期（包含）
+            filters: 过滤条件
+
+        返回:
+            dict[str, int]: 日期字符串 -> 消息数量
+        """
+        data_list = (
+            await cls.filter(day__gte=start, **filters)
+            .annotate(total=Sum("message_count"))
+            .group_by("day")
+            .values_list("day", "total")
+        )
+        return {str(day): int(total or 0) for day, total in data_list}
+
+    @classmethod
+    async def get_group_last_day(
+        cls, group_ids: set[str] | None = None
+    ) -> dict[str, date]:
+        """获取群组最后一次有消息记录的日期
+
+        参数:
+            group_ids: 群组id，为None时获取所有群组
+
+        返回:
+            dict[str, date]: 群组id -> 最后有消息的日期，无记录的群组不包含在内
+        """
+        query = cls.exclude(group_id="")
+        if group_ids is not None:
+            if not group_ids:
+                return {}
+            query = query.filter(group_id__in=group_ids)
+        data_list = (
+            await query.annotate(last_day=Max("day"))
+            .group_by("group_id")
+            .values_list("group_id", "last_day")
+        )
+        return {group_id: last_day for group_id, last_day in data_list if last_day}
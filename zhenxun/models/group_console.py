@@ -87,6 +87,12 @@ class GroupConsole(Model):
     """超级用户禁用被动"""
     platform = fields.CharField(255, default="qq", description="所属平台")
     """所属平台"""
+    update_time = fields.DatetimeField(auto_now=True, null=True, description="更新时间")
+    """更新时间，运行时缓存据此增量刷新"""
+    member_fingerprint = fields.CharField(
+        64, null=True, description="群成员指纹，用于跳过未变化群组的成员同步"
+    )
+    """群成员指纹"""
 
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "group_console"
@@ -272,7 +278,7 @@ class GroupConsole(Model):
         clean_duplicates: bool = True,
     ) -> Self | None:
         """获取群组（数据库）"""
-        dao = DataAccess(cls)
+        dao = DataAccess(cls, stale_ttl=60)
         if channel_id:
             return await dao.safe_get_or_none(
                 group_id=group_id,
@@ -521,4 +527,8 @@ class GroupConsole(Model):
             " character varying(255) NOT NULL DEFAULT '';",
             "CREATE INDEX idx_group_console_group_id ON group_console(group_id);",
             "CREATE INDEX idx_group_console_group_null_channel ON group_console(group_id) WHERE channel_id IS NULL;",  # 单独创建channel为空的索引 # noqa: E501
+            "ALTER TABLE group_console ADD COLUMN update_time TIMESTAMPTZ;",
+            "ALTER TABLE group_console ADD COLUMN update_time DATETIME(6) NULL;",
+            "CREATE INDEX idx_group_console_update_time ON group_console(update_time);",
+            "ALTER TABLE group_console ADD COLUMN member_fingerprint VARCHAR(64);",
         ]
@@ -16,6 +16,8 @@ class LevelUser(Model):
     """用户权限等级"""
     group_flag = fields.IntField(default=0)
     """特殊标记，是否随群管理员变更而设置权限"""
+    update_time = fields.DatetimeField(auto_now=True, null=True, description="更新时间")
+    """更新时间，运行时缓存据此增量刷新"""
 
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "level_users"
@@ -156,4 +158,7 @@ class LevelUser(Model):
             # 将user_id字段类型改为character varying(255)
             "ALTER TABLE level_users "
             "ALTER COLUMN group_id TYPE character varying(255);",
+            "ALTER TABLE level_users ADD COLUMN update_time TIMESTAMPTZ;",
+            "ALTER TABLE level_users ADD COLUMN update_time DATETIME(6) NULL;",
+            "CREATE INDEX idx_level_users_update_time ON level_users(update_time);",
         ]
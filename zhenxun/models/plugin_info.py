@@ -3,6 +3,7 @@ from typing_extensions import Self
 from tortoise import fields
 
 from zhenxun.models.plugin_limit import PluginLimit  # noqa: F401
+from zhenxun.services.cache.runtime_cache import PluginInfoMemoryCache
 from zhenxun.services.db_context import Model
 from zhenxun.utils.enum import BlockType, CacheType, PluginType
 
@@ -54,6 +55,8 @@ class PluginInfo(Model):
     """是否显示在帮助中"""
     impression = fields.FloatField(default=0, description="插件好感度限制")
     """插件好感度限制"""
+    update_time = fields.DatetimeField(auto_now=True, null=True, description="更新时间")
+    """更新时间，运行时缓存据此增量刷新"""
 
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "plugin_info"
@@ -102,6 +105,15 @@ class PluginInfo(Model):
             ).all()
         return await cls.filter(load_status=load_status, **kwargs).all()
 
+    async def save(self, *args, **kwargs):
+        await super().save(*args, **kwargs)
+        PluginInfoMemoryCache.set_plugin(self)
+
+    async def delete(self, *args, **kwargs):
+        module = self.module
+        await super().delete(*args, **kwargs)
+        PluginInfoMemoryCache.remove_by_module(module)
+
     @classmethod
     async def _run_script(cls):
         return [
@@ -110,4 +122,7 @@ class PluginInfo(Model):
             "ALTER TABLE plugin_info ADD COLUMN ignore_prompt boolean DEFAULT false;",
             "ALTER TABLE plugin_info ADD COLUMN impression float DEFAULT 0;",
             "CREATE INDEX idx_plugin_info_module ON plugin_info(module);",
+            "ALTER TABLE plugin_info ADD COLUMN update_time TIMESTAMPTZ;",
+            "ALTER TABLE plugin_info ADD COLUMN update_time DATETIME(6) NULL;",
+            "CREATE INDEX idx_plugin_info_update_time ON plugin_info(update_time);",
         ]
@@ -35,6 +35,8 @@ class PluginLimit(Model):
     """cd"""
     max_count = fields.IntField(null=True, description="最大调用次数")
     """最大调用次数"""
+    update_time = fields.DatetimeField(auto_now=True, null=True, description="更新时间")
+    """更新时间，运行时缓存据此增量刷新"""
 
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "plugin_limit"
@@ -60,3 +62,11 @@ class PluginLimit(Model):
         limit_id = self.id
         await super().delete(*args, **kwargs)
         await PluginLimitMemoryCache.remove_by_id(limit_id)
+
+    @classmethod
+    async def _run_script(cls):
+        return [
+            "ALTER TABLE plugin_limit ADD COLUMN update_time TIMESTAMPTZ;",
+            "ALTER TABLE plugin_limit ADD COLUMN update_time DATETIME(6) NULL;",
+            "CREATE INDEX idx_plugin_limit_update_time ON plugin_limit(update_time);",
+        ]
@@ -1,6 +1,6 @@
 from tortoise import fields
 
-from zhenxun.services.db_context import Model
+from zhenxun.services.db_context import Model, mysql_index_sql
 
 
 class Statistics(Model):
@@ -20,6 +20,13 @@ class Statistics(Model):
     class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
         table = "statistics"
         table_description = "插件调用统计数据库"
+        indexes = (
+            ("user_id", "group_id"),
+            ("group_id", "create_time"),
+            ("bot_id", "create_time"),
+            ("plugin_name",),
+            ("create_time",),
+        )
 
     @classmethod
     async def _run_script(cls):
@@ -29,4 +36,7 @@ class Statistics(Model):
             "ALTER TABLE statistics ALTER COLUMN user_id TYPE character varying(255);",
             "ALTER TABLE statistics ALTER COLUMN group_id TYPE character varying(255);",
             "ALTER TABLE statistics ADD bot_id Text DEFAULT '';",
+            # PostgreSQL/SQLite 由 generate_schemas 补建 Meta.indexes，
+            # MySQL 已有数据表需要单独补建
+            *mysql_index_sql(cls),
         ]
@@ -0,0 +1,222 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from tortoise import fields
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.functions import Count, Sum
+
+from zhenxun.services.db_context import Model, replace_rows, upsert_increment
+
+
+class StatisticsDaily(Model):
+    id = fields.IntField(pk=True, generated=True, auto_increment=True)
+    """自增id"""
+    plugin_name = fields.CharField(255)
+    """插件名称"""
+    group_id = fields.CharField(255, default="")
+    """群聊id，私聊为空字符串"""
+    user_id = fields.CharField(255)
+    """用户id"""
+    bot_id = fields.CharField(255, default="")
+    """Bot Id"""
+    day = fields.DateField()
+    """日期"""
+    call_count = fields.IntField(default=0)
+    """当日调用次数"""
+
+    class Meta:  # pyright: ignore [reportIncompatibleVariableOverride]
+        table = "statistics_daily"
+        table_description = "插件调用统计按日汇总表"
+        unique_together = ("plugin_name", "group_id", "user_id", "bot_id", "day")
+        indexes = (("day", "bot_id"), ("user_id", "group_id"), ("group_id", "day"))
+
+    @classmethod
+    async def add_rows(
+        cls, rows: list[dict[str, Any]], using_db: BaseDBAsyncClient | None = None
+    ):
+        """将新写入的调用记录累加到汇总表
+
+        参数:
+            rows: 调用记录字段字典，需包含 plugin_name, user_id, group_id, bot_id,
+                create_time
+            using_db: 数据库连接或事务
+        """
+        counter: dict[tuple[str, str, str, str, date], int] = {}
+        for row in rows:
+            key = (
+                row["plugin_name"],
+                row.get("group_id") or "",
+                row["user_id"],
+                row.get("bot_id") or "",
+                row["create_time"].date(),
+            )
+            counter[key] = counter.get(key, 0) + 1
+        await upsert_increment(
+            cls,
+            [
+                {
+                    "plugin_name": key[0],
+                    "group_id": key[1],
+                    "user_id": key[2],
+                    "bot_id": key[3],
+                    "day": key[4],
+                    "call_count": count,
+                }
+                for key, count in counter.items()
+            ],
+            cls._meta.unique_together[0],
+            "call_count",
+            using_db,
+        )
+
+    @classmethod
+    async def rebuild_day(cls, day: date) -> int:
+        """根据原始调用记录重建某一天的汇总数据
+
+        参数:
+            day: 日期
+
+        返回:
+            int: 当日调用次数
+        """
+        from zhenxun.models.statistics import Statistics
+
+        start = datetime.combine(day, time.min)
+        data_list = (
+            await Statistics.filter(
+                create_time__gte=start, create_time__lt=start + timedelta(days=1)
+            )
+            .annotate(count=Count("id"))
+            .group_by("plugin_name", "group_id", "user_id", "bot_id")
+            .values("plugin_name", "group_id", "user_id", "bot_id", "count")
+        )
+        counter: dict[tuple[str, str, str, str], int] = {}
+        for data in data_list:
+            # 原始表中 NULL 与空字符串在汇总表中为同一行
+            key = (
+                data["plugin_name"],
+                data["group_id"] or "",
+                data["user_id"],
+                data["bot_id"] or "",
+            )
+            counter[key] = counter.get(key, 0) + data["count"]
+        await replace_rows(
+            cls,
+            {"day": day},
+            [
+                cls(
+                    plugin_name=key[0],
+                    group_id=key[1],
+                    user_id=key[2],
+                    bot_id=key[3],
+                    day=day,
+                    call_count=count,
+                )
+                for key, count in counter.items()
+            ],
+        )
+        return sum(counter.values())
+
+    @classmethod
+    def _query(
+        cls,
+        user_id: str | None,
+        group_id: str | None,
+        bot_id: str | None,
+        start: date | None,
+        end: date | None,
+        filters: dict[str, Any],
+    ):
+        query = cls.filter(**filters)
+        if user_id:
+            query = query.filter(user_id=user_id)
+        if group_id:
+            query = query.filter(group_id=group_id)
+        if bot_id:
+            query = query.filter(bot_id=bot_id)
+        if start:
+            query = query.filter(day__gte=start)
+        if end:
+            query = query.filter(day__lte=end)
+        return query
+
+    @classmethod
+    async def get_count(
+        cls,
+        *,
+        user_id: str | None = None,
+        group_id: str | None = None,
+        bot_id: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        **filters: Any,
+    ) -> int:
+        """统计调用次数
+
+        参数:
+            user_id: 用户id
+            group_id: 群聊id
+            bot_id: bot id
+            start: 起始日期（包含）
+            end: 结束日期（包含）
+            filters: 其他过滤条件
+
+        返回:
+            int: 调用次数
+        """
+        query = cls._query(user_id, group_id, bot_id, start, end, filters)
+        result = await query.annotate(total=Sum("call_count")).values_list(
+            "total", flat=True
+        )
+        return int(result[0] or 0) if result else 0
+
+    @classmethod
+    async def get_plugin_count(
+        cls,
+        *,
+        user_id: str | None = None,
+        group_id: str | None = None,
+        bot_id: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        **filters: Any,
+    ) -> list[tuple[str, int]]:
+        """按插件统计调用次数
+
+        参数:
+            user_id: 用户id
+            group_id: 群聊id
+            bot_id: bot id
+            start: 起始日期（包含）
+            end: 结束日期（包含）
+            filters: 其他过滤条件
+
+        返回:
+            list[tuple[str, int]]: (插件名称, 调用次数)
+        """
+        query = cls._query(user_id, group_id, bot_id, start, end, filters)
+        data_list = (
+            await query.annotate(total=Sum("call_count"))
+            .group_by("plugin_name")
+            .values_list("plugin_name", "total")
+        )
+        return [(name, int(total or 0)) for name, total in data_list]
+
+    @classmethod
+    async def get_daily_count(cls, start: date, **filters: Any) -> dict[str, int]:
+        """获取从起始日期开始每天的调用次数
+
+        参数:
+            start: 起始日期（包含）
+            filters: 过滤条件
+
+        返回:
+            dict[str, int]: 日期字符串 -> 调用次数
+        """
+        data_list = (
+            await cls.filter(day__gte=start, **filters)
+            .annotate(total=Sum("call_count"))
+            .group_by("day")
+            .values_list("day", "total")
+        )
+        return {str(day): int(total or 0) for day, total in data_list}
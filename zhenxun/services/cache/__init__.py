@@ -292,6 +292,7 @@ class CacheManager:
     _data: ClassVar[dict[str, CacheData]] = {}
     _list_caches: ClassVar[dict[str, "CacheList"]] = {}
     _dict_caches: ClassVar[dict[str, "CacheDict"]] = {}
+    _invalidate_listeners: ClassVar[list[Callable[[str | None, str | None], None]]] = []
     _enabled = False  # 缓存启用标记
 
     def __new__(cls) -> Self:
@@ -320,6 +321,25 @@ class CacheManager:
         self.__class__._enabled = False
         logger.info("缓存功能已禁用", LOG_COMMAND)
 
+    def add_invalidate_listener(
+        self, func: Callable[[str | None, str | None], None]
+    ) -> None:
+        """注册缓存失效监听器
+
+        参数:
+            func: 回调函数，参数为 (缓存类型, 完整缓存键)，
+                清除整个类型时缓存键为None，清除全部缓存时两者均为None
+        """
+        if func not in self._invalidate_listeners:
+            self._invalidate_listeners.append(func)
+
+    def _notify_invalidate(self, cache_type: str | None, cache_key: str | None):
+        for func in self._invalidate_listeners:
+            try:
+                func(cache_type.upper() if cache_type else None, cache_key)
+            except Exception as e:
+                logger.warning("缓存失效监听器执行失败", LOG_COMMAND, e=e)
+
     def cache_dict(
         self, cache_type: str, expire: int = 0, value_type: type[U] = str
     ) -> CacheDict[U]:
@@ -530,6 +550,7 @@ class CacheManager:
             if key is not None:
                 # 只清除特定的缓存项
                 cache_key = self._build_key(cache_type, key)
+                self._notify_invalidate(cache_type, cache_key)
                 await self.cache_backend.delete(cache_key)  # type: ignore
                 logger.debug(f"清除缓存: {cache_type}, 键: {key}", LOG_COMMAND)
                 return True
@@ -631,6 +652,84 @@ class CacheManager:
             logger.error(f"设置缓存 {cache_type} 失败", LOG_COMMAND, e=e)
             return False
 
+    async def get_many(
+        self, cache_type: str, keys: list[str | dict[str, Any]]
+    ) -> list[Any]:
+        """批量获取缓存数据，Redis 下使用 MGET 一次往返
+
+        参数:
+            cache_type: 缓存类型
+            keys: 键或键参数列表
+
+        返回:
+            list[Any]: 与 keys 顺序一致的缓存数据，不存在的位置为None
+        """
+        if not keys:
+            return []
+        if not self.enabled or cache_config.cache_mode == CacheMode.NONE:
+            return [None] * len(keys)
+        try:
+            cache_keys = [self._build_key(cache_type, key) for key in keys]
+            data_list = await asyncio.wait_for(
+                self.cache_backend.multi_get(cache_keys),  # type: ignore
+                timeout=CACHE_TIMEOUT,
+            )
+            model = self.get_model(cache_type)
+            if not model.result_type:
+                return list(data_list)
+            return [
+                None
+                if data is None
+                else self._deserialize_value(data, model.result_type)
+                for data in data_list
+            ]
+        except asyncio.TimeoutError:
+            logger.error(f"批量获取缓存 {cache_type} 超时", LOG_COMMAND)
+        except Exception as e:
+            logger.error(f"批量获取缓存 {cache_type} 失败", LOG_COMMAND, e=e)
+        return [None] * len(keys)
+
+    async def set_many(
+        self,
+        cache_type: str,
+        items: list[tuple[str | dict[str, Any], Any]],
+        expire: int | None = None,
+    ) -> bool:
+        """批量设置缓存数据，Redis 下使用 pipeline 一次往返
+
+        参数:
+            cache_type: 缓存类型
+            items: (键或键参数, 值) 列表
+            expire: 过期时间（秒），为None时使用默认值
+
+        返回:
+            bool: 是否成功
+        """
+        from zhenxun.services.db_context import DB_TIMEOUT_SECONDS
+
+        if not items:
+            return True
+        if not self.enabled or cache_config.cache_mode == CacheMode.NONE:
+            return False
+        try:
+            model = self.get_model(cache_type)
+            pairs = [
+                (self._build_key(cache_type, key), self._serialize_value(value))
+                for key, value in items
+            ]
+            ttl = expire if expire is not None else model.expire
+            await asyncio.wait_for(
+                self.cache_backend.multi_set(pairs, ttl=ttl),  # type: ignore
+                timeout=DB_TIMEOUT_SECONDS,
+            )
+            return True
+        except asyncio.TimeoutError:
+            logger.error(f"批量设置缓存 {cache_type} 超时", LOG_COMMAND)
+            return False
+        except Exception as e:
+            logger.error(f"批量设置缓存 {cache_type} 失败", LOG_COMMAND, e=e)
+            return False
+
     async def delete(self, cache_type: str, key: str | dict[str, Any]) -> bool:
         """删除缓存数据
 
@@ -647,6 +746,7 @@ class CacheManager:
 
         try:
             cache_key = self._build_key(cache_type, key)
+            self._notify_invalidate(cache_type, cache_key)
             await self.cache_backend.delete(cache_key)  # type: ignore
             return True
         except Exception as e:
@@ -690,6 +790,7 @@ class CacheManager:
             return False
 
         try:
+            self._notify_invalidate(cache_type, None)
             if cache_type:
                 # 清除指定类型的缓存
                 # pattern = f"{cache_type.upper()}{CACHE_KEY_SEPARATOR}*"
@@ -1059,6 +1160,31 @@ class Cache(Generic[T]):
         """
         return await CacheRoot.set(self.cache_type, key, value, expire)
 
+    async def get_many(self, keys: list[str | dict[str, Any]]) -> list[T | None]:
+        """批量获取缓存数据
+
+        参数:
+            keys: 键或键参数列表
+
+        返回:
+            list[T | None]: 与 keys 顺序一致的缓存数据，不存在的位置为None
+        """
+        return await CacheRoot.get_many(self.cache_type, keys)
+
+    async def set_many(
+        self, items: list[tuple[str | dict[str, Any], T]], expire: int | None = None
+    ) -> bool:
+        """批量设置缓存数据
+
+        参数:
+            items: (键或键参数, 值) 列表
+            expire: 过期时间（秒），为None时使用默认值
+
+        返回:
+            bool: 是否成功
+        """
+        return await CacheRoot.set_many(self.cache_type, items, expire)
+
     async def delete(self, key: str | dict[str, Any]) -> bool:
         """删除缓存数据
 
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass, field
+from collections.abc import AsyncIterator, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
 import json
 import os
 import time
 from typing import TYPE_CHECKING, Any, ClassVar
 import uuid
+import zlib
 
 from zhenxun.configs.config import Config
 from zhenxun.services.cache.config import CacheMode
@@ -23,13 +26,13 @@ Config.add_plugin_config(
     "hook",
     "PLUGININFO_MEM_REFRESH_INTERVAL",
     300,
-    help="plugin info memory cache refresh seconds",
+    help="plugin info memory cache delta refresh seconds",
 )
 Config.add_plugin_config(
     "hook",
     "BAN_MEM_REFRESH_INTERVAL",
     60,
-    help="ban memory cache full refresh seconds",
+    help="ban memory cache delta refresh seconds",
 )
 Config.add_plugin_config(
     "hook",
@@ -53,7 +56,7 @@ Config.add_plugin_config(
     "hook",
     "BOT_MEM_REFRESH_INTERVAL",
     60,
-    help="bot memory cache refresh seconds",
+    help="bot memory cache delta refresh seconds",
 )
 Config.add_plugin_config(
     "hook",
@@ -65,7 +68,7 @@ Config.add_plugin_config(
     "hook",
     "GROUP_MEM_REFRESH_INTERVAL",
     60,
-    help="group memory cache refresh seconds",
+    help="group memory cache delta refresh seconds",
 )
 Config.add_plugin_config(
     "hook",
@@ -77,7 +80,7 @@ Config.add_plugin_config(
     "hook",
     "LEVEL_MEM_REFRESH_INTERVAL",
     120,
-    help="level memory cache refresh seconds",
+    help="level memory cache delta refresh seconds",
 )
 Config.add_plugin_config(
     "hook",
@@ -89,7 +92,7 @@ Config.add_plugin_config(
     "hook",
     "LIMIT_MEM_REFRESH_INTERVAL",
     60,
-    help="plugin limit memory cache refresh seconds",
+    help="plugin limit memory cache delta refresh seconds",
 )
 Config.add_plugin_config(
     "hook",
@@ -97,6 +100,18 @@ Config.add_plugin_config(
     30,
     help="plugin limit negative cache ttl seconds",
 )
+Config.add_plugin_config(
+    "hook",
+    "RUNTIME_CACHE_RECONCILE_INTERVAL",
+    3600,
+    help="runtime memory cache full reconcile seconds, 0 to only reconcile on demand",
+)
+Config.add_plugin_config(
+    "hook",
+    "RUNTIME_CACHE_CHUNK_SIZE",
+    2000,
+    help="rows per query when loading runtime memory caches",
+)
 Config.add_plugin_config(
     "hook",
     "RUNTIME_CACHE_SYNC_ENABLED",
@@ -109,6 +124,24 @@ Config.add_plugin_config(
     "ZHENXUN_RUNTIME_CACHE_SYNC",
     help="redis pubsub channel for runtime cache sync",
 )
+Config.add_plugin_config(
+    "hook",
+    "RUNTIME_CACHE_SYNC_BATCH_DELAY",
+    0.05,
+    help="seconds to collect runtime cache changes before publishing one batch",
+)
+Config.add_plugin_config(
+    "hook",
+    "RUNTIME_CACHE_SYNC_BATCH_SIZE",
+    500,
+    help="max runtime cache changes per published message",
+)
+Config.add_plugin_config(
+    "hook",
+    "RUNTIME_CACHE_SYNC_FORMAT",
+    "json",
+    help="runtime cache sync payload format: json or msgpack (requires msgpack)",
+)
 
 
 def _coerce_int(value, default: int) -> int:
@@ -137,6 +170,165 @@ def _redis_enabled() -> bool:
     return bool(_env_get("REDIS_HOST"))
 
 
+def create_redis_client(decode_responses: bool = True) -> Any | None:
+    """按 CACHE_MODE/REDIS_* 配置创建 redis.asyncio 客户端
+
+    参数:
+        decode_responses: 是否将返回值解码为字符串
+
+    返回:
+        Any | None: 未启用 redis 或未安装 redis 时返回 None
+    """
+    if not _redis_enabled():
+        return None
+    try:
+        import redis.asyncio as redis_async
+    except ImportError:
+        logger.warning("redis not installed", LOG_COMMAND)
+        return None
+    return redis_async.Redis(
+        host=_env_get("REDIS_HOST"),
+        port=_coerce_int(_env_get("REDIS_PORT"), 6379),
+        password=_env_get("REDIS_PASSWORD"),
+        decode_responses=decode_responses,
+    )
+
+
+_CHANGE_LISTENERS: list[Callable[[str, Any], None]] = []
+
+
+def add_change_listener(func: Callable[[str, Any], None]) -> None:
+    """注册内存缓存变更监听
+
+    参数:
+        func: 回调函数，参数为 (缓存类型, 变更键)，变更键为None时表示整体刷新，
+            缓存类型为 plugin/bot/group/plugin_limit，
+            变更键分别为 模块名/bot_id/(group_id, channel_id)/模块名
+    """
+    if func not in _CHANGE_LISTENERS:
+        _CHANGE_LISTENERS.append(func)
+
+
+def _notify_change(cache_type: str, key: Any = None) -> None:
+    for func in _CHANGE_LISTENERS:
+        try:
+            func(cache_type, key)
+        except Exception as exc:
+            logger.error(
+                f"{cache_type} cache change listener failed", LOG_COMMAND, e=exc
+            )
+
+
+_DELTA_OVERLAP = timedelta(seconds=5)
+"""增量查询回看的时间窗口，容忍多实例之间的时钟误差"""
+_DELTA_OVERLAP_POLLS = 2
+"""游标推进后保持回看的增量刷新次数"""
+_NOTIFY_FULL_THRESHOLD = 500
+"""对账变更条目超过该数量时按整体刷新通知"""
+
+
+@dataclass
+class _ChangeCursor:
+    """增量刷新游标，记录已加载数据中最大的 update_time"""
+
+    high_water: datetime | None = None
+    overlap_polls: int = 0
+    last_reconcile: float = field(default_factory=time.time)
+
+    def observe(self, records: list) -> None:
+        for record in records:
+            update_time = getattr(record, "update_time", None)
+            if update_time is None:
+                continue
+            if self.high_water is None or update_time > self.high_water:
+                self.high_water = update_time
+                self.overlap_polls = _DELTA_OVERLAP_POLLS
+
+    def since(self) -> datetime | None:
+        if self.high_water is None:
+            return None
+        if self.overlap_polls > 0:
+            self.overlap_polls -= 1
+            return self.high_water - _DELTA_OVERLAP
+        return self.high_water
+
+    def reconcile_due(self) -> bool:
+        interval = _coerce_int(
+            Config.get_config("hook", "RUNTIME_CACHE_RECONCILE_INTERVAL", 3600), 3600
+        )
+        return interval > 0 and time.time() - self.last_reconcile >= interval
+
+
+def _chunk_size() -> int:
+    return max(
+        _coerce_int(Config.get_config("hook", "RUNTIME_CACHE_CHUNK_SIZE", 2000), 2000),
+        100,
+    )
+
+
+async def _iter_chunks(model, **filters) -> AsyncIterator[list]:
+    """按主键分块读取数据，每块之间让出事件循环"""
+    chunk_size = _chunk_size()
+    last_id = 0
+    while True:
+        records = (
+            await model.filter(id__gt=last_id, **filters)
+            .order_by("id")
+            .limit(chunk_size)
+        )
+        if records:
+            yield records
+        if len(records) < chunk_size:
+            return
+        last_id = records[-1].id
+        await asyncio.sleep(0)
+
+
+def _model_values(record) -> tuple:
+    return tuple(getattr(record, name) for name in record._meta.fields_db_projection)
+
+
+async def _fetch_changed(model, cursor: _ChangeCursor) -> list | None:
+    """读取游标之后变更的数据
+
+    返回:
+        list | None: 变更数据，变更过多需要完整对账时为None
+    """
+    limit = _chunk_size()
+    query = model.filter(update_time__isnull=False)
+    if (since := cursor.since()) is not None:
+        query = query.filter(update_time__gt=since)
+    records = await query.order_by("update_time").limit(limit)
+    if len(records) >= limit:
+        return None
+    cursor.observe(records)
+    return records
+
+
+async def _refresh_changes(cache, model) -> None:
+    """增量刷新内存缓存，未加载、到达对账间隔或变更过多时完整对账"""
+    if not cache._loaded or cache._cursor.reconcile_due():
+        await cache.refresh()
+        return
+    records = await _fetch_changed(model, cache._cursor)
+    if records is None:
+        await cache.refresh()
+    elif records:
+        await cache._apply_changes(records)
+
+
+def _notify_keys(cache_type: str, keys: set) -> None:
+    if len(keys) > _NOTIFY_FULL_THRESHOLD:
+        _notify_change(cache_type)
+        return
+    for key in keys:
+        _notify_change(cache_type, key)
+
+
+def _changed_keys(old: dict, new: dict) -> set:
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
 def is_cache_ready() -> bool:
     return _CACHE_READY_EVENT.is_set()
 
@@ -440,13 +632,122 @@ class PluginLimitSnapshot:
         )
 
 
+_SYNC_KEY_FIELDS: dict[str, tuple[str, ...]] = {
+    "bot": ("bot_id",),
+    "group": ("group_id", "channel_id"),
+    "ban": ("user_id", "group_id"),
+    "level": ("user_id", "group_id"),
+    "plugin_limit": ("id",),
+}
+"""缓存类型 -> 同步事件中标识同一条数据的字段，用于合并同一数据的多次变更"""
+_SYNC_COMPRESS_THRESHOLD = 1024
+_SYNC_PEER_TTL = 3600
+"""超过该时间未收到消息的实例不再记录序号"""
+
+
+def _sync_event_key(cache_type: str, action: str, data: dict[str, Any]) -> tuple:
+    if action == "refresh":
+        return (cache_type,)
+    fields = _SYNC_KEY_FIELDS.get(cache_type, ())
+    return (cache_type, *(data.get(name) or None for name in fields))
+
+
+def _encode_sync_payload(payload: dict[str, Any], use_msgpack: bool) -> bytes:
+    """编码同步消息，首字节标记格式: M=msgpack J=json Z=zlib压缩"""
+    body = None
+    if use_msgpack:
+        try:
+            import msgpack
+
+            body = b"M" + msgpack.packb(payload, use_bin_type=True)
+        except ImportError:
+            body = None
+    if body is None:
+        body = (
+            b"J"
+            + json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        )
+    if len(body) > _SYNC_COMPRESS_THRESHOLD:
+        return b"Z" + zlib.compress(body, 1)
+    return body
+
+
+def _decode_sync_payload(raw: Any) -> dict[str, Any] | None:
+    if isinstance(raw, str):
+        raw = raw.encode()
+    if not isinstance(raw, bytes | bytearray) or not raw:
+        return None
+    if raw[:1] == b"Z":
+        raw = zlib.decompress(raw[1:])
+    tag = raw[:1]
+    if tag == b"M":
+        import msgpack
+
+        return msgpack.unpackb(raw[1:], raw=False)
+    if tag == b"J":
+        return json.loads(raw[1:])
+    if tag == b"{":
+        # 旧版本的单条事件消息
+        payload = json.loads(raw)
+        return {
+            "src": payload.get("source"),
+            "events": [
+                [payload.get("type"), payload.get("action"), payload.get("data")]
+            ],
+        }
+    return None
+
+
+@dataclass
+class _SyncPeer:
+    seq: int
+    type_seq: dict[str, int]
+    seen: float
+
+
+@dataclass
+class _SyncStats:
+    published_batches: int = 0
+    published_events: int = 0
+    coalesced_events: int = 0
+    received_batches: int = 0
+    received_events: int = 0
+    gaps: int = 0
+    resyncs: int = 0
+    decode_errors: int = 0
+    lag_avg: float = 0.0
+    lag_max: float = 0.0
+    queue_delay_avg: float = 0.0
+
+    def record_lag(self, lag: float):
+        self.lag_avg += 0.2 * (lag - self.lag_avg)
+        self.lag_max = max(self.lag_max, lag)
+
+
 class RuntimeCacheSync:
+    """基于 redis pubsub 的多实例内存缓存同步
+
+    本地变更先进入发送缓冲区，同一数据的多次变更只保留最后一次，
+    缓冲区在 RUNTIME_CACHE_SYNC_BATCH_DELAY 秒后整批发送。
+    每批消息携带实例序号与各缓存类型的序号，接收方发现某类型序号不连续时，
+    说明丢失了该类型的消息，对该类型缓存重新对账。
+    """
+
     _redis: ClassVar[Any | None] = None
     _pubsub: ClassVar[Any | None] = None
     _task: ClassVar[asyncio.Task | None] = None
-    _publish_tasks: ClassVar[set[asyncio.Task]] = set()
+    _flush_task: ClassVar[asyncio.Task | None] = None
+    _resync_task: ClassVar[asyncio.Task | None] = None
     _ready: ClassVar[bool] = False
     _channel: ClassVar[str] = ""
+    _outbox: ClassVar[dict[tuple, tuple[str, str, dict[str, Any]]]] = {}
+    _outbox_since: ClassVar[float] = 0.0
+    _wakeup: ClassVar[asyncio.Event] = asyncio.Event()
+    _seq: ClassVar[int] = 0
+    _type_seq: ClassVar[dict[str, int]] = {}
+    _peers: ClassVar[dict[str, _SyncPeer]] = {}
+    _pending_resync: ClassVar[set[str]] = set()
+    _stats: ClassVar[_SyncStats] = _SyncStats()
 
     @classmethod
     def _sync_enabled(cls) -> bool:
@@ -459,36 +760,20 @@ class RuntimeCacheSync:
             return
         if not cls._sync_enabled():
             return
-        try:
-            import redis.asyncio as redis_async
-        except ImportError:
-            logger.warning(
-                "redis not installed, runtime cache sync disabled", LOG_COMMAND
-            )
-            return
-
-        host = _env_get("REDIS_HOST")
-        if not host:
-            return
-        port = _coerce_int(_env_get("REDIS_PORT"), 6379)
-        password = _env_get("REDIS_PASSWORD")
         cls._channel = str(
             Config.get_config(
                 "hook", "RUNTIME_CACHE_SYNC_CHANNEL", "ZHENXUN_RUNTIME_CACHE_SYNC"
             )
         )
         try:
-            cls._redis = redis_async.Redis(
-                host=host,
-                port=port,
-                password=password,
-                decode_responses=True,
-            )
-            cls._pubsub = cls._redis.pubsub()
-            if cls._pubsub is None:
+            cls._redis = create_redis_client(decode_responses=False)
+            if cls._redis is None:
+                logger.warning("runtime cache sync disabled", LOG_COMMAND)
                 return
+            cls._pubsub = cls._redis.pubsub(ignore_subscribe_messages=True)
             await cls._pubsub.subscribe(cls._channel)
             cls._task = asyncio.create_task(cls._listen_loop())
+            cls._flush_task = asyncio.create_task(cls._flush_loop())
             cls._ready = True
             logger.info("runtime cache sync enabled", LOG_COMMAND)
         except Exception as exc:
@@ -497,9 +782,20 @@ class RuntimeCacheSync:
 
     @classmethod
     async def stop(cls) -> None:
-        if cls._task and not cls._task.done():
-            cls._task.cancel()
+        if cls._ready and cls._outbox:
+            try:
+                await cls._flush()
+            except Exception as exc:
+                logger.warning(
+                    "runtime cache sync final flush failed", LOG_COMMAND, e=exc
+                )
+        cls._ready = False
+        for task in (cls._task, cls._flush_task, cls._resync_task):
+            if task and not task.done():
+                task.cancel()
         cls._task = None
+        cls._flush_task = None
+        cls._resync_task = None
         try:
             if cls._pubsub is not None:
                 await cls._pubsub.close()
@@ -512,79 +808,262 @@ class RuntimeCacheSync:
         except Exception:
             pass
         cls._redis = None
-        cls._ready = False
 
     @classmethod
     def publish_event(cls, cache_type: str, action: str, data: dict[str, Any]) -> None:
+        """将变更放入发送缓冲区
+
+        参数:
+            cache_type: 缓存类型
+            action: upsert/delete/refresh
+            data: 变更数据
+        """
         if not cls._ready:
             return
-        payload = {
-            "source": INSTANCE_ID,
-            "type": cache_type,
-            "action": action,
-            "data": data,
-        }
-        task = asyncio.create_task(cls._publish(payload))
-        cls._publish_tasks.add(task)
-        task.add_done_callback(cls._publish_tasks.discard)
+        if not cls._outbox:
+            cls._outbox_since = time.time()
+        if action == "refresh":
+            for key in [key for key in cls._outbox if key[0] == cache_type]:
+                del cls._outbox[key]
+                cls._stats.coalesced_events += 1
+        key = _sync_event_key(cache_type, action, data)
+        if cls._outbox.pop(key, None) is not None:
+            cls._stats.coalesced_events += 1
+        cls._outbox[key] = (cache_type, action, data)
+        cls._wakeup.set()
+
+    @classmethod
+    async def _flush_loop(cls) -> None:
+        backoff = 1.0
+        while True:
+            await cls._wakeup.wait()
+            delay = float(
+                Config.get_config("hook", "RUNTIME_CACHE_SYNC_BATCH_DELAY", 0.05) or 0
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+            cls._wakeup.clear()
+            try:
+                await cls._flush()
+                backoff = 1.0
+            except Exception as exc:
+                logger.error("runtime cache sync publish failed", LOG_COMMAND, e=exc)
+                # 未发送的变更已放回缓冲区，等待后重试
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
 
     @classmethod
-    async def _publish(cls, payload: dict[str, Any]) -> None:
-        if not cls._ready or cls._redis is None:
+    async def _flush(cls) -> None:
+        if not cls._outbox or cls._redis is None:
             return
-        try:
-            await cls._redis.publish(cls._channel, json.dumps(payload))
-        except Exception as exc:
-            logger.error("runtime cache sync publish failed", LOG_COMMAND, e=exc)
+        items = list(cls._outbox.items())
+        since = cls._outbox_since
+        cls._outbox = {}
+        cls._stats.queue_delay_avg += 0.2 * (
+            time.time() - cls._outbox_since - cls._stats.queue_delay_avg
+        )
+        batch_size = max(
+            _coerce_int(
+                Config.get_config("hook", "RUNTIME_CACHE_SYNC_BATCH_SIZE", 500), 500
+            ),
+            1,
+        )
+        use_msgpack = (
+            str(Config.get_config("hook", "RUNTIME_CACHE_SYNC_FORMAT", "json")).lower()
+            == "msgpack"
+        )
+        for start in range(0, len(items), batch_size):
+            batch = [event for _, event in items[start : start + batch_size]]
+            # 发送成功后才占用序号，失败的批次重发时不会让接收方误判丢失
+            seq = cls._seq + 1
+            type_seq = dict(cls._type_seq)
+            for cache_type in {event[0] for event in batch}:
+                type_seq[cache_type] = type_seq.get(cache_type, 0) + 1
+            payload = {
+                "src": INSTANCE_ID,
+                "seq": seq,
+                "tseq": type_seq,
+                "ts": time.time(),
+                "events": [list(event) for event in batch],
+            }
+            try:
+                await cls._redis.publish(
+                    cls._channel, _encode_sync_payload(payload, use_msgpack)
+                )
+            except Exception:
+                cls._requeue(items[start:], since)
+                raise
+            cls._seq = seq
+            cls._type_seq = type_seq
+            cls._stats.published_batches += 1
+            cls._stats.published_events += len(batch)
+
+    @classmethod
+    def _requeue(
+        cls, items: list[tuple[tuple, tuple[str, str, dict[str, Any]]]], since: float
+    ) -> None:
+        """将未发送的变更放回发送缓冲区
+
+        发送期间产生的新变更排在后面，同一数据已有新变更时丢弃旧的
+
+        参数:
+            items: 未发送的 (缓冲区键, 变更)
+            since: 这些变更进入缓冲区的时间
+        """
+        outbox = {}
+        for key, event in items:
+            if key in cls._outbox or (event[0],) in cls._outbox:
+                cls._stats.coalesced_events += 1
+                continue
+            outbox[key] = event
+        if not outbox:
+            return
+        outbox.update(cls._outbox)
+        cls._outbox = outbox
+        cls._outbox_since = since
+        cls._wakeup.set()
 
     @classmethod
     async def _listen_loop(cls) -> None:
-        if cls._pubsub is None:
-            return
-        try:
-            while True:
-                message = await cls._pubsub.get_message(
-                    ignore_subscribe_messages=True, timeout=1.0
+        backoff = 1.0
+        while True:
+            try:
+                if cls._pubsub is None:
+                    return
+                async for message in cls._pubsub.listen():
+                    backoff = 1.0
+                    if message.get("type") != "message":
+                        continue
+                    await cls._handle_message(message.get("data"))
+            except asyncio.CancelledError:
+                return
+            except Exception as exc:
+                logger.error("runtime cache sync listener failed", LOG_COMMAND, e=exc)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+            try:
+                await cls._pubsub.subscribe(cls._channel)  # type: ignore
+            except Exception as exc:
+                logger.warning(
+                    "runtime cache sync resubscribe failed", LOG_COMMAND, e=exc
                 )
-                if not message:
-                    await asyncio.sleep(0.05)
-                    continue
-                await cls._handle_message(message.get("data"))
-        except asyncio.CancelledError:
-            return
-        except Exception as exc:
-            logger.error("runtime cache sync listener failed", LOG_COMMAND, e=exc)
+                continue
+            # 断线期间的消息无法得知，全部缓存类型重新对账
+            cls._peers.clear()
+            cls._schedule_resync(set(_SYNC_KEY_FIELDS))
 
     @classmethod
     async def _handle_message(cls, raw: Any) -> None:
-        if raw is None:
-            return
-        if isinstance(raw, bytes | bytearray):
-            try:
-                raw = raw.decode()
-            except Exception:
-                return
-        if not raw:
-            return
         try:
-            payload = json.loads(raw)
+            payload = _decode_sync_payload(raw)
         except Exception:
+            payload = None
+        if not payload:
+            cls._stats.decode_errors += 1
             return
-        if payload.get("source") == INSTANCE_ID:
+        source = payload.get("src")
+        if source == INSTANCE_ID:
             return
-        cache_type = payload.get("type")
-        action = payload.get("action")
-        data = payload.get("data") or {}
-        if cache_type == "bot":
-            await BotMemoryCache.apply_sync_event(action, data)
-        elif cache_type == "group":
-            await GroupMemoryCache.apply_sync_event(action, data)
-        elif cache_type == "ban":
-            await BanMemoryCache.apply_sync_event(action, data)
-        elif cache_type == "level":
-            await LevelUserMemoryCache.apply_sync_event(action, data)
-        elif cache_type == "plugin_limit":
-            await PluginLimitMemoryCache.apply_sync_event(action, data)
+        events = payload.get("events") or []
+        cls._stats.received_batches += 1
+        cls._stats.received_events += len(events)
+        if ts := payload.get("ts"):
+            cls._stats.record_lag(max(time.time() - float(ts), 0.0))
+        if source and payload.get("seq") is not None:
+            cls._check_sequence(
+                str(source),
+                int(payload["seq"]),
+                payload.get("tseq") or {},
+                {event[0] for event in events},
+            )
+        for idx, (cache_type, action, data) in enumerate(events, 1):
+            cache = _SYNC_CACHES.get(cache_type)
+            if cache is None:
+                continue
+            try:
+                await cache.apply_sync_event(action, data or {})
+            except Exception as exc:
+                logger.warning(
+                    f"runtime cache sync apply {cache_type} failed", LOG_COMMAND, e=exc
+                )
+            if idx % 200 == 0:
+                await asyncio.sleep(0)
+
+    @classmethod
+    def _check_sequence(
+        cls, source: str, seq: int, type_seq: dict[str, int], types: set[str]
+    ) -> None:
+        """根据序号检测丢失的消息，对丢失消息涉及的缓存类型重新对账"""
+        now = time.time()
+        peer = cls._peers.get(source)
+        if peer is not None and seq > peer.seq + 1:
+            cls._stats.gaps += 1
+            missing = {
+                cache_type
+                for cache_type, value in type_seq.items()
+                if value - (1 if cache_type in types else 0)
+                > peer.type_seq.get(cache_type, 0)
+            }
+            cls._schedule_resync(missing)
+        if peer is None or seq > peer.seq:
+            cls._peers[source] = _SyncPeer(seq=seq, type_seq=dict(type_seq), seen=now)
+        if peer is None:
+            # 新实例加入时顺便清理已下线的实例
+            cls._peers = {
+                key: value
+                for key, value in cls._peers.items()
+                if now - value.seen < _SYNC_PEER_TTL
+            }
+
+    @classmethod
+    def _schedule_resync(cls, cache_types: set[str]) -> None:
+        cache_types = {t for t in cache_types if t in _SYNC_CACHES}
+        if not cache_types:
+            return
+        cls._pending_resync.update(cache_types)
+        if cls._resync_task is None or cls._resync_task.done():
+            cls._resync_task = asyncio.create_task(cls._resync())
+
+    @classmethod
+    async def _resync(cls) -> None:
+        while cls._pending_resync:
+            cache_type = cls._pending_resync.pop()
+            logger.info(
+                f"runtime cache sync gap, reconciling {cache_type}", LOG_COMMAND
+            )
+            cls._stats.resyncs += 1
+            try:
+                await _SYNC_CACHES[cache_type].refresh()
+            except Exception as exc:
+                logger.error(
+                    f"runtime cache sync reconcile {cache_type} failed",
+                    LOG_COMMAND,
+                    e=exc,
+                )
+
+    @classmethod
+    def stats(cls) -> dict[str, Any]:
+        """同步发送、接收、丢失与传播延迟统计"""
+        return {
+            "enabled": cls._ready,
+            "instance": INSTANCE_ID,
+            "pending": len(cls._outbox),
+            "peers": len(cls._peers),
+            **asdict(cls._stats),
+        }
+
+    @classmethod
+    def prometheus(cls) -> str:
+        """Prometheus 文本格式的同步统计"""
+        stats = asdict(cls._stats)
+        lines = []
+        for name, value in stats.items():
+            metric = f"zhenxun_cache_sync_{name}"
+            kind = "gauge" if name.startswith(("lag", "queue")) else "counter"
+            if kind == "counter":
+                metric += "_total"
+            lines += [f"# TYPE {metric} {kind}", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
 
 
 class PluginInfoMemoryCache:
@@ -594,27 +1073,54 @@ class PluginInfoMemoryCache:
     _loaded: ClassVar[bool] = False
     _refresh_task: ClassVar[asyncio.Task | None] = None
     _last_refresh: ClassVar[float] = 0.0
+    _cursor: ClassVar[_ChangeCursor] = _ChangeCursor()
 
     @classmethod
     async def refresh(cls) -> None:
         from zhenxun.models.plugin_info import PluginInfo
 
         async with cls._lock:
-            plugins = await PluginInfo.all()
+            cursor = _ChangeCursor()
             by_module: dict[str, "PluginInfo"] = {}
             by_module_path: dict[str, "PluginInfo"] = {}
-            for plugin in plugins:
-                if plugin.module:
-                    by_module[plugin.module] = plugin
-                if plugin.module_path:
-                    by_module_path[plugin.module_path] = plugin
+            async for plugins in _iter_chunks(PluginInfo):
+                cursor.observe(plugins)
+                for plugin in plugins:
+                    if plugin.module:
+                        by_module[plugin.module] = plugin
+                    if plugin.module_path:
+                        by_module_path[plugin.module_path] = plugin
             cls._by_module = by_module
             cls._by_module_path = by_module_path
+            cls._cursor = cursor
             cls._loaded = True
             cls._last_refresh = time.time()
             logger.debug(
                 f"plugin cache refreshed: {len(by_module)} entries", LOG_COMMAND
             )
+        _notify_change("plugin")
+
+    @classmethod
+    async def refresh_changes(cls) -> None:
+        from zhenxun.models.plugin_info import PluginInfo
+
+        await _refresh_changes(cls, PluginInfo)
+
+    @classmethod
+    async def _apply_changes(cls, plugins: list["PluginInfo"]) -> None:
+        changed: set[str] = set()
+        async with cls._lock:
+            for plugin in plugins:
+                if plugin.module:
+                    # 模型实例只按主键比较，需逐字段对比才能跳过未变化的插件
+                    old = cls._by_module.get(plugin.module)
+                    if old is None or _model_values(old) != _model_values(plugin):
+                        changed.add(plugin.module)
+                    cls._by_module[plugin.module] = plugin
+                if plugin.module_path:
+                    cls._by_module_path[plugin.module_path] = plugin
+            cls._last_refresh = time.time()
+        _notify_keys("plugin", changed)
 
     @classmethod
     async def ensure_loaded(cls) -> None:
@@ -628,6 +1134,14 @@ class PluginInfoMemoryCache:
             await cls.ensure_loaded()
         return cls._by_module.get(module)
 
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._loaded
+
+    @classmethod
+    def get_if_ready(cls, module: str) -> "PluginInfo | None":
+        return cls._by_module.get(module)
+
     @classmethod
     def get_by_module_path(cls, module_path: str) -> "PluginInfo | None":
         return cls._by_module_path.get(module_path)
@@ -640,17 +1154,19 @@ class PluginInfoMemoryCache:
             cls._by_module[plugin.module] = plugin
         if getattr(plugin, "module_path", None):
             cls._by_module_path[plugin.module_path] = plugin
+        _notify_change("plugin", plugin.module)
 
     @classmethod
     def remove_by_module(cls, module: str) -> None:
         cls._by_module.pop(module, None)
+        _notify_change("plugin", module)
 
     @classmethod
     async def _refresh_loop(cls, interval: int) -> None:
         while True:
             await asyncio.sleep(interval)
             try:
-                await cls.refresh()
+                await cls.refresh_changes()
             except Exception as exc:
                 logger.error("plugin cache refresh failed", LOG_COMMAND, e=exc)
 
@@ -679,6 +1195,7 @@ class BotMemoryCache:
     _negative: ClassVar[dict[str, float]] = {}
     _loaded: ClassVar[bool] = False
     _refresh_task: ClassVar[asyncio.Task | None] = None
+    _cursor: ClassVar[_ChangeCursor] = _ChangeCursor()
 
     @classmethod
     def _normalize(cls, bot_id: str | None) -> str | None:
@@ -713,11 +1230,40 @@ class BotMemoryCache:
         from zhenxun.models.bot_console import BotConsole
 
         async with cls._lock:
-            records = await BotConsole.all()
-            cls._by_id = {str(r.bot_id): BotSnapshot.from_model(r) for r in records}
+            cursor = _ChangeCursor()
+            by_id: dict[str, BotSnapshot] = {}
+            async for records in _iter_chunks(BotConsole):
+                cursor.observe(records)
+                for record in records:
+                    by_id[str(record.bot_id)] = BotSnapshot.from_model(record)
+            changed = _changed_keys(cls._by_id, by_id) if cls._loaded else None
+            cls._by_id = by_id
+            cls._cursor = cursor
             cls._negative = {}
             cls._loaded = True
-            logger.debug(f"bot cache refreshed: {len(cls._by_id)} entries", LOG_COMMAND)
+            logger.debug(f"bot cache refreshed: {len(by_id)} entries", LOG_COMMAND)
+        if changed is None:
+            _notify_change("bot")
+        else:
+            _notify_keys("bot", changed)
+
+    @classmethod
+    async def refresh_changes(cls) -> None:
+        from zhenxun.models.bot_console import BotConsole
+
+        await _refresh_changes(cls, BotConsole)
+
+    @classmethod
+    async def _apply_changes(cls, records: list) -> None:
+        changed: set[str] = set()
+        async with cls._lock:
+            for record in records:
+                entry = BotSnapshot.from_model(record)
+                if cls._by_id.get(entry.bot_id) != entry:
+                    cls._by_id[entry.bot_id] = entry
+                    changed.add(entry.bot_id)
+                cls._negative.pop(entry.bot_id, None)
+        _notify_keys("bot", changed)
 
     @classmethod
     async def ensure_loaded(cls) -> None:
@@ -740,6 +1286,17 @@ class BotMemoryCache:
         cls._mark_negative(bot_id)
         return None
 
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._loaded
+
+    @classmethod
+    def get_if_ready(cls, bot_id: str | None) -> BotSnapshot | None:
+        bot_id = cls._normalize(bot_id)
+        if not bot_id or not cls._loaded:
+            return None
+        return cls._by_id.get(bot_id)
+
     @classmethod
     async def update_status(cls, bot_id: str | None, status: bool) -> None:
         bot_id = cls._normalize(bot_id)
@@ -759,6 +1316,7 @@ class BotMemoryCache:
                 available_tasks=entry.available_tasks,
             )
             cls._by_id[bot_id] = updated
+        _notify_change("bot", bot_id)
         RuntimeCacheSync.publish_event("bot", "upsert", updated.to_payload())
 
     @classmethod
@@ -767,6 +1325,7 @@ class BotMemoryCache:
         async with cls._lock:
             cls._by_id[entry.bot_id] = entry
             cls._negative.pop(entry.bot_id, None)
+        _notify_change("bot", entry.bot_id)
         RuntimeCacheSync.publish_event("bot", "upsert", entry.to_payload())
 
     @classmethod
@@ -777,6 +1336,7 @@ class BotMemoryCache:
         async with cls._lock:
             cls._by_id[entry.bot_id] = entry
             cls._negative.pop(entry.bot_id, None)
+        _notify_change("bot", entry.bot_id)
 
     @classmethod
     async def remove(cls, bot_id: str | None) -> None:
@@ -785,6 +1345,7 @@ class BotMemoryCache:
             return
         async with cls._lock:
             cls._by_id.pop(bot_id, None)
+        _notify_change("bot", bot_id)
         RuntimeCacheSync.publish_event("bot", "delete", {"bot_id": bot_id})
 
     @classmethod
@@ -801,7 +1362,7 @@ class BotMemoryCache:
         while True:
             await asyncio.sleep(interval)
             try:
-                await cls.refresh()
+                await cls.refresh_changes()
             except Exception as exc:
                 logger.error("bot cache refresh failed", LOG_COMMAND, e=exc)
 
@@ -829,6 +1390,7 @@ class GroupMemoryCache:
     _negative: ClassVar[dict[tuple[str, str], float]] = {}
     _loaded: ClassVar[bool] = False
     _refresh_task: ClassVar[asyncio.Task | None] = None
+    _cursor: ClassVar[_ChangeCursor] = _ChangeCursor()
 
     @classmethod
     def _normalize(cls, value: str | None) -> str | None:
@@ -873,17 +1435,46 @@ class GroupMemoryCache:
         from zhenxun.models.group_console import GroupConsole
 
         async with cls._lock:
-            records = await GroupConsole.all()
+            cursor = _ChangeCursor()
             by_key: dict[tuple[str, str], GroupSnapshot] = {}
-            for record in records:
-                entry = GroupSnapshot.from_model(record)
-                key = cls._key(entry.group_id, entry.channel_id)
-                if key:
-                    by_key[key] = entry
+            async for records in _iter_chunks(GroupConsole):
+                cursor.observe(records)
+                for record in records:
+                    entry = GroupSnapshot.from_model(record)
+                    key = cls._key(entry.group_id, entry.channel_id)
+                    if key:
+                        by_key[key] = entry
+            changed = _changed_keys(cls._by_key, by_key) if cls._loaded else None
             cls._by_key = by_key
+            cls._cursor = cursor
             cls._negative = {}
             cls._loaded = True
             logger.debug(f"group cache refreshed: {len(by_key)} entries", LOG_COMMAND)
+        if changed is None:
+            _notify_change("group")
+        else:
+            _notify_keys("group", changed)
+
+    @classmethod
+    async def refresh_changes(cls) -> None:
+        from zhenxun.models.group_console import GroupConsole
+
+        await _refresh_changes(cls, GroupConsole)
+
+    @classmethod
+    async def _apply_changes(cls, records: list) -> None:
+        changed: set[tuple[str, str]] = set()
+        async with cls._lock:
+            for record in records:
+                entry = GroupSnapshot.from_model(record)
+                key = cls._key(entry.group_id, entry.channel_id)
+                if not key:
+                    continue
+                if cls._by_key.get(key) != entry:
+                    cls._by_key[key] = entry
+                    changed.add(key)
+                cls._negative.pop(key, None)
+        _notify_keys("group", changed)
 
     @classmethod
     async def ensure_loaded(cls) -> None:
@@ -938,6 +1529,7 @@ class GroupMemoryCache:
         async with cls._lock:
             cls._by_key[key] = entry
             cls._negative.pop(key, None)
+        _notify_change("group", key)
         RuntimeCacheSync.publish_event("group", "upsert", entry.to_payload())
 
     @classmethod
@@ -949,6 +1541,7 @@ class GroupMemoryCache:
         async with cls._lock:
             cls._by_key[key] = entry
             cls._negative.pop(key, None)
+        _notify_change("group", key)
 
     @classmethod
     async def remove(cls, group_id: str | None, channel_id: str | None = None) -> None:
@@ -957,6 +1550,7 @@ class GroupMemoryCache:
             return
         async with cls._lock:
             cls._by_key.pop(key, None)
+        _notify_change("group", key)
         RuntimeCacheSync.publish_event(
             "group", "delete", {"group_id": key[0], "channel_id": key[1] or None}
         )
@@ -975,7 +1569,7 @@ class GroupMemoryCache:
         while True:
             await asyncio.sleep(interval)
             try:
-                await cls.refresh()
+                await cls.refresh_changes()
             except Exception as exc:
                 logger.error("group cache refresh failed", LOG_COMMAND, e=exc)
 
@@ -1004,6 +1598,7 @@ class LevelUserMemoryCache:
     _loaded: ClassVar[bool] = False
     _refresh_task: ClassVar[asyncio.Task | None] = None
     _last_refresh: ClassVar[float] = 0.0
+    _cursor: ClassVar[_ChangeCursor] = _ChangeCursor()
 
     @classmethod
     def _normalize(cls, value: str | None) -> str | None:
@@ -1046,19 +1641,38 @@ class LevelUserMemoryCache:
         from zhenxun.models.level_user import LevelUser
 
         async with cls._lock:
-            records = await LevelUser.all()
+            cursor = _ChangeCursor()
             by_key: dict[tuple[str, str], LevelUserSnapshot] = {}
-            for record in records:
-                entry = LevelUserSnapshot.from_model(record)
-                key = cls._key(entry.user_id, entry.group_id)
-                if key:
-                    by_key[key] = entry
+            async for records in _iter_chunks(LevelUser):
+                cursor.observe(records)
+                for record in records:
+                    entry = LevelUserSnapshot.from_model(record)
+                    key = cls._key(entry.user_id, entry.group_id)
+                    if key:
+                        by_key[key] = entry
             cls._by_key = by_key
+            cls._cursor = cursor
             cls._negative = {}
             cls._loaded = True
             cls._last_refresh = time.time()
             logger.debug(f"level cache refreshed: {len(by_key)} entries", LOG_COMMAND)
 
+    @classmethod
+    async def refresh_changes(cls) -> None:
+        from zhenxun.models.level_user import LevelUser
+
+        cls._last_refresh = time.time()
+        await _refresh_changes(cls, LevelUser)
+
+    @classmethod
+    async def _apply_changes(cls, records: list) -> None:
+        async with cls._lock:
+            for record in records:
+                entry = LevelUserSnapshot.from_model(record)
+                if key := cls._key(entry.user_id, entry.group_id):
+                    cls._by_key[key] = entry
+                    cls._negative.pop(key, None)
+
     @classmethod
     async def ensure_loaded(cls) -> None:
         if cls._loaded:
@@ -1076,7 +1690,7 @@ class LevelUserMemoryCache:
         if interval <= 0:
             return
         if time.time() - cls._last_refresh > interval:
-            await cls.refresh()
+            await cls.refresh_changes()
 
     @classmethod
     async def get(
@@ -1158,7 +1772,7 @@ class LevelUserMemoryCache:
         while True:
             await asyncio.sleep(interval)
             try:
-                await cls.refresh()
+                await cls.refresh_changes()
             except Exception as exc:
                 logger.error("level cache refresh failed", LOG_COMMAND, e=exc)
 
@@ -1187,6 +1801,7 @@ class PluginLimitMemoryCache:
     _negative: ClassVar[dict[str, float]] = {}
     _loaded: ClassVar[bool] = False
     _refresh_task: ClassVar[asyncio.Task | None] = None
+    _cursor: ClassVar[_ChangeCursor] = _ChangeCursor()
 
     @classmethod
     def _normalize(cls, value: str | None) -> str | None:
@@ -1221,21 +1836,46 @@ class PluginLimitMemoryCache:
         from zhenxun.models.plugin_limit import PluginLimit
 
         async with cls._lock:
-            records = await PluginLimit.filter(status=True).all()
+            cursor = _ChangeCursor()
             by_id: dict[int, PluginLimitSnapshot] = {}
             by_module: dict[str, list[PluginLimitSnapshot]] = {}
-            for record in records:
-                entry = PluginLimitSnapshot.from_model(record)
-                by_id[entry.id] = entry
-                by_module.setdefault(entry.module, []).append(entry)
+            async for records in _iter_chunks(PluginLimit):
+                cursor.observe(records)
+                for record in records:
+                    if not record.status:
+                        continue
+                    entry = PluginLimitSnapshot.from_model(record)
+                    by_id[entry.id] = entry
+                    by_module.setdefault(entry.module, []).append(entry)
+            changed = _changed_keys(cls._by_module, by_module) if cls._loaded else None
             cls._by_id = by_id
             cls._by_module = by_module
+            cls._cursor = cursor
             cls._negative = {}
             cls._loaded = True
             logger.debug(
                 f"plugin limit cache refreshed: {len(by_id)} entries",
                 LOG_COMMAND,
             )
+        if changed is None:
+            _notify_change("plugin_limit")
+        else:
+            _notify_keys("plugin_limit", changed)
+
+    @classmethod
+    async def refresh_changes(cls) -> None:
+        from zhenxun.models.plugin_limit import PluginLimit
+
+        await _refresh_changes(cls, PluginLimit)
+
+    @classmethod
+    async def _apply_changes(cls, records: list) -> None:
+        for record in records:
+            entry = PluginLimitSnapshot.from_model(record)
+            if not entry.status and entry.id not in cls._by_id:
+                continue
+            if cls._by_id.get(entry.id) != entry:
+                await cls._upsert_entry(entry)
 
     @classmethod
     async def ensure_loaded(cls) -> None:
@@ -1259,6 +1899,14 @@ class PluginLimitMemoryCache:
         cls._mark_negative(module)
         return []
 
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._loaded
+
+    @classmethod
+    def get_if_ready(cls, module: str) -> list[PluginLimitSnapshot]:
+        return cls._by_module.get(module) or []
+
     @classmethod
     def get_all_limits(cls) -> list[PluginLimitSnapshot]:
         return list(cls._by_id.values())
@@ -1281,7 +1929,9 @@ class PluginLimitMemoryCache:
     async def _upsert_entry(cls, entry: PluginLimitSnapshot) -> None:
         async with cls._lock:
             prev = cls._by_id.get(entry.id)
+            _notify_change("plugin_limit", entry.module)
             if prev and prev.module != entry.module:
+                _notify_change("plugin_limit", prev.module)
                 cls._by_module[prev.module] = [
                     item
                     for item in cls._by_module.get(prev.module, [])
@@ -1312,6 +1962,7 @@ class PluginLimitMemoryCache:
         async with cls._lock:
             entry = cls._by_id.pop(limit_id, None)
             if entry:
+                _notify_change("plugin_limit", entry.module)
                 cls._by_module[entry.module] = [
                     item
                     for item in cls._by_module.get(entry.module, [])
@@ -1333,7 +1984,7 @@ class PluginLimitMemoryCache:
         while True:
             await asyncio.sleep(interval)
             try:
-                await cls.refresh()
+                await cls.refresh_changes()
             except Exception as exc:
                 logger.error("plugin limit cache refresh failed", LOG_COMMAND, e=exc)
 
@@ -1364,6 +2015,7 @@ class BanMemoryCache:
     _loaded: ClassVar[bool] = False
     _refresh_task: ClassVar[asyncio.Task | None] = None
     _cleanup_task: ClassVar[asyncio.Task | None] = None
+    _cursor: ClassVar[_ChangeCursor] = _ChangeCursor()
     _remove_tasks: ClassVar[set[asyncio.Task]] = set()
 
     @classmethod
@@ -1424,25 +2076,28 @@ class BanMemoryCache:
 
         async with cls._lock:
             now_ts = time.time()
-            records = await BanConsole.all()
+            cursor = _ChangeCursor()
             by_user: dict[str, BanEntry] = {}
             by_group: dict[str, BanEntry] = {}
             by_user_group: dict[tuple[str, str], BanEntry] = {}
-            for record in records:
-                entry = cls._build_entry(record)
-                if not entry:
-                    continue
-                if entry.expire_at is not None and entry.expire_at <= now_ts:
-                    continue
-                if entry.user_id and entry.group_id:
-                    by_user_group[(entry.user_id, entry.group_id)] = entry
-                elif entry.user_id:
-                    by_user[entry.user_id] = entry
-                elif entry.group_id:
-                    by_group[entry.group_id] = entry
+            async for records in _iter_chunks(BanConsole):
+                cursor.observe(records)
+                for record in records:
+                    entry = cls._build_entry(record)
+                    if not entry:
+                        continue
+                    if entry.expire_at is not None and entry.expire_at <= now_ts:
+                        continue
+                    if entry.user_id and entry.group_id:
+                        by_user_group[(entry.user_id, entry.group_id)] = entry
+                    elif entry.user_id:
+                        by_user[entry.user_id] = entry
+                    elif entry.group_id:
+                        by_group[entry.group_id] = entry
             cls._by_user = by_user
             cls._by_group = by_group
             cls._by_user_group = by_user_group
+            cls._cursor = cursor
             cls._negative = {}
             cls._loaded = True
             logger.debug(
@@ -1452,6 +2107,34 @@ class BanMemoryCache:
                 LOG_COMMAND,
             )
 
+    @classmethod
+    async def refresh_changes(cls) -> None:
+        from zhenxun.models.ban_console import BanConsole
+
+        await _refresh_changes(cls, BanConsole)
+
+    @classmethod
+    async def _apply_changes(cls, records: list) -> None:
+        now_ts = time.time()
+        async with cls._lock:
+            for record in records:
+                entry = cls._build_entry(record)
+                if not entry:
+                    continue
+                if entry.user_id and entry.group_id:
+                    target, key = cls._by_user_group, (entry.user_id, entry.group_id)
+                elif entry.user_id:
+                    target, key = cls._by_user, entry.user_id
+                elif entry.group_id:
+                    target, key = cls._by_group, entry.group_id
+                else:
+                    continue
+                if entry.expire_at is not None and entry.expire_at <= now_ts:
+                    target.pop(key, None)
+                else:
+                    target[key] = entry
+            cls._negative = {}
+
     @classmethod
     async def ensure_loaded(cls) -> None:
         if cls._loaded:
@@ -1620,7 +2303,7 @@ class BanMemoryCache:
         while True:
             await asyncio.sleep(interval)
             try:
-                await cls.refresh()
+                await cls.refresh_changes()
             except Exception as exc:
                 logger.error("ban cache refresh failed", LOG_COMMAND, e=exc)
 
@@ -1681,6 +2364,16 @@ class BanMemoryCache:
             await cls.refresh()
 
 
+_SYNC_CACHES: dict[str, Any] = {
+    "bot": BotMemoryCache,
+    "group": GroupMemoryCache,
+    "ban": BanMemoryCache,
+    "level": LevelUserMemoryCache,
+    "plugin_limit": PluginLimitMemoryCache,
+}
+"""同步消息中的缓存类型 -> 内存缓存"""
+
+
 @PriorityLifecycle.on_startup(priority=6)
 async def _init_runtime_cache():
     await RuntimeCacheSync.start()
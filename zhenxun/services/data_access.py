@@ -1,7 +1,17 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+import time
 from typing import Any, ClassVar, Generic, TypeVar, cast
 
+from tortoise.expressions import Q
+
 from zhenxun.services.cache import Cache, CacheRoot, cache_config
-from zhenxun.services.cache.config import COMPOSITE_KEY_SEPARATOR, CacheMode
+from zhenxun.services.cache.config import (
+    CACHE_KEY_SEPARATOR,
+    COMPOSITE_KEY_SEPARATOR,
+    CacheMode,
+)
 from zhenxun.services.db_context import Model, with_db_timeout
 from zhenxun.services.log import logger
 
@@ -45,6 +55,14 @@ class DataAccess(Generic[T]):
     _NULL_RESULT = "__NULL_RESULT_PLACEHOLDER__"
     # 默认空结果缓存时间（秒）- 设置为5分钟，避免频繁查询数据库
     _NULL_RESULT_TTL = 300
+    # 正在进行的数据库查询，相同查询的并发请求共享同一结果
+    _inflight: ClassVar[dict[tuple, asyncio.Future]] = {}
+    # 过期数据副本，缓存类型 -> {缓存键: (数据, 写入时间)}
+    _stale_store: ClassVar[dict[str, OrderedDict[str, tuple[Any, float]]]] = {}
+    # 每个缓存类型最多保留的过期数据副本数
+    _STALE_MAX_ENTRIES = 10000
+    # 后台刷新任务
+    _refresh_tasks: ClassVar[set[asyncio.Task]] = set()
 
     @classmethod
     def set_null_result_ttl(cls, seconds: int) -> None:
@@ -68,15 +86,25 @@ class DataAccess(Generic[T]):
         return cls._NULL_RESULT_TTL
 
     def __init__(
-        self, model_cls: type[T], key_field: str = "id", cache_type: str | None = None
+        self,
+        model_cls: type[T],
+        key_field: str = "id",
+        cache_type: str | None = None,
+        stale_ttl: int = 0,
     ):
         """初始化数据访问对象
 
         参数:
             model_cls: 模型类
             key_field: 主键字段
+            cache_type: 缓存类型
+            stale_ttl: 缓存过期后仍可返回旧数据的时间（秒），
+                期间在后台刷新，为0时不启用；
+                过期副本保存在本进程内，只随本进程的缓存失效清除，
+                其他实例的修改可能在此期间读到旧数据
         """
         self.model_cls = model_cls
+        self.stale_ttl = stale_ttl
         self.key_field = getattr(model_cls, "cache_key_field", key_field)
         self.cache_type = getattr(model_cls, "cache_type", cache_type)
 
@@ -93,6 +121,9 @@ class DataAccess(Generic[T]):
                 "sets": 0,  # 缓存设置次数
                 "null_sets": 0,  # 空结果缓存设置次数
                 "deletes": 0,  # 缓存删除次数
+                "coalesced": 0,  # 合并到进行中查询的次数
+                "stale_hits": 0,  # 返回过期数据的次数
+                "refreshes": 0,  # 后台刷新次数
             }
 
     @classmethod
@@ -114,6 +145,9 @@ class DataAccess(Generic[T]):
                     "sets": stats["sets"],
                     "null_sets": stats.get("null_sets", 0),
                     "deletes": stats["deletes"],
+                    "coalesced": stats.get("coalesced", 0),
+                    "stale_hits": stats.get("stale_hits", 0),
+                    "refreshes": stats.get("refreshes", 0),
                     "hit_rate": f"{hit_rate:.2f}%",
                 }
             )
@@ -129,6 +163,91 @@ class DataAccess(Generic[T]):
             stats["sets"] = 0
             stats["null_sets"] = 0
             stats["deletes"] = 0
+            stats["coalesced"] = 0
+            stats["stale_hits"] = 0
+            stats["refreshes"] = 0
+
+    @classmethod
+    def _drop_stale(cls, cache_type: str | None, cache_key: str | None):
+        """本进程缓存失效时同步清除过期数据副本"""
+        if cache_type is None:
+            cls._stale_store.clear()
+            return
+        store = cls._stale_store.get(cache_type)
+        if not store:
+            return
+        if cache_key is None:
+            store.clear()
+        else:
+            store.pop(
+                cache_key.removeprefix(f"{cache_type}{CACHE_KEY_SEPARATOR}"), None
+            )
+
+    def _remember_stale(self, cache_key: str, data: Any):
+        if self.stale_ttl <= 0 or not self.cache_type:
+            return
+        store = self._stale_store.setdefault(self.cache_type, OrderedDict())
+        store[cache_key] = (data, time.time())
+        store.move_to_end(cache_key)
+        while len(store) > self._STALE_MAX_ENTRIES:
+            store.popitem(last=False)
+
+    def _get_stale(self, cache_key: str) -> Any:
+        if self.stale_ttl <= 0 or not self.cache_type:
+            return None
+        store = self._stale_store.get(self.cache_type)
+        if not store or not (item := store.get(cache_key)):
+            return None
+        data, stored_at = item
+        max_age = CacheRoot.get_model(self.cache_type).expire + self.stale_ttl
+        if time.time() - stored_at > max_age:
+            store.pop(cache_key, None)
+            return None
+        return data
+
+    async def _single_flight(
+        self, flight_key: tuple, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """相同查询只执行一次，并发调用方等待同一结果
+
+        参数:
+            flight_key: 查询标识
+            factory: 实际执行查询的函数
+        """
+        if task := self._inflight.get(flight_key):
+            if self.cache_type:
+                self._cache_stats[self.cache_type]["coalesced"] += 1
+        else:
+            # 查询在独立任务中执行，任一调用方超时取消都不会取消共享的查询
+            task = asyncio.ensure_future(factory())
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda done: self._finish_flight(flight_key, done))
+        return await asyncio.shield(task)
+
+    def _finish_flight(self, flight_key: tuple, task: asyncio.Future):
+        if self._inflight.get(flight_key) is task:
+            del self._inflight[flight_key]
+        # 所有调用方都已取消时避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def _refresh_in_background(
+        self, flight_key: tuple, factory: Callable[[], Awaitable[Any]]
+    ):
+        if flight_key in self._inflight:
+            return
+
+        async def _refresh():
+            try:
+                await self._single_flight(flight_key, factory)
+            except Exception as e:
+                logger.warning(f"{self.model_cls.__name__} 后台刷新缓存失败", e=e)
+
+        if self.cache_type:
+            self._cache_stats[self.cache_type]["refreshes"] += 1
+        task = asyncio.create_task(_refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
 
     def _build_cache_key_from_kwargs(self, **kwargs) -> str | None:
         """从关键字参数构建缓存键
@@ -212,7 +331,41 @@ class DataAccess(Generic[T]):
         except Exception as e:
             logger.error(f"{self.model_cls.__name__} 从缓存获取数据失败: {kwargs}", e=e)
 
-        # 如果缓存中没有，从数据库获取
+        flight_key = (
+            self.cache_type,
+            getattr(db_query_func, "__qualname__", repr(db_query_func)),
+            allow_not_exist,
+            repr(args),
+            repr(sorted(kwargs.items())),
+        )
+
+        async def _load():
+            return await self._load_from_db(db_query_func, cache_key, *args, **kwargs)
+
+        # 缓存已过期但仍在容忍范围内时先返回旧数据，同时在后台刷新
+        if cache_key is not None:
+            stale = self._get_stale(cache_key)
+            if stale is not None:
+                self._cache_stats[self.cache_type]["stale_hits"] += 1
+                self._refresh_in_background(flight_key, _load)
+                return cast(T, stale)
+
+        return await self._single_flight(flight_key, _load)
+
+    async def _load_from_db(
+        self, db_query_func, cache_key: str | None, *args, **kwargs
+    ) -> T | None:
+        """从数据库获取数据并写入缓存
+
+        参数:
+            db_query_func: 数据库查询函数
+            cache_key: 根据查询参数构建的缓存键
+            *args: 查询参数
+            **kwargs: 查询参数
+
+        返回:
+            Optional[T]: 查询结果，如果不存在返回None
+        """
         logger.debug(f"{self.model_cls.__name__} 从数据库获取数据: {kwargs}")
         data = await db_query_func(*args, **kwargs)
 
@@ -224,6 +377,7 @@ class DataAccess(Generic[T]):
                 if cache_key is not None:
                     # 存入缓存
                     await self.cache.set(cache_key, data)
+                    self._remember_stale(cache_key, data)
                     self._cache_stats[self.cache_type]["sets"] += 1
                     logger.debug(
                         f"{self.model_cls.__name__} 数据已存入缓存: {cache_key}"
@@ -298,6 +452,118 @@ class DataAccess(Generic[T]):
         """
         return await self._get_with_cache(func, allow_not_exist, *args, **kwargs)
 
+    def _normalize_many_keys(
+        self, keys: list[str] | list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        fields = (
+            self.key_field if isinstance(self.key_field, tuple) else (self.key_field,)
+        )
+        result = []
+        for key in keys:
+            if isinstance(key, dict):
+                result.append({field: key.get(field) for field in fields})
+            elif len(fields) == 1:
+                result.append({fields[0]: key})
+            else:
+                raise ValueError(
+                    f"{self.model_cls.__name__} 为多字段主键 {fields}，"
+                    "批量获取时需要传入字段字典"
+                )
+        return result
+
+    async def get_many(
+        self, keys: list[str] | list[dict[str, Any]], chunk_size: int = 500
+    ) -> dict[str, T | None]:
+        """批量获取数据，缓存使用一次 MGET，未命中部分使用一次 IN 查询
+
+        参数:
+            keys: 主键值列表，多字段主键时传入字段字典列表
+            chunk_size: 未命中时每次数据库查询的最大键数
+
+        返回:
+            dict[str, T | None]: 缓存键 -> 数据，不存在时为None
+        """
+        kwargs_list = self._normalize_many_keys(keys)
+        key2kwargs: dict[str, dict[str, Any]] = {}
+        for kwargs in kwargs_list:
+            if (cache_key := self._build_cache_key_from_kwargs(**kwargs)) is not None:
+                key2kwargs.setdefault(cache_key, kwargs)
+        result: dict[str, T | None] = dict.fromkeys(key2kwargs)
+        if not key2kwargs:
+            return result
+
+        use_cache = bool(self.cache_type) and cache_config.cache_mode != CacheMode.NONE
+        missing = list(key2kwargs)
+        if use_cache:
+            stats = self._cache_stats[self.cache_type]
+            cache_keys = list(key2kwargs)
+            data_list = await self.cache.get_many(cache_keys)  # type: ignore
+            missing = []
+            for cache_key, data in zip(cache_keys, data_list):
+                if data == self._NULL_RESULT:
+                    stats["null_hits"] += 1
+                elif data:
+                    stats["hits"] += 1
+                    result[cache_key] = cast(T, data)
+                else:
+                    stats["misses"] += 1
+                    missing.append(cache_key)
+            if not missing:
+                return result
+
+        fields = (
+            self.key_field if isinstance(self.key_field, tuple) else (self.key_field,)
+        )
+        found: dict[str, T] = {}
+        for i in range(0, len(missing), max(chunk_size, 1)):
+            chunk = [key2kwargs[cache_key] for cache_key in missing[i : i + chunk_size]]
+            if len(fields) == 1:
+                query = self.model_cls.filter(
+                    **{f"{fields[0]}__in": [kw[fields[0]] for kw in chunk]}
+                )
+            else:
+                query = self.model_cls.filter(
+                    Q(*[Q(**kw) for kw in chunk], join_type="OR")
+                )
+            rows = await with_db_timeout(
+                query,
+                operation=f"{self.model_cls.__name__}.get_many",
+                source="DataAccess",
+            )
+            for row in rows:
+                cache_key = self._build_cache_key_from_kwargs(
+                    **{field: getattr(row, field, None) for field in fields}
+                )
+                if cache_key in key2kwargs:
+                    found[cache_key] = row
+        result.update(found)
+        for cache_key in missing:
+            if cache_key not in found:
+                result[cache_key] = None
+
+        if use_cache:
+            stats = self._cache_stats[self.cache_type]
+            try:
+                items: list[tuple[str | dict[str, Any], Any]] = []
+                for row in found.values():
+                    if (item_key := self._build_cache_key_for_item(row)) is not None:
+                        items.append((item_key, row))
+                        self._remember_stale(item_key, row)
+                if items and await self.cache.set_many(items):
+                    stats["sets"] += len(items)
+                null_items: list[tuple[str | dict[str, Any], Any]] = [
+                    (cache_key, self._NULL_RESULT)
+                    for cache_key in missing
+                    if cache_key not in found
+                ]
+                if null_items and await self.cache.set_many(
+                    null_items, expire=self._NULL_RESULT_TTL
+                ):
+                    stats["null_sets"] += len(null_items)
+            except Exception as e:
+                logger.error(f"{self.model_cls.__name__} 批量存入缓存失败", e=e)
+        return result
+
     async def clear_cache(self, **kwargs) -> bool:
         """只清除缓存，不影响数据库数据
 
@@ -412,17 +678,17 @@ class DataAccess(Generic[T]):
             return
 
         try:
-            # 遍历数据列表，将每条数据存入缓存
-            cached_count = 0
+            # 一次写入所有数据，Redis 下只需一次往返
+            items: list[tuple[str | dict[str, Any], Any]] = []
             for item in data_list:
                 cache_key = self._build_cache_key_for_item(item)
                 if cache_key is not None:
-                    await self.cache.set(cache_key, item)
-                    cached_count += 1
-                    self._cache_stats[self.cache_type]["sets"] += 1
+                    items.append((cache_key, item))
+            if items and await self.cache.set_many(items):
+                self._cache_stats[self.cache_type]["sets"] += len(items)
 
             logger.debug(
-                f"{self.model_cls.__name__} 批量缓存: {cached_count}/{len(data_list)}项"
+                f"{self.model_cls.__name__} 批量缓存: {len(items)}/{len(data_list)}项"
             )
         except Exception as e:
             logger.error(f"{self.model_cls.__name__} 批量缓存失败", e=e)
@@ -512,6 +778,7 @@ class DataAccess(Generic[T]):
                 if cache_key is not None:
                     # 存入缓存
                     await self.cache.set(cache_key, data)
+                    self._remember_stale(cache_key, data)
                     self._cache_stats[self.cache_type]["sets"] += 1
                     logger.debug(
                         f"{self.model_cls.__name__} create: "
@@ -550,6 +817,7 @@ class DataAccess(Generic[T]):
                 if cache_key is not None:
                     # 存入缓存
                     await self.cache.set(cache_key, data)
+                    self._remember_stale(cache_key, data)
                     self._cache_stats[self.cache_type]["sets"] += 1
                     logger.debug(f"更新或创建的数据已存入缓存: {cache_key}")
             except Exception as e:
@@ -624,3 +892,6 @@ class DataAccess(Generic[T]):
 
         # 如果无法生成复合键，生成一个唯一键
         return f"object_{id(data)}"
+
+
+CacheRoot.add_invalidate_listener(DataAccess._drop_stale)
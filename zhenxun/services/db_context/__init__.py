@@ -23,7 +23,13 @@ from .config import (
     prompt,
 )
 from .exceptions import DbConnectError, DbUrlIsNode
-from .utils import with_db_timeout
+from .utils import (
+    bulk_insert_rows,
+    mysql_index_sql,
+    replace_rows,
+    upsert_increment,
+    with_db_timeout,
+)
 
 MODELS = db_model.models
 SCRIPT_METHOD = db_model.script_method
@@ -36,8 +42,12 @@ __all__ = [
     "DbConnectError",
     "DbUrlIsNode",
     "Model",
+    "bulk_insert_rows",
     "disconnect",
     "init",
+    "mysql_index_sql",
+    "replace_rows",
+    "upsert_increment",
     "with_db_timeout",
 ]
 
@@ -184,6 +184,30 @@ class Model(TortoiseModel):
                 obj = await cls.get(**kwargs)
                 return obj, False
 
+    @classmethod
+    def _auto_now_fields(cls) -> list[str]:
+        """auto_now 的时间字段，指定更新字段时同样需要写入"""
+        return [
+            name
+            for name, field in cls._meta.fields_map.items()
+            if getattr(field, "auto_now", False)
+        ]
+
+    @classmethod
+    def bulk_update(
+        cls,
+        objects: Iterable[Self],
+        fields: Iterable[str],
+        batch_size: int | None = None,
+        using_db: BaseDBAsyncClient | None = None,
+    ):
+        """批量更新，auto_now 字段一并更新"""
+        fields = list(fields)
+        fields += [name for name in cls._auto_now_fields() if name not in fields]
+        return super().bulk_update(
+            objects, fields, batch_size=batch_size, using_db=using_db
+        )
+
     async def save(
         self,
         using_db: BaseDBAsyncClient | None = None,
@@ -192,6 +216,11 @@ class Model(TortoiseModel):
         force_update: bool = False,
     ):
         """保存数据（根据操作类型自动选择锁）"""
+        if update_fields is not None:
+            update_fields = list(update_fields)
+            update_fields += [
+                name for name in self._auto_now_fields() if name not in update_fields
+            ]
         lock_type = (
             DbLockType.CREATE
             if getattr(self, "id", None) is None
@@ -1,7 +1,15 @@
 import asyncio
+from collections.abc import Sequence
+from datetime import datetime
 import time
+from typing import Any
+
+from tortoise import Model, timezone
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
 
 from zhenxun.services.log import logger
+from zhenxun.services.message_load import LoadGovernor
 
 from .config import (
     DB_TIMEOUT_SECONDS,
@@ -22,13 +30,169 @@ async def with_db_timeout(
         logger.debug(f"开始执行数据库操作: {operation} 来源: {source}")
         result = await asyncio.wait_for(coro, timeout=timeout)
         elapsed = time.time() - start_time
+        LoadGovernor.report_db_latency(elapsed)
         if elapsed > SLOW_QUERY_THRESHOLD and operation:
             logger.warning(f"慢查询: {operation} 耗时 {elapsed:.3f}s", LOG_COMMAND)
         return result
     except asyncio.TimeoutError:
+        LoadGovernor.report_db_latency(timeout)
         if operation:
             logger.error(
                 f"数据库操作超时: {operation} (>{timeout}s) 来源: {source}",
                 LOG_COMMAND,
             )
         raise
+
+
+async def bulk_insert_rows(
+    model: type[Model],
+    rows: list[dict[str, Any]],
+    using_db: BaseDBAsyncClient | None = None,
+):
+    """按字段字典批量插入数据
+
+    PostgreSQL(asyncpg) 下直接使用 COPY 写入，不构建模型实例；
+    其他数据库回退为 bulk_create。
+
+    参数:
+        model: 数据模型
+        rows: 字段名 -> 值 的列表，所有行需包含相同字段
+        using_db: 数据库连接或事务
+    """
+    if not rows:
+        return
+    db = using_db or model._meta.db
+    if db.capabilities.dialect != "postgres":
+        await model.bulk_create([model(**row) for row in rows], using_db=db)
+        return
+    fields = list(rows[0])
+    projection = model._meta.fields_db_projection
+    columns = [projection[field] for field in fields]
+    records = [
+        tuple(
+            timezone.make_aware(value)
+            if isinstance(value, datetime) and timezone.is_naive(value)
+            else value
+            for value in (row.get(field) for field in fields)
+        )
+        for row in rows
+    ]
+    async with db.acquire_connection() as connection:
+        await connection.copy_records_to_table(
+            model._meta.db_table, records=records, columns=columns
+        )
+
+
+async def upsert_increment(
+    model: type[Model],
+    rows: list[dict[str, Any]],
+    conflict_fields: Sequence[str],
+    increment_field: str,
+    using_db: BaseDBAsyncClient | None = None,
+    batch_size: int = 500,
+):
+    """按唯一键批量写入，已存在的行在数据库端累加计数字段
+
+    PostgreSQL/SQLite 使用 ON CONFLICT DO UPDATE，MySQL 使用 ON DUPLICATE KEY UPDATE，
+    多个实例并发写入同一行时不会丢失计数，也不会因唯一键冲突失败。
+
+    参数:
+        model: 数据模型，conflict_fields 需为其唯一约束且均不可为空
+        rows: 字段名 -> 值 的列表，所有行需包含相同字段，唯一键互不重复
+        conflict_fields: 唯一键字段
+        increment_field: 累加的计数字段
+        using_db: 数据库连接或事务
+        batch_size: 单条语句写入的行数
+    """
+    if not rows:
+        return
+    db = using_db or model._meta.db
+    dialect = db.capabilities.dialect
+    executor = db.executor_class(model=model, db=db)
+    fields = list(rows[0])
+    fields_map = model._meta.fields_map
+    projection = model._meta.fields_db_projection
+    quote = "`" if dialect == "mysql" else '"'
+    table = f"{quote}{model._meta.db_table}{quote}"
+    columns = ", ".join(f"{quote}{projection[field]}{quote}" for field in fields)
+    counter = f"{quote}{projection[increment_field]}{quote}"
+    if dialect == "mysql":
+        conflict = f"ON DUPLICATE KEY UPDATE {counter} = {counter} + VALUES({counter})"
+    else:
+        keys = ", ".join(
+            f"{quote}{projection[field]}{quote}" for field in conflict_fields
+        )
+        conflict = (
+            f"ON CONFLICT ({keys}) DO UPDATE "
+            f"SET {counter} = {table}.{counter} + EXCLUDED.{counter}"
+        )
+    # 按唯一键排序，并发事务以相同顺序加锁，避免死锁
+    rows = sorted(rows, key=lambda row: tuple(str(row[f]) for f in conflict_fields))
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i : i + batch_size]
+        values = [
+            executor._field_to_db(fields_map[field], row[field], model)
+            for row in batch
+            for field in fields
+        ]
+        placeholders = ", ".join(
+            "({})".format(
+                ", ".join(
+                    str(executor.parameter(n * len(fields) + j))
+                    for j in range(len(fields))
+                )
+            )
+            for n in range(len(batch))
+        )
+        await db.execute_query(
+            f"INSERT INTO {table} ({columns}) VALUES {placeholders} {conflict}",
+            values,
+        )
+
+
+async def replace_rows(
+    model: type[Model],
+    filters: dict[str, Any],
+    objects: list[Model],
+    batch_size: int = 1000,
+):
+    """在同一事务中删除满足条件的数据并写入新数据
+
+    参数:
+        model: 数据模型
+        filters: 删除条件
+        objects: 新数据
+        batch_size: 批量写入的行数
+    """
+    async with in_transaction(model._meta.default_connection) as connection:
+        await model.filter(**filters).using_db(connection).delete()
+        await model.bulk_create(objects, batch_size=batch_size, using_db=connection)
+
+
+def mysql_index_sql(model: type[Model]) -> list[str]:
+    """为已存在的 MySQL 数据表补建 Meta.indexes 中的索引
+
+    PostgreSQL/SQLite 下 generate_schemas 会以 CREATE INDEX IF NOT EXISTS
+    为已有表补建索引；MySQL 的索引写在 CREATE TABLE 中，已有表不会补建。
+    索引名与 tortoise 生成的一致，索引已存在时语句报错并被忽略。
+
+    参数:
+        model: 数据模型，需在 Tortoise 初始化后调用
+
+    返回:
+        list[str]: ALTER TABLE 语句，非 MySQL 时为空
+    """
+    db = model._meta.db
+    if db.capabilities.dialect != "mysql":
+        return []
+    generator = db.schema_generator(db)
+    table = model._meta.db_table
+    sql_list = []
+    for fields in model._meta.indexes:
+        columns = [model._meta.fields_db_projection[field] for field in fields]
+        name = generator._generate_index_name("idx", model, columns)
+        sql_list.append(
+            f"ALTER TABLE `{table}` ADD INDEX `{name}` "
+            f"({', '.join(f'`{c}`' for c in columns)});"
+        )
+    return sql_list
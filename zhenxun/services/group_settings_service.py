@@ -1,6 +1,8 @@
+import copy
 from typing import Any, TypeVar, overload
 
 from pydantic import BaseModel, ValidationError
+from tortoise.transactions import in_transaction
 import ujson as json
 
 from zhenxun.configs.config import Config
@@ -8,7 +10,7 @@ from zhenxun.models.group_plugin_setting import GroupPluginSetting
 from zhenxun.services.cache import Cache
 from zhenxun.services.data_access import DataAccess
 from zhenxun.services.log import logger
-from zhenxun.utils.pydantic_compat import model_dump, model_validate, parse_as
+from zhenxun.utils.pydantic_compat import model_dump, parse_as
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -210,14 +212,75 @@ class GroupSettingsService:
         """
         if not group_ids:
             return 0, 0
+        group_ids = list(dict.fromkeys(group_ids))
 
+        entries = await self.dao.get_many(
+            [{"group_id": gid, "plugin_name": plugin_name} for gid in group_ids]
+        )
+        existing = {
+            entry.group_id: entry for entry in entries.values() if entry is not None
+        }
+
+        # 在副本上修改，事务失败时缓存中的对象保持不变
+        update_list: list[GroupPluginSetting] = []
+        create_list: list[GroupPluginSetting] = []
         for group_id in group_ids:
-            current_settings = await self.get_all_for_plugin(group_id, plugin_name)
-            current_settings[key] = value
-            await self.set(
-                group_id, plugin_name, model_validate(BaseModel, current_settings)
-            )
-        return len(group_ids), 0
+            if entry := existing.get(group_id):
+                settings = entry.settings if isinstance(entry.settings, dict) else {}
+                updated = copy.copy(entry)
+                updated.settings = {**settings, key: value}
+                update_list.append(updated)
+            else:
+                create_list.append(
+                    GroupPluginSetting(
+                        group_id=group_id,
+                        plugin_name=plugin_name,
+                        settings={key: value},
+                    )
+                )
+
+        created = len(create_list)
+        async with in_transaction() as connection:
+            if update_list:
+                await GroupPluginSetting.bulk_update(
+                    update_list,
+                    fields=["settings"],
+                    batch_size=500,
+                    using_db=connection,
+                )
+            if create_list:
+                await GroupPluginSetting.bulk_create(
+                    create_list,
+                    batch_size=500,
+                    ignore_conflicts=True,
+                    using_db=connection,
+                )
+                # 并发创建的记录会使插入被忽略，重新读取并合并配置项
+                conflicted = [
+                    row
+                    for row in await GroupPluginSetting.filter(
+                        group_id__in=[item.group_id for item in create_list],
+                        plugin_name=plugin_name,
+                    ).using_db(connection)
+                    if row.settings != {key: value}
+                ]
+                for row in conflicted:
+                    settings = row.settings if isinstance(row.settings, dict) else {}
+                    row.settings = {**settings, key: value}
+                if conflicted:
+                    await GroupPluginSetting.bulk_update(
+                        conflicted,
+                        fields=["settings"],
+                        batch_size=500,
+                        using_db=connection,
+                    )
+                created -= len(conflicted)
+
+        # 事务提交后再清除缓存
+        for group_id in group_ids:
+            await self.dao.clear_cache(group_id=group_id, plugin_name=plugin_name)
+            await self._cache.delete(f"{group_id}:{plugin_name}")
+        return len(group_ids) - created, created
 
 
 group_settings_service = GroupSettingsService()
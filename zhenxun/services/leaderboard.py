@@ -0,0 +1,318 @@
+"""
+排行榜
+
+排行数据直接在数据库中计算：前 N 名使用 ORDER BY ... LIMIT，
+个人排名使用 COUNT(分数大于自己的人数) + 1，群内排行通过子查询关联
+GroupInfoUser，不再把群成员 id 列表整体传入 IN 条件，也不再加载全部数据。
+
+启用 redis 时，全局排行额外镜像到有序集合中：模型保存时同步更新分数，
+并定期整体重建以覆盖批量更新等不触发信号的写入；镜像未就绪时回退数据库查询。
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, ClassVar
+
+from tortoise.expressions import Subquery
+from tortoise.signals import post_delete, post_save
+
+from zhenxun.configs.config import Config
+from zhenxun.models.group_member_info import GroupInfoUser
+from zhenxun.models.sign_user import SignUser
+from zhenxun.models.user_console import UserConsole
+from zhenxun.services.cache.runtime_cache import create_redis_client
+from zhenxun.services.db_context import Model
+from zhenxun.services.log import logger
+from zhenxun.utils.manager.priority_manager import PriorityLifecycle
+
+LOG_COMMAND = "Leaderboard"
+
+Config.add_plugin_config(
+    "hook",
+    "LEADERBOARD_REDIS",
+    True,
+    help="mirror global leaderboards into redis sorted sets when redis is enabled",
+    default_value=True,
+    type=bool,
+)
+Config.add_plugin_config(
+    "hook",
+    "LEADERBOARD_REBUILD_INTERVAL",
+    3600,
+    help="leaderboard redis mirror full rebuild interval in seconds",
+    default_value=3600,
+    type=int,
+)
+
+_REDIS_PREFIX = "zhenxun:leaderboard:"
+_REBUILD_CHUNK = 5000
+
+
+@dataclass(frozen=True)
+class Board:
+    name: str
+    """排行榜名称"""
+    model: type[Model]
+    """数据模型，需包含 user_id 字段"""
+    score_field: str
+    """分数字段"""
+
+
+class Leaderboard:
+    """排行榜
+
+    使用示例:
+    ```python
+    top = await Leaderboard.top("gold", 10, group_id)
+    rank = await Leaderboard.rank("gold", user_id, group_id)
+    ```
+    """
+
+    _boards: ClassVar[dict[str, Board]] = {}
+    _redis: ClassVar[Any | None] = None
+    _ready: ClassVar[set[str]] = set()
+    _task: ClassVar[asyncio.Task | None] = None
+    _pending: ClassVar[dict[str, dict[str, float | None]]] = {}
+    """重建期间的分数变更，排行榜名称 -> {用户id: 分数}，分数为None时表示删除"""
+
+    @classmethod
+    def register(cls, name: str, model: type[Model], score_field: str):
+        """注册排行榜
+
+        参数:
+            name: 排行榜名称
+            model: 数据模型
+            score_field: 分数字段
+        """
+        board = Board(name, model, score_field)
+        cls._boards[name] = board
+
+        async def _on_save(sender, instance, created, using_db, update_fields):
+            if update_fields and score_field not in update_fields:
+                return
+            await cls._mirror_score(board, instance)
+
+        async def _on_delete(sender, instance, using_db):
+            await cls._mirror_remove(board, instance.user_id)
+
+        post_save(model)(_on_save)
+        post_delete(model)(_on_delete)
+
+    @classmethod
+    async def _query(cls, board: Board, group_id: str | None):
+        query = board.model.all()
+        # 群组没有成员记录时与全局排行一致
+        if group_id and await GroupInfoUser.exists(group_id=group_id):
+            query = query.filter(
+                user_id__in=Subquery(
+                    GroupInfoUser.filter(group_id=group_id).values("user_id")
+                )
+            )
+        return query
+
+    @classmethod
+    def _use_redis(cls, board: Board, group_id: str | None) -> bool:
+        return not group_id and cls._redis is not None and board.name in cls._ready
+
+    @classmethod
+    async def top(
+        cls, name: str, num: int, group_id: str | None = None
+    ) -> list[tuple[str, float]]:
+        """获取排行前 N 名
+
+        参数:
+            name: 排行榜名称
+            num: 数量
+            group_id: 群组id，为None时为全局排行
+
+        返回:
+            list[tuple[str, float]]: (用户id, 分数)，按分数从高到低
+        """
+        board = cls._boards[name]
+        if cls._use_redis(board, group_id):
+            try:
+                data = await cls._redis.zrevrange(  # type: ignore
+                    cls._key(name), 0, num - 1, withscores=True
+                )
+                return [(str(uid), float(score)) for uid, score in data]
+            except Exception as e:
+                logger.warning("读取排行榜缓存失败，回退数据库", LOG_COMMAND, e=e)
+        query = await cls._query(board, group_id)
+        data = (
+            await query.order_by(f"-{board.score_field}", "id")
+            .limit(num)
+            .values_list("user_id", board.score_field)
+        )
+        return [(uid, float(score)) for uid, score in data]
+
+    @classmethod
+    async def rank(
+        cls, name: str, user_id: str, group_id: str | None = None
+    ) -> int | None:
+        """获取用户排名，同分并列
+
+        参数:
+            name: 排行榜名称
+            user_id: 用户id
+            group_id: 群组id，为None时为全局排行
+
+        返回:
+            int | None: 排名，用户不在排行中时为None
+        """
+        board = cls._boards[name]
+        if cls._use_redis(board, group_id):
+            try:
+                key = cls._key(name)
+                score = await cls._redis.zscore(key, user_id)  # type: ignore
+                if score is None:
+                    return None
+                return await cls._redis.zcount(key, f"({score}", "+inf") + 1  # type: ignore
+            except Exception as e:
+                logger.warning("读取排行榜缓存失败，回退数据库", LOG_COMMAND, e=e)
+        query = await cls._query(board, group_id)
+        scores = (
+            await query.filter(user_id=user_id)
+            .limit(1)
+            .values_list(board.score_field, flat=True)
+        )
+        if not scores:
+            return None
+        score = scores[0]
+        return await query.filter(**{f"{board.score_field}__gt": score}).count() + 1
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return f"{_REDIS_PREFIX}{name}"
+
+    @classmethod
+    async def _mirror_score(cls, board: Board, instance: Model):
+        score = float(getattr(instance, board.score_field))
+        if (pending := cls._pending.get(board.name)) is not None:
+            pending[instance.user_id] = score  # type: ignore
+        if cls._redis is None or board.name not in cls._ready:
+            return
+        try:
+            await cls._redis.zadd(
+                cls._key(board.name),
+                {instance.user_id: score},  # type: ignore
+            )
+        except Exception as e:
+            cls._ready.discard(board.name)
+            logger.warning(f"同步排行榜 {board.name} 失败", LOG_COMMAND, e=e)
+
+    @classmethod
+    async def _mirror_remove(cls, board: Board, user_id: str):
+        if (pending := cls._pending.get(board.name)) is not None:
+            pending[user_id] = None
+        if cls._redis is None or board.name not in cls._ready:
+            return
+        try:
+            await cls._redis.zrem(cls._key(board.name), user_id)
+        except Exception as e:
+            cls._ready.discard(board.name)
+            logger.warning(f"同步排行榜 {board.name} 失败", LOG_COMMAND, e=e)
+
+    @classmethod
+    async def rebuild(cls, name: str):
+        """从数据库整体重建排行榜的 redis 镜像
+
+        参数:
+            name: 排行榜名称
+        """
+        if cls._redis is None:
+            return
+        board = cls._boards[name]
+        key = cls._key(name)
+        tmp_key = f"{key}:rebuild"
+        # 扫描期间保存的分数可能已被读过的旧数据覆盖，记录下来在替换前重新写入
+        cls._pending[name] = {}
+        try:
+            await cls._redis.delete(tmp_key)
+            last_id = 0
+            while True:
+                rows = (
+                    await board.model.filter(id__gt=last_id)
+                    .order_by("id")
+                    .limit(_REBUILD_CHUNK)
+                    .values_list("id", "user_id", board.score_field)
+                )
+                if not rows:
+                    break
+                await cls._redis.zadd(
+                    tmp_key, {uid: float(score) for _, uid, score in rows}
+                )
+                last_id = rows[-1][0]
+            pending = cls._pending[name]
+            cls._pending[name] = {}
+            async with cls._redis.pipeline(transaction=True) as pipe:
+                cls._apply_pending(pipe, tmp_key, pending)
+                if last_id or any(v is not None for v in pending.values()):
+                    pipe.rename(tmp_key, key)
+                else:
+                    pipe.delete(tmp_key, key)
+                await pipe.execute()
+        finally:
+            pending = cls._pending.pop(name, {})
+        # 替换期间的变更可能写入了被替换掉的旧镜像
+        if pending:
+            async with cls._redis.pipeline(transaction=True) as pipe:
+                cls._apply_pending(pipe, key, pending)
+                await pipe.execute()
+        cls._ready.add(name)
+
+    @staticmethod
+    def _apply_pending(pipe: Any, key: str, pending: dict[str, float | None]):
+        if scores := {uid: v for uid, v in pending.items() if v is not None}:
+            pipe.zadd(key, scores)
+        if removed := [uid for uid, v in pending.items() if v is None]:
+            pipe.zrem(key, *removed)
+
+    @classmethod
+    async def _rebuild_loop(cls):
+        while True:
+            for name in cls._boards:
+                try:
+                    await cls.rebuild(name)
+                except Exception as e:
+                    cls._ready.discard(name)
+                    logger.warning(f"重建排行榜 {name} 失败", LOG_COMMAND, e=e)
+            interval = Config.get_config("hook", "LEADERBOARD_REBUILD_INTERVAL", 3600)
+            await asyncio.sleep(max(int(interval or 3600), 60))
+
+    @classmethod
+    def start(cls):
+        """启用 redis 镜像并开始定期重建"""
+        if not Config.get_config("hook", "LEADERBOARD_REDIS", True):
+            return
+        if cls._redis is None:
+            cls._redis = create_redis_client()
+        if cls._redis is not None and (cls._task is None or cls._task.done()):
+            cls._task = asyncio.create_task(cls._rebuild_loop())
+
+    @classmethod
+    async def stop(cls):
+        """停止重建并关闭 redis 连接"""
+        if cls._task:
+            cls._task.cancel()
+            cls._task = None
+        cls._ready.clear()
+        if cls._redis is not None:
+            try:
+                await cls._redis.close()
+            except Exception:
+                pass
+            cls._redis = None
+
+
+Leaderboard.register("gold", UserConsole, "gold")
+Leaderboard.register("impression", SignUser, "impression")
+
+
+@PriorityLifecycle.on_startup(priority=7)
+async def _start_leaderboard():
+    Leaderboard.start()
+
+
+@PriorityLifecycle.on_shutdown(priority=7)
+async def _stop_leaderboard():
+    await Leaderboard.stop()
@@ -1,24 +1,354 @@
+"""
+负载调控
+
+根据事件循环延迟、进行中的权限检查数量、发送队列深度与数据库延迟计算分级负载，
+各子系统按各自的策略在不同负载等级下降级：
+- ELEVATED: 停止聊天记录采样，压制调试日志
+- HIGH: 推迟统计与聊天记录写入、暂停定时任务与后台任务、暂停广播发送
+- CRITICAL: 丢弃新的交互命令
+
+负载升级立即生效；降级需各项指标低于进入阈值的 EXIT_RATIO 倍并持续 HOLD 秒，
+且每次只降低一级，避免在阈值附近反复切换。
+"""
+
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from enum import IntEnum
 import time
+from typing import Any, ClassVar
 
-_OVERLOAD_UNTIL = 0.0
+import nonebot
 
+from zhenxun.configs.config import Config
+from zhenxun.services.log import logger
 
-def signal_overload(duration: float = 5.0) -> None:
-    """Mark the system as overloaded for a short time window."""
-    global _OVERLOAD_UNTIL
-    if duration <= 0:
+LOG_COMMAND = "LoadGovernor"
+
+Config.add_plugin_config(
+    "hook",
+    "LOAD_SAMPLE_INTERVAL",
+    0.5,
+    help="load governor sample interval in seconds",
+)
+Config.add_plugin_config(
+    "hook",
+    "LOAD_HOLD_SECONDS",
+    10.0,
+    help="seconds load must stay low before dropping one pressure level",
+)
+
+
+class LoadLevel(IntEnum):
+    """负载等级"""
+
+    NORMAL = 0
+    ELEVATED = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+class Subsystem(IntEnum):
+    """可降级的子系统"""
+
+    LOGGING = 0
+    """调试日志"""
+    CHAT_HISTORY = 1
+    """聊天记录采样"""
+    STATISTICS = 2
+    """统计、聊天记录等可推迟的批量写入"""
+    SCHEDULER = 3
+    """定时任务与后台任务"""
+    BROADCAST = 4
+    """广播发送"""
+    INTERACTIVE = 5
+    """交互命令"""
+
+
+SHED_POLICY: dict[Subsystem, LoadLevel] = {
+    Subsystem.LOGGING: LoadLevel.ELEVATED,
+    Subsystem.CHAT_HISTORY: LoadLevel.ELEVATED,
+    Subsystem.STATISTICS: LoadLevel.HIGH,
+    Subsystem.SCHEDULER: LoadLevel.HIGH,
+    Subsystem.BROADCAST: LoadLevel.HIGH,
+    Subsystem.INTERACTIVE: LoadLevel.CRITICAL,
+}
+"""子系统 -> 开始降级的负载等级"""
+
+
+class _Gauge:
+    __slots__ = ("getter", "thresholds", "value")
+
+    def __init__(
+        self, getter: Callable[[], float], thresholds: tuple[float, float, float]
+    ):
+        self.getter = getter
+        self.thresholds = thresholds
+        self.value = 0.0
+
+    def level(self, ratio: float = 1.0) -> LoadLevel:
+        level = LoadLevel.NORMAL
+        for idx, threshold in enumerate(self.thresholds, 1):
+            if self.value >= threshold * ratio:
+                level = LoadLevel(idx)
+        return level
+
+
+class LoadGovernor:
+    """负载调控器
+
+    使用示例:
+    ```python
+    if LoadGovernor.should_shed(Subsystem.STATISTICS):
         return
-    now = time.monotonic()
-    until = now + duration
-    if until > _OVERLOAD_UNTIL:
-        _OVERLOAD_UNTIL = until
+    with LoadGovernor.inflight("auth"):
+        await auth(...)
+    ```
+    """
+
+    EXIT_RATIO: ClassVar[float] = 0.7
+    """降级阈值相对进入阈值的比例"""
+    EWMA_ALPHA: ClassVar[float] = 0.3
+    """事件循环延迟与数据库延迟的平滑系数"""
+
+    _gauges: ClassVar[dict[str, _Gauge]] = {}
+    _inflight: ClassVar[dict[str, int]] = {}
+    _loop_lag: ClassVar[float] = 0.0
+    _db_latency: ClassVar[float] = 0.0
+    _level: ClassVar[LoadLevel] = LoadLevel.NORMAL
+    _calm_since: ClassVar[float] = 0.0
+    _forced_until: ClassVar[float] = 0.0
+    _transitions: ClassVar[int] = 0
+    _shed_count: ClassVar[dict[Subsystem, int]] = dict.fromkeys(Subsystem, 0)
+    _task: ClassVar[asyncio.Task | None] = None
+
+    @classmethod
+    def register_gauge(
+        cls,
+        name: str,
+        getter: Callable[[], float],
+        thresholds: tuple[float, float, float],
+    ):
+        """注册负载指标
+
+        参数:
+            name: 指标名称
+            getter: 读取指标当前值的函数
+            thresholds: 进入 ELEVATED / HIGH / CRITICAL 的阈值
+        """
+        cls._gauges[name] = _Gauge(getter, thresholds)
+
+    @classmethod
+    @contextmanager
+    def inflight(cls, name: str) -> Iterator[None]:
+        """统计上下文中进行中的任务数量
+
+        参数:
+            name: 任务名称
+        """
+        cls._inflight[name] = cls._inflight.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            cls._inflight[name] -= 1
+
+    @classmethod
+    def report_db_latency(cls, elapsed: float):
+        """记录一次数据库操作耗时
+
+        参数:
+            elapsed: 耗时（秒）
+        """
+        cls._db_latency += cls.EWMA_ALPHA * (elapsed - cls._db_latency)
+
+    @classmethod
+    def force(cls, level: LoadLevel, duration: float):
+        """在一段时间内将负载等级至少保持为 level
+
+        参数:
+            level: 负载等级
+            duration: 持续秒数
+        """
+        if duration <= 0:
+            return
+        cls._forced_until = max(cls._forced_until, time.monotonic() + duration)
+        cls._set_level(max(cls._level, level), time.monotonic())
+
+    @classmethod
+    def level(cls) -> LoadLevel:
+        """当前负载等级"""
+        return cls._level
+
+    @classmethod
+    def should_shed(cls, subsystem: Subsystem) -> bool:
+        """子系统在当前负载下是否应当降级
+
+        参数:
+            subsystem: 子系统
+
+        返回:
+            bool: 是否应跳过或推迟该子系统的工作
+        """
+        if cls._level < SHED_POLICY[subsystem]:
+            return False
+        cls._shed_count[subsystem] += 1
+        return True
+
+    @classmethod
+    def _set_level(cls, level: LoadLevel, now: float):
+        if level == cls._level:
+            return
+        logger.info(
+            f"负载等级 {cls._level.name} -> {level.name} ({cls._format_values()})",
+            LOG_COMMAND,
+        )
+        cls._level = level
+        cls._calm_since = now
+        cls._transitions += 1
+
+    @classmethod
+    def _format_values(cls) -> str:
+        return ", ".join(f"{k}={g.value:.3g}" for k, g in cls._gauges.items())
+
+    @classmethod
+    def evaluate(cls, now: float | None = None) -> LoadLevel:
+        """读取所有指标并更新负载等级
+
+        参数:
+            now: 当前时间，默认为 time.monotonic()
+
+        返回:
+            LoadLevel: 更新后的负载等级
+        """
+        now = time.monotonic() if now is None else now
+        for name, gauge in cls._gauges.items():
+            try:
+                gauge.value = float(gauge.getter())
+            except Exception as e:
+                logger.debug(f"读取负载指标 {name} 失败", LOG_COMMAND, e=e)
+        enter = max((g.level() for g in cls._gauges.values()), default=LoadLevel.NORMAL)
+        if now < cls._forced_until:
+            enter = max(enter, cls._level)
+        if enter > cls._level:
+            cls._set_level(enter, now)
+            return cls._level
+        stay = max(
+            (g.level(cls.EXIT_RATIO) for g in cls._gauges.values()),
+            default=LoadLevel.NORMAL,
+        )
+        if stay >= cls._level or now < cls._forced_until:
+            cls._calm_since = now
+        elif now - cls._calm_since >= cls._hold_seconds():
+            cls._set_level(LoadLevel(cls._level - 1), now)
+        return cls._level
+
+    @staticmethod
+    def _hold_seconds() -> float:
+        return float(Config.get_config("hook", "LOAD_HOLD_SECONDS", 10.0) or 0)
+
+    @classmethod
+    async def _sample_loop(cls):
+        while True:
+            interval = max(
+                float(Config.get_config("hook", "LOAD_SAMPLE_INTERVAL", 0.5) or 0.5),
+                0.05,
+            )
+            start = time.monotonic()
+            await asyncio.sleep(interval)
+            lag = max(time.monotonic() - start - interval, 0.0)
+            cls._loop_lag += cls.EWMA_ALPHA * (lag - cls._loop_lag)
+            cls.evaluate()
+
+    @classmethod
+    def start(cls):
+        """启动事件循环延迟采样"""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._sample_loop())
+
+    @classmethod
+    async def stop(cls):
+        """停止采样"""
+        if cls._task:
+            cls._task.cancel()
+            cls._task = None
+
+    @classmethod
+    def metrics(cls) -> dict[str, Any]:
+        """负载指标与各子系统降级状态"""
+        return {
+            "level": cls._level.name,
+            "transitions": cls._transitions,
+            "gauges": {
+                name: {
+                    "value": gauge.value,
+                    "level": gauge.level().name,
+                    "thresholds": list(gauge.thresholds),
+                }
+                for name, gauge in cls._gauges.items()
+            },
+            "subsystems": {
+                subsystem.name.lower(): {
+                    "shed": cls._level >= SHED_POLICY[subsystem],
+                    "shed_count": cls._shed_count[subsystem],
+                }
+                for subsystem in Subsystem
+            },
+        }
+
+    @classmethod
+    def prometheus(cls) -> str:
+        """Prometheus 文本格式的负载指标"""
+        lines = [
+            "# TYPE zhenxun_load_level gauge",
+            f"zhenxun_load_level {int(cls._level)}",
+            "# TYPE zhenxun_load_transitions_total counter",
+            f"zhenxun_load_transitions_total {cls._transitions}",
+            "# TYPE zhenxun_load_gauge gauge",
+        ]
+        lines.extend(
+            f'zhenxun_load_gauge{{name="{name}"}} {gauge.value}'
+            for name, gauge in cls._gauges.items()
+        )
+        lines.append("# TYPE zhenxun_load_shed_total counter")
+        lines.extend(
+            f'zhenxun_load_shed_total{{subsystem="{s.name.lower()}"}} {count}'
+            for s, count in cls._shed_count.items()
+        )
+        return "\n".join(lines) + "\n"
+
+
+LoadGovernor.register_gauge("loop_lag", lambda: LoadGovernor._loop_lag, (0.1, 0.5, 2.0))
+LoadGovernor.register_gauge(
+    "auth_inflight", lambda: LoadGovernor._inflight.get("auth", 0), (50, 200, 500)
+)
+LoadGovernor.register_gauge(
+    "db_latency", lambda: LoadGovernor._db_latency, (0.5, 2.0, 5.0)
+)
+
+
+def signal_overload(duration: float = 5.0) -> None:
+    """在一段时间内将负载等级至少保持为 HIGH"""
+    LoadGovernor.force(LoadLevel.HIGH, duration)
 
 
 def is_overloaded() -> bool:
-    return time.monotonic() < _OVERLOAD_UNTIL
+    return LoadGovernor.level() >= LoadLevel.HIGH
 
 
 def should_pause_tasks() -> bool:
-    return is_overloaded()
+    return LoadGovernor.should_shed(Subsystem.SCHEDULER)
+
+
+driver = nonebot.get_driver()
+
+
+@driver.on_startup
+async def _start_load_governor():
+    LoadGovernor.start()
+
+
+@driver.on_shutdown
+async def _stop_load_governor():
+    await LoadGovernor.stop()
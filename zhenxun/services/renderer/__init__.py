@@ -11,4 +11,10 @@ async def _init_renderer_service():
     await renderer_service.initialize()
 
 
+@PriorityLifecycle.on_shutdown(priority=10)
+async def _shutdown_renderer_service():
+    """在Bot关闭时释放截图引擎的浏览器页面。"""
+    await renderer_service.shutdown()
+
+
 __all__ = ["renderer_service"]
@@ -0,0 +1,231 @@
+"""
+渲染结果缓存
+
+两级缓存：内存中保存最近使用的图片字节，磁盘上保存 png 文件，两级均按字节预算
+做 LRU 淘汰。缓存键为渲染内容的哈希，相同的渲染请求在进行中时只会执行一次，
+其余请求等待同一结果。
+"""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+import hashlib
+import os
+from pathlib import Path
+import secrets
+from typing import Any
+
+import aiofiles
+
+from zhenxun.services.log import logger
+
+from .protocols import RenderResult
+
+LOG_COMMAND = "RenderCache"
+
+
+@dataclass
+class RenderCacheStats:
+    memory_hits: int = 0
+    """内存命中次数"""
+    disk_hits: int = 0
+    """磁盘命中次数"""
+    misses: int = 0
+    """未命中次数"""
+    coalesced: int = 0
+    """等待进行中的相同渲染的次数"""
+    evicted: int = 0
+    """淘汰的磁盘文件数量"""
+
+
+def cache_key(*parts: str) -> str:
+    """由渲染内容生成缓存键
+
+    参数:
+        parts: 主题名称、主题版本、模板名称、渲染数据等
+
+    返回:
+        str: sha256 十六进制字符串
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    渲染结果两级缓存
+
+    参数:
+        path: 磁盘缓存目录
+        memory_bytes: 内存缓存字节预算，0为不使用内存缓存
+        disk_bytes: 磁盘缓存字节预算，0为不限制
+    """
+
+    def __init__(self, path: Path, *, memory_bytes: int = 0, disk_bytes: int = 0):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.stats = RenderCacheStats()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._disk: OrderedDict[str, int] | None = None
+        self._disk_size = 0
+        self._disk_lock = asyncio.Lock()
+        self._inflight: dict[str, asyncio.Future[RenderResult]] = {}
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.png"
+
+    def _scan_disk(self) -> OrderedDict[str, int]:
+        """按修改时间从旧到新读取磁盘上已有的缓存文件"""
+        entries = []
+        for file in self.path.glob("*.png"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, file.stem, stat.st_size))
+        entries.sort()
+        return OrderedDict((key, size) for _, key, size in entries)
+
+    async def _disk_index(self) -> OrderedDict[str, int]:
+        if self._disk is None:
+            async with self._disk_lock:
+                if self._disk is None:
+                    index = await asyncio.to_thread(self._scan_disk)
+                    self._disk_size = sum(index.values())
+                    self._disk = index
+        return self._disk
+
+    def _remember(self, key: str, data: bytes):
+        if not self.memory_bytes or len(data) > self.memory_bytes:
+            return
+        if (old := self._memory.pop(key, None)) is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    async def get(self, key: str) -> bytes | None:
+        """读取缓存
+
+        参数:
+            key: 缓存键
+
+        返回:
+            bytes | None: 图片字节，未命中时为None
+        """
+        if (data := self._memory.get(key)) is not None:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return data
+        index = await self._disk_index()
+        if key not in index:
+            return None
+        file = self._file(key)
+        try:
+            async with aiofiles.open(file, "rb") as f:
+                data = await f.read()
+            # 更新修改时间，重启后重建的索引仍能反映最近使用顺序
+            os.utime(file)
+        except OSError:
+            self._forget_disk(key)
+            return None
+        index.move_to_end(key)
+        self.stats.disk_hits += 1
+        self._remember(key, data)
+        return data
+
+    def _forget_disk(self, key: str):
+        if self._disk is not None and (size := self._disk.pop(key, None)) is not None:
+            self._disk_size -= size
+
+    async def set(self, key: str, data: bytes):
+        """写入缓存
+
+        参数:
+            key: 缓存键
+            data: 图片字节
+        """
+        self._remember(key, data)
+        index = await self._disk_index()
+        file = self._file(key)
+        # 同一键可能被并发写入，各自使用独立的临时文件
+        tmp = file.with_suffix(f".{secrets.token_hex(4)}.tmp")
+        try:
+            async with aiofiles.open(tmp, "wb") as f:
+                await f.write(data)
+            os.replace(tmp, file)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            logger.warning(f"UI缓存写入失败: {file}", LOG_COMMAND, e=e)
+            return
+        self._forget_disk(key)
+        index[key] = len(data)
+        self._disk_size += len(data)
+        while self.disk_bytes and self._disk_size > self.disk_bytes and len(index) > 1:
+            old_key, size = index.popitem(last=False)
+            self._disk_size -= size
+            self.stats.evicted += 1
+            self._file(old_key).unlink(missing_ok=True)
+
+    async def get_or_render(
+        self, key: str, render: Callable[[], Awaitable[RenderResult]]
+    ) -> RenderResult:
+        """读取缓存，未命中时渲染并写入，相同键的并发请求只渲染一次
+
+        参数:
+            key: 缓存键
+            render: 渲染函数
+
+        返回:
+            RenderResult: 渲染结果
+        """
+        if task := self._inflight.get(key):
+            self.stats.coalesced += 1
+        else:
+            # 渲染在独立任务中执行，任一请求被取消都不会影响其他等待者
+            task = asyncio.ensure_future(self._load_or_render(key, render))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_flight(key, done))
+        return await asyncio.shield(task)
+
+    async def _load_or_render(
+        self, key: str, render: Callable[[], Awaitable[RenderResult]]
+    ) -> RenderResult:
+        if (data := await self.get(key)) is not None:
+            return RenderResult(image_bytes=data, html_content="<!-- from cache -->")
+        self.stats.misses += 1
+        result = await render()
+        if result.image_bytes:
+            await self.set(key, result.image_bytes)
+        return result
+
+    def _finish_flight(self, key: str, task: asyncio.Future[RenderResult]):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 没有等待者时避免 "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def clear_memory(self):
+        """清空内存缓存"""
+        self._memory.clear()
+        self._memory_size = 0
+
+    def metrics(self) -> dict[str, Any]:
+        """缓存统计"""
+        return {
+            **asdict(self.stats),
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk or ()),
+            "disk_bytes": self._disk_size,
+            "inflight": len(self._inflight),
+        }
@@ -1,20 +1,41 @@
+import asyncio
 from pathlib import Path
+import time
 
 from nonebot_plugin_htmlrender import html_to_pic
+from nonebot_plugin_htmlrender.browser import get_browser
 
+from zhenxun.configs.config import Config
+from zhenxun.services.log import logger
+
+from .page_pool import PagePool, ScreenshotJob
 from .protocols import ScreenshotEngine
 
+LOG_COMMAND = "RendererService"
+
+_DEFAULT_VIEWPORT = {"width": 800, "height": 10}
+_PAGE_ONLY_OPTIONS = (
+    "wait",
+    "type",
+    "quality",
+    "screenshot_timeout",
+    "full_page",
+)
+
+
+def _base_url(base_url_path: Path) -> str:
+    base_url = base_url_path.absolute().as_uri()
+    return base_url if base_url.endswith("/") else f"{base_url}/"
+
 
 class PlaywrightEngine(ScreenshotEngine):
     """使用 nonebot-plugin-htmlrender 实现的截图引擎。"""
 
     async def render(self, html: str, base_url_path: Path, **render_options) -> bytes:
-        base_url_for_browser = base_url_path.absolute().as_uri()
-        if not base_url_for_browser.endswith("/"):
-            base_url_for_browser += "/"
+        base_url_for_browser = _base_url(base_url_path)
 
         final_render_options = {
-            "viewport": {"width": 800, "height": 10},
+            "viewport": _DEFAULT_VIEWPORT,
             **render_options,
             "base_url": base_url_for_browser,
         }
@@ -26,9 +47,125 @@ class PlaywrightEngine(ScreenshotEngine):
         )
 
 
+class PooledPlaywrightEngine(ScreenshotEngine):
+    """
+    复用预热页面的截图引擎。
+
+    与 PlaywrightEngine 接受相同的渲染参数，但不再为每次截图新建 context 与
+    page，而是从按视口等参数分组的页面池中取出页面替换内容后截图。
+    """
+
+    def __init__(
+        self,
+        *,
+        warm_pages: int = 2,
+        max_pages: int = 8,
+        max_renders: int = 100,
+        queue_timeout: float = 30,
+    ):
+        self.queue_timeout = queue_timeout
+        self._warm_task: asyncio.Task | None = None
+        self.pool = PagePool(
+            get_browser,
+            warm_pages=warm_pages,
+            max_pages=max_pages,
+            max_renders=max_renders,
+            on_console=lambda msg: logger.debug(
+                f"浏览器控制台: {msg.text}", LOG_COMMAND
+            ),
+        )
+
+    async def _warm(self):
+        try:
+            await self.pool.warm(2, {"viewport": _DEFAULT_VIEWPORT})
+        except Exception as e:
+            logger.warning("预热截图页面失败", LOG_COMMAND, e=e)
+
+    def warm(self):
+        """在后台预热默认视口的页面"""
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(self._warm())
+
+    @staticmethod
+    def _job(html: str, base_url_path: Path, render_options: dict) -> ScreenshotJob:
+        page_options = {"viewport": _DEFAULT_VIEWPORT, **render_options}
+        page_options.pop("base_url", None)
+        options = {
+            key: page_options.pop(key)
+            for key in _PAGE_ONLY_OPTIONS
+            if key in page_options
+        }
+        return ScreenshotJob(
+            html=html,
+            base_url=_base_url(base_url_path),
+            device_scale_factor=page_options.pop("device_scale_factor", 2),
+            page_options=page_options,
+            wait=options.get("wait", 0),
+            screenshot_options={
+                "full_page": options.get("full_page", True),
+                "type": options.get("type", "png"),
+                "quality": options.get("quality"),
+                "timeout": options.get("screenshot_timeout", 30_000),
+            },
+        )
+
+    def _deadline(self) -> float | None:
+        if self.queue_timeout > 0:
+            return time.monotonic() + self.queue_timeout
+        return None
+
+    async def render(self, html: str, base_url_path: Path, **render_options) -> bytes:
+        job = self._job(html, base_url_path, render_options)
+        return await self.pool.screenshot(
+            job.html,
+            job.base_url,
+            device_scale_factor=job.device_scale_factor,
+            page_options=job.page_options,
+            wait=job.wait,
+            deadline=self._deadline(),
+            **job.screenshot_options,
+        )
+
+    async def render_many(
+        self, items: list[tuple[str, Path, dict]]
+    ) -> list[bytes | Exception]:
+        """
+        在同一个页面中依次截图多个HTML，只占用一个并发名额。
+
+        参数:
+            items: (html, base_url_path, render_options) 列表
+
+        返回:
+            list[bytes | Exception]: 与 items 顺序一致的图片或异常
+        """
+        jobs = [self._job(html, path, options) for html, path, options in items]
+        return await self.pool.screenshot_many(jobs, deadline=self._deadline())
+
+    async def close(self):
+        if self._warm_task:
+            self._warm_task.cancel()
+        stats = self.pool.stats
+        logger.debug(
+            f"截图页面池关闭: 截图 {stats.renders} 次, 创建页面 {stats.created} 个,"
+            f" 回收 {stats.recycled} 个, 丢弃 {stats.discarded} 个,"
+            f" 排队超时 {stats.timeouts} 次",
+            LOG_COMMAND,
+        )
+        await self.pool.close()
+
+
 def get_screenshot_engine() -> ScreenshotEngine:
     """
     截图引擎工厂函数。
-    目前只返回 PlaywrightEngine, 未来可以根据配置返回不同的引擎。
+    根据配置 UI.SCREENSHOT_ENGINE 返回页面池引擎(pool)或每次新建页面的引擎(playwright)。
     """
-    return PlaywrightEngine()
+    if Config.get_config("UI", "SCREENSHOT_ENGINE", "pool") != "pool":
+        return PlaywrightEngine()
+    engine = PooledPlaywrightEngine(
+        warm_pages=int(Config.get_config("UI", "PAGE_POOL_SIZE", 2) or 0),
+        max_pages=int(Config.get_config("UI", "PAGE_POOL_MAX_PAGES", 8) or 8),
+        max_renders=int(Config.get_config("UI", "PAGE_MAX_RENDERS", 100) or 100),
+        queue_timeout=float(Config.get_config("UI", "RENDER_QUEUE_TIMEOUT", 30) or 0),
+    )
+    engine.warm()
+    return engine
@@ -0,0 +1,352 @@
+"""
+Playwright 页面池
+
+按 (缩放比例, 页面参数) 分组保存预热好的页面，截图时复用已有页面而不是每次
+新建 context 与 page。所有分组共享同一个并发上限，等待超过截止时间的请求直接失败；
+页面渲染达到次数上限、出错或浏览器断开后会被关闭并重新创建。
+
+本模块不依赖 nonebot，浏览器通过 browser_getter 获取。
+"""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import json
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page
+
+PoolKey = tuple[float, str]
+
+
+@dataclass
+class PagePoolStats:
+    renders: int = 0
+    """截图次数"""
+    created: int = 0
+    """创建的页面数量"""
+    recycled: int = 0
+    """因达到渲染次数上限关闭的页面数量"""
+    discarded: int = 0
+    """因出错或不健康关闭的页面数量"""
+    timeouts: int = 0
+    """排队超时的请求数量"""
+    wait_time: float = 0.0
+    """累计排队耗时（秒）"""
+    render_time: float = 0.0
+    """累计渲染耗时（秒）"""
+
+
+@dataclass
+class ScreenshotJob:
+    html: str
+    """html文本"""
+    base_url: str
+    """解析相对路径的基础地址"""
+    device_scale_factor: float = 2
+    """缩放比例"""
+    page_options: dict[str, Any] = field(default_factory=dict)
+    """创建页面时的参数，如 viewport"""
+    wait: int = 0
+    """页面加载完成后额外等待的毫秒数"""
+    screenshot_options: dict[str, Any] = field(default_factory=dict)
+    """传递给 page.screenshot 的参数"""
+
+
+class _PooledPage:
+    __slots__ = ("page", "renders")
+
+    def __init__(self, page: "Page"):
+        self.page = page
+        self.renders = 0
+
+    def healthy(self) -> bool:
+        if self.page.is_closed():
+            return False
+        browser = self.page.context.browser
+        return browser is None or browser.is_connected()
+
+
+def pool_key(device_scale_factor: float, page_options: dict[str, Any]) -> PoolKey:
+    """页面分组键，页面参数相同的截图请求共享同一组页面
+
+    参数:
+        device_scale_factor: 缩放比例
+        page_options: 创建页面时的参数，如 viewport
+
+    返回:
+        PoolKey: 分组键
+    """
+    return device_scale_factor, json.dumps(page_options, sort_keys=True, default=str)
+
+
+class PagePool:
+    """
+    Playwright 页面池
+
+    参数:
+        browser_getter: 获取浏览器实例的协程函数
+        warm_pages: 每个分组预热的空闲页面数量
+            所有分组的空闲页面合计不超过 max_pages
+        max_pages: 同时进行的截图数量上限
+        max_renders: 单个页面最多渲染的次数，超出后关闭重建
+        max_groups: 最多保留的分组数量，超出后关闭最久未使用分组的页面
+        on_console: 浏览器控制台消息回调
+    """
+
+    def __init__(
+        self,
+        browser_getter: Callable[[], Awaitable["Browser"]],
+        *,
+        warm_pages: int = 2,
+        max_pages: int = 8,
+        max_renders: int = 100,
+        max_groups: int = 8,
+        on_console: Callable[[Any], None] | None = None,
+    ):
+        self.browser_getter = browser_getter
+        self.warm_pages = max(warm_pages, 0)
+        self.max_pages = max(max_pages, 1)
+        self.max_renders = max(max_renders, 1)
+        self.max_groups = max(max_groups, 1)
+        self.on_console = on_console
+        self.stats = PagePoolStats()
+        self._slots = asyncio.Semaphore(self.max_pages)
+        self._idle: OrderedDict[PoolKey, list[_PooledPage]] = OrderedDict()
+        self._options: dict[PoolKey, dict[str, Any]] = {}
+        self._warm_tasks: set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def idle_pages(self) -> int:
+        return sum(len(pages) for pages in self._idle.values())
+
+    async def _new_page(self, key: PoolKey) -> _PooledPage:
+        browser = await self.browser_getter()
+        page = await browser.new_page(device_scale_factor=key[0], **self._options[key])
+        if self.on_console:
+            page.on("console", self.on_console)
+        self.stats.created += 1
+        return _PooledPage(page)
+
+    @staticmethod
+    async def _close(item: _PooledPage):
+        try:
+            await item.page.close()
+        except Exception:
+            pass
+
+    def _group(self, key: PoolKey, options: dict[str, Any]) -> list[_PooledPage]:
+        if (pages := self._idle.get(key)) is not None:
+            self._idle.move_to_end(key)
+            return pages
+        pages = self._idle[key] = []
+        self._options[key] = options
+        while len(self._idle) > self.max_groups:
+            old_key, old_pages = self._idle.popitem(last=False)
+            self._options.pop(old_key, None)
+            for item in old_pages:
+                self._spawn(self._close(item))
+        if self.warm_pages:
+            self._spawn(self._warm(key))
+        return pages
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.ensure_future(coro)
+        self._warm_tasks.add(task)
+        task.add_done_callback(self._warm_tasks.discard)
+
+    async def _warm(self, key: PoolKey):
+        while (pages := self._idle.get(key)) is not None and len(
+            pages
+        ) < self.warm_pages:
+            try:
+                item = await self._new_page(key)
+            except Exception:
+                return
+            if self._closed or (pages := self._idle.get(key)) is None:
+                await self._close(item)
+                return
+            pages.append(item)
+
+    async def warm(self, device_scale_factor: float, page_options: dict[str, Any]):
+        """预热一组页面
+
+        参数:
+            device_scale_factor: 缩放比例
+            page_options: 创建页面时的参数
+        """
+        key = pool_key(device_scale_factor, page_options)
+        self._group(key, page_options)
+        await self._warm(key)
+
+    async def _checkout(self, key: PoolKey, options: dict[str, Any]) -> _PooledPage:
+        pages = self._group(key, options)
+        while pages:
+            item = pages.pop()
+            if item.healthy():
+                return item
+            self.stats.discarded += 1
+            await self._close(item)
+        return await self._new_page(key)
+
+    async def _checkin(self, key: PoolKey, item: _PooledPage, ok: bool):
+        pages = self._idle.get(key)
+        if not ok or not item.healthy():
+            self.stats.discarded += 1
+        elif item.renders >= self.max_renders:
+            self.stats.recycled += 1
+        elif pages is not None and self.idle_pages < self.max_pages:
+            pages.append(item)
+            return
+        await self._close(item)
+        if pages is not None and not self._closed:
+            self._spawn(self._warm(key))
+
+    async def _acquire_slot(self, deadline: float | None):
+        start = time.monotonic()
+        timeout = None if deadline is None else max(deadline - start, 0)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise asyncio.TimeoutError(
+                f"截图排队超过 {timeout:.1f}s，当前并发上限 {self.max_pages}"
+            ) from None
+        self.stats.wait_time += time.monotonic() - start
+
+    @staticmethod
+    async def _shoot(item: _PooledPage, job: ScreenshotJob) -> bytes:
+        item.renders += 1
+        # 每次重新导航以重置上一次渲染遗留的脚本状态
+        await item.page.goto(job.base_url)
+        await item.page.set_content(job.html, wait_until="networkidle")
+        if job.wait:
+            await item.page.wait_for_timeout(job.wait)
+        return await item.page.screenshot(**job.screenshot_options)
+
+    async def screenshot(
+        self,
+        html: str,
+        base_url: str,
+        *,
+        device_scale_factor: float = 2,
+        page_options: dict[str, Any] | None = None,
+        wait: int = 0,
+        deadline: float | None = None,
+        **screenshot_options,
+    ) -> bytes:
+        """使用池中的页面截图
+
+        参数:
+            html: html文本
+            base_url: 解析相对路径的基础地址，如 file:///path/to/template/
+            device_scale_factor: 缩放比例
+            page_options: 创建页面时的参数，如 viewport
+            wait: 页面加载完成后额外等待的毫秒数
+            deadline: 排队截止时间（time.monotonic），为None时不限制
+            screenshot_options: 传递给 page.screenshot 的参数
+
+        返回:
+            bytes: 图片
+
+        异常:
+            asyncio.TimeoutError: 排队超过截止时间
+        """
+        job = ScreenshotJob(
+            html,
+            base_url,
+            device_scale_factor,
+            page_options or {},
+            wait,
+            screenshot_options,
+        )
+        key = pool_key(job.device_scale_factor, job.page_options)
+        await self._acquire_slot(deadline)
+        start = time.monotonic()
+        try:
+            item = await self._checkout(key, job.page_options)
+            ok = False
+            try:
+                image = await self._shoot(item, job)
+                ok = True
+            finally:
+                await self._checkin(key, item, ok)
+        finally:
+            self._slots.release()
+            self.stats.renders += 1
+            self.stats.render_time += time.monotonic() - start
+        return image
+
+    async def screenshot_many(
+        self, jobs: list[ScreenshotJob], *, deadline: float | None = None
+    ) -> list[bytes | Exception]:
+        """在一个并发名额内依次截图多个页面
+
+        参数相同的任务复用同一个页面，只替换内容；单个任务失败时换用新页面
+        继续处理剩余任务，不影响其他任务的结果。
+
+        参数:
+            jobs: 截图任务
+            deadline: 排队截止时间（time.monotonic），为None时不限制
+
+        返回:
+            list[bytes | Exception]: 与 jobs 顺序一致的图片或异常
+
+        异常:
+            asyncio.TimeoutError: 排队超过截止时间
+        """
+        groups: dict[PoolKey, list[int]] = {}
+        for index, job in enumerate(jobs):
+            key = pool_key(job.device_scale_factor, job.page_options)
+            groups.setdefault(key, []).append(index)
+        results: list[bytes | Exception] = [b""] * len(jobs)
+        if not jobs:
+            return results
+        await self._acquire_slot(deadline)
+        try:
+            for key, indexes in groups.items():
+                options = jobs[indexes[0]].page_options
+                item: _PooledPage | None = None
+                for index in indexes:
+                    start = time.monotonic()
+                    try:
+                        if item is None:
+                            item = await self._checkout(key, options)
+                        results[index] = await self._shoot(item, jobs[index])
+                    except Exception as e:
+                        results[index] = e
+                        if item is not None:
+                            await self._checkin(key, item, False)
+                            item = None
+                    except BaseException:
+                        if item is not None:
+                            await self._checkin(key, item, False)
+                        raise
+                    else:
+                        if item.renders >= self.max_renders:
+                            await self._checkin(key, item, True)
+                            item = None
+                    finally:
+                        self.stats.renders += 1
+                        self.stats.render_time += time.monotonic() - start
+                if item is not None:
+                    await self._checkin(key, item, True)
+        finally:
+            self._slots.release()
+        return results
+
+    async def close(self):
+        """关闭所有空闲页面"""
+        self._closed = True
+        for task in list(self._warm_tasks):
+            task.cancel()
+        groups = list(self._idle.values())
+        self._idle.clear()
+        self._options.clear()
+        for pages in groups:
+            for item in pages:
+                await self._close(item)
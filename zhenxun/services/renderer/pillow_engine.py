@@ -0,0 +1,466 @@
+"""
+Pillow 表格渲染
+
+排行榜等由 TableBuilder 构建的简单表格只包含文字、头像与徽章，
+直接用 Pillow 在工作线程中绘制，不经过 HTML 与浏览器。
+字体与解码缩放后的图片均会缓存，整张图片在一次线程调用中完成绘制。
+
+只处理默认主题下未自定义样式的 TableData，且单元格均为文字、本地图片或徽章，
+其余组件仍走 HTML 渲染。
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+import threading
+from typing import Any
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from PIL import Image, ImageDraw
+from PIL.Image import Resampling
+from PIL.ImageFont import FreeTypeFont
+
+from zhenxun.ui.models.core.table import (
+    ImageCell,
+    StatusBadgeCell,
+    TableData,
+    TextCell,
+)
+from zhenxun.utils._build_image import BuildImage
+
+FONT = "HYWenHei-85W.ttf"
+
+PAGE_PADDING = 20
+CARD_PADDING = 20
+CARD_RADIUS = 12
+TITLE_SIZE = 24
+TIP_SIZE = 14
+CELL_SIZE = 15
+CELL_PADDING_X = 12
+CELL_PADDING_Y = 10
+LINE_HEIGHT = 1.4
+MIN_TEXT_COLUMN = 60
+
+PAGE_COLOR = "#f5f6f8"
+CARD_COLOR = "#ffffff"
+TITLE_COLOR = "#303133"
+TIP_COLOR = "#909399"
+HEADER_BG = "#f2f3f5"
+HEADER_COLOR = "#606266"
+TEXT_COLOR = "#303133"
+DIVIDER_COLOR = "#ebeef5"
+STRIPE_COLOR = "#fafafa"
+BADGE_COLORS = {
+    "ok": "#67C23A",
+    "error": "#F56C6C",
+    "warning": "#E6A23C",
+    "info": "#909399",
+}
+
+_IMAGE_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=32)
+def _font(size: int) -> FreeTypeFont:
+    return BuildImage.load_font(FONT, size)
+
+
+def _local_path(src: str) -> Path | None:
+    parsed = urlparse(src)
+    if parsed.scheme != "file":
+        return None
+    return Path(url2pathname(parsed.path))
+
+
+@dataclass
+class _Cell:
+    kind: str
+    text: str = ""
+    color: str = TEXT_COLOR
+    bold: bool = False
+    image: Path | None = None
+    width: int = 0
+    height: int = 0
+    circle: bool = False
+
+
+class PillowEngine:
+    """
+    使用 Pillow 直接绘制表格组件的渲染引擎。
+
+    与 ScreenshotEngine 接收 HTML 不同，本引擎直接接收组件数据模型，
+    由 RendererService 在生成 HTML 之前判断是否可以使用。
+    """
+
+    def __init__(self):
+        self._images: OrderedDict[tuple, Image.Image] = OrderedDict()
+        self._images_lock = threading.Lock()
+
+    def supports(self, component: Any) -> bool:
+        """组件是否可以由 Pillow 绘制
+
+        参数:
+            component: 组件
+
+        返回:
+            bool: 是否支持
+        """
+        if type(component) is not TableData:
+            return False
+        if (
+            component.variant
+            or component.style_name
+            or component.inline_style
+            or component.component_css
+            or component.extra_classes
+        ):
+            return False
+        for row in component.rows:
+            for cell in row:
+                if isinstance(cell, ImageCell):
+                    if cell.src and _local_path(cell.src) is None:
+                        return False
+                elif not isinstance(
+                    cell, TextCell | StatusBadgeCell | str | int | float | None
+                ):
+                    return False
+        return True
+
+    async def render_component(self, component: TableData, **render_options) -> bytes:
+        """绘制表格
+
+        参数:
+            component: 表格数据
+            render_options: 渲染参数，支持 viewport、device_scale_factor、type、quality
+
+        返回:
+            bytes: 图片
+        """
+        return await asyncio.to_thread(self._draw, component, render_options)
+
+    def _load_image(self, cell: _Cell, scale: float) -> Image.Image | None:
+        """读取并缩放图片，按 (路径, 修改时间, 尺寸, 形状) 缓存解码结果"""
+        if not cell.image:
+            return None
+        try:
+            mtime = cell.image.stat().st_mtime_ns
+        except OSError:
+            return None
+        size = (round(cell.width * scale), round(cell.height * scale))
+        key = (cell.image, mtime, size, cell.circle)
+        with self._images_lock:
+            if (image := self._images.get(key)) is not None:
+                self._images.move_to_end(key)
+                return image
+        try:
+            with Image.open(cell.image) as raw:
+                image = raw.convert("RGBA").resize(size, Resampling.LANCZOS)
+        except Exception:
+            return None
+        if cell.circle:
+            # 放大绘制遮罩再缩小，获得抗锯齿的圆形边缘
+            mask = Image.new("L", (size[0] * 4, size[1] * 4), 0)
+            ImageDraw.Draw(mask).ellipse((0, 0, *mask.size), fill=255)
+            mask = mask.resize(size, Resampling.LANCZOS)
+            alpha = image.getchannel("A")
+            image.putalpha(Image.composite(alpha, mask, mask))
+        with self._images_lock:
+            self._images[key] = image
+            while len(self._images) > _IMAGE_CACHE_SIZE:
+                self._images.popitem(last=False)
+        return image
+
+    @staticmethod
+    def _to_cell(cell: Any) -> _Cell:
+        if isinstance(cell, TextCell):
+            return _Cell("text", cell.content, cell.color or TEXT_COLOR, bold=cell.bold)
+        if isinstance(cell, ImageCell):
+            return _Cell(
+                "image",
+                image=_local_path(cell.src) if cell.src else None,
+                width=cell.width,
+                height=cell.height,
+                circle=cell.shape == "circle",
+            )
+        if isinstance(cell, StatusBadgeCell):
+            return _Cell("badge", cell.text, BADGE_COLORS[cell.status_type])
+        return _Cell("text", "" if cell is None else str(cell))
+
+    @staticmethod
+    def _wrap(text: str, font: FreeTypeFont, width: float) -> list[str]:
+        lines = []
+        for paragraph in text.split("\n"):
+            line = ""
+            for char in paragraph:
+                if line and font.getlength(line + char) > width:
+                    lines.append(line)
+                    line = char
+                else:
+                    line += char
+            lines.append(line)
+        return lines
+
+    @staticmethod
+    def _fixed_width(value: str | int | None) -> int | None:
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str) and value.endswith("px"):
+            try:
+                return int(float(value[:-2]))
+            except ValueError:
+                return None
+        return None
+
+    def _column_widths(
+        self,
+        headers: list[str],
+        rows: list[list[_Cell]],
+        fixed: list[str | int] | None,
+        font: FreeTypeFont,
+        badge_font: FreeTypeFont,
+        available: float,
+    ) -> list[float]:
+        columns = max([len(headers), *(len(row) for row in rows)], default=0)
+        natural = [0.0] * columns
+        flexible = [False] * columns
+        for index, header in enumerate(headers):
+            natural[index] = font.getlength(header)
+        for row in rows:
+            for index, cell in enumerate(row):
+                if cell.kind == "image":
+                    width = cell.width
+                elif cell.kind == "badge":
+                    width = badge_font.getlength(cell.text) + 16
+                else:
+                    width = max(
+                        (font.getlength(line) for line in cell.text.split("\n")),
+                        default=0,
+                    )
+                    flexible[index] = flexible[index] or bool(cell.text)
+                natural[index] = max(natural[index], width)
+        widths = [w + CELL_PADDING_X * 2 for w in natural]
+        for index, value in enumerate(fixed or []):
+            if index < columns and (px := self._fixed_width(value)) is not None:
+                widths[index] = px
+                flexible[index] = False
+        total = sum(widths)
+        flex_total = sum(w for w, f in zip(widths, flexible) if f)
+        if total < available:
+            # 与 HTML 表格一致，剩余宽度按内容宽度比例分配
+            grow = [w if f else 0 for w, f in zip(widths, flexible)]
+            if not any(grow):
+                grow = widths
+            extra = available - total
+            widths = [w + extra * g / sum(grow) for w, g in zip(widths, grow)]
+        elif total > available and flex_total:
+            # 超出可用宽度时按比例压缩文字列，文字换行
+            budget = max(available - (total - flex_total), 0)
+            widths = [
+                max(w * budget / flex_total, MIN_TEXT_COLUMN) if f else w
+                for w, f in zip(widths, flexible)
+            ]
+        return widths
+
+    def _draw(self, component: TableData, options: dict[str, Any]) -> bytes:
+        scale = float(options.get("device_scale_factor", 2))
+        viewport = options.get("viewport") or {}
+        page_width = int(viewport.get("width", 800))
+
+        def px(value: float) -> int:
+            return round(value * scale)
+
+        title_font = _font(px(TITLE_SIZE))
+        tip_font = _font(px(TIP_SIZE))
+        cell_font = _font(px(CELL_SIZE))
+        badge_font = _font(px(CELL_SIZE - 2))
+
+        rows = [[self._to_cell(cell) for cell in row] for row in component.rows]
+        table_width = page_width - PAGE_PADDING * 2 - CARD_PADDING * 2
+        widths = self._column_widths(
+            component.headers,
+            rows,
+            component.column_widths,
+            _font(CELL_SIZE),
+            _font(CELL_SIZE - 2),
+            table_width,
+        )
+        alignments = component.column_alignments or []
+        table_width = max(table_width, sum(widths))
+        card_width = table_width + CARD_PADDING * 2
+        line_height = CELL_SIZE * LINE_HEIGHT
+
+        def wrap(text: str, index: int) -> list[str]:
+            return self._wrap(text, cell_font, px(widths[index] - CELL_PADDING_X * 2))
+
+        header_lines = [wrap(h, i) for i, h in enumerate(component.headers)]
+        header_height = (
+            max((len(lines) for lines in header_lines), default=0) * line_height
+            + CELL_PADDING_Y * 2
+            if component.headers
+            else 0
+        )
+        row_lines: list[list[list[str]]] = []
+        row_heights: list[float] = []
+        for row in rows:
+            lines_list = []
+            height = line_height
+            for index, cell in enumerate(row):
+                if cell.kind == "text":
+                    lines = wrap(cell.text, index)
+                    height = max(height, len(lines) * line_height)
+                else:
+                    lines = []
+                    if cell.kind == "image":
+                        height = max(height, cell.height)
+                lines_list.append(lines)
+            row_lines.append(lines_list)
+            row_heights.append(height + CELL_PADDING_Y * 2)
+
+        title_height = TITLE_SIZE * LINE_HEIGHT
+        tip_height = TIP_SIZE * LINE_HEIGHT + 8 if component.tip else 0
+        card_height = (
+            CARD_PADDING * 2
+            + title_height
+            + tip_height
+            + 12
+            + header_height
+            + sum(row_heights)
+        )
+        image = Image.new(
+            "RGB",
+            (px(card_width + PAGE_PADDING * 2), px(card_height + PAGE_PADDING * 2)),
+            PAGE_COLOR,
+        )
+        draw = ImageDraw.Draw(image)
+        draw.rounded_rectangle(
+            (
+                px(PAGE_PADDING),
+                px(PAGE_PADDING),
+                px(PAGE_PADDING + card_width),
+                px(PAGE_PADDING + card_height),
+            ),
+            radius=px(CARD_RADIUS),
+            fill=CARD_COLOR,
+        )
+
+        left = PAGE_PADDING + CARD_PADDING
+        y = PAGE_PADDING + CARD_PADDING
+        draw.text(
+            (px(left), px(y + title_height / 2)),
+            component.title,
+            font=title_font,
+            fill=TITLE_COLOR,
+            anchor="lm",
+        )
+        y += title_height
+        if component.tip:
+            draw.text(
+                (px(left), px(y + 4 + TIP_SIZE * LINE_HEIGHT / 2)),
+                component.tip,
+                font=tip_font,
+                fill=TIP_COLOR,
+                anchor="lm",
+            )
+            y += tip_height
+        y += 12
+
+        def cell_x(index: int, x: float, content_width: float) -> float:
+            align = alignments[index] if index < len(alignments) else "left"
+            if align == "center":
+                return x + (widths[index] - content_width) / 2
+            if align == "right":
+                return x + widths[index] - CELL_PADDING_X - content_width
+            return x + CELL_PADDING_X
+
+        def draw_lines(
+            lines: list[str],
+            index: int,
+            x: float,
+            top: float,
+            height: float,
+            color: str,
+            bold: bool = False,
+        ):
+            start = top + (height - len(lines) * line_height) / 2
+            for n, line in enumerate(lines):
+                width = cell_font.getlength(line) / scale
+                draw.text(
+                    (
+                        px(cell_x(index, x, width)),
+                        px(start + n * line_height + line_height / 2),
+                    ),
+                    line,
+                    font=cell_font,
+                    fill=color,
+                    anchor="lm",
+                    stroke_width=1 if bold else 0,
+                    stroke_fill=color,
+                )
+
+        if component.headers:
+            draw.rectangle(
+                (px(left), px(y), px(left + table_width), px(y + header_height)),
+                fill=HEADER_BG,
+            )
+            x = left
+            for index, lines in enumerate(header_lines):
+                draw_lines(lines, index, x, y, header_height, HEADER_COLOR, True)
+                x += widths[index]
+            y += header_height
+
+        for row_index, (row, lines_list, height) in enumerate(
+            zip(rows, row_lines, row_heights)
+        ):
+            if row_index % 2:
+                draw.rectangle(
+                    (px(left), px(y), px(left + table_width), px(y + height)),
+                    fill=STRIPE_COLOR,
+                )
+            x = left
+            for index, (cell, lines) in enumerate(zip(row, lines_list)):
+                if cell.kind == "text":
+                    draw_lines(lines, index, x, y, height, cell.color, cell.bold)
+                elif cell.kind == "image":
+                    if picture := self._load_image(cell, scale):
+                        image.paste(
+                            picture,
+                            (
+                                px(cell_x(index, x, cell.width)),
+                                px(y + (height - cell.height) / 2),
+                            ),
+                            picture,
+                        )
+                elif cell.kind == "badge":
+                    text_width = badge_font.getlength(cell.text) / scale
+                    bx = cell_x(index, x, text_width + 16)
+                    by = y + height / 2
+                    draw.rounded_rectangle(
+                        (px(bx), px(by - 11), px(bx + text_width + 16), px(by + 11)),
+                        radius=px(11),
+                        fill=cell.color,
+                    )
+                    draw.text(
+                        (px(bx + 8), px(by)),
+                        cell.text,
+                        font=badge_font,
+                        fill="#ffffff",
+                        anchor="lm",
+                    )
+                x += widths[index]
+            y += height
+            draw.line(
+                (px(left), px(y), px(left + table_width), px(y)),
+                fill=DIVIDER_COLOR,
+                width=max(px(1), 1),
+            )
+
+        buffer = BytesIO()
+        if options.get("type") == "jpeg":
+            image.save(buffer, "JPEG", quality=options.get("quality") or 90)
+        else:
+            image.save(buffer, "PNG", compress_level=3)
+        return buffer.getvalue()
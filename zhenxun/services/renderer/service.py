@@ -1,12 +1,10 @@
 import asyncio
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Sequence
 from dataclasses import dataclass, field
-import hashlib
 import inspect
 from pathlib import Path
 from typing import Any, ClassVar
 
-import aiofiles
 from jinja2 import (
     ChoiceLoader,
     Environment,
@@ -25,8 +23,10 @@ from zhenxun.utils.exception import RenderingError
 from zhenxun.utils.log_sanitizer import sanitize_for_logging
 from zhenxun.utils.pydantic_compat import _dump_pydantic_obj
 
+from .cache import RenderCache, cache_key
 from .config import RESERVED_TEMPLATE_KEYS
 from .engine import get_screenshot_engine
+from .pillow_engine import PillowEngine
 from .protocols import Renderable, RenderResult, ScreenshotEngine
 from .registry import asset_registry
 from .theme import RelativePathEnvironment, ThemeManager
@@ -47,6 +47,7 @@ class RenderContext:
     collected_asset_styles: set[str] = field(default_factory=set)
     collected_scripts: set[str] = field(default_factory=set)
     collected_inline_css: list[str] = field(default_factory=list)
+    collected_style_paths: set[str] = field(default_factory=set)
     processed_components: set[int] = field(default_factory=set)
 
 
@@ -69,6 +70,8 @@ class RendererService:
         self._jinja_env: Environment | None = None
         self._theme_manager: ThemeManager | None = None
         self._screenshot_engine: ScreenshotEngine | None = None
+        self._cache = RenderCache(UI_CACHE_PATH)
+        self._pillow_engine = PillowEngine()
         self._initialized = False
         self._init_lock = asyncio.Lock()
         self._custom_filters: dict[str, Callable] = {}
@@ -211,6 +214,12 @@ class RendererService:
             self._jinja_env.globals.update(self._custom_globals)
 
             self._screenshot_engine = get_screenshot_engine()
+            self._cache.memory_bytes = (
+                int(Config.get_config("UI", "CACHE_MEMORY_MB", 32) or 0) * 1024 * 1024
+            )
+            self._cache.disk_bytes = (
+                int(Config.get_config("UI", "CACHE_DISK_MB", 512) or 0) * 1024 * 1024
+            )
 
             self._theme_manager = ThemeManager(self._jinja_env)
 
@@ -218,6 +227,13 @@ class RendererService:
             await self._theme_manager.load_theme(current_theme_name)
             self._initialized = True
 
+    async def shutdown(self):
+        """关闭截图引擎持有的浏览器页面。"""
+        engine, self._screenshot_engine = self._screenshot_engine, None
+        self._initialized = False
+        if close := getattr(engine, "close", None):
+            await close()
+
     async def _collect_dependencies_recursive(
         self, component: Renderable, context: "RenderContext"
     ):
@@ -226,62 +242,23 @@ class RendererService:
 
         这是实现组件化样式和脚本管理的基础，确保即使是深层嵌套的组件
         所需的资源也能被正确加载到最终的HTML页面中。
+        组件样式在加载主题时已预编译，这里只按路径取出并去重。
         """
         component_id = id(component)
         if component_id in context.processed_components:
             return
         context.processed_components.add(component_id)
 
-        component_path_base = str(component.template_name)
-        variant = getattr(component, "variant", None)
-        manifest = await context.theme_manager.get_template_manifest(
-            component_path_base, skin=variant
-        )
-
-        style_paths_to_load = []
-        if manifest and manifest.get("styles"):
-            styles = manifest["styles"]
-            styles = [styles] if isinstance(styles, str) else styles
-
-            resolution_base_path = Path(component_path_base)
-            if variant:
-                skin_manifest_path = str(Path(component_path_base) / "skins" / variant)
-                skin_manifest = await context.theme_manager._load_single_manifest(
-                    skin_manifest_path
-                )
-                if skin_manifest and "styles" in skin_manifest:
-                    resolution_base_path = Path(skin_manifest_path)
-
-            style_paths_to_load.extend(
-                str(resolution_base_path / style).replace("\\", "/") for style in styles
-            )
-        else:
-            base_template_path = (
-                await context.theme_manager._resolve_component_template(
-                    component, context
-                )
-            )
-            base_style_path = str(
-                Path(base_template_path).with_name("style.css")
-            ).replace("\\", "/")
-            style_paths_to_load.append(base_style_path)
-
-            if variant:
-                skin_style_path = f"{component_path_base}/skins/{variant}/style.css"
-                style_paths_to_load.append(skin_style_path)
-
-        for css_template_path in style_paths_to_load:
-            try:
-                css_template = context.theme_manager.jinja_env.get_template(
-                    css_template_path
-                )
-                theme_context = {
-                    "theme": context.theme_manager.jinja_env.globals.get("theme", {})
-                }
-                css_content = await css_template.render_async(**theme_context)
+        theme_manager = context.theme_manager
+        for css_path in await theme_manager.get_component_style_paths(
+            component, context
+        ):
+            # 同一组件的多个实例（如表格中的每个单元格）只需加载一次样式
+            if css_path in context.collected_style_paths:
+                continue
+            context.collected_style_paths.add(css_path)
+            if css_content := await theme_manager.get_compiled_css(css_path):
                 context.collected_inline_css.append(css_content)
-            except TemplateNotFound:
-                pass
 
         context.collected_scripts.update(component.get_required_scripts())
         context.collected_asset_styles.update(component.get_required_styles())
@@ -304,8 +281,9 @@ class RendererService:
         核心的私有渲染方法，执行完整的渲染流程。
 
         执行步骤:
-        1.  **缓存检查**: 如果启用缓存，则根据组件模板名和渲染数据生成缓存键，
-            并尝试从文件系统中读取缓存图片。
+        1.  **缓存检查**: 如果启用缓存，则根据主题版本、组件模板名和渲染数据
+            生成缓存键，依次从内存和文件系统中读取缓存图片；相同的渲染正在
+            进行时直接等待其结果。
         2.  **组件准备**: 调用 `component.prepare()` 生命周期钩子，允许组件执行
             异步数据加载。
         3.  **依赖收集**: 调用 `_collect_dependencies_recursive` 遍历组件树，
@@ -313,7 +291,8 @@ class RendererService:
         4.  **HTML渲染**: 调用 `ThemeManager` 将组件数据模型渲染为HTML字符串。
             此步骤会处理独立模板和主题内模板两种情况。
         5.  **截图**: 调用 `ScreenshotEngine` 将生成的HTML转换为图片字节。
-        6.  **缓存写入**: 如果缓存未命中且启用了缓存，将生成的图片写入文件系统。
+        6.  **缓存写入**: 如果缓存未命中且启用了缓存，将生成的图片写入内存和
+            文件系统，超出字节预算时淘汰最久未使用的缓存。
         """
         return await self._apply_caching_layer(self._render_component_core, context)
 
@@ -324,179 +303,217 @@ class RendererService:
     ) -> RenderResult:
         """
         一个高阶函数，为核心渲染逻辑提供缓存层。
-        它负责处理缓存的读取和写入，而将实际的渲染工作委托给传入的函数。
+        缓存的读取、写入与并发去重由 RenderCache 处理，实际的渲染工作委托给传入的函数。
         """
-        cache_path = None
         component = context.component
+        if not (Config.get_config("UI", "CACHE") and context.use_cache):
+            return await core_render_func(context)
 
-        if Config.get_config("UI", "CACHE") and context.use_cache:
-            try:
-                template_name = component.template_name
-                data_dict = component.get_render_data()
-                resolved_data_dict = {}
-                for key, value in data_dict.items():
-                    if is_coroutine_callable(value):  # type: ignore
-                        resolved_data_dict[key] = await value
-                    else:
-                        resolved_data_dict[key] = value
-                data_str = json.dumps(resolved_data_dict, sort_keys=True)
-                cache_key_str = f"{template_name}:{data_str}"
-                cache_filename = (
-                    f"{hashlib.sha256(cache_key_str.encode()).hexdigest()}.png"
-                )
-                cache_path = UI_CACHE_PATH / cache_filename
-
-                if cache_path.exists():
-                    logger.debug(f"UI缓存命中: {cache_path}")
-                    async with aiofiles.open(cache_path, "rb") as f:
-                        image_bytes = await f.read()
-                    return RenderResult(
-                        image_bytes=image_bytes, html_content="<!-- from cache -->"
-                    )
-                logger.debug(f"UI缓存未命中: {cache_key_str[:100]}...")
-            except Exception as e:
-                logger.warning(f"UI缓存读取失败: {e}", e=e)
-                cache_path = None
+        try:
+            key = await self._cache_key(context)
+        except Exception as e:
+            logger.warning(f"UI缓存键生成失败: {e}", e=e)
+            return await core_render_func(context)
+        logger.debug(f"UI缓存键: {component.template_name} -> {key}")
+        return await self._cache.get_or_render(key, lambda: core_render_func(context))
 
-        result = await core_render_func(context)
+    async def _cache_key(self, context: "RenderContext") -> str:
+        """
+        由主题名称与版本、模板、渲染数据和渲染参数生成缓存键。
+        主题切换或主题文件变化后版本不同，旧缓存不会再被命中。
+        """
+        component = context.component
+        data_dict = component.get_render_data()
+        resolved_data_dict = {}
+        for key, value in data_dict.items():
+            if is_coroutine_callable(value):  # type: ignore
+                resolved_data_dict[key] = await value
+            else:
+                resolved_data_dict[key] = value
+        theme = context.theme_manager.current_theme
+        return cache_key(
+            theme.name if theme else "",
+            theme.version if theme else "",
+            component.template_name,
+            str(getattr(component, "variant", None) or ""),
+            json.dumps(resolved_data_dict, sort_keys=True),
+            json.dumps(context.render_options, sort_keys=True, default=str),
+        )
+
+    async def _build_page(
+        self, context: "RenderContext"
+    ) -> tuple[str, Path, dict[str, Any]]:
+        """
+        执行截图之前的全部步骤：组件准备、依赖收集与HTML渲染。
+
+        返回:
+            tuple[str, Path, dict[str, Any]]: (HTML, 解析相对路径的基础目录, 截图参数)
+        """
+        component = context.component
+        assert context.theme_manager is not None, "ThemeManager 未初始化"
 
         if (
-            Config.get_config("UI", "CACHE")
-            and context.use_cache
-            and cache_path
-            and result.image_bytes
+            hasattr(component, "template_path")
+            and isinstance(
+                template_path := getattr(component, "template_path"),
+                Path,
+            )
+            and template_path.is_absolute()
         ):
-            try:
-                async with aiofiles.open(cache_path, "wb") as f:
-                    await f.write(result.image_bytes)
-                logger.debug(f"UI缓存写入成功: {cache_path}")
-            except Exception as e:
-                logger.warning(f"UI缓存写入失败: {e}", e=e)
+            await component.prepare()
 
-        return result
+            logger.debug(f"正在渲染独立模板: '{template_path}'", "RendererService")
 
-    async def _render_component_core(self, context: "RenderContext") -> RenderResult:
-        """
-        纯粹的核心渲染逻辑，不包含任何缓存处理。
-        此方法负责从组件数据模型生成最终的图片字节和HTML。
-        """
-        component = context.component
+            template_dir = template_path.parent
+            temp_loader = FileSystemLoader(str(template_dir))
+            temp_env = Environment(
+                loader=temp_loader,
+                enable_async=True,
+                autoescape=select_autoescape(["html", "xml"]),
+            )
 
-        try:
-            if not self._initialized:
-                await self.initialize()
-            assert context.theme_manager is not None, "ThemeManager 未初始化"
-            assert context.screenshot_engine is not None, "ScreenshotEngine 未初始化"
+            temp_env.globals.update(context.theme_manager.jinja_env.globals)
+            temp_env.filters.update(context.theme_manager.jinja_env.filters)
+            temp_env.globals["asset"] = (
+                context.theme_manager._create_standalone_asset_loader(template_dir)
+            )
+            temp_env.filters["md"] = context.theme_manager._markdown_filter
 
-            if (
-                hasattr(component, "template_path")
-                and isinstance(
-                    template_path := getattr(component, "template_path"),
-                    Path,
-                )
-                and template_path.is_absolute()
-            ):
-                await component.prepare()
+            data_dict = component.get_render_data()
+            template = temp_env.get_template(template_path.name)
 
-                logger.debug(f"正在渲染独立模板: '{template_path}'", "RendererService")
+            template_context = {
+                "theme": context.theme_manager.jinja_env.globals.get("theme", {}),
+                "data": data_dict,
+            }
+            for key, value in data_dict.items():
+                if key in RESERVED_TEMPLATE_KEYS:
+                    logger.warning(
+                        f"模板数据键 '{key}' 与渲染器保留关键字冲突，"
+                        f"在模板 '{component.template_name}' 中请使用 "
+                        f"'data.{key}' 访问。"
+                    )
+                else:
+                    template_context[key] = value
+            html_content = await template.render_async(**template_context)
 
-                template_dir = template_path.parent
-                temp_loader = FileSystemLoader(str(template_dir))
-                temp_env = Environment(
-                    loader=temp_loader,
-                    enable_async=True,
-                    autoescape=select_autoescape(["html", "xml"]),
-                )
+            component_render_options = data_dict.get("render_options", {})
+            if not isinstance(component_render_options, dict):
+                component_render_options = {}
 
-                temp_env.globals.update(context.theme_manager.jinja_env.globals)
-                temp_env.filters.update(context.theme_manager.jinja_env.filters)
-                temp_env.globals["asset"] = (
-                    context.theme_manager._create_standalone_asset_loader(template_dir)
-                )
-                temp_env.filters["md"] = context.theme_manager._markdown_filter
-
-                data_dict = component.get_render_data()
-                template = temp_env.get_template(template_path.name)
-
-                template_context = {
-                    "theme": context.theme_manager.jinja_env.globals.get("theme", {}),
-                    "data": data_dict,
-                }
-                for key, value in data_dict.items():
-                    if key in RESERVED_TEMPLATE_KEYS:
-                        logger.warning(
-                            f"模板数据键 '{key}' 与渲染器保留关键字冲突，"
-                            f"在模板 '{component.template_name}' 中请使用 "
-                            f"'data.{key}' 访问。"
-                        )
-                    else:
-                        template_context[key] = value
-                html_content = await template.render_async(**template_context)
-
-                component_render_options = data_dict.get("render_options", {})
-                if not isinstance(component_render_options, dict):
-                    component_render_options = {}
-
-                final_render_options = component_render_options.copy()
-                final_render_options.update(context.render_options)
-
-                image_bytes = await context.screenshot_engine.render(
-                    html=html_content,
-                    base_url_path=template_dir,
-                    **final_render_options,
-                )
+            final_render_options = component_render_options.copy()
+            final_render_options.update(context.render_options)
 
-                return RenderResult(image_bytes=image_bytes, html_content=html_content)
+            return html_content, template_dir, final_render_options
 
-            else:
-                await component.prepare()
-                await self._collect_dependencies_recursive(component, context)
-
-                data_dict = component.get_render_data()
-                component_render_options = data_dict.get("render_options", {})
-                if not isinstance(component_render_options, dict):
-                    component_render_options = {}
-
-                manifest_options = {}
-                variant = getattr(component, "variant", None)
-                if manifest := await context.theme_manager.get_template_manifest(
-                    component.template_name, skin=variant
-                ):
-                    manifest_options = manifest.get("render_options", {})
-
-                final_render_options = component_render_options.copy()
-                final_render_options.update(manifest_options)
-                final_render_options.update(context.render_options)
-
-                if not context.theme_manager.current_theme:
-                    raise RenderingError("渲染失败：主题未被正确加载。")
-
-                html_content = await context.theme_manager._render_component_to_html(
-                    context,
-                    **final_render_options,
-                )
+        else:
+            await component.prepare()
+            await self._collect_dependencies_recursive(component, context)
+
+            data_dict = component.get_render_data()
+            component_render_options = data_dict.get("render_options", {})
+            if not isinstance(component_render_options, dict):
+                component_render_options = {}
+
+            manifest_options = {}
+            variant = getattr(component, "variant", None)
+            if manifest := await context.theme_manager.get_template_manifest(
+                component.template_name, skin=variant
+            ):
+                manifest_options = manifest.get("render_options", {})
 
-                screenshot_options = final_render_options.copy()
-                screenshot_options.pop("extra_css", None)
-                screenshot_options.pop("frameless", None)
+            final_render_options = component_render_options.copy()
+            final_render_options.update(manifest_options)
+            final_render_options.update(context.render_options)
 
-                image_bytes = await context.screenshot_engine.render(
-                    html=html_content,
-                    base_url_path=THEMES_PATH.parent,
-                    **screenshot_options,
-                )
+            if not context.theme_manager.current_theme:
+                raise RenderingError("渲染失败：主题未被正确加载。")
+
+            html_content = await context.theme_manager._render_component_to_html(
+                context,
+                **final_render_options,
+            )
+
+            screenshot_options = final_render_options.copy()
+            screenshot_options.pop("extra_css", None)
+            screenshot_options.pop("frameless", None)
 
-                return RenderResult(image_bytes=image_bytes, html_content=html_content)
+            return html_content, THEMES_PATH.parent, screenshot_options
+
+    async def _render_fast_path(self, context: "RenderContext") -> bytes | None:
+        """
+        默认主题下的简单表格直接使用 Pillow 绘制，跳过HTML生成与浏览器截图。
 
+        返回:
+            bytes | None: 图片字节，组件不适用或绘制失败时为None，由调用方回退到HTML渲染
+        """
+        component = context.component
+        theme_manager = context.theme_manager
+        if (
+            not Config.get_config("UI", "PILLOW_FAST_PATH", True)
+            or theme_manager is None
+            or not theme_manager.current_theme
+            or theme_manager.current_theme.name != "default"
+            or not self._pillow_engine.supports(component)
+        ):
+            return None
+        try:
+            await component.prepare()
+            render_options = {}
+            if manifest := await theme_manager.get_template_manifest(
+                component.template_name
+            ):
+                render_options.update(manifest.get("render_options", {}))
+            render_options.update(context.render_options)
+            return await self._pillow_engine.render_component(
+                component,  # type: ignore
+                **render_options,
+            )
         except Exception as e:
-            logger.error(
-                f"渲染组件 '{component.__class__.__name__}' 时发生错误",
+            logger.warning(
+                f"Pillow 绘制 '{component.__class__.__name__}' 失败，回退到HTML渲染",
                 "RendererService",
                 e=e,
             )
-            raise RenderingError(
-                f"渲染组件 '{component.__class__.__name__}' 失败"
-            ) from e
+            return None
+
+    @staticmethod
+    def _render_error(component: Renderable, e: BaseException) -> RenderingError:
+        logger.error(
+            f"渲染组件 '{component.__class__.__name__}' 时发生错误",
+            "RendererService",
+            e=e,
+        )
+        error = RenderingError(f"渲染组件 '{component.__class__.__name__}' 失败")
+        error.__cause__ = e
+        return error
+
+    async def _render_component_core(self, context: "RenderContext") -> RenderResult:
+        """
+        纯粹的核心渲染逻辑，不包含任何缓存处理。
+        此方法负责从组件数据模型生成最终的图片字节和HTML。
+        """
+        try:
+            if not self._initialized:
+                await self.initialize()
+            assert context.screenshot_engine is not None, "ScreenshotEngine 未初始化"
+
+            if (image_bytes := await self._render_fast_path(context)) is not None:
+                return RenderResult(
+                    image_bytes=image_bytes, html_content="<!-- rendered by pillow -->"
+                )
+
+            html_content, base_url_path, screenshot_options = await self._build_page(
+                context
+            )
+            image_bytes = await context.screenshot_engine.render(
+                html=html_content,
+                base_url_path=base_url_path,
+                **screenshot_options,
+            )
+            return RenderResult(image_bytes=image_bytes, html_content=html_content)
+        except Exception as e:
+            raise self._render_error(context.component, e) from e
 
     async def render(
         self, component: Renderable, use_cache: bool = False, **render_options
@@ -542,6 +559,102 @@ class RendererService:
             raise RenderingError("渲染成功但未能生成图片字节数据。")
         return result.image_bytes
 
+    async def render_many(
+        self,
+        components: Sequence[Renderable],
+        use_cache: bool = False,
+        **render_options,
+    ) -> list[bytes | RenderingError]:
+        """
+        批量渲染多个组件，适用于一次输出多张图片的场景。
+
+        所有组件的HTML并发生成，截图引擎支持批量截图时在同一个页面中依次替换内容
+        截图，否则并发逐个截图。单个组件失败不会影响其他组件。
+
+        参数:
+            components: `Renderable` 实例列表。
+            use_cache: (可选) 是否启用渲染缓存，默认为 False。
+            **render_options: 传递给底层截图引擎的额外参数，对所有组件生效。
+
+        返回:
+            list[bytes | RenderingError]: 与 components 顺序一致的图片字节，
+                渲染失败的位置为对应的 RenderingError。
+        """
+        if not self._initialized:
+            await self.initialize()
+        assert self._theme_manager is not None, "ThemeManager 未初始化"
+        assert self._screenshot_engine is not None, "ScreenshotEngine 未初始化"
+        engine = self._screenshot_engine
+
+        contexts = [
+            RenderContext(
+                renderer=self,
+                theme_manager=self._theme_manager,
+                screenshot_engine=engine,
+                component=component,
+                use_cache=use_cache,
+                render_options=render_options,
+            )
+            for component in components
+        ]
+        results: list[bytes | RenderingError | None] = [None] * len(contexts)
+        keys: list[str | None] = [None] * len(contexts)
+        if Config.get_config("UI", "CACHE") and use_cache:
+            for index, context in enumerate(contexts):
+                try:
+                    keys[index] = await self._cache_key(context)
+                    results[index] = await self._cache.get(keys[index])  # type: ignore
+                except Exception as e:
+                    logger.warning(f"UI缓存读取失败: {e}", e=e)
+
+        pending = [index for index, result in enumerate(results) if result is None]
+        drawn = await asyncio.gather(
+            *(self._render_fast_path(contexts[index]) for index in pending)
+        )
+        for index, image in zip(pending, drawn):
+            if image is not None:
+                results[index] = image
+                if key := keys[index]:
+                    await self._cache.set(key, image)
+        pending = [index for index in pending if results[index] is None]
+        pages = await asyncio.gather(
+            *(self._build_page(contexts[index]) for index in pending),
+            return_exceptions=True,
+        )
+        jobs: list[tuple[str, Path, dict[str, Any]]] = []
+        job_indexes: list[int] = []
+        for index, page in zip(pending, pages):
+            if isinstance(page, BaseException):
+                results[index] = self._render_error(contexts[index].component, page)
+            else:
+                jobs.append(page)
+                job_indexes.append(index)
+
+        if not jobs:
+            images = []
+        elif render_batch := getattr(engine, "render_many", None):
+            try:
+                images = await render_batch(jobs)
+            except Exception as e:
+                # 如截图排队超时，只影响尚未完成的组件
+                images = [e] * len(jobs)
+        else:
+            images = await asyncio.gather(
+                *(
+                    engine.render(html=html, base_url_path=path, **options)
+                    for html, path, options in jobs
+                ),
+                return_exceptions=True,
+            )
+        for index, image in zip(job_indexes, images):
+            if isinstance(image, BaseException):
+                results[index] = self._render_error(contexts[index].component, image)
+                continue
+            results[index] = image
+            if key := keys[index]:
+                await self._cache.set(key, image)
+        return results  # type: ignore
+
     async def render_to_html(
         self, component: Renderable, frameless: bool = False
     ) -> str:
@@ -589,6 +702,7 @@ class RendererService:
         logger.debug("已清除UI清单缓存 (manifest cache)。")
         current_theme_name = Config.get_config("UI", "THEME", "default")
         await self._theme_manager.load_theme(current_theme_name)
+        self._cache.clear_memory()
         logger.info(f"主题 '{current_theme_name}' 已成功重载。")
         return current_theme_name
 
@@ -616,6 +730,7 @@ class RendererService:
             )
 
         await self._theme_manager.load_theme(theme_name)
+        self._cache.clear_memory()
         Config.set_config("UI", "THEME", theme_name, auto_save=True)
         logger.info(f"UI主题已切换为: {theme_name}")
         return theme_name
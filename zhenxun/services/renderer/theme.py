@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import Callable
+import hashlib
 import os
 from pathlib import Path
+import re
+import time
 from typing import TYPE_CHECKING, Any
 
 from jinja2 import (
@@ -45,6 +48,44 @@ def deep_merge_dict(base: dict, new: dict) -> dict:
     return result
 
 
+def directory_version(*dirs: Path) -> str:
+    """
+    根据目录下所有文件的相对路径、大小与修改时间生成版本哈希。
+    文件有任何增删改时版本都会变化，不读取文件内容。
+    """
+    digest = hashlib.sha256()
+    for base in dirs:
+        digest.update(str(base).encode())
+        if not base.is_dir():
+            continue
+        for dir_path, dir_names, file_names in os.walk(base):
+            dir_names.sort()
+            for name in sorted(file_names):
+                file = Path(dir_path) / name
+                try:
+                    stat = file.stat()
+                except OSError:
+                    continue
+                digest.update(
+                    f"{file.relative_to(base)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+                )
+    return digest.hexdigest()[:16]
+
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_PUNCT_SPACE = re.compile(r"\s*([{};])\s*")
+
+
+def minify_css(css: str) -> str:
+    """
+    保守地压缩CSS：去除注释、空行与花括号和分号两侧的空白。
+    不改动冒号、逗号等两侧的空白，避免影响后代选择器与 calc() 等写法。
+    """
+    css = _CSS_COMMENT.sub("", css)
+    css = " ".join(line.strip() for line in css.splitlines() if line.strip())
+    return _CSS_PUNCT_SPACE.sub(r"\1", css).strip()
+
+
 class RelativePathEnvironment(Environment):
     """
     一个自定义的 Jinja2 环境，重写了 join_path 方法以支持模板间的相对路径引用。
@@ -67,6 +108,7 @@ class Theme(BaseModel):
     style_css: str = ""
     assets_dir: Path
     default_assets_dir: Path
+    version: str = ""
 
 
 class ResourceResolver:
@@ -274,6 +316,13 @@ class ThemeManager:
         self._manifest_cache: dict[str, Any] = {}
         self._manifest_cache_lock = asyncio.Lock()
 
+        self.theme_css: str = ""
+        """预编译的 theme.css.jinja"""
+        self._compiled_css: dict[str, str | None] = {}
+        """组件样式模板路径 -> 预编译后的CSS，None 表示模板不存在"""
+        self._component_styles: dict[tuple[str, str | None], tuple[str, ...]] = {}
+        """(组件模板名, 皮肤) -> 该组件需要加载的样式模板路径"""
+
     def list_available_themes(self) -> list[str]:
         """扫描主题目录并返回所有可用的主题名称。"""
         if not THEMES_PATH.is_dir():
@@ -393,11 +442,15 @@ class ThemeManager:
             json.loads(palette_path.read_text("utf-8")) if palette_path.exists() else {}
         )
 
+        version = await asyncio.to_thread(
+            directory_version, theme_dir, THEMES_PATH / "default"
+        )
         self.current_theme = Theme(
             name=theme_name,
             palette=palette,
             assets_dir=theme_dir / "assets",
             default_assets_dir=THEMES_PATH / "default" / "assets",
+            version=version,
         )
         theme_context_dict = {
             "name": theme_name,
@@ -407,7 +460,108 @@ class ThemeManager:
         }
         self.jinja_env.globals["theme"] = theme_context_dict
         self.jinja_env.globals["default_theme_palette"] = default_palette
-        logger.info(f"主题管理器已加载主题: {theme_name}")
+        logger.info(f"主题管理器已加载主题: {theme_name} (版本 {version})")
+        await self.compile_styles()
+
+    async def compile_styles(self):
+        """
+        预编译当前主题的全部CSS模板。
+
+        主题样式与各组件的样式模板只依赖主题上下文，在加载主题时渲染并压缩一次，
+        之后每次渲染只需按路径取出拼接，不再重复渲染模板。
+        """
+        assert self.current_theme is not None, "主题加载失败"
+        start = time.perf_counter()
+        self._compiled_css = {}
+        self._component_styles = {}
+        self.theme_css = minify_css(
+            await self.jinja_env.get_template("theme.css.jinja").render_async(
+                theme=model_dump(self.current_theme)
+            )
+        )
+        try:
+            css_templates = self.jinja_env.list_templates(extensions=["css"])
+        except TypeError:
+            # 加载器不支持列出模板时，全部在首次渲染时编译
+            css_templates = []
+        compiled = 0
+        for path in css_templates:
+            try:
+                await self.get_compiled_css(path)
+                compiled += 1
+            except Exception as e:
+                logger.debug(f"预编译样式 '{path}' 失败，将在渲染时重试", e=e)
+        logger.info(
+            f"主题 '{self.current_theme.name}' 样式预编译完成: {compiled} 个样式, "
+            f"耗时 {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+    async def get_compiled_css(self, path: str) -> str | None:
+        """
+        获取预编译的组件样式，未预编译时渲染并缓存。
+
+        参数:
+            path: 样式模板路径
+
+        返回:
+            str | None: 压缩后的CSS，模板不存在时为None
+        """
+        if path in self._compiled_css:
+            return self._compiled_css[path]
+        try:
+            template = self.jinja_env.get_template(path)
+        except TemplateNotFound:
+            self._compiled_css[path] = None
+            return None
+        css = minify_css(
+            await template.render_async(theme=self.jinja_env.globals.get("theme", {}))
+        )
+        self._compiled_css[path] = css
+        return css
+
+    async def get_component_style_paths(
+        self, component: Renderable, context: "RenderContext"
+    ) -> tuple[str, ...]:
+        """
+        获取组件需要加载的样式模板路径，结果按 (模板名, 皮肤) 缓存。
+
+        优先使用 manifest.json 中声明的 styles，否则回退到入口模板同目录的
+        style.css 以及皮肤目录下的 style.css。
+        """
+        component_path_base = str(component.template_name)
+        variant = getattr(component, "variant", None)
+        cache_key = (component_path_base, variant)
+        if (paths := self._component_styles.get(cache_key)) is not None:
+            return paths
+
+        manifest = await self.get_template_manifest(component_path_base, skin=variant)
+        style_paths: list[str] = []
+        if manifest and manifest.get("styles"):
+            styles = manifest["styles"]
+            styles = [styles] if isinstance(styles, str) else styles
+
+            resolution_base_path = Path(component_path_base)
+            if variant:
+                skin_manifest_path = str(Path(component_path_base) / "skins" / variant)
+                skin_manifest = await self._load_single_manifest(skin_manifest_path)
+                if skin_manifest and "styles" in skin_manifest:
+                    resolution_base_path = Path(skin_manifest_path)
+
+            style_paths.extend(
+                str(resolution_base_path / style).replace("\\", "/") for style in styles
+            )
+        else:
+            base_template_path = await self._resolve_component_template(
+                component, context
+            )
+            style_paths.append(
+                str(Path(base_template_path).with_name("style.css")).replace("\\", "/")
+            )
+            if variant:
+                style_paths.append(f"{component_path_base}/skins/{variant}/style.css")
+
+        paths = self._component_styles[cache_key] = tuple(style_paths)
+        return paths
 
     async def _resolve_component_template(
         self, component: Renderable, context: "RenderContext"
@@ -632,11 +786,6 @@ class ThemeManager:
 
         theme_context_dict = model_dump(self.current_theme)
 
-        theme_css_template = self.jinja_env.get_template("theme.css.jinja")
-        theme_css_content = await theme_css_template.render_async(
-            theme=theme_context_dict
-        )
-
         resolved_template_name = await self._resolve_component_template(
             component, context
         )
@@ -671,7 +820,7 @@ class ThemeManager:
             base_template = self.jinja_env.get_template("partials/_base.html")
             page_context = {
                 "data": component,
-                "theme_css": theme_css_content,
+                "theme_css": self.theme_css,
                 "collected_inline_css": context.collected_inline_css,
                 "required_scripts": list(context.collected_scripts),
                 "collected_asset_styles": list(context.collected_asset_styles),
@@ -24,7 +24,8 @@ from pydantic import BaseModel
 from zhenxun.configs.config import Config
 from zhenxun.models.scheduled_job import ScheduledJob
 from zhenxun.services.log import logger
-from zhenxun.services.message_load import should_pause_tasks
+from zhenxun.services.message_load import LoadGovernor, Subsystem
+from zhenxun.services.send_queue import SendPriority, send_priority
 from zhenxun.utils.common_utils import CommonUtils
 from zhenxun.utils.decorator.retry import Retry
 from zhenxun.utils.pydantic_compat import parse_as
@@ -272,7 +273,8 @@ async def _execute_single_job_instance(
                 raise
 
         async def wrapper(bot: Bot):
-            return await task_meta["func"](bot=bot, **injected_params)  # type: ignore
+            with send_priority(SendPriority.SCHEDULED):
+                return await task_meta["func"](bot=bot, **injected_params)  # type: ignore
 
         dependent = Dependent.parse(
             call=wrapper,
@@ -349,7 +351,8 @@ async def _execute_job(
             state: T_State = {ScheduleContext: context_override}
 
             async def wrapper(bot: Bot):
-                return await task_meta["func"](bot=bot, **injected_params)  # type: ignore
+                with send_priority(SendPriority.SCHEDULED):
+                    return await task_meta["func"](bot=bot, **injected_params)  # type: ignore
 
             dependent = Dependent.parse(
                 call=wrapper,
@@ -366,11 +369,13 @@ async def _execute_job(
         return
 
     global _LAST_PRESSURE_SKIP
-    if should_pause_tasks():
+    if LoadGovernor.should_shed(Subsystem.SCHEDULER):
         now = time.time()
         if now - _LAST_PRESSURE_SKIP > 30:
             _LAST_PRESSURE_SKIP = now
-            logger.info("scheduler paused due to message pressure")
+            logger.info(
+                f"scheduler paused due to load level {LoadGovernor.level().name}"
+            )
         return
 
     scheduler_manager._running_tasks.add(schedule_id)
@@ -1,62 +1,588 @@
+"""
+发送调度队列
+
+所有 bot 的发送类 API 调用都会进入该队列，由调度器按以下规则派发：
+- 优先级通道：交互回复 > 定时任务 > 广播
+- 同一优先级内，按 bot 轮询，bot 内再按目标（群/用户）轮询
+- 每个 bot、每个目标各有一个令牌桶限制发送速率
+- 负载调控器要求广播降级时，广播通道暂停派发
+"""
+
 import asyncio
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
 import time
 from typing import Any
 
 import nonebot
-from nonebot.adapters import Bot
+from nonebot.adapters import Bot, Message
 
+from zhenxun.configs.config import Config
 from zhenxun.services.log import logger
+from zhenxun.services.message_load import LoadGovernor, Subsystem
+
+LOG_COMMAND = "SendQueue"
 
-_SEND_APIS = {"send_msg", "send_like"}
-_QUEUE: asyncio.Queue[tuple[Bot, str, dict[str, Any], asyncio.Future]] = asyncio.Queue()
-_WORKERS = 3
-_MIN_INTERVAL = 0.05
-_SEND_LOCK = asyncio.Lock()
-_LAST_SEND_TS = 0.0
-_API_SEMAPHORE = asyncio.Semaphore(3)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_WORKERS",
+    3,
+    help="send queue worker count",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_MAXSIZE",
+    5000,
+    help="send queue max pending messages, 0 for unbounded",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_BOT_RATE",
+    20.0,
+    help="send queue messages per second per bot",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_BOT_BURST",
+    5,
+    help="send queue burst size per bot",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_TARGET_RATE",
+    1.0,
+    help="send queue messages per second per group/user",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_TARGET_BURST",
+    3,
+    help="send queue burst size per group/user",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_COALESCE",
+    False,
+    help="merge queued text/image messages to the same target into one message",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_COALESCE_WINDOW",
+    0.3,
+    help="max seconds between the first and last merged message",
+)
+Config.add_plugin_config(
+    "hook",
+    "SEND_QUEUE_COALESCE_MAX",
+    5,
+    help="max messages merged into one send",
+)
+
+_SEND_APIS = {
+    "send_msg",
+    "send_like",
+    "send_group_msg",
+    "send_private_msg",
+    "send_group_forward_msg",
+    "send_private_forward_msg",
+}
 _ORIG_CALL_API = Bot.call_api
 _PATCHED = False
 _WORKER_TASKS: list[asyncio.Task] = []
+_BUCKET_PRUNE_INTERVAL = 60.0
+_COALESCE_APIS = {"send_msg", "send_group_msg", "send_private_msg"}
+_COALESCE_SEGMENTS = {"text", "image", "face"}
+_PAUSED_RECHECK = 1.0
+"""广播暂停时重新检查负载的间隔（秒）"""
 
 
-async def _rate_limit():
-    global _LAST_SEND_TS
-    async with _SEND_LOCK:
-        now = time.monotonic()
-        wait = _MIN_INTERVAL - (now - _LAST_SEND_TS)
-        if wait > 0:
-            await asyncio.sleep(wait)
-        _LAST_SEND_TS = time.monotonic()
+class SendQueueFullError(Exception):
+    """发送队列已满，消息被更高优先级的消息挤出"""
 
 
-async def _worker(worker_id: int):
-    while True:
-        bot, api, data, future = await _QUEUE.get()
-        try:
-            await _rate_limit()
-            async with _API_SEMAPHORE:
-                result = await _ORIG_CALL_API(bot, api, **data)
+class SendPriority(IntEnum):
+    """发送优先级，数值越小越先发送"""
+
+    INTERACTIVE = 0
+    """交互回复"""
+    SCHEDULED = 1
+    """定时任务"""
+    BROADCAST = 2
+    """广播"""
+
+
+_SEND_PRIORITY: ContextVar[SendPriority] = ContextVar(
+    "zhenxun_send_priority", default=SendPriority.INTERACTIVE
+)
+
+
+@contextmanager
+def send_priority(priority: SendPriority) -> Iterator[None]:
+    """在上下文中以指定优先级发送消息
+
+    参数:
+        priority: 发送优先级
+    """
+    token = _SEND_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _SEND_PRIORITY.reset(token)
+
+
+class TokenBucket:
+    """令牌桶"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """距离可取出一个令牌还需等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        if self.rate <= 0:
+            return
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass(eq=False)
+class _SendItem:
+    bot: Bot
+    api: str
+    data: dict[str, Any]
+    future: asyncio.Future
+    priority: SendPriority
+    target: str
+    enqueued: float
+    followers: list[asyncio.Future] = field(default_factory=list)
+    """合并进本条消息的其他消息的 future"""
+
+    def set_result(self, result: Any):
+        for future in (self.future, *self.followers):
             if not future.done():
                 future.set_result(result)
-        except Exception as exc:
+
+    def set_exception(self, exc: BaseException):
+        for future in (self.future, *self.followers):
             if not future.done():
                 future.set_exception(exc)
+
+    def is_done(self) -> bool:
+        return all(future.done() for future in (self.future, *self.followers))
+
+
+@dataclass
+class _Lane:
+    """单个 bot 单个优先级下按目标轮询的队列"""
+
+    targets: dict[str, deque[_SendItem]] = field(default_factory=dict)
+    ring: deque[str] = field(default_factory=deque)
+
+
+@dataclass
+class _WaitStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+
+
+def _coalescible(item: _SendItem) -> bool:
+    if item.api not in _COALESCE_APIS:
+        return False
+    message = item.data.get("message")
+    if not isinstance(message, Message):
+        return False
+    return all(segment.type in _COALESCE_SEGMENTS for segment in message)
+
+
+def _merge_message(first: Message, second: Message) -> Message:
+    merged = first.copy()
+    segment_class = first.get_segment_class()
+    if (
+        merged
+        and second
+        and merged[-1].type == "text"
+        and second[0].type == "text"
+        and hasattr(segment_class, "text")
+    ):
+        merged.append(segment_class.text("\n"))  # type: ignore
+    merged.extend(second)
+    return merged
+
+
+def _target_key(data: dict[str, Any]) -> str:
+    if group_id := data.get("group_id"):
+        return f"group:{group_id}"
+    if channel_id := data.get("channel_id"):
+        return f"channel:{data.get('guild_id')}:{channel_id}"
+    if user_id := data.get("user_id"):
+        return f"user:{user_id}"
+    return "unknown"
+
+
+class SendScheduler:
+    """按 bot/目标公平调度的发送队列"""
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        bot_rate: float = 20.0,
+        bot_burst: float = 5,
+        target_rate: float = 1.0,
+        target_burst: float = 3,
+        coalesce: bool = False,
+        coalesce_window: float = 0.3,
+        coalesce_max: int = 5,
+    ):
+        self.maxsize = maxsize
+        self.coalesce = coalesce
+        self.coalesce_window = coalesce_window
+        self.coalesce_max = max(1, coalesce_max)
+        self.bot_rate = bot_rate
+        self.bot_burst = max(1.0, bot_burst)
+        self.target_rate = target_rate
+        self.target_burst = max(1.0, target_burst)
+        self._lanes: dict[str, list[_Lane]] = {}
+        self._bot_ring: deque[str] = deque()
+        self._pending: dict[str, int] = {}
+        self._bot_buckets: dict[str, TokenBucket] = {}
+        self._target_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._depth = dict.fromkeys(SendPriority, 0)
+        self._wait_stats = {priority: _WaitStats() for priority in SendPriority}
+        self._size = 0
+        self._dropped = 0
+        self._merged = 0
+        self._select_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._last_prune = time.monotonic()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def pressure_size(self) -> int:
+        """不含广播的排队消息数，广播暂停时积压不应继续推高负载"""
+        return self._size - self._depth[SendPriority.BROADCAST]
+
+    def full(self) -> bool:
+        return self.maxsize > 0 and self._size >= self.maxsize
+
+    def _enqueue(self, item: _SendItem):
+        bot_id = str(item.bot.self_id)
+        lanes = self._lanes.get(bot_id)
+        if lanes is None:
+            lanes = self._lanes[bot_id] = [_Lane() for _ in SendPriority]
+        lane = lanes[item.priority]
+        items = lane.targets.get(item.target)
+        if items is None:
+            items = lane.targets[item.target] = deque()
+            lane.ring.append(item.target)
+        items.append(item)
+        if not self._pending.get(bot_id):
+            self._bot_ring.append(bot_id)
+        self._pending[bot_id] = self._pending.get(bot_id, 0) + 1
+        self._depth[item.priority] += 1
+        self._size += 1
+        if self.full():
+            self._not_full.clear()
+        self._wakeup.set()
+
+    def _evict_lower(self, priority: SendPriority) -> bool:
+        """挤出一条优先级低于 priority 的最新消息
+
+        返回:
+            bool: 是否成功挤出
+        """
+        for lower in reversed(SendPriority):
+            if lower <= priority:
+                return False
+            if not self._depth[lower]:
+                continue
+            for bot_id in reversed(self._bot_ring):
+                lane = self._lanes[bot_id][lower]
+                if not lane.ring:
+                    continue
+                target = lane.ring[-1]
+                items = lane.targets[target]
+                victim = items.pop()
+                if not items:
+                    lane.ring.pop()
+                    del lane.targets[target]
+                self._remove_pending(bot_id, victim)
+                self._dropped += 1
+                victim.set_exception(SendQueueFullError("send queue full"))
+                return True
+        return False
+
+    async def put(self, item: _SendItem):
+        """加入队列
+
+        队列已满时优先挤出更低优先级的消息，没有可挤出的消息时等待空位。
+        """
+        while self.full() and not self._evict_lower(item.priority):
+            await self._not_full.wait()
+        self._enqueue(item)
+
+    def _bot_bucket(self, bot_id: str, now: float) -> TokenBucket:
+        bucket = self._bot_buckets.get(bot_id)
+        if bucket is None:
+            bucket = self._bot_buckets[bot_id] = TokenBucket(
+                self.bot_rate, self.bot_burst, now
+            )
+        return bucket
+
+    def _target_bucket(self, bot_id: str, target: str, now: float) -> TokenBucket:
+        key = (bot_id, target)
+        bucket = self._target_buckets.get(key)
+        if bucket is None:
+            bucket = self._target_buckets[key] = TokenBucket(
+                self.target_rate, self.target_burst, now
+            )
+        return bucket
+
+    def _remove_pending(self, bot_id: str, item: _SendItem):
+        self._pending[bot_id] -= 1
+        if not self._pending[bot_id]:
+            del self._pending[bot_id]
+            del self._lanes[bot_id]
+            self._bot_ring.remove(bot_id)
+        self._depth[item.priority] -= 1
+        self._size -= 1
+        if not self.full():
+            self._not_full.set()
+
+    def _coalesce(self, item: _SendItem, items: deque[_SendItem]) -> _SendItem:
+        """将同一目标后续排队的文本/图片消息合并进 item"""
+        if not items or not _coalescible(item):
+            return item
+        params = {k: v for k, v in item.data.items() if k != "message"}
+        message: Message = item.data["message"]
+        count = 1
+        while items and count < self.coalesce_max:
+            follower = items[0]
+            if (
+                follower.api != item.api
+                or follower.enqueued - item.enqueued > self.coalesce_window
+                or not _coalescible(follower)
+                or {k: v for k, v in follower.data.items() if k != "message"} != params
+            ):
+                break
+            items.popleft()
+            self._depth[follower.priority] -= 1
+            self._size -= 1
+            self._pending[str(item.bot.self_id)] -= 1
+            if follower.is_done():
+                continue
+            message = _merge_message(message, follower.data["message"])
+            item.followers.append(follower.future)
+            self._merged += 1
+            count += 1
+        if item.followers:
+            item.data = {**params, "message": message}
+        return item
+
+    def _pop_from_lane(self, bot_id: str, lane: _Lane, target: str) -> _SendItem:
+        items = lane.targets[target]
+        item = items.popleft()
+        if self.coalesce:
+            item = self._coalesce(item, items)
+        if items:
+            lane.ring.rotate(-1)
+        else:
+            lane.ring.popleft()
+            del lane.targets[target]
+        self._bot_ring.remove(bot_id)
+        self._bot_ring.append(bot_id)
+        self._remove_pending(bot_id, item)
+        return item
+
+    def _pop_ready(self, now: float) -> tuple[_SendItem | None, float | None]:
+        """取出一个当前可发送的消息
+
+        返回:
+            tuple[_SendItem | None, float | None]: 消息，以及无可发送消息时的等待秒数
+        """
+        min_wait: float | None = None
+        for priority in SendPriority:
+            if (
+                priority == SendPriority.BROADCAST
+                and self._depth[priority]
+                and LoadGovernor.should_shed(Subsystem.BROADCAST)
+            ):
+                min_wait = (
+                    _PAUSED_RECHECK
+                    if min_wait is None
+                    else min(min_wait, _PAUSED_RECHECK)
+                )
+                continue
+            for bot_id in list(self._bot_ring):
+                lane = self._lanes[bot_id][priority]
+                if not lane.ring:
+                    continue
+                bot_bucket = self._bot_bucket(bot_id, now)
+                if wait := bot_bucket.wait_time(now):
+                    min_wait = wait if min_wait is None else min(min_wait, wait)
+                    continue
+                for _ in range(len(lane.ring)):
+                    target = lane.ring[0]
+                    target_bucket = self._target_bucket(bot_id, target, now)
+                    if wait := target_bucket.wait_time(now):
+                        min_wait = wait if min_wait is None else min(min_wait, wait)
+                        lane.ring.rotate(-1)
+                        continue
+                    bot_bucket.take(now)
+                    target_bucket.take(now)
+                    return self._pop_from_lane(bot_id, lane, target), None
+        return None, min_wait
+
+    def _prune_buckets(self, now: float):
+        """移除已回满且空闲的令牌桶，避免目标数量无限增长"""
+        self._last_prune = now
+        self._target_buckets = {
+            key: bucket
+            for key, bucket in self._target_buckets.items()
+            if not bucket.is_idle(now)
+        }
+        self._bot_buckets = {
+            key: bucket
+            for key, bucket in self._bot_buckets.items()
+            if key in self._pending or not bucket.is_idle(now)
+        }
+
+    async def get(self) -> _SendItem:
+        """等待并取出下一条可发送的消息"""
+        async with self._select_lock:
+            while True:
+                now = time.monotonic()
+                if now - self._last_prune > _BUCKET_PRUNE_INTERVAL:
+                    self._prune_buckets(now)
+                item, wait = self._pop_ready(now)
+                if item is not None:
+                    self._wait_stats[item.priority].record(now - item.enqueued)
+                    return item
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stats(self) -> dict[str, Any]:
+        """队列深度与等待时间统计"""
+        return {
+            "size": self._size,
+            "maxsize": self.maxsize,
+            "bots": len(self._pending),
+            "dropped": self._dropped,
+            "merged": self._merged,
+            "depth": {
+                priority.name: self._depth[priority] for priority in SendPriority
+            },
+            "wait": {
+                priority.name: {
+                    "count": stats.count,
+                    "avg": stats.total / stats.count if stats.count else 0.0,
+                    "max": stats.max,
+                }
+                for priority, stats in self._wait_stats.items()
+            },
+        }
+
+
+def _build_scheduler() -> SendScheduler:
+    return SendScheduler(
+        maxsize=int(Config.get_config("hook", "SEND_QUEUE_MAXSIZE", 5000) or 0),
+        bot_rate=float(Config.get_config("hook", "SEND_QUEUE_BOT_RATE", 20.0) or 0),
+        bot_burst=float(Config.get_config("hook", "SEND_QUEUE_BOT_BURST", 5) or 1),
+        target_rate=float(
+            Config.get_config("hook", "SEND_QUEUE_TARGET_RATE", 1.0) or 0
+        ),
+        target_burst=float(
+            Config.get_config("hook", "SEND_QUEUE_TARGET_BURST", 3) or 1
+        ),
+        coalesce=bool(Config.get_config("hook", "SEND_QUEUE_COALESCE", False)),
+        coalesce_window=float(
+            Config.get_config("hook", "SEND_QUEUE_COALESCE_WINDOW", 0.3) or 0
+        ),
+        coalesce_max=int(Config.get_config("hook", "SEND_QUEUE_COALESCE_MAX", 5) or 1),
+    )
+
+
+_SCHEDULER = _build_scheduler()
+LoadGovernor.register_gauge("send_queue", _SCHEDULER.pressure_size, (200, 1000, 3000))
+
+
+def get_send_queue_stats() -> dict[str, Any]:
+    """获取发送队列统计信息"""
+    return _SCHEDULER.stats()
+
+
+async def _worker(worker_id: int):
+    while True:
+        item = await _SCHEDULER.get()
+        if item.is_done():
+            continue
+        try:
+            result = await _ORIG_CALL_API(item.bot, item.api, **item.data)
+            item.set_result(result)
+        except Exception as exc:
+            item.set_exception(exc)
             logger.warning(
-                f"send queue failed: {api}",
-                "SendQueue",
-                target=getattr(bot, "self_id", None),
+                f"send queue failed: {item.api}",
+                LOG_COMMAND,
+                target=getattr(item.bot, "self_id", None),
                 e=exc,
             )
-        finally:
-            _QUEUE.task_done()
 
 
 async def _queued_call_api(self: Bot, api: str, **data: Any):
-    if api not in _SEND_APIS:
+    if api not in _SEND_APIS or not _WORKER_TASKS:
         return await _ORIG_CALL_API(self, api, **data)
     loop = asyncio.get_running_loop()
     future: asyncio.Future = loop.create_future()
-    await _QUEUE.put((self, api, data, future))
+    await _SCHEDULER.put(
+        _SendItem(
+            bot=self,
+            api=api,
+            data=data,
+            future=future,
+            priority=_SEND_PRIORITY.get(),
+            target=_target_key(data),
+            enqueued=time.monotonic(),
+        )
+    )
     return await future
 
 
@@ -74,5 +600,13 @@ driver = nonebot.get_driver()
 @driver.on_startup
 async def _start_send_queue():
     patch_send_queue()
-    for idx in range(_WORKERS):
+    workers = max(1, int(Config.get_config("hook", "SEND_QUEUE_WORKERS", 3) or 1))
+    for idx in range(workers):
         _WORKER_TASKS.append(asyncio.create_task(_worker(idx)))
+
+
+@driver.on_shutdown
+async def _stop_send_queue():
+    for task in _WORKER_TASKS:
+        task.cancel()
+    _WORKER_TASKS.clear()
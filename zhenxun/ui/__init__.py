@@ -2,6 +2,7 @@ from pathlib import Path
 from typing import Any
 
 from zhenxun.services.renderer.protocols import Renderable
+from zhenxun.utils.exception import RenderingError
 
 from . import builders
 from .builders.core.layout import LayoutBuilder
@@ -123,6 +124,27 @@ async def render(
     return await renderer_service.render(component, use_cache=use_cache, **kwargs)
 
 
+async def render_many(
+    components: list[Renderable], *, use_cache: bool = False, **kwargs
+) -> list[bytes | RenderingError]:
+    """
+    批量渲染多个组件，所有HTML并发生成，并尽量复用同一个浏览器页面截图。
+    适用于一次发送多张图片的场景，比逐个调用 `render()` 更快。
+
+    参数:
+        components: `Renderable` 实例列表。
+        use_cache: (可选) 是否启用渲染缓存，默认为 `False`。
+        **kwargs: 传递给底层截图引擎的额外参数，对所有组件生效。
+
+    返回:
+        list[bytes | RenderingError]: 与 components 顺序一致的图片字节，
+            渲染失败的位置为对应的 RenderingError。
+    """
+    from zhenxun.services import renderer_service
+
+    return await renderer_service.render_many(components, use_cache=use_cache, **kwargs)
+
+
 async def render_template(
     path: str | Path, data: dict, use_cache: bool = False, **kwargs
 ) -> bytes:
@@ -219,6 +241,7 @@ __all__ = [
     "markdown",
     "render",
     "render_full_result",
+    "render_many",
     "render_markdown",
     "render_template",
     "template",
@@ -0,0 +1,317 @@
+"""
+增量去重备份
+
+文件内容按 sha256 存储为 gzip 压缩的对象，每次备份生成一份快照清单记录
+路径 -> (大小, 修改时间, 内容哈希)。大小与修改时间均未变化的文件直接沿用上一份
+快照中的哈希，不再读取；内容相同的文件在所有快照间只保存一份。
+SQLite 数据库通过在线备份 API 生成一致的副本后再入库，不直接复制正在写入的文件。
+超出保留数量的快照会被删除，并清理不再被任何快照引用的对象。
+
+所有操作均为同步阻塞调用，应放在线程中执行。
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Any
+
+_CHUNK_SIZE = 1024 * 1024
+_SQLITE_HEADER = b"SQLite format 3\x00"
+_SQLITE_SIDECARS = ("-wal", "-shm", "-journal")
+
+
+@dataclass
+class BackupReport:
+    snapshot: str = ""
+    """快照名称"""
+    files: int = 0
+    """快照包含的文件数量"""
+    hashed: int = 0
+    """重新读取计算哈希的文件数量"""
+    stored: int = 0
+    """新写入的对象数量"""
+    bytes_read: int = 0
+    """读取的原始字节数"""
+    bytes_written: int = 0
+    """写入的压缩后字节数"""
+    total_bytes: int = 0
+    """快照包含的原始字节数"""
+    sqlite: int = 0
+    """通过在线备份 API 备份的数据库数量"""
+    removed_snapshots: int = 0
+    """清理的过期快照数量"""
+    removed_objects: int = 0
+    """清理的无引用对象数量"""
+    errors: int = 0
+    """备份失败的文件数量"""
+    duration: float = 0.0
+    """耗时（秒）"""
+
+    @property
+    def throughput(self) -> float:
+        """读取吞吐量（MB/s）"""
+        return self.bytes_read / 1024 / 1024 / self.duration if self.duration else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "throughput": self.throughput}
+
+
+def _is_sqlite(path: Path) -> bool:
+    try:
+        with path.open("rb") as f:
+            return f.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+    except OSError:
+        return False
+
+
+class BackupEngine:
+    """
+    增量去重备份
+
+    参数:
+        root: 备份目录，其下包含 objects 与 snapshots
+        keep: 保留的快照数量
+        compress_level: gzip 压缩等级
+    """
+
+    def __init__(self, root: Path, *, keep: int = 7, compress_level: int = 6):
+        self.root = root
+        self.keep = max(keep, 1)
+        self.compress_level = compress_level
+        self.objects = root / "objects"
+        self.snapshots = root / "snapshots"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.gz"
+
+    def _snapshot_paths(self) -> list[Path]:
+        return sorted(self.snapshots.glob("*.json"))
+
+    def load_snapshot(self, path: Path) -> dict[str, dict[str, Any]]:
+        """读取快照清单
+
+        参数:
+            path: 快照文件
+
+        返回:
+            dict[str, dict[str, Any]]: 相对路径 -> {size, mtime_ns, hash}
+        """
+        try:
+            return self._read_snapshot(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _read_snapshot(self, path: Path) -> dict[str, dict[str, Any]]:
+        files = json.loads(path.read_text(encoding="utf-8"))["files"]
+        if not isinstance(files, dict):
+            raise ValueError(f"快照清单格式错误: {path}")
+        return files
+
+    def _latest_files(self) -> dict[str, dict[str, Any]]:
+        snapshots = self._snapshot_paths()
+        return self.load_snapshot(snapshots[-1]) if snapshots else {}
+
+    def _store(self, file: Path, report: BackupReport) -> str:
+        """边读取边计算哈希并压缩写入临时对象，对象已存在时丢弃临时文件"""
+        self.objects.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.objects, suffix=".tmp")
+        tmp = Path(tmp_name)
+        try:
+            with (
+                os.fdopen(fd, "wb") as raw,
+                gzip.GzipFile(
+                    fileobj=raw, mode="wb", compresslevel=self.compress_level, mtime=0
+                ) as gz,
+                file.open("rb") as src,
+            ):
+                while chunk := src.read(_CHUNK_SIZE):
+                    digest.update(chunk)
+                    gz.write(chunk)
+                    report.bytes_read += len(chunk)
+            key = digest.hexdigest()
+            target = self._object_path(key)
+            if target.exists():
+                tmp.unlink()
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                report.bytes_written += tmp.stat().st_size
+                report.stored += 1
+                os.replace(tmp, target)
+            return key
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def _store_sqlite(self, file: Path, report: BackupReport) -> str:
+        with tempfile.TemporaryDirectory(dir=self.root) as tmp_dir:
+            copy = Path(tmp_dir) / file.name
+            src = sqlite3.connect(f"{file.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                dst = sqlite3.connect(copy)
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+            report.sqlite += 1
+            return self._store(copy, report)
+
+    def _iter_files(self, sources: list[Path]):
+        for source in sources:
+            if source.is_file():
+                yield source
+            elif source.is_dir():
+                for dir_path, dir_names, file_names in os.walk(source):
+                    dir_names.sort()
+                    for name in sorted(file_names):
+                        yield Path(dir_path) / name
+
+    def backup(self, sources: list[Path]) -> BackupReport:
+        """备份文件或文件夹并生成新的快照
+
+        参数:
+            sources: 需要备份的文件或文件夹
+
+        返回:
+            BackupReport: 备份统计
+        """
+        start = time.perf_counter()
+        self.snapshots.mkdir(parents=True, exist_ok=True)
+        name = datetime.now().strftime("%Y%m%d-%H%M%S")
+        seq = 0
+        while (self.snapshots / f"{name}.json").exists():
+            seq += 1
+            name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{seq}"
+        report = BackupReport(snapshot=name)
+        previous = self._latest_files()
+        root = self.root.resolve()
+        stats: dict[Path, tuple[int, int, bool]] = {}
+        for file in self._iter_files(sources):
+            if root in file.resolve().parents:
+                continue
+            try:
+                stat = file.stat()
+            except OSError:
+                report.errors += 1
+                continue
+            old = previous.get(file.as_posix()) or {}
+            if (old.get("size"), old.get("mtime_ns")) == (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                is_sqlite = old.get("sqlite", False)
+            else:
+                is_sqlite = _is_sqlite(file)
+            stats[file] = (stat.st_size, stat.st_mtime_ns, is_sqlite)
+        sidecars = {
+            file.with_name(file.name + suffix)
+            for file, (_, _, is_sqlite) in stats.items()
+            if is_sqlite
+            for suffix in _SQLITE_SIDECARS
+        }
+        files: dict[str, dict[str, Any]] = {}
+        for file, (size, mtime_ns, is_sqlite) in stats.items():
+            if file in sidecars:
+                continue
+            key = file.as_posix()
+            old = previous.get(key)
+            entry: dict[str, Any] = {"size": size, "mtime_ns": mtime_ns}
+            try:
+                if is_sqlite:
+                    # WAL 模式下主文件的大小与修改时间不能反映未检查点的写入
+                    entry["hash"] = self._store_sqlite(file, report)
+                    entry["sqlite"] = True
+                    report.hashed += 1
+                elif (
+                    old
+                    and old["size"] == size
+                    and old["mtime_ns"] == mtime_ns
+                    and self._object_path(old["hash"]).exists()
+                ):
+                    entry["hash"] = old["hash"]
+                else:
+                    entry["hash"] = self._store(file, report)
+                    report.hashed += 1
+            except Exception:
+                report.errors += 1
+                if old:
+                    files[key] = old
+                continue
+            files[key] = entry
+            report.total_bytes += size
+        report.files = len(files)
+        snapshot = self.snapshots / f"{report.snapshot}.json"
+        tmp = snapshot.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"time": report.snapshot, "files": files}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, snapshot)
+        self._prune(report)
+        report.duration = time.perf_counter() - start
+        return report
+
+    def _prune(self, report: BackupReport):
+        snapshots = self._snapshot_paths()
+        for path in snapshots[: -self.keep]:
+            path.unlink(missing_ok=True)
+            report.removed_snapshots += 1
+        if not report.removed_snapshots:
+            return
+        try:
+            referenced = {
+                entry["hash"]
+                for path in self._snapshot_paths()
+                for entry in self._read_snapshot(path).values()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            # 无法确定损坏的快照引用了哪些对象，本次不清理对象
+            return
+        for obj in self.objects.glob("*/*.gz"):
+            if obj.name.removesuffix(".gz") not in referenced:
+                obj.unlink(missing_ok=True)
+                report.removed_objects += 1
+
+    def restore(self, snapshot: str, target: Path) -> int:
+        """将快照中的文件解压还原到目标目录
+
+        参数:
+            snapshot: 快照名称
+            target: 目标目录，文件按备份时的相对路径还原
+
+        返回:
+            int: 还原的文件数量
+
+        异常:
+            ValueError: 快照中的路径会还原到目标目录之外
+        """
+        files = self.load_snapshot(self.snapshots / f"{snapshot}.json")
+        root = target.resolve()
+        dests: dict[str, Path] = {}
+        for key in files:
+            path = Path(key)
+            # 备份绝对路径时去掉根目录，按相对路径还原
+            parts = path.parts[1:] if path.anchor else path.parts
+            dest = target.joinpath(*parts) if parts else target
+            if ".." in parts or root not in dest.resolve().parents:
+                raise ValueError(f"快照中的路径不安全: {key}")
+            dests[key] = dest
+        for key, entry in files.items():
+            dest = dests[key]
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with (
+                gzip.open(self._object_path(entry["hash"]), "rb") as src,
+                dest.open("wb") as dst,
+            ):
+                shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+        return len(files)
@@ -0,0 +1,269 @@
+"""
+命令前缀树
+
+命令按字符插入字典树，匹配时对消息文本单次遍历即可得到所有命中的命令，
+命令结束位置需为文本末尾或空白字符。
+正则命令（如 alconna 快捷指令）挂在其字面前缀对应的节点上，
+只有遍历经过该节点时才会尝试匹配。
+"""
+
+from collections.abc import Hashable
+import re
+from typing import Generic, TypeVar
+
+V = TypeVar("V", bound=Hashable)
+
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def literal_prefix(pattern: str) -> str:
+    """获取正则表达式开头必定出现的字面前缀
+
+    参数:
+        pattern: 正则表达式
+
+    返回:
+        str: 字面前缀，无法确定时为空字符串
+    """
+    if _has_top_level_alternation(pattern):
+        return ""
+    prefix: list[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+                prefix.append(pattern[i + 1])
+                i += 2
+                continue
+            break
+        if char in _REGEX_META:
+            break
+        prefix.append(char)
+        i += 1
+    # 量词作用于前一个字符时，该字符不一定出现
+    if prefix and i < len(pattern) and pattern[i] in "*?{":
+        prefix.pop()
+    return "".join(prefix)
+
+
+_LEADING_ALTERNATION = re.compile(
+    r"^\((?:\?:)?((?:[^()\[\]\\.^$*+?{}|]+\|)+[^()\[\]\\.^$*+?{}|]+)\)"
+)
+
+
+def literal_prefixes(pattern: str) -> list[str]:
+    """获取正则表达式可能的字面前缀，开头为纯文本分支时按分支展开
+
+    参数:
+        pattern: 正则表达式，如 "(添加|安装)插件"
+
+    返回:
+        list[str]: 字面前缀列表，如 ["添加插件", "安装插件"]
+    """
+    if (m := _LEADING_ALTERNATION.match(pattern)) and not _has_top_level_alternation(
+        pattern
+    ):
+        rest = pattern[m.end() :]
+        if rest[:1] in {"*", "?", "{"}:
+            return [""]
+        suffix = literal_prefix(rest)
+        return [branch + suffix for branch in m.group(1).split("|")]
+    return [literal_prefix(pattern)]
+
+
+def command_head(command: str) -> str:
+    """获取帮助格式命令的字面部分，去除 [参数] / ?[参数] 占位
+
+    参数:
+        command: 命令文本，如 "以后叫我 [昵称]"
+
+    返回:
+        str: 第一个非占位的片段，如 "以后叫我"
+    """
+    for token in command.split():
+        if not token.startswith(("[", "?[")):
+            return token
+    return ""
+
+
+class _Node(Generic[V]):
+    __slots__ = ("children", "patterns", "values")
+
+    def __init__(self):
+        self.children: dict[str, _Node[V]] = {}
+        self.values: set[V] = set()
+        self.patterns: list[tuple[re.Pattern[str], V]] = []
+
+
+def _at_boundary(text: str, end: int) -> bool:
+    return end == len(text) or text[end].isspace()
+
+
+class CommandTrie(Generic[V]):
+    """命令前缀树
+
+    使用示例:
+    ```python
+    trie = CommandTrie[str]()
+    trie.add("签到", "sign_in")
+    trie.add_pattern(r"我(是谁|叫什么)", "nickname")
+    trie.match("签到 详情")  # {"sign_in"}
+    ```
+    """
+
+    def __init__(self):
+        self._root: _Node[V] = _Node()
+
+    def _walk(self, prefix: str, create: bool) -> list[_Node[V]] | None:
+        path = [self._root]
+        node = self._root
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _Node()
+            node = child
+            path.append(node)
+        return path
+
+    def _prune(self, prefix: str, path: list[_Node[V]]):
+        for depth in range(len(prefix), 0, -1):
+            node = path[depth]
+            if node.children or node.values or node.patterns:
+                break
+            del path[depth - 1].children[prefix[depth - 1]]
+
+    def add(self, command: str, value: V):
+        """添加命令
+
+        参数:
+            command: 命令文本
+            value: 命令对应的值
+        """
+        if command := command.strip():
+            path = self._walk(command, True)
+            path[-1].values.add(value)  # type: ignore
+
+    def remove(self, command: str, value: V):
+        """移除命令
+
+        参数:
+            command: 命令文本
+            value: 命令对应的值
+        """
+        command = command.strip()
+        if not command or not (path := self._walk(command, False)):
+            return
+        path[-1].values.discard(value)
+        self._prune(command, path)
+
+    def add_pattern(self, pattern: str, value: V):
+        """添加正则命令
+
+        参数:
+            pattern: 正则表达式
+            value: 命令对应的值
+
+        异常:
+            re.error: 正则表达式无效
+        """
+        compiled = re.compile(pattern)
+        for prefix in literal_prefixes(pattern):
+            path = self._walk(prefix, True)
+            path[-1].patterns.append((compiled, value))  # type: ignore
+
+    def remove_pattern(self, pattern: str, value: V):
+        """移除正则命令
+
+        参数:
+            pattern: 正则表达式
+            value: 命令对应的值
+        """
+        for prefix in literal_prefixes(pattern):
+            if not (path := self._walk(prefix, False)):
+                continue
+            node = path[-1]
+            node.patterns = [
+                item
+                for item in node.patterns
+                if item[0].pattern != pattern or item[1] != value
+            ]
+            self._prune(prefix, path)
+
+    def match(self, text: str) -> set[V]:
+        """单次遍历匹配文本开头的所有命令
+
+        参数:
+            text: 消息文本
+
+        返回:
+            set[V]: 所有命中命令对应的值
+        """
+        text = text.strip()
+        result: set[V] = set()
+        if not text:
+            return result
+        node = self._root
+        self._match_patterns(node, text, result)
+        for end, char in enumerate(text, 1):
+            node = node.children.get(char)  # type: ignore
+            if node is None:
+                break
+            if node.values and _at_boundary(text, end):
+                result.update(node.values)
+            if node.patterns:
+                self._match_patterns(node, text, result)
+        return result
+
+    def longest_match(self, text: str) -> tuple[str, set[V]] | None:
+        """获取文本开头最长的命中命令
+
+        参数:
+            text: 消息文本
+
+        返回:
+            tuple[str, set[V]] | None: (命令, 对应的值)，未命中时为None
+        """
+        text = text.strip()
+        node = self._root
+        best: tuple[str, set[V]] | None = None
+        for end, char in enumerate(text, 1):
+            node = node.children.get(char)  # type: ignore
+            if node is None:
+                break
+            if node.values and _at_boundary(text, end):
+                best = (text[:end], set(node.values))
+        return best
+
+    @staticmethod
+    def _match_patterns(node: _Node[V], text: str, result: set[V]):
+        for pattern, value in node.patterns:
+            if value in result:
+                continue
+            if (m := pattern.match(text)) and _at_boundary(text, m.end()):
+                result.add(value)
@@ -1,140 +1,553 @@
+from abc import ABC, abstractmethod
 import asyncio
-from collections import defaultdict, deque
+from collections import OrderedDict, deque
+import datetime
+import heapq
+import logging
 import time
 from typing import Any
+import weakref
 
+DEFAULT_MAX_ENTRIES = 100000
+"""单个限制器默认最多保留的键数量，超出后按 LRU 淘汰"""
 
-class FreqLimiter:
+_LIMITERS: "weakref.WeakSet[_BoundedLimiter]" = weakref.WeakSet()
+
+
+class _ExpiringStore:
+    """
+    有界且自动过期的键值存储。
+
+    条目按访问顺序保存（LRU），超过 max_size 时淘汰最久未访问的条目；
+    同时按过期时间分桶，sweep 只需遍历已经过期的桶。查询不会插入新键。
+    """
+
+    __slots__ = (
+        "_bucket_heap",
+        "_buckets",
+        "_data",
+        "_granularity",
+        "evicted",
+        "expired",
+        "max_size",
+    )
+
+    def __init__(self, max_size: int = DEFAULT_MAX_ENTRIES, granularity: float = 1.0):
+        self.max_size = max_size
+        self._granularity = granularity
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._buckets: dict[int, set[Any]] = {}
+        self._bucket_heap: list[int] = []
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _bucket(self, expire_at: float) -> int:
+        return int(expire_at // self._granularity)
+
+    def _link(self, key: Any, expire_at: float):
+        bucket = self._bucket(expire_at)
+        keys = self._buckets.get(bucket)
+        if keys is None:
+            keys = self._buckets[bucket] = set()
+            # 已删除的桶在堆中留下的失效项由 sweep 惰性丢弃，过多时重建堆
+            if len(self._bucket_heap) > 2 * len(self._buckets) + 64:
+                self._bucket_heap = list(self._buckets)
+                heapq.heapify(self._bucket_heap)
+            else:
+                heapq.heappush(self._bucket_heap, bucket)
+        keys.add(key)
+
+    def _unlink(self, key: Any, expire_at: float):
+        bucket = self._bucket(expire_at)
+        if keys := self._buckets.get(bucket):
+            keys.discard(key)
+            if not keys:
+                del self._buckets[bucket]
+
+    def get(self, key: Any, default: Any = None, now: float | None = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= (time.time() if now is None else now):
+            self.pop(key)
+            self.expired += 1
+            return default
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Any, value: Any, expire_at: float):
+        old = self._data.get(key)
+        if old is not None:
+            self._data.move_to_end(key)
+            if self._bucket(old[0]) != self._bucket(expire_at):
+                self._unlink(key, old[0])
+                self._link(key, expire_at)
+        else:
+            self._link(key, expire_at)
+        self._data[key] = (expire_at, value)
+        while len(self._data) > self.max_size:
+            old_key, (old_expire, _) = self._data.popitem(last=False)
+            self._unlink(old_key, old_expire)
+            self.evicted += 1
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self._unlink(key, entry[0])
+        return entry[1]
+
+    def clear(self):
+        self._data.clear()
+        self._buckets.clear()
+        self._bucket_heap.clear()
+
+    def sweep(self, now: float | None = None) -> int:
+        """清理已过期的条目
+
+        返回:
+            int: 清理的条目数量
+        """
+        now = time.time() if now is None else now
+        current = self._bucket(now)
+        removed = 0
+        while self._bucket_heap and self._bucket_heap[0] < current:
+            bucket = heapq.heappop(self._bucket_heap)
+            keys = self._buckets.pop(bucket, None)
+            if keys is None:
+                continue
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._data[key]
+                    removed += 1
+                else:
+                    self._link(key, entry[0])
+        self.expired += removed
+        return removed
+
+
+class _BoundedLimiter:
+    """
+    限制器基类，负责注册到全局清理器并提供条目统计
+    """
+
+    def __init__(self):
+        _LIMITERS.add(self)
+
+    def _stores(self) -> tuple[_ExpiringStore, ...]:
+        return ()
+
+    def sweep(self, now: float | None = None) -> int:
+        """清理过期条目"""
+        return sum(store.sweep(now) for store in self._stores())
+
+    def stats(self) -> dict[str, int]:
+        """条目统计"""
+        stores = self._stores()
+        return {
+            "entries": sum(len(store) for store in stores),
+            "evicted": sum(store.evicted for store in stores),
+            "expired": sum(store.expired for store in stores),
+        }
+
+
+class FreqLimiter(_BoundedLimiter):
     """
     命令冷却，检测用户是否处于冷却状态
     """
 
-    def __init__(self, default_cd_seconds: int):
-        self.next_time: dict[Any, float] = defaultdict(float)
+    def __init__(self, default_cd_seconds: int, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__()
+        self.next_time = _ExpiringStore(max_entries)
         self.default_cd = default_cd_seconds
 
+    def _stores(self) -> tuple[_ExpiringStore, ...]:
+        return (self.next_time,)
+
     def check(self, key: Any) -> bool:
-        return time.time() >= self.next_time[key]
+        return time.time() >= self.next_time.get(key, 0.0)
 
     def start_cd(self, key: Any, cd_time: int = 0):
-        self.next_time[key] = time.time() + (
-            cd_time if cd_time > 0 else self.default_cd
-        )
+        next_time = time.time() + (cd_time if cd_time > 0 else self.default_cd)
+        self.next_time.set(key, next_time, next_time)
 
     def left_time(self, key: Any) -> float:
-        return max(0.0, self.next_time[key] - time.time())
+        return max(0.0, self.next_time.get(key, 0.0) - time.time())
+
 
+def _tomorrow_timestamp() -> float:
+    now = datetime.datetime.now()
+    tomorrow = (now + datetime.timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return tomorrow.timestamp()
 
-class CountLimiter:
+
+class CountLimiter(_BoundedLimiter):
     """
     每日调用命令次数限制
     """
 
     tz = None
 
-    def __init__(self, max_num: int):
+    def __init__(self, max_num: int, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__()
         self.today = -1
-        self.count: dict[Any, int] = defaultdict(int)
+        self.count = _ExpiringStore(max_entries)
         self.max = max_num
+        self._reset_at = _tomorrow_timestamp()
 
-    def check(self, key: Any) -> bool:
-        import datetime
+    def _stores(self) -> tuple[_ExpiringStore, ...]:
+        return (self.count,)
 
+    def check(self, key: Any) -> bool:
         day = datetime.datetime.now().day
         if day != self.today:
             self.today = day
+            self._reset_at = _tomorrow_timestamp()
             self.count.clear()
-        return self.count[key] < self.max
+        return self.count.get(key, 0) < self.max
 
     def get_num(self, key: Any) -> int:
-        return self.count[key]
+        return self.count.get(key, 0)
 
     def increase(self, key: Any, num: int = 1):
-        self.count[key] += num
+        self.count.set(key, self.count.get(key, 0) + num, self._reset_at)
 
     def reset(self, key: Any):
-        self.count[key] = 0
+        self.count.pop(key)
 
 
-class UserBlockLimiter:
+class UserBlockLimiter(_BoundedLimiter):
     """
     检测用户是否正在调用命令 (简单阻塞锁)
     """
 
-    def __init__(self):
-        self.flag_data: dict[Any, bool] = defaultdict(bool)
-        self.time: dict[Any, float] = defaultdict(float)
+    def __init__(self, timeout: int = 30, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__()
+        self.flag_data = _ExpiringStore(max_entries)
+        self.timeout = timeout
+
+    def _stores(self) -> tuple[_ExpiringStore, ...]:
+        return (self.flag_data,)
 
     def set_true(self, key: Any):
-        self.time[key] = time.time()
-        self.flag_data[key] = True
+        now = time.time()
+        self.flag_data.set(key, now, now + self.timeout)
 
     def set_false(self, key: Any):
-        self.flag_data[key] = False
+        self.flag_data.pop(key)
 
     def check(self, key: Any) -> bool:
-        if self.flag_data[key] and time.time() - self.time[key] > 30:
-            self.set_false(key)
-        return not self.flag_data[key]
+        return self.flag_data.get(key) is None
 
 
-class RateLimiter:
+class RateLimiter(_BoundedLimiter):
     """
     一个简单的基于时间窗口的速率限制器。
     """
 
-    def __init__(self, max_calls: int, time_window: int):
-        self.requests: dict[Any, deque[float]] = defaultdict(deque)
+    def __init__(
+        self, max_calls: int, time_window: int, max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        super().__init__()
+        self.requests = _ExpiringStore(max_entries)
         self.max_calls = max_calls
         self.time_window = time_window
 
+    def _stores(self) -> tuple[_ExpiringStore, ...]:
+        return (self.requests,)
+
     def check(self, key: Any) -> bool:
         """检查是否超出速率限制。如果未超出，则记录本次调用。"""
         now = time.time()
+        requests: deque[float] | None = self.requests.get(key, now=now)
+        if requests is None:
+            requests = deque()
 
-        while self.requests[key] and self.requests[key][0] <= now - self.time_window:
-            self.requests[key].popleft()
+        while requests and requests[0] <= now - self.time_window:
+            requests.popleft()
 
-        if len(self.requests[key]) < self.max_calls:
-            self.requests[key].append(now)
+        if len(requests) < self.max_calls:
+            requests.append(now)
+            self.requests.set(key, requests, now + self.time_window)
             return True
         return False
 
     def left_time(self, key: Any) -> float:
         """计算距离下次可调用还需等待的时间"""
-        if self.requests[key]:
-            return max(0.0, self.requests[key][0] + self.time_window - time.time())
+        if requests := self.requests.get(key):
+            return max(0.0, requests[0] + self.time_window - time.time())
         return 0.0
 
 
-class ConcurrencyLimiter:
+class ConcurrencyLimiter(_BoundedLimiter):
     """
     一个基于 asyncio.Semaphore 的并发限制器。
+
+    键在没有占用者与等待者时会被移除，因此状态数量只与当前并发量相关。
     """
 
     def __init__(self, max_concurrent: int):
+        super().__init__()
         self._semaphores: dict[Any, asyncio.Semaphore] = {}
         self.max_concurrent = max_concurrent
-        self._active_tasks: dict[Any, int] = defaultdict(int)
+        self._active_tasks: dict[Any, int] = {}
+        self._waiting: dict[Any, int] = {}
 
     def _get_semaphore(self, key: Any) -> asyncio.Semaphore:
         if key not in self._semaphores:
             self._semaphores[key] = asyncio.Semaphore(self.max_concurrent)
         return self._semaphores[key]
 
+    def _discard_if_idle(self, key: Any):
+        if not self._active_tasks.get(key) and not self._waiting.get(key):
+            self._semaphores.pop(key, None)
+            self._active_tasks.pop(key, None)
+            self._waiting.pop(key, None)
+
     async def acquire(self, key: Any):
         """获取一个信号量，如果达到并发上限则会阻塞等待。"""
         semaphore = self._get_semaphore(key)
-        await semaphore.acquire()
-        self._active_tasks[key] += 1
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._waiting[key] -= 1
+            self._discard_if_idle(key)
+            raise
+        self._waiting[key] -= 1
+        self._active_tasks[key] = self._active_tasks.get(key, 0) + 1
 
     def release(self, key: Any):
         """释放一个信号量。"""
         if key in self._semaphores:
-            if self._active_tasks[key] > 0:
+            if self._active_tasks.get(key, 0) > 0:
                 self._semaphores[key].release()
                 self._active_tasks[key] -= 1
+                self._discard_if_idle(key)
             else:
-                import logging
-
                 logging.warning(f"尝试释放键 '{key}' 的信号量时，计数已经为零。")
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._semaphores), "evicted": 0, "expired": 0}
+
+
+def sweep_limiters(now: float | None = None) -> int:
+    """清理所有限制器中已过期的条目
+
+    返回:
+        int: 清理的条目数量
+    """
+    return sum(limiter.sweep(now) for limiter in list(_LIMITERS))
+
+
+def limiter_stats() -> dict[str, dict[str, int]]:
+    """按限制器类型汇总条目统计
+
+    返回:
+        dict[str, dict[str, int]]: {类型名: {limiters, entries, evicted, expired}}
+    """
+    result: dict[str, dict[str, int]] = {}
+    for limiter in list(_LIMITERS):
+        data = result.setdefault(
+            type(limiter).__name__,
+            {"limiters": 0, "entries": 0, "evicted": 0, "expired": 0},
+        )
+        data["limiters"] += 1
+        for name, value in limiter.stats().items():
+            data[name] += value
+    return result
+
+
+def _seconds_until_tomorrow() -> int:
+    return max(1, int(_tomorrow_timestamp() - time.time()))
+
+
+class LimitBackend(ABC):
+    """
+    限制器存储后端。
+
+    每个方法都是“检查并占用”的原子操作，调用方只需一次调用即可完成
+    检查与计数，避免共享后端出现额外的往返和竞争。
+    scope 用于区分不同的限制对象（如插件模块名）。
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    async def acquire_cd(self, scope: str, key: Any, cd: int) -> float:
+        """尝试进入冷却
+
+        参数:
+            scope: 限制作用域
+            key: 限制对象
+            cd: 冷却时间（秒）
+
+        返回:
+            float: 0 表示成功进入冷却，否则为剩余冷却秒数
+        """
+        ...
+
+    @abstractmethod
+    async def acquire_count(self, scope: str, key: Any, max_count: int) -> bool:
+        """尝试增加当日调用次数
+
+        参数:
+            scope: 限制作用域
+            key: 限制对象
+            max_count: 每日最大次数
+
+        返回:
+            bool: 未超出限制并已计数时为 True
+        """
+        ...
+
+    @abstractmethod
+    async def acquire_block(self, scope: str, key: Any, timeout: int = 30) -> bool:
+        """尝试占用阻塞锁
+
+        参数:
+            scope: 限制作用域
+            key: 限制对象
+            timeout: 阻塞锁自动释放时间（秒）
+
+        返回:
+            bool: 成功占用时为 True
+        """
+        ...
+
+    @abstractmethod
+    async def release_block(self, scope: str, key: Any) -> None:
+        """释放阻塞锁"""
+        ...
+
+    async def close(self) -> None:
+        """关闭后端持有的连接"""
+
+
+class MemoryLimitBackend(LimitBackend):
+    """
+    进程内限制器后端，状态仅在当前实例内生效
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._cd: dict[str, FreqLimiter] = {}
+        self._count: dict[str, CountLimiter] = {}
+        self._block: dict[str, UserBlockLimiter] = {}
+
+    async def acquire_cd(self, scope: str, key: Any, cd: int) -> float:
+        limiter = self._cd.get(scope)
+        if limiter is None:
+            limiter = self._cd[scope] = FreqLimiter(cd)
+        if not limiter.check(key):
+            return limiter.left_time(key)
+        limiter.start_cd(key, cd)
+        return 0.0
+
+    async def acquire_count(self, scope: str, key: Any, max_count: int) -> bool:
+        limiter = self._count.get(scope)
+        if limiter is None:
+            limiter = self._count[scope] = CountLimiter(max_count)
+        limiter.max = max_count
+        if not limiter.check(key):
+            return False
+        limiter.increase(key)
+        return True
+
+    async def acquire_block(self, scope: str, key: Any, timeout: int = 30) -> bool:
+        limiter = self._block.get(scope)
+        if limiter is None:
+            limiter = self._block[scope] = UserBlockLimiter(timeout)
+        if not limiter.check(key):
+            return False
+        limiter.set_true(key)
+        return True
+
+    async def release_block(self, scope: str, key: Any) -> None:
+        self.release_block_nowait(scope, key)
+
+    def release_block_nowait(self, scope: str, key: Any) -> None:
+        """同步释放阻塞锁"""
+        if limiter := self._block.get(scope):
+            limiter.set_false(key)
+
+
+_REDIS_CD_SCRIPT = """
+if redis.call('SET', KEYS[1], '1', 'NX', 'PX', ARGV[1]) then
+    return 0
+end
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl <= 0 then
+    return 1
+end
+return ttl
+"""
+
+_REDIS_COUNT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if current >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+if current == 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisLimitBackend(LimitBackend):
+    """
+    基于 Redis 的共享限制器后端，多个实例共享同一份限制状态。
+
+    冷却与每日次数通过 Lua 脚本原子完成“检查并占用”，阻塞锁使用
+    SET NX EX，每次检查仅需一次往返。
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, prefix: str = "ZHENXUN:LIMIT"):
+        self._client = client
+        self._prefix = prefix
+        self._cd_script = client.register_script(_REDIS_CD_SCRIPT)
+        self._count_script = client.register_script(_REDIS_COUNT_SCRIPT)
+
+    def _key(self, kind: str, scope: str, key: Any) -> str:
+        return f"{self._prefix}:{kind}:{scope}:{key}"
+
+    async def acquire_cd(self, scope: str, key: Any, cd: int) -> float:
+        if cd <= 0:
+            return 0.0
+        ttl = await self._cd_script(
+            keys=[self._key("cd", scope, key)], args=[int(cd * 1000)]
+        )
+        return int(ttl) / 1000
+
+    async def acquire_count(self, scope: str, key: Any, max_count: int) -> bool:
+        day = datetime.date.today().strftime("%Y%m%d")
+        result = await self._count_script(
+            keys=[self._key(f"count:{day}", scope, key)],
+            args=[max_count, _seconds_until_tomorrow() + 60],
+        )
+        return bool(int(result))
+
+    async def acquire_block(self, scope: str, key: Any, timeout: int = 30) -> bool:
+        result = await self._client.set(
+            self._key("block", scope, key), "1", nx=True, ex=max(1, timeout)
+        )
+        return bool(result)
+
+    async def release_block(self, scope: str, key: Any) -> None:
+        await self._client.delete(self._key("block", scope, key))
+
+    async def close(self) -> None:
+        await self._client.close()
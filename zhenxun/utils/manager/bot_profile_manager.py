@@ -10,7 +10,7 @@ from zhenxun import ui
 from zhenxun.configs.config import BotConfig, Config
 from zhenxun.configs.path_config import DATA_PATH
 from zhenxun.configs.utils.models import PluginExtraData
-from zhenxun.models.statistics import Statistics
+from zhenxun.models.statistics_daily import StatisticsDaily
 from zhenxun.models.user_console import UserConsole
 from zhenxun.services.log import logger
 from zhenxun.utils.platform import PlatformUtils
@@ -142,7 +142,7 @@ class BotProfileManager:
         profile, service_count, call_count = await asyncio.gather(
             cls.get_bot_profile(bot_id),
             UserConsole.get_new_uid(),
-            Statistics.filter(bot_id=bot_id).count(),
+            StatisticsDaily.get_count(bot_id=bot_id),
         )
         if not profile:
             return None
@@ -0,0 +1,56 @@
+from datetime import date, datetime, timedelta
+import json
+from pathlib import Path
+from typing import ClassVar
+
+from zhenxun.configs.path_config import DATA_PATH
+
+
+class RetentionManager:
+    """记录原始数据表已清理到的时间
+
+    清理后原始数据不再完整，按日汇总表只能根据之后的数据重建，
+    否则重建会用不完整的原始数据覆盖已有的汇总。
+    """
+
+    file: ClassVar[Path] = DATA_PATH / "retention.json"
+    _data: ClassVar[dict[str, str] | None] = None
+
+    @classmethod
+    def _load(cls) -> dict[str, str]:
+        if cls._data is None:
+            try:
+                cls._data = json.loads(cls.file.read_text(encoding="utf8"))
+            except (OSError, ValueError):
+                cls._data = {}
+        return cls._data  # type: ignore
+
+    @classmethod
+    def mark_purged(cls, table: str, cutoff: datetime):
+        """记录数据表中早于 cutoff 的数据已被清理
+
+        参数:
+            table: 数据表名
+            cutoff: 清理截止时间
+        """
+        data = cls._load()
+        if (old := data.get(table)) and datetime.fromisoformat(old) >= cutoff:
+            return
+        data[table] = cutoff.isoformat()
+        cls.file.parent.mkdir(parents=True, exist_ok=True)
+        cls.file.write_text(json.dumps(data, indent=4), encoding="utf8")
+
+    @classmethod
+    def get_rebuild_start(cls, table: str) -> date | None:
+        """原始数据仍完整保留的第一天
+
+        参数:
+            table: 数据表名
+
+        返回:
+            date | None: 日期，未清理过时为None
+        """
+        if cutoff := cls._load().get(table):
+            # 截止时间所在的当天只清理了一部分
+            return datetime.fromisoformat(cutoff).date() + timedelta(days=1)
+        return None
@@ -0,0 +1,235 @@
+"""
+本地追加写日志（spool）
+
+数据先以 JSON 行的形式追加写入分段文件，并按批次 fsync，
+随后由消费者按块读取、写入数据库，成功后记录进度并删除分段。
+进程崩溃或重启后，未消费的分段会在下一次 drain 时重放，保证至少一次写入。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+import os
+from pathlib import Path
+from typing import IO, Any
+
+from zhenxun.services.log import logger
+
+LOG_COMMAND = "Spool"
+
+SpoolHandler = Callable[[list[dict[str, Any]]], Awaitable[None]]
+
+
+class Spool:
+    """
+    分段追加写日志
+
+    参数:
+        path: 分段文件所在目录
+        name: 分段文件名前缀
+        segment_bytes: 单个分段的最大字节数，超出后切换新分段
+        fsync_interval: 缓冲数据最长等待多久落盘（秒）
+        fsync_batch: 缓冲达到多少条时立即落盘
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        name: str,
+        *,
+        segment_bytes: int = 4 * 1024 * 1024,
+        fsync_interval: float = 1.0,
+        fsync_batch: int = 256,
+    ):
+        self.path = path
+        self.name = name
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self._buffer: list[str] = []
+        self._file: IO[str] | None = None
+        self._file_bytes = 0
+        self._seq = 0
+        self._pending = 0
+        self._opened = False
+        self._io_lock = asyncio.Lock()
+        self._drain_lock = asyncio.Lock()
+        self._sync_handle: asyncio.TimerHandle | None = None
+        self._sync_tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """已写入 spool 但尚未被消费的条数"""
+        return self._pending
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.path / f"{self.name}-{seq:010d}.jsonl"
+
+    @staticmethod
+    def _offset_path(segment: Path) -> Path:
+        return segment.with_suffix(".offset")
+
+    def _segments(self) -> list[Path]:
+        return sorted(self.path.glob(f"{self.name}-*.jsonl"))
+
+    def _open_sync(self) -> int:
+        self.path.mkdir(parents=True, exist_ok=True)
+        pending = 0
+        segments = self._segments()
+        for segment in segments:
+            offset = self._read_offset(segment)
+            with segment.open("rb") as f:
+                pending += max(0, sum(1 for _ in f) - offset)
+        if segments:
+            self._seq = int(segments[-1].stem.rsplit("-", 1)[-1]) + 1
+        return pending
+
+    async def open(self):
+        """打开 spool，统计上次遗留的未消费数据"""
+        if self._opened:
+            return
+        self._pending = await asyncio.to_thread(self._open_sync)
+        self._opened = True
+        if self._pending:
+            logger.info(
+                f"{self.name} 发现 {self._pending} 条未写入数据，等待重放",
+                LOG_COMMAND,
+            )
+
+    def append(self, record: dict[str, Any]):
+        """追加一条记录，按批次或时间间隔异步落盘"""
+        self._buffer.append(json.dumps(record, ensure_ascii=False))
+        self._pending += 1
+        if len(self._buffer) >= self.fsync_batch:
+            self._schedule_sync()
+        elif self._sync_handle is None:
+            loop = asyncio.get_running_loop()
+            self._sync_handle = loop.call_later(
+                self.fsync_interval, self._schedule_sync
+            )
+
+    def _schedule_sync(self):
+        if self._sync_handle is not None:
+            self._sync_handle.cancel()
+            self._sync_handle = None
+        task = asyncio.create_task(self.sync())
+        self._sync_tasks.add(task)
+        task.add_done_callback(self._sync_tasks.discard)
+
+    def _write_sync(self, lines: list[str]):
+        if self._file is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            segment = self._segment_path(self._seq)
+            self._file = segment.open("a", encoding="utf-8")
+            self._file_bytes = segment.stat().st_size
+        data = "".join(f"{line}\n" for line in lines)
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file_bytes += len(data.encode("utf-8"))
+        if self._file_bytes >= self.segment_bytes:
+            self._seal_sync()
+
+    def _seal_sync(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._file_bytes = 0
+        self._seq += 1
+
+    async def sync(self):
+        """将缓冲数据写入分段文件并 fsync"""
+        if self._sync_handle is not None:
+            self._sync_handle.cancel()
+            self._sync_handle = None
+        async with self._io_lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._write_sync, lines)
+            except Exception as e:
+                self._buffer = lines + self._buffer
+                logger.error(f"{self.name} 写入 spool 失败", LOG_COMMAND, e=e)
+
+    def _read_offset(self, segment: Path) -> int:
+        offset_path = self._offset_path(segment)
+        try:
+            return int(offset_path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _load_segment(
+        self, segment: Path
+    ) -> tuple[int, int, list[tuple[int, dict[str, Any]]]]:
+        offset = self._read_offset(segment)
+        records: list[tuple[int, dict[str, Any]]] = []
+        line_no = -1
+        with segment.open(encoding="utf-8", errors="replace") as f:
+            for line_no, line in enumerate(f):
+                if line_no < offset or not line.strip():
+                    continue
+                try:
+                    records.append((line_no, json.loads(line)))
+                except ValueError:
+                    logger.warning(
+                        f"{segment.name} 第 {line_no + 1} 行损坏，已跳过", LOG_COMMAND
+                    )
+        return offset, line_no + 1, records
+
+    def _commit_offset(self, segment: Path, offset: int):
+        offset_path = self._offset_path(segment)
+        tmp_path = offset_path.with_suffix(".tmp")
+        tmp_path.write_text(str(offset))
+        os.replace(tmp_path, offset_path)
+
+    def _remove_segment(self, segment: Path):
+        segment.unlink(missing_ok=True)
+        self._offset_path(segment).unlink(missing_ok=True)
+
+    async def drain(
+        self, handler: SpoolHandler, chunk_size: int | Callable[[], int] = 500
+    ) -> int:
+        """消费所有已落盘的数据
+
+        参数:
+            handler: 每块数据的处理函数，抛出异常时停止消费，数据保留待下次重放
+            chunk_size: 每块数据条数，传入函数时每块消费前重新获取
+
+        返回:
+            int: 本次消费的条数
+        """
+        async with self._drain_lock:
+            await self.sync()
+            async with self._io_lock:
+                await asyncio.to_thread(self._seal_sync)
+                active = self._segment_path(self._seq)
+            consumed = 0
+            for segment in self._segments():
+                if segment == active:
+                    continue
+                offset, total, records = await asyncio.to_thread(
+                    self._load_segment, segment
+                )
+                # 损坏或空行不会交给 handler，但同样计入已消费
+                skipped = max(0, total - offset) - len(records)
+                start = 0
+                while start < len(records):
+                    size = chunk_size() if callable(chunk_size) else chunk_size
+                    chunk = records[start : start + max(1, size)]
+                    start += len(chunk)
+                    await handler([record for _, record in chunk])
+                    offset = chunk[-1][0] + 1
+                    await asyncio.to_thread(self._commit_offset, segment, offset)
+                    consumed += len(chunk)
+                    self._pending = max(0, self._pending - len(chunk))
+                await asyncio.to_thread(self._remove_segment, segment)
+                self._pending = max(0, self._pending - skipped)
+            return consumed
+
+    async def close(self):
+        """落盘缓冲数据并关闭当前分段"""
+        await self.sync()
+        async with self._io_lock:
+            await asyncio.to_thread(self._seal_sync)